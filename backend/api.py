@@ -6,7 +6,15 @@ from typing import Any, Dict
 
 import webview
 
+from .diagnostics import DiagnosticsTracker
+from .documents import DocumentError, DocumentStore
 from .facade import CompilerFacade
+from .jobs import Cancelled, JobManager
+from .references import ReferenceIndex
+from .results import ResultError, ResultStore, encode_tokens, flatten_symbols
+
+# Evita que un bucle infinito bloquee la GUI al ejecutar desde el editor.
+EXECUTION_STEP_LIMIT = 50_000_000
 
 
 def _as_path(value: str | Path | None) -> Path | None:
@@ -27,6 +35,12 @@ class BackendAPI:
         self.project_root = project_root
         self.facade = CompilerFacade(project_root)
         self.window: webview.Window | None = None
+        self._index = None
+        self.documents = DocumentStore()
+        self.jobs = JobManager()
+        self.results = ResultStore()
+        self.diagnosed = DiagnosticsTracker()
+        self.references = ReferenceIndex()
 
     # --- utilidades ---
     def bind_window(self, window: webview.Window) -> None:
@@ -38,6 +52,29 @@ class BackendAPI:
     def _get_window(self) -> webview.Window | None:
         return self.window
 
+    def _publish(self, group: str, kind: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Deja tokens, simbolos y AST en `results` y responde solo con su `result_id` y conteos."""
+        sections: Dict[str, Any] = {}
+        if "ast_json" in result:
+            # `ast` es el mismo arbol que `ast_json`: no viaja y el JSON se pide con `get_ast`.
+            result.pop("ast", None)
+            ast_json = result.pop("ast_json")
+            result["has_ast"] = ast_json is not None
+            if ast_json is not None:
+                sections["ast"] = ast_json
+        if result.get("tokens") is not None:
+            sections["tokens"] = result.pop("tokens")
+            result["token_count"] = len(sections["tokens"])
+        if result.get("symbol_table") is not None:
+            sections["symbols"] = flatten_symbols(result.pop("symbol_table"))
+            result["symbol_count"] = len(sections["symbols"])
+        positions = result.pop("positions", None)
+        result["has_positions"] = positions is not None
+        if positions is not None:
+            sections["positions"] = positions
+        result["result_id"] = self.results.store(group, kind, sections) if sections else None
+        return result
+
     # --- archivos ---
     def open_file_dialog(self) -> Dict[str, Any]:
         window = self._get_window()
@@ -103,9 +140,289 @@ class BackendAPI:
 
     # --- compilador ---
     def compile(self, code: str, path: str | None = None) -> Dict[str, Any]:
-        result = self.facade.compile(code, path=_as_path(path))
-        return result.__dict__
+        # Sin documento abierto la clave es la ruta: un compile nuevo reemplaza al anterior.
+        def job(cancel):
+            return self.facade.compile(code, path=_as_path(path), cancel=cancel)
+
+        group = path or "<editor>"
+        try:
+            result = self.jobs.run(group, "compile", job)
+        except Cancelled:
+            return {"ok": False, "cancelled": True}
+        return self._publish(group, "compile", dict(result.__dict__))
 
     def semantic_preview(self, code: str) -> Dict[str, Any]:
         result = self.facade.semantic_preview(code)
         return result.__dict__
+
+    # --- documentos abiertos (la GUI envia solo deltas) ---
+    def open_document(self, content: str, path: str | None = None) -> Dict[str, Any]:
+        document = self.documents.open(content, path=path)
+        return {"ok": True, "doc_id": document.doc_id, "version": document.version}
+
+    def apply_edits(self, doc_id: str, version: int, edits: list[Dict[str, Any]]) -> Dict[str, Any]:
+        # Los analisis en curso quedan viejos: se cancelan para liberar el documento.
+        self.jobs.cancel(doc_id)
+        try:
+            document = self.documents.apply_edits(doc_id, version, edits)
+        except DocumentError as exc:
+            return {"ok": False, "error": exc.message, "version": exc.version}
+        return {
+            "ok": True,
+            "doc_id": doc_id,
+            "version": document.version,
+            "length": len(document.buffer),
+            "lines": document.buffer.line_count,
+        }
+
+    def analyze(self, doc_id: str, stages: list[str] | None = None) -> Dict[str, Any]:
+        """Analiza en el hilo de trabajos; una llamada nueva con las mismas etapas cancela la anterior.
+
+        Los resultados llevan `version`; los cancelados vuelven con `cancelled` para que la GUI los ignore.
+        Tokens y simbolos quedan en `results` y se piden por paginas con `get_tokens`/`get_symbols`.
+        """
+        try:
+            document = self.documents.get(doc_id)
+            kind = tuple(sorted(stages)) if stages is not None else None
+
+            def job(cancel):
+                with document.lock:
+                    return self.facade.analyze_document(document, stages, cancel=cancel)
+
+            return self._publish(doc_id, kind, self.jobs.run(doc_id, kind, job))
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except (DocumentError, ValueError) as exc:
+            return self._dialog_error(str(exc))
+
+    def diagnostics(self, doc_id: str, since: int | None = None) -> Dict[str, Any]:
+        """Diagnosticos en vivo como diferencias por linea respecto de la secuencia `since`.
+
+        Corre en el hilo de trabajos como `analyze`: un pedido nuevo o una edicion cancela el anterior.
+        """
+        try:
+            document = self.documents.get(doc_id)
+
+            def job(cancel):
+                with document.lock:
+                    version = document.version
+                    diagnostics = self.facade.diagnose_document(document, cancel=cancel)
+                return version, self.diagnosed.delta(doc_id, diagnostics, since)
+
+            version, delta = self.jobs.run(doc_id, "diagnostics", job)
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+        return {"ok": True, "doc_id": doc_id, "version": version, **delta}
+
+    def highlight(self, doc_id: str, first_line: int, last_line: int) -> Dict[str, Any]:
+        """Tokens para resaltar solo las lineas visibles del editor (ver `Document.highlight`)."""
+        # Sin `document.lock`: solo lee tokens, la GUI lo encadena detras de sus ediciones y
+        # no debe esperar a que termine un analisis en curso.
+        try:
+            document = self.documents.get(doc_id)
+            return {"ok": True, "version": document.version, **document.highlight(int(first_line), int(last_line))}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+
+    def hover(self, doc_id: str, offset: int) -> Dict[str, Any]:
+        """Nodo y tipo bajo `offset` (en caracteres) del documento.
+
+        El indice de posiciones se arma en el hilo de trabajos una vez por version
+        y queda en `results`; las consultas siguientes solo recorren el arbol de intervalos.
+        """
+        try:
+            document = self.documents.get(doc_id)
+            result_id = self.results.find(doc_id, "positions")
+            try:
+                version = self.results.get(result_id, "version") if result_id is not None else None
+            except ResultError:
+                version = None
+            if version is None or version != document.version:
+
+                def job(cancel):
+                    with document.lock:
+                        return document.version, self.facade.index_document(document, cancel)
+
+                version, index = self.jobs.run(doc_id, "positions", job)
+                result_id = self.results.store(doc_id, "positions", {"positions": index, "version": version})
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+        return {**self.node_at(result_id, offset), **self.type_at(result_id, offset), "version": version}
+
+    def complete(self, doc_id: str, offset: int, limit: int | None = None) -> Dict[str, Any]:
+        """Autocompletado en `offset` con los simbolos del ultimo analisis (ver `backend.completion`).
+
+        Corre en el hilo de trabajos y con el documento tomado, como `hover`: los
+        tries se actualizan dentro de los analisis.
+        """
+        try:
+            document = self.documents.get(doc_id)
+
+            def job(cancel):
+                with document.lock:
+                    return document.version, self.facade.complete_document(document, offset, limit, cancel)
+
+            version, result = self.jobs.run(doc_id, "completion", job)
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+        return {"ok": True, "version": version, **result}
+
+    def find_usages(self, doc_id: str, offset: int) -> Dict[str, Any]:
+        """Declaraciones y usos del simbolo bajo `offset` desde el indice invertido (`self.references`).
+
+        Cada documento se reindexa una vez por version; la consulta es una busqueda en el indice.
+        """
+        try:
+            document = self.documents.get(doc_id)
+
+            def job(cancel):
+                with document.lock:
+                    return document.version, self.facade.references_document(document, self.references, offset, cancel)
+
+            version, found = self.jobs.run(doc_id, "references", job)
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+        return {"ok": True, "version": version, "found": found}
+
+    def rename(self, doc_id: str, offset: int, new_name: str) -> Dict[str, Any]:
+        """Ediciones para renombrar el simbolo bajo `offset`; la GUI las aplica y las sincroniza como siempre."""
+        try:
+            document = self.documents.get(doc_id)
+
+            def job(cancel):
+                with document.lock:
+                    return document.version, self.facade.rename_document(document, self.references, offset, new_name, cancel)
+
+            version, result = self.jobs.run(doc_id, "references", job)
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "doc_id": doc_id, "version": document.version}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+        except ValueError as exc:
+            return self._dialog_error(str(exc))
+        return {"ok": True, "version": version, "symbol": result["symbol"], "edits": result["edits"]}
+
+    def outline(self, doc_id: str) -> Dict[str, Any]:
+        """Esquema del documento desde sus tokens, sin parsear (ver `backend.outline`)."""
+        # Igual que `highlight`: solo lee tokens y va encadenado detras de las ediciones.
+        try:
+            document = self.documents.get(doc_id)
+            return {"ok": True, "version": document.version, "items": self.facade.outline_document(document)}
+        except DocumentError as exc:
+            return self._dialog_error(exc.message)
+
+    def close_document(self, doc_id: str) -> Dict[str, Any]:
+        self.jobs.cancel(doc_id)
+        try:
+            document = self.documents.get(doc_id)
+            self.references.remove(document.path or doc_id)
+        except DocumentError:
+            pass
+        self.results.discard(doc_id)
+        self.diagnosed.forget(doc_id)
+        self.documents.close(doc_id)
+        return {"ok": True}
+
+    # --- paginas de resultados (la GUI pide solo las filas visibles) ---
+    def _page(self, result_id: str, section: str, offset: int, limit: int | None) -> Dict[str, Any]:
+        try:
+            return {"ok": True, **self.results.page(result_id, section, offset, limit)}
+        except ResultError as exc:
+            return self._dialog_error(str(exc))
+
+    def get_tokens(self, result_id: str, offset: int = 0, limit: int | None = None) -> Dict[str, Any]:
+        """Pagina de tokens en columnas (`results.encode_tokens`)."""
+        page = self._page(result_id, "tokens", offset, limit)
+        if page["ok"]:
+            page["columns"] = encode_tokens(page.pop("rows"))
+        return page
+
+    def get_symbols(self, result_id: str, offset: int = 0, limit: int | None = None) -> Dict[str, Any]:
+        return self._page(result_id, "symbols", offset, limit)
+
+    def get_ast(self, result_id: str) -> Dict[str, Any]:
+        try:
+            return {"ok": True, "result_id": result_id, "ast_json": self.results.get(result_id, "ast")}
+        except ResultError as exc:
+            return self._dialog_error(str(exc))
+
+    def _positions(self, result_id: str) -> Any:
+        return self.results.get(result_id, "positions")
+
+    def node_at(self, result_id: str, offset: int) -> Dict[str, Any]:
+        """Nodo mas interno bajo `offset` en un resultado con `has_positions`."""
+        try:
+            span = self._positions(result_id).node_at(int(offset))
+        except ResultError as exc:
+            return self._dialog_error(str(exc))
+        return {"ok": True, "result_id": result_id, "node": span.to_dict() if span is not None else None}
+
+    def type_at(self, result_id: str, offset: int) -> Dict[str, Any]:
+        """Nodo mas interno con tipo inferido bajo `offset` (`typed`, con `type`)."""
+        try:
+            span = self._positions(result_id).type_at(int(offset))
+        except ResultError as exc:
+            return self._dialog_error(str(exc))
+        return {"ok": True, "result_id": result_id, "typed": span.to_dict() if span is not None else None}
+
+    def execute(self, code: str, backend: str = "vm") -> Dict[str, Any]:
+        try:
+            result = self.facade.execute(code, max_steps=EXECUTION_STEP_LIMIT, backend=backend)
+        except ValueError as exc:
+            return self._dialog_error(str(exc))
+        return result.to_dict()
+
+    def optimize(self, code: str) -> Dict[str, Any]:
+        return self.facade.optimize(code)
+
+    def format_code(self, code: str, minify: bool = False) -> Dict[str, Any]:
+        return self.facade.format_code(code, minify=minify)
+
+    def analyze_project(self, path: str) -> Dict[str, Any]:
+        target = _as_path(path)
+        if target is None:
+            return self._dialog_error("Ruta no valida")
+        return self.facade.analyze_project(target).to_dict()
+
+    def find_clones(self, paths: list[str], min_tokens: int | None = None) -> Dict[str, Any]:
+        try:
+            report = self.facade.find_clones([Path(p).expanduser() for p in paths], min_tokens=min_tokens)
+        except ValueError as exc:
+            return self._dialog_error(str(exc))
+        return {"ok": True, **report.to_dict()}
+
+    def code_metrics(self, paths: list[str]) -> Dict[str, Any]:
+        return {"ok": True, **self.facade.metrics([Path(p).expanduser() for p in paths]).to_dict()}
+
+    # --- indice de simbolos ---
+    def _get_index(self):
+        if self._index is None:
+            from .cli import DEFAULT_DB
+            from .indexer import ProjectIndex
+
+            self._index = ProjectIndex(self.project_root / DEFAULT_DB)
+        return self._index
+
+    def index_paths(self, paths: list[str]) -> Dict[str, Any]:
+        try:
+            summary = self._get_index().index_paths([Path(p).expanduser() for p in paths])
+        except OSError as exc:
+            return self._dialog_error(f"No se pudo indexar: {exc}")
+        return {"ok": True, **summary}
+
+    def find_definitions(self, name: str, kind: str | None = None) -> Dict[str, Any]:
+        return {"ok": True, "results": self._get_index().find_definitions(name, kind=kind)}
+
+    def find_references(self, name: str, kind: str | None = None) -> Dict[str, Any]:
+        return {"ok": True, "results": self._get_index().find_references(name, kind=kind)}
+
+    def find_callers(self, name: str) -> Dict[str, Any]:
+        return {"ok": True, "results": self._get_index().callers(name)}
@@ -177,3 +177,51 @@ class Ternary:
     cond: Expr
     if_true: Expr
     if_false: Expr
+
+
+# === UTILIDADES DE RECORRIDO ===
+_FIELDS_CACHE: dict = {}
+
+
+def node_fields(node) -> Tuple[str, ...]:
+    """Nombres de campos dataclass de un nodo (cacheado por clase)."""
+    cls = node.__class__
+    names = _FIELDS_CACHE.get(cls)
+    if names is None:
+        from dataclasses import fields
+
+        names = tuple(f.name for f in fields(cls))
+        _FIELDS_CACHE[cls] = names
+    return names
+
+
+def is_node(value) -> bool:
+    """True si el valor es un nodo del AST (dataclass de este modulo)."""
+    return hasattr(value, "__dataclass_fields__") and not isinstance(value, type)
+
+
+def iter_child_nodes(node):
+    """Itera los hijos directos de un nodo, incluyendo los anidados en listas/tuplas."""
+    for name in node_fields(node):
+        value = getattr(node, name)
+        if is_node(value):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if is_node(item):
+                    yield item
+                elif isinstance(item, (list, tuple)):
+                    for sub in item:
+                        if is_node(sub):
+                            yield sub
+
+
+def walk(node):
+    """Recorrido en preorden de todos los nodos alcanzables desde `node`."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = list(iter_child_nodes(current))
+        children.reverse()
+        stack.extend(children)
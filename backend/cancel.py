@@ -0,0 +1,28 @@
+"""Cancelacion cooperativa de analisis largos.
+
+El trabajo llama `CancelToken.check()` entre etapas y dentro de los recorridos
+del AST, y termina con `Cancelled` en el siguiente punto de control. No depende
+de hilos: `jobs.JobManager` crea y cancela los tokens de la GUI.
+"""
+from __future__ import annotations
+
+
+class Cancelled(Exception):
+    """El trabajo fue reemplazado por uno mas nuevo o por una edicion."""
+
+
+class CancelToken:
+    """Bandera de cancelacion consultada por el trabajo en sus puntos de control."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        # Un bool simple: leerlo en cada nodo visitado cuesta menos que un Event.
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise Cancelled()
@@ -0,0 +1,365 @@
+"""Interfaz de linea de comandos: `python -m backend.cli <comando> ...`."""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Any, List, Optional
+
+DEFAULT_DB = ".mini_php_index.sqlite"
+
+
+def _print_json(data: Any) -> None:
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _print_rows(rows: List[dict]) -> None:
+    if not rows:
+        print("(sin resultados)")
+        return
+    for row in rows:
+        where = f"{row['path']}:{row.get('lineno') or '-'}"
+        owner = f" [{row['owner']}]" if row.get("owner") else ""
+        print(f"{where:<60} {row['kind']:<12} {row['name']}{owner}")
+
+
+def _emit(rows: List[dict], as_json: bool) -> int:
+    if as_json:
+        _print_json(rows)
+    else:
+        _print_rows(rows)
+    return 0 if rows else 1
+
+
+def _cmd_index(args) -> int:
+    from .indexer import ProjectIndex
+
+    index = ProjectIndex(args.db)
+    summary = index.index_paths(args.paths)
+    summary.update(index.stats())
+    _print_json(summary)
+    return 0
+
+
+def _cmd_where(args) -> int:
+    from .indexer import ProjectIndex
+
+    return _emit(ProjectIndex(args.db).find_definitions(args.name, kind=args.kind), args.json)
+
+
+def _cmd_refs(args) -> int:
+    from .indexer import ProjectIndex
+
+    return _emit(ProjectIndex(args.db).find_references(args.name, kind=args.kind), args.json)
+
+
+def _cmd_callers(args) -> int:
+    from .indexer import ProjectIndex
+
+    return _emit(ProjectIndex(args.db).callers(args.name), args.json)
+
+
+def _cmd_run(args) -> int:
+    if args.backend == "python":
+        return _run_python(args)
+    from .facade import parse_source
+    from .vm import CompileError, VirtualMachine, compile_program
+
+    parsed = parse_source(args.file.read_text(encoding="utf-8"))
+    if parsed.ast is None or parsed.lexical_errors or parsed.syntax_errors:
+        for msg in parsed.lexical_messages + parsed.syntax_messages:
+            print(msg["message"], file=sys.stderr)
+        return 1
+    program = parsed.ast
+    if args.fold:
+        from .optimizer import fold_constants
+
+        program, report = fold_constants(program)
+        if args.stats:
+            print(report.format(), file=sys.stderr)
+    if args.backend == "ir":
+        return _run_ir(program, args)
+    try:
+        module = compile_program(program)
+    except CompileError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if args.dis:
+        print(module.disassemble())
+        return 0
+    result = VirtualMachine(module, max_steps=args.max_steps).run()
+    return _report_run(result, args.stats, f"[vm] {result.steps} instrucciones")
+
+
+def _run_python(args) -> int:
+    from .vm import CompileError, PythonBackend
+
+    if args.fold:
+        print("--fold no se aplica con --backend python", file=sys.stderr)
+        return 2
+
+    try:
+        program = PythonBackend().load(args.file.read_text(encoding="utf-8"), guard=args.max_steps is not None)
+    except CompileError as exc:
+        print(exc.message if exc.lineno is None else exc, file=sys.stderr)
+        return 1
+    if args.dis:
+        print(program.python_source, end="")
+        return 0
+    result = program.run(max_steps=args.max_steps)
+    return _report_run(result, args.stats, "[python] ejecutado")
+
+
+def _run_ir(program, args) -> int:
+    from .ir import IRMachine, build_ir
+    from .vm import CompileError
+
+    try:
+        module, report = build_ir(program, optimize=not args.no_opt)
+    except CompileError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if report is not None and args.stats:
+        counts = ", ".join(f"{name}: {count}" for name, count in report.counts.items()) or "sin cambios"
+        print(f"[ir] instrucciones {report.before} -> {report.after} ({counts})", file=sys.stderr)
+    if args.dis:
+        print(module.dump())
+        return 0
+    result = IRMachine(module, max_steps=args.max_steps).run()
+    return _report_run(result, args.stats, f"[ir] {result.steps} instrucciones")
+
+
+def _report_run(result, stats: bool, label: str) -> int:
+    sys.stdout.write(result.output)
+    if stats:
+        print(f"\n{label} en {result.elapsed * 1000:.2f} ms", file=sys.stderr)
+    if not result.ok:
+        print(result.error, file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cmd_optimize(args) -> int:
+    from .facade import CompilerFacade
+
+    result = CompilerFacade().optimize(args.file.read_text(encoding="utf-8"))
+    if args.json:
+        _print_json(result)
+    elif not result["ok"]:
+        print(result["error"], file=sys.stderr)
+    else:
+        for change in result["changes"]:
+            print(f"{args.file}:{change['lineno'] or '-'}  {change['kind']:<8} {change['detail']}")
+        print(f"{len(result['changes'])} cambios, nodos {result['nodes_before']} -> {result['nodes_after']}")
+    return 0 if result["ok"] else 1
+
+
+def _cmd_format(args) -> int:
+    from .printer import FormatError, format_stream, minify_stream
+
+    target = sys.stdout if args.output is None else args.output.open("w", encoding="utf-8")
+    try:
+        with args.file.open(encoding="utf-8") as source:
+            if args.tokens:
+                minify_stream(source, target.write)
+            else:
+                format_stream(source, target.write, minify=args.minify)
+    except FormatError as exc:
+        print(exc.message, file=sys.stderr)
+        return 1
+    finally:
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+def _print_outline(items: List[dict], depth: int = 0) -> None:
+    for item in items:
+        signature = f"({', '.join(item['params'])})" if item["kind"] in ("function", "method") else ""
+        modifiers = " ".join(filter(None, (item["visibility"], "static" if item["is_static"] else None)))
+        prefix = f"{modifiers} " if modifiers else ""
+        print(f"{item['lineno']:>5}  {'  ' * depth}{item['kind']:<10} {prefix}{item['name']}{signature}")
+        _print_outline(item["children"], depth + 1)
+
+
+def _cmd_outline(args) -> int:
+    from .facade import CompilerFacade
+
+    items = CompilerFacade().outline(args.file.read_text(encoding="utf-8"))
+    if args.json:
+        _print_json(items)
+    elif items:
+        _print_outline(items)
+    else:
+        print("(sin declaraciones)")
+    return 0
+
+
+def _cmd_rename(args) -> int:
+    from .documents import DocumentError, DocumentStore
+    from .facade import CompilerFacade
+    from .references import ReferenceIndex
+
+    try:
+        line, column = (int(part) for part in args.position.split(":"))
+    except ValueError:
+        print(f"Posicion no valida (LINEA:COLUMNA): {args.position}", file=sys.stderr)
+        return 1
+    document = DocumentStore().open(args.file.read_text(encoding="utf-8"), path=str(args.file))
+    try:
+        offset = document.buffer.offset_at(line, max(column - 1, 0))
+        result = CompilerFacade().rename_document(document, ReferenceIndex(), offset, args.new_name)
+    except (DocumentError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if args.write:
+        args.file.write_text(result["text"], encoding="utf-8")
+    else:
+        sys.stdout.write(result["text"])
+    print(f"{len(result['edits'])} apariciones de {result['symbol']}", file=sys.stderr)
+    return 0
+
+
+def _cmd_clones(args) -> int:
+    from .clones import CloneDetector
+
+    try:
+        detector = CloneDetector(args.min_tokens, args.window, args.workers)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    report = detector.detect(args.paths)
+    if args.json:
+        _print_json(report.to_dict())
+    elif report.pairs:
+        for pair in report.pairs:
+            first = f"{pair.first.path}:{pair.first.start_line}-{pair.first.end_line}"
+            second = f"{pair.second.path}:{pair.second.start_line}-{pair.second.end_line}"
+            print(f"{first:<40} {second:<40} {pair.tokens} tokens")
+    else:
+        print("(sin resultados)")
+    for error in report.errors:
+        print(f"{error['path']}: {error['message']}", file=sys.stderr)
+    return 0 if report.pairs else 1
+
+
+def _cmd_metrics(args) -> int:
+    from .metrics import collect_metrics, write_table
+
+    try:
+        report = collect_metrics(args.paths, workers=args.workers, use_numpy=False if args.no_numpy else None)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    tables = {"files": report.files, "functions": report.functions, "token_kinds": report.token_kinds}
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+        for name, table in tables.items():
+            write_table(table, args.output / f"{name}.{args.format}")
+        print(f"{len(report.files['path'])} archivos, {len(report.functions['path'])} funciones -> {args.output}")
+    else:
+        table = tables[args.table]
+        if args.format == "json":
+            _print_json(table)
+        else:
+            writer = csv.writer(sys.stdout, lineterminator="\n")
+            writer.writerow(list(table))
+            writer.writerows(zip(*table.values()))
+    for error in report.errors:
+        print(f"{error['path']}: {error['message']}", file=sys.stderr)
+    return 0 if report.files["path"] else 1
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    from .clones import DEFAULT_MIN_TOKENS, DEFAULT_WINDOW
+
+    parser = argparse.ArgumentParser(prog="mini-php", description="Herramientas del Mini PHP Compiler")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def _with_db(p: argparse.ArgumentParser) -> argparse.ArgumentParser:
+        p.add_argument("--db", default=DEFAULT_DB, help=f"ruta del indice SQLite (por defecto {DEFAULT_DB})")
+        return p
+
+    p = _with_db(sub.add_parser("index", help="indexa archivos o directorios PHP"))
+    p.add_argument("paths", nargs="+", type=Path)
+    p.set_defaults(func=_cmd_index)
+
+    for name, func, help_text in (
+        ("where", _cmd_where, "donde se define un simbolo"),
+        ("refs", _cmd_refs, "referencias a un nombre"),
+    ):
+        p = _with_db(sub.add_parser(name, help=help_text))
+        p.add_argument("name")
+        p.add_argument("--kind", default=None)
+        p.add_argument("--json", action="store_true")
+        p.set_defaults(func=func)
+
+    p = _with_db(sub.add_parser("callers", help="quien llama a una funcion o a Clase::metodo"))
+    p.add_argument("name")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=_cmd_callers)
+
+    p = sub.add_parser("run", help="compila y ejecuta un archivo PHP (VM de bytecode, Python o IR en SSA)")
+    p.add_argument("file", type=Path)
+    p.add_argument("--backend", choices=("vm", "python", "ir"), default="vm")
+    p.add_argument(
+        "--dis", action="store_true", help="muestra el bytecode, el Python generado o la IR en lugar de ejecutar"
+    )
+    p.add_argument("--stats", action="store_true", help="instrucciones ejecutadas y tiempo")
+    p.add_argument("--max-steps", type=int, default=None)
+    p.add_argument("--fold", action="store_true", help="pliega constantes antes de compilar (backends vm e ir)")
+    p.add_argument("--no-opt", action="store_true", help="ejecuta la IR sin los pases de optimizacion (backend ir)")
+    p.set_defaults(func=_cmd_run)
+
+    p = sub.add_parser("format", help="reimprime un archivo PHP formateado o minificado (por bloques)")
+    p.add_argument("file", type=Path)
+    p.add_argument("-o", "--output", type=Path, default=None, help="archivo de salida (por defecto stdout)")
+    p.add_argument("--minify", action="store_true", help="sin comentarios ni espacios innecesarios")
+    p.add_argument("--tokens", action="store_true", help="minifica sobre los tokens, sin parsear")
+    p.set_defaults(func=_cmd_format)
+
+    p = sub.add_parser("optimize", help="pliega constantes y poda ramas muertas; muestra los cambios")
+    p.add_argument("file", type=Path)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=_cmd_optimize)
+
+    p = sub.add_parser("outline", help="esquema de namespaces, clases y funciones leyendo solo tokens")
+    p.add_argument("file", type=Path)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=_cmd_outline)
+
+    p = sub.add_parser("rename", help="renombra el simbolo en LINEA:COLUMNA (declaraciones y usos)")
+    p.add_argument("file", type=Path)
+    p.add_argument("position", help="LINEA:COLUMNA (desde 1) de una aparicion del simbolo")
+    p.add_argument("new_name")
+    p.add_argument("-w", "--write", action="store_true", help="reescribe el archivo en lugar de imprimirlo")
+    p.set_defaults(func=_cmd_rename)
+
+    p = sub.add_parser("clones", help="copias de codigo entre archivos (tokens normalizados y winnowing)")
+    p.add_argument("paths", nargs="+", type=Path)
+    p.add_argument("--min-tokens", type=int, default=DEFAULT_MIN_TOKENS, help="largo minimo de una copia en tokens")
+    p.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="ventana del winnowing (mas chica: mas huellas)")
+    p.add_argument("--workers", type=int, default=None, help="procesos para lexear (por defecto uno por CPU)")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=_cmd_clones)
+
+    p = sub.add_parser("metrics", help="LOC, Halstead, complejidad ciclomatica y anidamiento por archivo y funcion")
+    p.add_argument("paths", nargs="+", type=Path)
+    p.add_argument("--table", choices=("files", "functions", "token_kinds"), default="files")
+    p.add_argument("--format", choices=("csv", "json"), default="csv", help="CSV o JSON en columnas")
+    p.add_argument("-o", "--output", type=Path, default=None, help="directorio donde escribir las tres tablas")
+    p.add_argument("--workers", type=int, default=None, help="procesos para parsear (por defecto uno por CPU)")
+    p.add_argument("--no-numpy", action="store_true", help="agrega con `array` aunque numpy este instalado")
+    p.set_defaults(func=_cmd_metrics)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""Deteccion de codigo duplicado entre archivos con huellas de tokens (winnowing).
+
+Cada archivo se reduce a la secuencia de tipos de sus tokens, sin ningun valor:
+operadores y palabras clave ya tienen un tipo propio en el lexer, asi que solo
+se pierden nombres y literales y una copia con variables o literales renombrados
+normaliza igual que el original. Sobre esa secuencia se calcula un hash rodante
+de cada k-grama y el winnowing se queda con el minimo de cada ventana de
+`window` hashes: toda coincidencia de al menos
+`min_tokens` tokens (k = `min_tokens - window + 1`) comparte alguna huella.
+
+`FingerprintIndex` junta las huellas de todos los archivos (hash -> archivo y
+posicion). Cada par de posiciones con el mismo hash es una semilla; las semillas
+de un mismo par de archivos se agrupan por diagonal y se extienden comparando
+las secuencias normalizadas, de modo que cada token se compara una vez por
+diagonal. Los hashes que aparecen en mas de `max_postings` lugares (codigo
+repetido en todo el corpus) se descartan para que el costo siga siendo lineal.
+
+El lexeo y las huellas de cada archivo son independientes y se reparten en
+procesos (`corpus.parallel_map`). Los procesos devuelven solo la secuencia
+normalizada (un byte por token) y las huellas; los offsets y lineas de las
+copias encontradas se piden al final, solo para los archivos involucrados.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .corpus import KIND_IDS, default_workers, parallel_map, php_files
+from .outline import scan_spans
+
+DEFAULT_MIN_TOKENS = 30
+DEFAULT_WINDOW = 8
+DEFAULT_MAX_POSTINGS = 64
+
+_SKIPPED = ("PHP_OPEN", "PHP_CLOSE")
+
+_BASE = 257
+_MOD = (1 << 61) - 1
+
+Fingerprint = Tuple[int, int]  # (hash, indice del primer token del k-grama)
+Token = Tuple[str, Any, int, int, int]
+
+
+def normalize(spans: Iterable[Token]) -> Tuple[bytes, List[Token]]:
+    """Secuencia de tipos (un byte por token) y los tokens que la forman."""
+    kept = [span for span in spans if span[0] not in _SKIPPED]
+    return bytes(KIND_IDS.get(span[0], 0) for span in kept), kept
+
+
+def kgram_hashes(kinds: bytes, k: int) -> List[int]:
+    """Hash rodante (Karp-Rabin) de cada k-grama de `kinds`."""
+    if len(kinds) < k:
+        return []
+    top = pow(_BASE, k - 1, _MOD)
+    value = 0
+    for byte in kinds[:k]:
+        value = (value * _BASE + byte) % _MOD
+    hashes = [value]
+    for idx in range(k, len(kinds)):
+        value = ((value - kinds[idx - k] * top) * _BASE + kinds[idx]) % _MOD
+        hashes.append(value)
+    return hashes
+
+
+def winnow(hashes: Sequence[int], window: int) -> List[Fingerprint]:
+    """Minimo de cada ventana (el de mas a la derecha ante empates), sin repetir posiciones."""
+    if not hashes:
+        return []
+    if len(hashes) <= window:
+        pos = min(range(len(hashes)), key=lambda idx: (hashes[idx], -idx))
+        return [(hashes[pos], pos)]
+    found: List[Fingerprint] = []
+    candidates: List[int] = []  # cola monotona de posiciones (hashes crecientes)
+    head = 0
+    last = -1
+    for idx, value in enumerate(hashes):
+        while len(candidates) > head and hashes[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(idx)
+        if candidates[head] <= idx - window:
+            head += 1
+        if idx >= window - 1 and candidates[head] != last:
+            last = candidates[head]
+            found.append((hashes[last], last))
+        if head > 1024:
+            del candidates[:head]
+            head = 0
+    return found
+
+
+@dataclass
+class FileFingerprints:
+    path: str
+    kinds: bytes = b""
+    fingerprints: List[Fingerprint] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def fingerprint_text(code: str, k: int, window: int, path: str = "") -> FileFingerprints:
+    kinds, _ = normalize(scan_spans(code))
+    return FileFingerprints(path, kinds, winnow(kgram_hashes(kinds, k), window))
+
+
+def fingerprint_file(path: str, k: int, window: int) -> FileFingerprints:
+    """Huellas de un archivo; corre en los procesos de trabajo."""
+    try:
+        code = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        return FileFingerprints(path, error=str(exc))
+    return fingerprint_text(code, k, window, path)
+
+
+def _token_spans(path: str, indices: Sequence[int]) -> Dict[int, Tuple[int, int, int]]:
+    """(inicio, fin, linea) de los tokens normalizados `indices` de `path`."""
+    _, kept = normalize(scan_spans(Path(path).read_text(encoding="utf-8")))
+    return {idx: kept[idx][2:5] for idx in indices}
+
+
+class FingerprintIndex:
+    """Huellas compartidas por todo el corpus: hash -> [(archivo, posicion)]."""
+
+    def __init__(self) -> None:
+        self.files: List[FileFingerprints] = []
+        self._postings: Dict[int, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def add(self, item: FileFingerprints) -> int:
+        file_id = len(self.files)
+        self.files.append(item)
+        for value, pos in item.fingerprints:
+            self._postings.setdefault(value, []).append((file_id, pos))
+        return file_id
+
+    def seeds(self, max_postings: int = DEFAULT_MAX_POSTINGS) -> Iterable[Tuple[int, int, int, int]]:
+        """Pares `(archivo_a, pos_a, archivo_b, pos_b)` con la misma huella, con a antes que b."""
+        for postings in self._postings.values():
+            if len(postings) < 2 or len(postings) > max_postings:
+                continue
+            for i, first in enumerate(postings):
+                for second in postings[i + 1:]:
+                    yield (*first, *second) if first < second else (*second, *first)
+
+
+def _match_forward(a: bytes, i: int, b: bytes, j: int, limit: int) -> int:
+    """Largo del prefijo comun de `a[i:]` y `b[j:]` (hasta `limit`), comparando por bloques."""
+    length = 0
+    step = 64
+    while length < limit:
+        size = min(step, limit - length)
+        if a[i + length:i + length + size] == b[j + length:j + length + size]:
+            length += size
+            step *= 2
+        elif size == 1:
+            break
+        else:
+            step = size // 2
+    return length
+
+
+def _match_backward(a: bytes, i: int, b: bytes, j: int, limit: int) -> int:
+    """Largo del sufijo comun de `a[:i]` y `b[:j]` (hasta `limit`)."""
+    length = 0
+    step = 64
+    while length < limit:
+        size = min(step, limit - length)
+        if a[i - length - size:i - length] == b[j - length - size:j - length]:
+            length += size
+            step *= 2
+        elif size == 1:
+            break
+        else:
+            step = size // 2
+    return length
+
+
+@dataclass(frozen=True)
+class CloneRegion:
+    path: str
+    start: int
+    end: int
+    start_line: int
+    end_line: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "start": self.start,
+            "end": self.end,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+        }
+
+
+@dataclass(frozen=True)
+class ClonePair:
+    first: CloneRegion
+    second: CloneRegion
+    tokens: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"first": self.first.to_dict(), "second": self.second.to_dict(), "tokens": self.tokens}
+
+
+@dataclass
+class CloneReport:
+    files: int
+    tokens: int
+    fingerprints: int
+    pairs: List[ClonePair] = field(default_factory=list)
+    errors: List[Dict[str, str]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "tokens": self.tokens,
+            "fingerprints": self.fingerprints,
+            "pairs": [pair.to_dict() for pair in self.pairs],
+            "errors": self.errors,
+        }
+
+
+class CloneDetector:
+    """Busca copias de al menos `min_tokens` tokens entre (y dentro de) los archivos dados.
+
+    `workers` es la cantidad de procesos para lexear (por defecto uno por CPU);
+    con 1 todo corre en el proceso actual.
+    """
+
+    def __init__(
+        self,
+        min_tokens: int = DEFAULT_MIN_TOKENS,
+        window: int = DEFAULT_WINDOW,
+        workers: Optional[int] = None,
+        max_postings: int = DEFAULT_MAX_POSTINGS,
+    ) -> None:
+        if window < 1 or min_tokens < window:
+            raise ValueError("min_tokens debe ser al menos window y window al menos 1")
+        self.min_tokens = min_tokens
+        self.window = window
+        self.k = min_tokens - window + 1
+        self.workers = default_workers(workers)
+        self.max_postings = max_postings
+
+    def detect(self, paths: Iterable[str | Path]) -> CloneReport:
+        files = php_files(paths)
+        index = FingerprintIndex()
+        errors: List[Dict[str, str]] = []
+        columns = (files, [self.k] * len(files), [self.window] * len(files))
+        for item in parallel_map(fingerprint_file, columns, self.workers):
+            if item.error is not None:
+                errors.append({"path": item.path, "message": item.error})
+            else:
+                index.add(item)
+        matches = self._regions(index)
+        pairs = self._resolve(index, matches)
+        return CloneReport(
+            files=len(index.files),
+            tokens=sum(len(item.kinds) for item in index.files),
+            fingerprints=len(index),
+            pairs=pairs,
+            errors=errors,
+        )
+
+    def _regions(self, index: FingerprintIndex) -> List[Tuple[int, int, int, int, int]]:
+        """Copias maximas `(archivo_a, pos_a, archivo_b, pos_b, largo)` en tokens normalizados."""
+        diagonals: Dict[Tuple[int, int, int], List[int]] = {}
+        for fa, pa, fb, pb in index.seeds(self.max_postings):
+            if fa == fb and pb - pa < self.k:
+                continue  # k-gramas solapados del mismo archivo
+            diagonals.setdefault((fa, fb, pb - pa), []).append(pa)
+        found: List[Tuple[int, int, int, int, int]] = []
+        k = self.k
+        for (fa, fb, diagonal), starts in diagonals.items():
+            a = index.files[fa].kinds
+            b = index.files[fb].kinds
+            covered = -1
+            for pa in sorted(starts):
+                if pa < covered:
+                    continue
+                pb = pa + diagonal
+                if a[pa:pa + k] != b[pb:pb + k]:
+                    continue  # colision del hash
+                back = _match_backward(a, pa, b, pb, min(pa, pb, pa - covered if covered >= 0 else pa))
+                first = pa - back
+                limit = min(len(a) - pa, len(b) - pb)
+                if fa == fb:
+                    limit = min(limit, diagonal - back)  # sin solaparse consigo misma
+                length = back + _match_forward(a, pa, b, pb, limit)
+                covered = first + length
+                if length >= self.min_tokens:
+                    found.append((fa, first, fb, first + diagonal, length))
+        found.sort()
+        return found
+
+    def _resolve(self, index: FingerprintIndex, matches: List[Tuple[int, int, int, int, int]]) -> List[ClonePair]:
+        needed: Dict[int, set] = {}
+        for fa, pa, fb, pb, length in matches:
+            needed.setdefault(fa, set()).update((pa, pa + length - 1))
+            needed.setdefault(fb, set()).update((pb, pb + length - 1))
+        ids = sorted(needed)
+        paths = [index.files[file_id].path for file_id in ids]
+        indices = [sorted(needed[file_id]) for file_id in ids]
+        spans = dict(zip(ids, parallel_map(_token_spans, (paths, indices), self.workers)))
+
+        def region(file_id: int, first: int, length: int) -> CloneRegion:
+            start, _, start_line = spans[file_id][first]
+            _, end, end_line = spans[file_id][first + length - 1]
+            return CloneRegion(index.files[file_id].path, start, end, start_line, end_line)
+
+        return [ClonePair(region(fa, pa, length), region(fb, pb, length), length) for fa, pa, fb, pb, length in matches]
+
+
+def find_clones(
+    paths: Iterable[str | Path],
+    min_tokens: int = DEFAULT_MIN_TOKENS,
+    window: int = DEFAULT_WINDOW,
+    workers: Optional[int] = None,
+) -> CloneReport:
+    return CloneDetector(min_tokens, window, workers).detect(paths)
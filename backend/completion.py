@@ -0,0 +1,291 @@
+"""Autocompletado de identificadores con tries de prefijos sobre la tabla de simbolos.
+
+`CompletionIndex` guarda un `PrefixTrie` por contenedor (el scope global, cada
+funcion o metodo y cada clase) mas uno con las palabras reservadas del lexer:
+
+- los scopes de bloque se suman a la funcion, metodo o global que los contiene;
+- las clases guardan sus metodos desde `ClassMemberIndex` (con visibilidad y
+  `static`), para completar despues de `->` y `::`.
+
+`update` recibe la tabla de simbolos de cada nuevo analisis y solo inserta o
+borra en los tries lo que cambio respecto del anterior, asi que el costo de
+reanalizar es un recorrido de los simbolos y no reconstruir los tries. Entre
+analisis (mientras el codigo a medio escribir no parsea) los rangos de los
+contenedores se corren con cada edicion (`shift`) para seguir ubicando el
+scope del cursor.
+
+Una consulta baja por el trie hasta el prefijo y recorre en orden alfabetico
+solo hasta juntar `limit` candidatos: el costo depende del largo del prefijo y
+del limite, no de la cantidad de simbolos.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .lexer import LexerConfig
+from .positions import NodeSpan, SpanIndex
+
+DEFAULT_LIMIT = 50
+# Caracteres antes del cursor que alcanzan para ver el prefijo y un `$obj->`/`Clase::`.
+CONTEXT = 256
+GLOBAL = ("global", "")
+# Orden de los candidatos de un mismo nivel de scope.
+KIND_RANK = {"param": 0, "var": 0, "method": 1, "func": 2, "class": 3, "keyword": 4}
+
+_MEMBER = re.compile(r"(\$\w+|[A-Za-z_\\][\w\\]*)\s*(->|::)\s*(\w*)$")
+_WORD = re.compile(r"\$?\w*$")
+
+ScopeKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class Candidate:
+    label: str
+    kind: str  # 'var', 'param', 'func', 'class', 'method', 'keyword'
+    detail: Optional[str] = None  # tipo inferido, nombre calificado o clase duena
+    is_static: bool = False
+    visibility: str = "public"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "kind": self.kind, "detail": self.detail}
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.items: Optional[Dict[Tuple[str, str], Candidate]] = None
+
+
+class PrefixTrie:
+    """Trie por caracter con claves en minusculas (PHP no distingue mayusculas en nombres).
+
+    Varias entradas pueden compartir clave (una funcion `foo` y una clase `Foo`);
+    se distinguen por `(kind, label)`.
+    """
+
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str, candidate: Candidate) -> None:
+        node = self.root
+        for char in key.lower():
+            nxt = node.children.get(char)
+            if nxt is None:
+                nxt = node.children[char] = _TrieNode()
+            node = nxt
+        if node.items is None:
+            node.items = {}
+        ident = (candidate.kind, candidate.label)
+        if ident not in node.items:
+            self._size += 1
+        node.items[ident] = candidate
+
+    def discard(self, key: str, candidate: Candidate) -> None:
+        """Quita la entrada y poda las ramas que quedan vacias."""
+        path = [self.root]
+        for char in key.lower():
+            nxt = path[-1].children.get(char)
+            if nxt is None:
+                return
+            path.append(nxt)
+        node = path[-1]
+        if not node.items or node.items.pop((candidate.kind, candidate.label), None) is None:
+            return
+        self._size -= 1
+        if not node.items:
+            node.items = None
+        for depth in range(len(path) - 1, 0, -1):
+            if path[depth].items or path[depth].children:
+                break
+            del path[depth - 1].children[key[depth - 1].lower()]
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[Candidate]:
+        """Hasta `limit` entradas que empiezan con `prefix`, en orden alfabetico."""
+        node = self.root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        found: List[Candidate] = []
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            if node.items:
+                found.extend(sorted(node.items.values(), key=lambda item: (item.label, item.kind)))
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+        return found[:limit]
+
+
+def _short(name: str) -> str:
+    return name.rsplit("\\", 1)[-1]
+
+
+def _detail(symbol: Any) -> Optional[str]:
+    if symbol.kind in ("func", "class"):
+        return symbol.name
+    return symbol.type if isinstance(symbol.type, str) else None
+
+
+class CompletionIndex:
+    """Candidatos de completado de un documento, actualizados con cada analisis."""
+
+    def __init__(self, reserved: Iterable[str] = ()) -> None:
+        self.keywords = PrefixTrie()
+        for word in reserved or LexerConfig().reserved:
+            self.keywords.add(word, Candidate(word, "keyword"))
+        self.tries: Dict[ScopeKey, PrefixTrie] = {}
+        self._entries: Dict[ScopeKey, Dict[Tuple[str, str], Candidate]] = {}
+        self._spans: List[NodeSpan] = []
+        self._scopes: Optional[SpanIndex] = SpanIndex()
+        self._classes: Dict[str, List[ScopeKey]] = {}
+        self.analyzed = False
+        # Inserciones y borrados en los tries durante el ultimo `update`.
+        self.changes = 0
+
+    # --- actualizacion ---
+    def update(self, symtab: Any, members: Any = None) -> int:
+        """Lleva los tries a la tabla de simbolos `symtab` (y los metodos de `members`).
+
+        Solo toca los tries en lo que difiere del analisis anterior; devuelve cuantas
+        entradas se insertaron o borraron. Los rangos de los contenedores se toman
+        de los nodos, que deben tener sus offsets al dia (`settle_offsets`).
+        """
+        containers = symtab.containers()
+        entries: Dict[ScopeKey, Dict[Tuple[str, str], Candidate]] = {}
+        spans: List[NodeSpan] = []
+        for meta, symbols in symtab.all_scopes():
+            kind, name = containers[meta["id"]]
+            key = (kind, name.lower())
+            node = meta.get("node")
+            if meta["kind"] in ("function", "method", "class") and getattr(node, "start", None) is not None:
+                spans.append(NodeSpan(node.start, node.end, key))
+            if key[0] == "class":
+                continue  # los metodos salen de `members`
+            table = entries.setdefault(key, {})
+            for symbol in symbols.values():
+                label = _short(symbol.name) if symbol.kind in ("func", "class") else symbol.name
+                table.setdefault((symbol.kind, label), Candidate(label, symbol.kind, _detail(symbol)))
+        classes: Dict[str, List[ScopeKey]] = {}
+        for entry in (members.classes.values() if members is not None else ()):
+            key = ("class", entry.name.lower())
+            for name in {entry.name.lower(), _short(entry.name).lower()}:
+                classes.setdefault(name, []).append(key)
+            entries[key] = {
+                ("method", method.name): Candidate(method.name, "method", entry.name, method.is_static, method.visibility)
+                for method in entry.methods.values()
+            }
+        self.changes = self._apply(entries)
+        self._spans = spans
+        self._scopes = None
+        self._classes = classes
+        self.analyzed = True
+        return self.changes
+
+    def _apply(self, entries: Dict[ScopeKey, Dict[Tuple[str, str], Candidate]]) -> int:
+        changes = 0
+        for key in set(self._entries) | set(entries):
+            old = self._entries.get(key, {})
+            new = entries.get(key, {})
+            if old == new:
+                continue
+            trie = self.tries.setdefault(key, PrefixTrie())
+            for ident, candidate in old.items():
+                if new.get(ident) != candidate:
+                    trie.discard(candidate.label, candidate)
+                    changes += 1
+            for ident, candidate in new.items():
+                if old.get(ident) != candidate:
+                    trie.add(candidate.label, candidate)
+                    changes += 1
+            if not trie:
+                del self.tries[key]
+        self._entries = {key: table for key, table in entries.items() if table}
+        return changes
+
+    def shift(self, offset: int, deleted: int, inserted: int) -> None:
+        """Corre los rangos de los contenedores por una edicion del texto."""
+        if not self._spans:
+            return
+
+        def moved(pos: int) -> int:
+            if pos <= offset:
+                return pos
+            if pos >= offset + deleted:
+                return pos + inserted - deleted
+            return offset + inserted
+
+        self._spans = [NodeSpan(moved(span.start), moved(span.end), span.node) for span in self._spans]
+        self._scopes = None
+
+    # --- consultas ---
+    def scopes_at(self, offset: int) -> List[ScopeKey]:
+        """Contenedores que encierran `offset`, del mas interno al global."""
+        if self._scopes is None:
+            self._scopes = SpanIndex(self._spans)
+        return [span.node for span in reversed(self._scopes.containing(offset))] + [GLOBAL]
+
+    def _lookup(self, key: ScopeKey, kind: str, label: str) -> Optional[Candidate]:
+        return self._entries.get(key, {}).get((kind, label))
+
+    def _class_keys(self, name: str, scopes: List[ScopeKey]) -> List[ScopeKey]:
+        if name.lower() in ("self", "static"):
+            return [key for key in scopes if key[0] == "class"][:1]
+        return self._classes.get(name.lstrip("\\").lower(), [])
+
+    def _target_classes(self, target: str, scopes: List[ScopeKey]) -> List[ScopeKey]:
+        if not target.startswith("$"):
+            return self._class_keys(target, scopes)
+        for key in scopes:
+            for kind in ("var", "param"):
+                found = self._lookup(key, kind, target)
+                if found is not None and found.detail:
+                    return self._class_keys(found.detail, scopes)
+        return []
+
+    def complete(self, before: str, offset: int, limit: int = DEFAULT_LIMIT) -> Tuple[int, List[Candidate]]:
+        """Candidatos para el cursor en `offset`; `before` es el texto que termina ahi.
+
+        Devuelve el offset donde empieza el prefijo escrito (lo que reemplaza el
+        candidato elegido) y los candidatos ordenados: primero los del scope mas
+        interno, dentro de cada nivel por clase (variables, metodos, funciones,
+        clases, palabras reservadas) y luego alfabeticamente.
+        """
+        scopes = self.scopes_at(offset)
+        member = _MEMBER.search(before)
+        ranked: List[Tuple[int, Candidate]] = []
+        if member is not None:
+            target, operator, prefix = member.groups()
+            inside = {key[1] for key in scopes if key[0] == "class"}
+            for level, key in enumerate(self._target_classes(target, scopes)):
+                trie = self.tries.get(key)
+                for candidate in trie.complete(prefix, limit) if trie is not None else ():
+                    if candidate.is_static != (operator == "::"):
+                        continue
+                    if candidate.visibility != "public" and key[1] not in inside:
+                        continue
+                    ranked.append((level, candidate))
+        else:
+            prefix = _WORD.search(before).group()
+            levels = [key for key in scopes if key[0] != "class"]
+            for level, key in enumerate(levels):
+                trie = self.tries.get(key)
+                if trie is not None:
+                    ranked.extend((level, candidate) for candidate in trie.complete(prefix, limit))
+            if not prefix.startswith("$"):
+                ranked.extend((len(levels), candidate) for candidate in self.keywords.complete(prefix, limit))
+        ranked.sort(key=lambda item: (item[0], KIND_RANK.get(item[1].kind, 5), item[1].label.lower()))
+        seen = set()
+        candidates = []
+        for _, candidate in ranked:
+            if candidate.label not in seen:
+                seen.add(candidate.label)
+                candidates.append(candidate)
+        return offset - len(prefix), candidates[:limit]
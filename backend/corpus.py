@@ -0,0 +1,47 @@
+"""Utilidades para procesar corpus de archivos PHP: listar archivos y repartirlos en procesos.
+
+Lexear y parsear ocupan la CPU (a diferencia de leer archivos, que `project.py`
+reparte en hilos), asi que los analisis de corpus completos (`clones`,
+`metrics`) corren cada archivo en un `ProcessPoolExecutor`; cada proceso tiene
+su propio lexer y parser PLY.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from .lexer import LexerConfig
+
+# Un byte por tipo de token (0 queda libre).
+KIND_IDS = {kind: idx for idx, kind in enumerate(LexerConfig().full_token_list(), start=1)}
+KIND_NAMES = ("",) + LexerConfig().full_token_list()
+
+
+def php_files(paths: Iterable[str | Path]) -> List[str]:
+    """Archivos `.php` de `paths` (los directorios se recorren), sin repetir y en orden."""
+    files: List[str] = []
+    for raw in paths:
+        target = Path(raw).expanduser()
+        found = sorted(target.rglob("*.php")) if target.is_dir() else [target]
+        files.extend(str(path) for path in found)
+    return list(dict.fromkeys(files))
+
+
+def default_workers(workers: Optional[int] = None) -> int:
+    return workers or os.cpu_count() or 1
+
+
+def parallel_map(func: Callable[..., Any], columns: Sequence[Sequence[Any]], workers: int) -> List[Any]:
+    """`func(*fila)` por cada fila de `columns`, en orden; en el proceso actual si `workers` es 1.
+
+    `func` debe ser una funcion de modulo (se envia por nombre a los procesos).
+    """
+    count = len(columns[0])
+    if workers <= 1 or count < 2:
+        return [func(*args) for args in zip(*columns)]
+    workers = min(workers, count)
+    chunksize = max(1, count // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *columns, chunksize=chunksize))
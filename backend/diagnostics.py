@@ -0,0 +1,57 @@
+"""Diagnosticos en vivo por linea, enviados como diferencias.
+
+Mientras se escribe, la GUI pide `diagnostics(doc_id, since)` con la ultima
+secuencia que aplico. `DiagnosticsTracker` recuerda por documento que
+diagnosticos envio en esa secuencia y responde solo las lineas cuyos mensajes
+cambiaron (`changed`) y las que quedaron limpias (`removed`). Si `since` no
+coincide con lo ultimo enviado (respuesta perdida, documento reabierto) la
+respuesta es completa (`full`).
+"""
+from __future__ import annotations
+
+import threading
+from itertools import count
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Linea -> mensajes de esa linea (0 para los que no tienen linea).
+LineMap = Dict[int, List[Dict[str, Any]]]
+
+
+def by_line(diagnostics: Iterable[Dict[str, Any]]) -> LineMap:
+    lines: LineMap = {}
+    for item in diagnostics:
+        lines.setdefault(item.get("lineno") or 0, []).append(item)
+    return lines
+
+
+class DiagnosticsTracker:
+    """Ultimo juego de diagnosticos enviado por documento, con su numero de secuencia."""
+
+    def __init__(self) -> None:
+        self._sent: Dict[str, Tuple[int, LineMap]] = {}
+        self._seq = count(1)
+        self._lock = threading.Lock()
+
+    def delta(self, doc_id: str, diagnostics: Iterable[Dict[str, Any]], since: Optional[int] = None) -> Dict[str, Any]:
+        """Diferencia entre lo enviado en `since` y `diagnostics`; registra el nuevo estado."""
+        current = by_line(diagnostics)
+        with self._lock:
+            seq, previous = self._sent.get(doc_id, (None, {}))
+            full = since is None or since != seq
+            if full:
+                previous = {}
+            new_seq = next(self._seq)
+            self._sent[doc_id] = (new_seq, current)
+        changed = [[line, items] for line, items in sorted(current.items()) if previous.get(line) != items]
+        removed = sorted(line for line in previous if line not in current)
+        return {
+            "seq": new_seq,
+            "full": full,
+            "changed": changed,
+            "removed": removed,
+            "count": sum(len(items) for items in current.values()),
+        }
+
+    def forget(self, doc_id: str) -> None:
+        with self._lock:
+            self._sent.pop(doc_id, None)
@@ -0,0 +1,240 @@
+"""Documentos abiertos en el backend, actualizados por ediciones incrementales.
+
+La GUI abre un documento una vez (`open`) y despues solo envia deltas
+(`apply_edits`) con un numero de version; el texto vive en un `TextBuffer`
+(trozos de texto con conteo de saltos de linea, para pasar de
+`(linea, columna)` a offset sin recorrer todo) y el AST en un
+`IncrementalParser`, asi que analizar no vuelve a cruzar el texto por el puente
+ni a parsear lo que no cambio.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate, count
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .completion import CompletionIndex
+from .lexer import LexerConfig
+from .parser import IncrementalParser, ParseChange
+
+CHUNK_SIZE = 4096
+
+# Clase de resaltado por tipo de token; el resto (operadores y signos) es `punct`.
+HIGHLIGHT_CLASSES: Dict[str, str] = {
+    "PHP_OPEN": "tag",
+    "PHP_CLOSE": "tag",
+    "VARIABLE": "variable",
+    "NUMBER": "number",
+    "STRING": "string",
+    "ID": "name",
+    **{kind: "keyword" for kind in LexerConfig().reserved.values()},
+}
+
+
+class DocumentError(Exception):
+    """Documento inexistente, version fuera de orden o edicion invalida."""
+
+    def __init__(self, message: str, version: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.version = version
+
+
+class TextBuffer:
+    """Texto en trozos de hasta `CHUNK_SIZE` caracteres con indice de lineas.
+
+    Lineas desde 1 y columnas desde 0, como `lineno` en el resto del compilador.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        self._chunks = self._split(text) or [""]
+        self._sizes = [len(chunk) for chunk in self._chunks]
+        self._breaks = [chunk.count("\n") for chunk in self._chunks]
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        return [text[idx:idx + CHUNK_SIZE] for idx in range(0, len(text), CHUNK_SIZE)]
+
+    def __len__(self) -> int:
+        return sum(self._sizes)
+
+    @property
+    def line_count(self) -> int:
+        return sum(self._breaks) + 1
+
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def _locate(self, offset: int) -> Tuple[int, int]:
+        """(trozo, posicion dentro del trozo) de `offset`."""
+        if not 0 <= offset <= len(self):
+            raise DocumentError(f"offset fuera del texto: {offset}")
+        starts = list(accumulate(self._sizes, initial=0))
+        idx = min(bisect_right(starts, offset) - 1, len(self._chunks) - 1)
+        return idx, offset - starts[idx]
+
+    def replace(self, offset: int, deleted: int, text: str) -> None:
+        """Reemplaza `deleted` caracteres desde `offset` por `text`."""
+        if deleted < 0:
+            raise DocumentError(f"largo a borrar negativo: {deleted}")
+        first, head = self._locate(offset)
+        last, tail = self._locate(offset + deleted)
+        middle = self._chunks[first][:head] + text + self._chunks[last][tail:]
+        chunks = self._split(middle)
+        if not chunks and len(self._chunks) == last - first + 1:
+            chunks = [""]
+        self._chunks[first:last + 1] = chunks
+        self._sizes[first:last + 1] = [len(chunk) for chunk in chunks]
+        self._breaks[first:last + 1] = [chunk.count("\n") for chunk in chunks]
+
+    def slice(self, start: int, end: int) -> str:
+        first, head = self._locate(start)
+        last, tail = self._locate(max(start, end))
+        if first == last:
+            return self._chunks[first][head:tail]
+        return "".join([self._chunks[first][head:], *self._chunks[first + 1:last], self._chunks[last][:tail]])
+
+    def offset_at(self, line: int, col: int = 0) -> int:
+        """Offset de `(linea, columna)`; la columna se recorta al largo de la linea."""
+        if not 1 <= line <= self.line_count:
+            raise DocumentError(f"linea fuera del texto: {line}")
+        lines = list(accumulate(self._breaks, initial=0))
+        idx = bisect_right(lines, line - 2) - 1 if line > 1 else 0
+        pos = 0
+        for _ in range(line - 1 - lines[idx]):
+            pos = self._chunks[idx].index("\n", pos) + 1
+        start = sum(self._sizes[:idx]) + pos
+        end = self._line_end(idx, pos, start)
+        return start + min(max(col, 0), end - start)
+
+    def _line_end(self, idx: int, pos: int, start: int) -> int:
+        offset = start
+        while idx < len(self._chunks):
+            found = self._chunks[idx].find("\n", pos)
+            if found >= 0:
+                return offset + found - pos
+            offset += len(self._chunks[idx]) - pos
+            idx, pos = idx + 1, 0
+        return offset
+
+    def position_at(self, offset: int) -> Tuple[int, int]:
+        """`(linea, columna)` de `offset`."""
+        idx, pos = self._locate(offset)
+        line = sum(self._breaks[:idx]) + self._chunks[idx].count("\n", 0, pos) + 1
+        return line, offset - self.offset_at(line)
+
+    def line(self, line: int) -> str:
+        start = self.offset_at(line)
+        end = self.offset_at(line, len(self))
+        return self.slice(start, end)
+
+
+@dataclass
+class Document:
+    doc_id: str
+    version: int
+    buffer: TextBuffer
+    parser: IncrementalParser
+    path: Optional[str] = None
+    changes: List[ParseChange] = field(default_factory=list)
+    # Candidatos de autocompletado del ultimo analisis (ver `backend.completion`).
+    completions: CompletionIndex = field(default_factory=CompletionIndex, repr=False, compare=False)
+    # Las ediciones y los analisis en segundo plano (`jobs`) no se pisan.
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def text(self) -> str:
+        return self.parser.text
+
+    def _span(self, edit: Dict[str, Any]) -> Tuple[int, int, str]:
+        """Normaliza una edicion `{offset, deleted, text}` o `{start: [l, c], end: [l, c], text}`."""
+        text = edit.get("text", "")
+        if "offset" in edit:
+            return int(edit["offset"]), int(edit.get("deleted", 0)), text
+        try:
+            start = self.buffer.offset_at(*edit["start"])
+            end = self.buffer.offset_at(*edit.get("end", edit["start"]))
+        except (KeyError, TypeError) as exc:
+            raise DocumentError(f"edicion sin rango valido: {edit!r}") from exc
+        return start, max(end - start, 0), text
+
+    def highlight(self, first_line: int, last_line: int) -> Dict[str, Any]:
+        """Tokens de las lineas `[first_line, last_line]` para pintar solo la vista visible.
+
+        `spans` es plano `[inicio, fin, clase, ...]` en caracteres desde el inicio
+        de `first_line` (recortado a las lineas pedidas); `classes` es la tabla de
+        `HIGHLIGHT_CLASSES` usada.
+        """
+        first_line = min(max(first_line, 1), self.buffer.line_count)
+        last_line = min(max(last_line, first_line), self.buffer.line_count)
+        start = self.buffer.offset_at(first_line)
+        end = self.buffer.offset_at(last_line, len(self.buffer))
+        classes: Dict[str, int] = {}
+        spans: List[int] = []
+        for kind, _, lo, hi, _ in self.parser.lexer.spans_between(start, end):
+            css = HIGHLIGHT_CLASSES.get(kind, "punct")
+            spans.extend((max(lo, start) - start, min(hi, end) - start, classes.setdefault(css, len(classes))))
+        return {"first_line": first_line, "last_line": last_line, "classes": list(classes), "spans": spans}
+
+    def apply(self, edits: Iterable[Dict[str, Any]]) -> List[ParseChange]:
+        """Aplica las ediciones en orden (cada una sobre el resultado de la anterior)."""
+        changes = []
+        shifts = []
+        for edit in edits:
+            offset, deleted, text = self._span(edit)
+            if offset < 0 or offset + deleted > len(self.buffer):
+                raise DocumentError(f"edicion fuera del texto: {offset}+{deleted}")
+            self.buffer.replace(offset, deleted, text)
+            changes.append(self.parser.edit(offset, deleted, text))
+            shifts.append((offset, deleted, len(text)))
+        # Solo si todas entran: si una falla `DocumentStore` vuelve al texto anterior.
+        for shift in shifts:
+            self.completions.shift(*shift)
+        return changes
+
+
+class DocumentStore:
+    """Documentos abiertos por id, con control de version por documento."""
+
+    def __init__(self) -> None:
+        self._documents: Dict[str, Document] = {}
+        self._ids = count(1)
+
+    def open(self, text: str, path: Optional[str] = None) -> Document:
+        doc_id = f"doc-{next(self._ids)}"
+        document = Document(doc_id, 0, TextBuffer(text), IncrementalParser(text), path=path)
+        self._documents[doc_id] = document
+        return document
+
+    def get(self, doc_id: str) -> Document:
+        try:
+            return self._documents[doc_id]
+        except KeyError:
+            raise DocumentError(f"Documento no abierto: {doc_id}") from None
+
+    def close(self, doc_id: str) -> None:
+        self._documents.pop(doc_id, None)
+
+    def apply_edits(self, doc_id: str, version: int, edits: Iterable[Dict[str, Any]]) -> Document:
+        """Aplica `edits` y deja el documento en `version`, que debe ser la siguiente.
+
+        Si una edicion falla el documento vuelve al texto anterior y no cambia de version.
+        """
+        document = self.get(doc_id)
+        if version != document.version + 1:
+            raise DocumentError(
+                f"Version fuera de orden para {doc_id}: se esperaba {document.version + 1}, llego {version}",
+                document.version,
+            )
+        with document.lock:
+            previous = document.text
+            try:
+                document.changes = document.apply(edits)
+            except DocumentError:
+                document.buffer = TextBuffer(previous)
+                document.parser.reset(previous)
+                raise
+            document.version = version
+        return document
@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from .cancel import CancelToken
 from .lexer import PhpLexer
 from .parser import build_parser
-from .semantic import SemanticAnalyzer, SemanticError
+from .semantic import LintConfig, LintEngine, SemanticAnalyzer, SemanticError
+
+
+ANALYSIS_STAGES = frozenset({"tokens", "ast", "semantic", "lint"})
 
 
 def _to_serializable(obj: Any) -> Any:
@@ -34,6 +38,11 @@ def _collect_tokens(code: str, reporter=None) -> List[dict]:
     return tokens
 
 
+def _checkpoint(cancel: Optional[CancelToken]) -> None:
+    if cancel is not None:
+        cancel.check()
+
+
 def _safe_json_dump(obj: Any) -> str:
     try:
         return json.dumps(obj, indent=2, ensure_ascii=False)
@@ -41,6 +50,38 @@ def _safe_json_dump(obj: Any) -> str:
         return json.dumps(str(obj), ensure_ascii=False)
 
 
+@dataclass
+class ParsedSource:
+    ast: Any
+    lexical_errors: int
+    syntax_errors: int
+    lexical_messages: List[Dict[str, str]]
+    syntax_messages: List[Dict[str, str]]
+
+
+def parse_source(code: str) -> ParsedSource:
+    """Ejecuta lexer + parser capturando mensajes de cada etapa."""
+    lexical_messages: List[Dict[str, str]] = []
+    syntax_messages: List[Dict[str, str]] = []
+
+    def _lex_reporter(level: str, message: str) -> None:
+        lexical_messages.append({"level": level, "message": message})
+
+    def _syn_reporter(level: str, message: str) -> None:
+        syntax_messages.append({"level": level, "message": message})
+
+    parser = build_parser(reporter=_syn_reporter)
+    parse_lexer = PhpLexer(reporter=_lex_reporter)
+    ast = parser.parse(code, lexer=parse_lexer.lexer)
+    return ParsedSource(
+        ast=ast,
+        lexical_errors=parse_lexer.error_count,
+        syntax_errors=parser.error_count,
+        lexical_messages=lexical_messages,
+        syntax_messages=syntax_messages,
+    )
+
+
 @dataclass
 class CompilationResult:
     ok: bool
@@ -55,6 +96,9 @@ class CompilationResult:
     semantic_errors: int
     symbol_table: List[Dict[str, Any]]
     source_path: Optional[str]
+    lint_messages: List[Dict[str, Any]] = field(default_factory=list)
+    # Con `compile(..., references=True)`: cada declaracion y uso con su simbolo (ver `backend.references`).
+    references: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass
@@ -73,39 +117,80 @@ class SemanticPreviewResult:
 class CompilerFacade:
     """Punto de entrada para compilar codigo PHP desde la GUI o adaptadores."""
 
-    def __init__(self, project_root: Path | str | None = None) -> None:
+    def __init__(self, project_root: Path | str | None = None, lint_config: LintConfig | None = None) -> None:
         self.project_root = Path(project_root) if project_root else Path.cwd()
-
-    def _run_semantic(self, ast: Any) -> tuple[List[SemanticError], List[Dict[str, Any]]]:
-        analyzer = SemanticAnalyzer()
+        self.lint_engine = LintEngine(lint_config)
+        self._project = None
+        self._python_backend = None
+
+    def _run_semantic(
+        self, ast: Any, cancel: Optional[CancelToken] = None
+    ) -> tuple[List[SemanticError], SemanticAnalyzer]:
+        analyzer = SemanticAnalyzer(cancel=cancel)
         errors = analyzer.analyze(ast)
-        return errors, analyzer.snapshot_data
-
-    def compile(self, code: str, path: str | Path | None = None) -> CompilationResult:
-        lexical_messages: List[Dict[str, str]] = []
-        syntax_messages: List[Dict[str, str]] = []
-
-        def _lex_reporter(level: str, message: str) -> None:
-            lexical_messages.append({"level": level, "message": message})
-
-        def _syn_reporter(level: str, message: str) -> None:
-            syntax_messages.append({"level": level, "message": message})
-
-        parser = build_parser(reporter=_syn_reporter)
-        parse_lexer = PhpLexer(reporter=_lex_reporter)
-        ast = parser.parse(code, lexer=parse_lexer.lexer)
+        return errors, analyzer
+
+    def _positions(self, document: Any, analyzer: Optional[SemanticAnalyzer]) -> Any:
+        from .positions import index_program
+
+        document.parser.settle_offsets()
+        return index_program(document.parser.program, analyzer.types if analyzer is not None else None)
+
+    def _remember(self, document: Any, analyzer: SemanticAnalyzer) -> None:
+        """Pasa los simbolos del analisis al autocompletado del documento (solo las diferencias)."""
+        document.parser.settle_offsets()
+        document.completions.update(analyzer.symtab, analyzer.members)
+
+    def _run_lint(self, ast: Any, cancel: Optional[CancelToken] = None) -> List[Dict[str, Any]]:
+        return [
+            {
+                "level": msg.level,
+                "rule": msg.rule,
+                "message": str(msg),
+                "lineno": msg.lineno,
+            }
+            for msg in self.lint_engine.run(ast, cancel=cancel)
+        ]
+
+    def compile(
+        self,
+        code: str,
+        path: str | Path | None = None,
+        cancel: Optional[CancelToken] = None,
+        references: bool = False,
+    ) -> CompilationResult:
+        """Compila `code` completo; con `cancel` se puede abandonar entre etapas y durante los recorridos.
+
+        Con `references` el resultado trae tambien las apariciones de cada simbolo
+        (`collect_occurrences`), listas para un `ReferenceIndex`.
+        """
+        parsed = parse_source(code)
+        ast = parsed.ast
+        lexical_messages = parsed.lexical_messages
+        syntax_messages = parsed.syntax_messages
 
         tokens = _collect_tokens(code, reporter=lambda *_: None)
 
-        lexical_errors = parse_lexer.error_count
-        syntax_errors = parser.error_count
+        lexical_errors = parsed.lexical_errors
+        syntax_errors = parsed.syntax_errors
         semantic_messages: List[Dict[str, str]] = []
         semantic_errors = 0
         symbol_table: List[Dict[str, Any]] = []
+        lint_messages: List[Dict[str, Any]] = []
+        occurrences: List[Dict[str, Any]] = []
         if ast is not None and lexical_errors == 0 and syntax_errors == 0:
-            sem_errors, snapshot = self._run_semantic(ast)
+            _checkpoint(cancel)
+            lint_messages = self._run_lint(ast, cancel)
+            sem_errors, analyzer = self._run_semantic(ast, cancel)
             semantic_errors = len(sem_errors)
-            symbol_table = snapshot
+            symbol_table = analyzer.snapshot_data
+            if references:
+                from .outline import scan_spans
+                from .references import collect_occurrences
+
+                occurrences = [
+                    {"symbol": occ.symbol, **occ.to_dict()} for occ in collect_occurrences(analyzer, scan_spans(code))
+                ]
             semantic_messages = [
                 {
                     "level": "error",
@@ -118,6 +203,7 @@ class CompilerFacade:
 
         ok = ast is not None and lexical_errors == 0 and syntax_errors == 0 and semantic_errors == 0
 
+        _checkpoint(cancel)
         ast_serializable = _to_serializable(ast) if ast is not None else None
 
         return CompilationResult(
@@ -133,32 +219,26 @@ class CompilerFacade:
             semantic_errors=semantic_errors,
             symbol_table=symbol_table,
             source_path=str(path) if path is not None else None,
+            lint_messages=lint_messages,
+            references=occurrences,
         )
 
     def semantic_preview(self, code: str, path: str | Path | None = None) -> SemanticPreviewResult:
-        lexical_messages: List[Dict[str, str]] = []
-        syntax_messages: List[Dict[str, str]] = []
-
-        def _lex_reporter(level: str, message: str) -> None:
-            lexical_messages.append({"level": level, "message": message})
-
-        def _syn_reporter(level: str, message: str) -> None:
-            syntax_messages.append({"level": level, "message": message})
-
-        parser = build_parser(reporter=_syn_reporter)
-        parse_lexer = PhpLexer(reporter=_lex_reporter)
-        ast = parser.parse(code, lexer=parse_lexer.lexer)
+        parsed = parse_source(code)
+        ast = parsed.ast
+        lexical_messages = parsed.lexical_messages
+        syntax_messages = parsed.syntax_messages
 
-        lexical_errors = parse_lexer.error_count
-        syntax_errors = parser.error_count
+        lexical_errors = parsed.lexical_errors
+        syntax_errors = parsed.syntax_errors
 
         semantic_messages: List[Dict[str, str]] = []
         semantic_errors = 0
         symbol_table: List[Dict[str, Any]] = []
         if ast is not None and lexical_errors == 0 and syntax_errors == 0:
-            sem_errors, snapshot = self._run_semantic(ast)
+            sem_errors, analyzer = self._run_semantic(ast)
             semantic_errors = len(sem_errors)
-            symbol_table = snapshot
+            symbol_table = analyzer.snapshot_data
             semantic_messages = [
                 {
                     "level": "error",
@@ -181,3 +261,266 @@ class CompilerFacade:
             symbol_table=symbol_table,
             source_path=str(path) if path is not None else None,
         )
+
+    def analyze_document(
+        self, document: Any, stages: Iterable[str] | None = None, cancel: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
+        """Analiza un documento abierto (`documents.Document`) sin volver a parsearlo.
+
+        `stages` elige que agregar a los errores lexicos y sintacticos: `tokens`,
+        `ast`, `semantic` y `lint` (por defecto `semantic`). La etapa semantica
+        agrega `positions`, un `SpanIndex` con los tipos inferidos. Con `cancel` el
+        analisis termina con `Cancelled` entre etapas o dentro de los recorridos
+        si otro trabajo lo reemplaza.
+        """
+        wanted = set(stages if stages is not None else ("semantic",))
+        unknown = wanted - ANALYSIS_STAGES
+        if unknown:
+            raise ValueError(f"Etapas de analisis desconocidas: {', '.join(sorted(unknown))}")
+        lexer = document.parser.lexer
+        program = document.parser.program
+        result: Dict[str, Any] = {
+            "doc_id": document.doc_id,
+            "version": document.version,
+            "lexical_errors": lexer.error_count,
+            "syntax_errors": document.parser.error_count,
+            "lexical_messages": [{"level": "error", "message": message} for message in lexer.errors],
+            "syntax_messages": [
+                {"level": "error", "message": error.message, "lineno": error.lineno} for error in document.parser.errors
+            ],
+        }
+        clean = program is not None and not result["lexical_errors"] and not result["syntax_errors"]
+        if "tokens" in wanted:
+            _checkpoint(cancel)
+            result["tokens"] = [{"lineno": tok.lineno, "type": tok.type, "value": tok.value} for tok in lexer.tokens()]
+        if "ast" in wanted:
+            _checkpoint(cancel)
+            result["ast"] = _to_serializable(program) if program is not None else None
+            result["ast_json"] = _safe_json_dump(result["ast"]) if program is not None else None
+        semantic_errors = 0
+        if "semantic" in wanted:
+            messages: List[Dict[str, Any]] = []
+            symbol_table: List[Dict[str, Any]] = []
+            positions = None
+            if clean:
+                _checkpoint(cancel)
+                analyzer = SemanticAnalyzer(cancel=cancel)
+                sem_errors = analyzer.analyze(program)
+                symbol_table = analyzer.snapshot_data
+                messages = [
+                    {"level": "error", "message": str(err), "lineno": err.lineno, "col": err.col} for err in sem_errors
+                ]
+                positions = self._positions(document, analyzer)
+                self._remember(document, analyzer)
+            result["positions"] = positions
+            semantic_errors = len(messages)
+            result.update(semantic_messages=messages, semantic_errors=semantic_errors, symbol_table=symbol_table)
+        if "lint" in wanted:
+            _checkpoint(cancel)
+            result["lint_messages"] = self._run_lint(program, cancel) if clean else []
+        result["ok"] = clean and not semantic_errors
+        return result
+
+    def diagnose_document(self, document: Any, cancel: Optional[CancelToken] = None) -> List[Dict[str, Any]]:
+        """Errores lexicos, sintacticos y semanticos de un documento abierto, cada uno con su linea.
+
+        Solo las etapas que producen diagnosticos: sin tokens, AST serializado,
+        tabla de simbolos ni lint.
+        """
+        parser = document.parser
+        diagnostics = [
+            {"lineno": line, "level": "error", "stage": "lexical", "message": message}
+            for line, message in parser.lexer.located_errors
+        ]
+        diagnostics.extend(
+            {"lineno": error.lineno, "level": "error", "stage": "syntax", "message": error.message}
+            for error in parser.errors
+        )
+        if parser.program is not None and not diagnostics:
+            _checkpoint(cancel)
+            analyzer = SemanticAnalyzer(cancel=cancel)
+            diagnostics.extend(
+                {"lineno": err.lineno, "level": "error", "stage": "semantic", "message": str(err)}
+                for err in analyzer.analyze(parser.program)
+            )
+            self._remember(document, analyzer)
+        return diagnostics
+
+    def index_document(self, document: Any, cancel: Optional[CancelToken] = None) -> Any:
+        """`SpanIndex` de un documento abierto para `node_at`/`type_at` (hover).
+
+        Con el documento sin errores los nodos llevan el tipo inferido por la
+        semantica; si no parsea, el indice queda vacio.
+        """
+        from .positions import SpanIndex
+
+        parser = document.parser
+        if parser.program is None:
+            return SpanIndex()
+        analyzer = None
+        if not parser.lexer.error_count:
+            _checkpoint(cancel)
+            analyzer = SemanticAnalyzer(cancel=cancel)
+            analyzer.analyze(parser.program)
+            self._remember(document, analyzer)
+        return self._positions(document, analyzer)
+
+    def complete_document(
+        self, document: Any, offset: int, limit: Optional[int] = None, cancel: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
+        """Candidatos de autocompletado para el cursor en `offset` (ver `backend.completion`).
+
+        Usa los simbolos del ultimo analisis del documento (diagnosticos, hover o
+        `analyze_document`), asi que sigue respondiendo mientras el codigo a medio
+        escribir no parsea; solo si nunca se analizo lo analiza aqui. `start`/`end`
+        es el rango del prefijo que reemplaza el candidato elegido.
+        """
+        from .completion import CONTEXT, DEFAULT_LIMIT
+
+        parser = document.parser
+        if not document.completions.analyzed and parser.program is not None and not parser.lexer.error_count:
+            _checkpoint(cancel)
+            analyzer = SemanticAnalyzer(cancel=cancel)
+            analyzer.analyze(parser.program)
+            self._remember(document, analyzer)
+        offset = min(max(int(offset), 0), len(document.buffer))
+        before = document.buffer.slice(max(offset - CONTEXT, 0), offset)
+        start, candidates = document.completions.complete(before, offset, limit or DEFAULT_LIMIT)
+        return {"start": start, "end": offset, "items": [candidate.to_dict() for candidate in candidates]}
+
+    def index_references(self, document: Any, index: Any, cancel: Optional[CancelToken] = None) -> bool:
+        """Pone al dia las apariciones del documento en `index` (un `ReferenceIndex`).
+
+        Se reindexa solo el documento y solo si cambio desde la ultima vez; devuelve
+        False si no parsea (el indice conserva lo del ultimo texto valido).
+        """
+        from .references import collect_occurrences
+
+        key = document.path or document.doc_id
+        stamp = (document.doc_id, document.version)
+        if index.stamp(key) == stamp:
+            return True
+        parser = document.parser
+        if parser.program is None or parser.error_count or parser.lexer.error_count:
+            return False
+        _checkpoint(cancel)
+        analyzer = SemanticAnalyzer(cancel=cancel)
+        analyzer.analyze(parser.program)
+        self._remember(document, analyzer)
+        index.update(key, collect_occurrences(analyzer, parser.lexer.spans()), stamp)
+        return True
+
+    def references_document(
+        self, document: Any, index: Any, offset: int, cancel: Optional[CancelToken] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Declaraciones y usos del simbolo bajo `offset`; None si no hay simbolo o el documento no parsea."""
+        if not self.index_references(document, index, cancel):
+            return None
+        return index.references(document.path or document.doc_id, offset)
+
+    def rename_document(
+        self, document: Any, index: Any, offset: int, new_name: str, cancel: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
+        """Ediciones `{offset, deleted, text}` que renombran en el documento el simbolo bajo `offset`.
+
+        Las ediciones van de la ultima a la primera, asi que aplicadas en orden no se
+        corren entre si; `text` es el documento ya renombrado (una pasada sobre el texto).
+        ValueError si no hay simbolo, el documento no parsea, el nombre no es valido o ya
+        lo usa otro simbolo del mismo contenedor.
+        """
+        from .references import check_new_name, rename_text, renamed_symbol
+
+        if not self.index_references(document, index, cancel):
+            raise ValueError("El documento tiene errores: no se puede renombrar")
+        key = document.path or document.doc_id
+        found = index.occurrence_at(key, offset)
+        if found is None:
+            raise ValueError("No hay un simbolo para renombrar en esa posicion")
+        check_new_name(found.symbol, new_name)
+        target = renamed_symbol(found.symbol, new_name)
+        if target != found.symbol and index.occurrences(target).get(key):
+            raise ValueError(f"Ya existe {target}: renombrar uniria los dos simbolos")
+        occurrences = index.occurrences(found.symbol).get(key, [])
+        edits = [{"offset": occ.start, "deleted": occ.end - occ.start, "text": new_name} for occ in reversed(occurrences)]
+        return {"symbol": found.symbol, "edits": edits, "text": rename_text(document.text, occurrences, new_name)}
+
+    def outline(self, code: str) -> List[Dict[str, Any]]:
+        """Esquema (namespaces, use, clases, funciones y metodos) sin parsear."""
+        from .outline import outline
+
+        return [item.to_dict() for item in outline(code)]
+
+    def outline_document(self, document: Any) -> List[Dict[str, Any]]:
+        """Esquema de un documento abierto reutilizando sus tokens ya calculados."""
+        from .outline import skim
+
+        lexer = document.parser.lexer
+        return [item.to_dict() for item in skim(list(lexer.spans()), lexer.text)]
+
+    def analyze_project(self, entry: str | Path):
+        """Analiza `entry` y los archivos que incluye; reutiliza resumenes entre llamadas."""
+        from .project import ProjectAnalyzer
+
+        if self._project is None:
+            self._project = ProjectAnalyzer()
+        target = Path(entry)
+        if not target.is_absolute():
+            target = self.project_root / target
+        return self._project.analyze(target)
+
+    def find_clones(self, paths: Iterable[str | Path], min_tokens: int | None = None, workers: int | None = None):
+        """Copias de codigo (con nombres y literales cambiados) entre los archivos de `paths`."""
+        from .clones import DEFAULT_MIN_TOKENS, CloneDetector
+
+        targets = [path if Path(path).is_absolute() else self.project_root / path for path in paths]
+        return CloneDetector(min_tokens or DEFAULT_MIN_TOKENS, workers=workers).detect(targets)
+
+    def metrics(self, paths: Iterable[str | Path], workers: int | None = None):
+        """Metricas por archivo y por funcion (LOC, Halstead, complejidad, anidamiento) de `paths`."""
+        from .metrics import collect_metrics
+
+        targets = [path if Path(path).is_absolute() else self.project_root / path for path in paths]
+        return collect_metrics(targets, workers=workers)
+
+    def optimize(self, code: str) -> Dict[str, Any]:
+        """Pliega constantes y poda ramas muertas; devuelve el reporte de cambios."""
+        from .optimizer import fold_constants
+        from .vm import parse_program
+
+        program, error = parse_program(code)
+        if program is None:
+            return {"ok": False, "error": error, "changes": [], "counts": {}, "nodes_before": 0, "nodes_after": 0}
+        _, report = fold_constants(program)
+        return {"ok": True, "error": None, **report.to_dict()}
+
+    def format_code(self, code: str, minify: bool = False) -> Dict[str, Any]:
+        """Reimprime el codigo desde el AST (legible o minificado)."""
+        from .printer import FormatError, format_code
+
+        try:
+            return {"ok": True, "error": None, "lineno": None, "code": format_code(code, minify=minify)}
+        except FormatError as exc:
+            return {"ok": False, "error": exc.message, "lineno": exc.lineno, "code": None}
+
+    def execute(self, code: str, max_steps: int | None = None, backend: str = "vm"):
+        """Ejecuta en la VM (`"vm"`), traducido a Python (`"python"`) o sobre la IR
+        optimizada (`"ir"`); devuelve `ExecutionResult`.
+
+        El backend Python cachea el codigo compilado por hash del fuente, asi que
+        reejecutar el mismo programa no vuelve a parsearlo.
+        """
+        if backend == "python":
+            if self._python_backend is None:
+                from .vm import PythonBackend
+
+                self._python_backend = PythonBackend()
+            return self._python_backend.run(code, max_steps=max_steps)
+        if backend == "ir":
+            from .ir import run_source as run_ir_source
+
+            return run_ir_source(code, max_steps=max_steps)
+        if backend != "vm":
+            raise ValueError(f"Backend de ejecucion desconocido: {backend}")
+        from .vm import run_source
+
+        return run_source(code, max_steps=max_steps)
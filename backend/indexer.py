@@ -0,0 +1,191 @@
+"""Indice de simbolos y referencias del proyecto persistido en SQLite."""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .facade import parse_source
+from .outline import scan_spans
+from .project import content_hash
+from .references import IdentifierTokens, use_token
+from .semantic import SemanticAnalyzer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    scope TEXT,
+    type TEXT,
+    lineno INTEGER
+);
+CREATE TABLE IF NOT EXISTS refs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    is_write INTEGER NOT NULL DEFAULT 0,
+    lineno INTEGER,
+    start INTEGER,
+    end INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name, kind);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+CREATE INDEX IF NOT EXISTS idx_refs_name ON refs(name, kind);
+CREATE INDEX IF NOT EXISTS idx_refs_file ON refs(file_id);
+"""
+
+
+class ProjectIndex:
+    """Llena y consulta la base SQLite; la actualizacion es incremental por hash."""
+
+    def __init__(self, db_path: str | Path = ":memory:") -> None:
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --- escritura ---
+    def index_file(self, path: str | Path, code: Optional[str] = None) -> bool:
+        """Indexa un archivo; devuelve False si su contenido no cambio."""
+        path = Path(path).resolve()
+        if code is None:
+            code = path.read_text(encoding="utf-8")
+        digest = content_hash(code)
+        row = self.conn.execute("SELECT id, content_hash FROM files WHERE path = ?", (str(path),)).fetchone()
+        if row is not None and row["content_hash"] == digest:
+            return False
+
+        symbols, refs = self._extract(code)
+        with self.conn:
+            if row is not None:
+                file_id = row["id"]
+                self.conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+                self.conn.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+                self.conn.execute("UPDATE files SET content_hash = ? WHERE id = ?", (digest, file_id))
+            else:
+                cur = self.conn.execute(
+                    "INSERT INTO files(path, content_hash) VALUES (?, ?)", (str(path), digest)
+                )
+                file_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO symbols(file_id, name, kind, owner, scope, type, lineno) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(file_id, *sym) for sym in symbols],
+            )
+            self.conn.executemany(
+                "INSERT INTO refs(file_id, name, kind, owner, is_write, lineno, start, end) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(file_id, *ref) for ref in refs],
+            )
+        return True
+
+    def index_paths(self, paths: Iterable[str | Path]) -> Dict[str, int]:
+        """Indexa archivos o directorios (`*.php` recursivo) y elimina los borrados."""
+        updated = skipped = 0
+        for target in paths:
+            target = Path(target)
+            files = sorted(target.rglob("*.php")) if target.is_dir() else [target]
+            for file in files:
+                if self.index_file(file):
+                    updated += 1
+                else:
+                    skipped += 1
+        removed = self.prune_missing()
+        return {"updated": updated, "skipped": skipped, "removed": removed}
+
+    def prune_missing(self) -> int:
+        gone = [row["id"] for row in self.conn.execute("SELECT id, path FROM files") if not Path(row["path"]).exists()]
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE id = ?", [(i,) for i in gone])
+        return len(gone)
+
+    def _extract(self, code: str) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
+        parsed = parse_source(code)
+        if parsed.ast is None:
+            return [], []
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parsed.ast)
+
+        symbols = []
+        for scope in analyzer.snapshot_data:
+            for sym in scope["symbols"]:
+                sym_type = sym["type"]
+                symbols.append(
+                    (
+                        sym["name"],
+                        sym["kind"],
+                        sym["owner"],
+                        scope["name"],
+                        sym_type if isinstance(sym_type, str) or sym_type is None else str(sym_type),
+                        sym["lineno"],
+                    )
+                )
+
+        # El rango sale del token dentro del rango del nodo (`start`/`end`), no de buscar
+        # el texto en la linea: asi una declaracion en la misma linea no se confunde con un uso.
+        tokens = IdentifierTokens(scan_spans(code))
+        refs = []
+        for ref in analyzer.references:
+            lineno = getattr(ref.node, "lineno", None)
+            token = use_token(ref, tokens)
+            start, end = (token[2], token[3]) if token is not None else (None, None)
+            refs.append((ref.name, ref.kind, ref.owner, int(ref.write), lineno, start, end))
+        return symbols, refs
+
+    # --- consultas ---
+    def _rows(self, sql: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def find_definitions(self, name: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Donde se declara `name` (funciones, clases, metodos, variables)."""
+        sql = (
+            "SELECT f.path, s.name, s.kind, s.owner, s.scope, s.type, s.lineno "
+            "FROM symbols s JOIN files f ON f.id = s.file_id WHERE s.name = ?"
+        )
+        params: Tuple[Any, ...] = (name,)
+        if kind is not None:
+            sql += " AND s.kind = ?"
+            params += (kind,)
+        return self._rows(sql + " ORDER BY f.path, s.lineno", params)
+
+    def find_references(self, name: str, kind: Optional[str] = None, owner: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = (
+            "SELECT f.path, r.name, r.kind, r.owner, r.is_write, r.lineno, r.start, r.end "
+            "FROM refs r JOIN files f ON f.id = r.file_id WHERE r.name = ?"
+        )
+        params: Tuple[Any, ...] = (name,)
+        if kind is not None:
+            sql += " AND r.kind = ?"
+            params += (kind,)
+        if owner is not None:
+            sql += " AND r.owner = ?"
+            params += (owner,)
+        return self._rows(sql + " ORDER BY f.path, r.start", params)
+
+    def callers(self, name: str) -> List[Dict[str, Any]]:
+        """Llamadas a una funcion (`foo`) o a un metodo (`Clase::metodo` o `metodo`)."""
+        if "::" in name:
+            owner, method = name.rsplit("::", 1)
+            return self.find_references(method, kind="method_call", owner=owner)
+        calls = self.find_references(name, kind="call")
+        return calls + self.find_references(name, kind="method_call")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("files", "symbols", "refs")
+        }
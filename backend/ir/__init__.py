@@ -0,0 +1,68 @@
+"""IR de tres direcciones en SSA: bajada desde el AST, optimizaciones escalares y ejecutor."""
+
+from typing import Optional, Tuple
+
+from .. import ast_nodes as ast
+from ..vm import CompileError, ExecutionResult, parse_program
+from .ir import Block, Const, Instr, IRClass, IRFunction, IRModule, Var, format_instr
+from .lowering import IRBuilder, lower_program
+from .machine import IRMachine, run_ir
+from .passes import (
+    OptimizationReport,
+    eliminate_common_subexpressions,
+    eliminate_dead_code,
+    inline_small_functions,
+    optimize_module,
+    propagate,
+)
+from .ssa import dominators, liveness, to_ssa
+
+__all__ = [
+    "Block",
+    "Const",
+    "Instr",
+    "IRClass",
+    "IRFunction",
+    "IRModule",
+    "Var",
+    "format_instr",
+    "IRBuilder",
+    "lower_program",
+    "IRMachine",
+    "run_ir",
+    "OptimizationReport",
+    "eliminate_common_subexpressions",
+    "eliminate_dead_code",
+    "inline_small_functions",
+    "optimize_module",
+    "propagate",
+    "dominators",
+    "liveness",
+    "to_ssa",
+    "build_ir",
+    "run_source",
+]
+
+
+def build_ir(program: ast.Program, optimize: bool = True) -> Tuple[IRModule, Optional[OptimizationReport]]:
+    """Baja `program` a la IR en SSA y, si `optimize`, aplica los pases escalares.
+
+    Lanza `CompileError` si el programa usa algo que la IR no soporta.
+    """
+    module = lower_program(program)
+    for func in module.all_functions():
+        to_ssa(func)
+    report = optimize_module(module) if optimize else None
+    return module, report
+
+
+def run_source(code: str, max_steps: Optional[int] = None, optimize: bool = True) -> ExecutionResult:
+    """Como `vm.run_source`, pero ejecutando la IR (optimizada salvo `optimize=False`)."""
+    program, error = parse_program(code)
+    if program is None:
+        return ExecutionResult(ok=False, output="", error=error)
+    try:
+        module, _ = build_ir(program, optimize=optimize)
+    except CompileError as exc:
+        return ExecutionResult(ok=False, output="", error=str(exc), lineno=exc.lineno)
+    return run_ir(module, max_steps=max_steps)
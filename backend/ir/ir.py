@@ -0,0 +1,215 @@
+"""Representacion intermedia de tres direcciones organizada en bloques basicos.
+
+Cada funcion es un grafo de `Block`; un bloque tiene instrucciones `Instr` (las
+`phi` siempre al inicio) y un terminador (`jump`, `branch` o `return`). Los
+operandos son `Var` (variables PHP `$x`, temporales `tN` o internas `%...`,
+con version SSA tras `ssa.to_ssa`) o `Const`.
+
+Instrucciones (`dest = op args`, `attr` segun el caso):
+
+- `param` (attr: indice), `copy a`, `bin a b` (attr: operador),
+  `un a` (attr: `!`, `-`, `+`, `++`, `--` o `!!`, conversion a booleano)
+- `call args` (attr: clave de funcion), `callm obj args` (attr: metodo),
+  `calls args` (attr: clase, metodo), `new args` (attr: clase)
+- `array k1 v1 ...` (attr: tupla de flags "tiene clave"), `index base key`,
+  `setdim base value k1..kn` (dest: arreglo actualizado), `prop obj` (attr: nombre),
+  `setprop obj value`, `setpropdim obj value k1..kn` (attr: nombre)
+- `iter x`, `itlen it`, `itkey it i`, `itval it i`, `echo a`
+- `phi a1 .. an` (attr: etiquetas de los predecesores, alineadas con `args`)
+
+Los arreglos tienen semantica de valor: `setdim` produce una version nueva y el
+backend decide si puede escribir en sitio.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from ..vm import runtime as rt
+
+
+class Var:
+    """Variable de la IR; `version` 0 antes de SSA."""
+
+    __slots__ = ("name", "version")
+
+    def __init__(self, name: str, version: int = 0) -> None:
+        self.name = name
+        self.version = version
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Var) and other.name == self.name and other.version == self.version
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.version))
+
+    def __repr__(self) -> str:
+        return self.name if self.version == 0 else f"{self.name}.{self.version}"
+
+
+class Const:
+    """Constante escalar; la igualdad distingue tipos (`1`, `1.0` y `true` difieren)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Const)
+            and other.value.__class__ is self.value.__class__
+            and other.value == self.value
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.value.__class__, self.value))
+
+    def __repr__(self) -> str:
+        value = self.value
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, str):
+            return repr(value)
+        return rt.to_str(value) if isinstance(value, int) else repr(value)
+
+
+Operand = Union[Var, Const]
+
+TERMINATORS = ("jump", "branch", "return")
+
+
+class Instr:
+    __slots__ = ("op", "dest", "args", "attr", "lineno")
+
+    def __init__(self, op: str, dest: Optional[Var] = None, args: Optional[List[Operand]] = None,
+                 attr: Any = None, lineno: Optional[int] = None) -> None:
+        self.op = op
+        self.dest = dest
+        self.args = args if args is not None else []
+        self.attr = attr
+        self.lineno = lineno
+
+    def __repr__(self) -> str:
+        return format_instr(self)
+
+
+@dataclass
+class Block:
+    label: int
+    instrs: List[Instr] = field(default_factory=list)
+    term: Optional[Instr] = None
+
+    @property
+    def successors(self) -> List[int]:
+        if self.term is None or self.term.op == "return":
+            return []
+        return list(self.term.attr)
+
+    def phis(self) -> Iterator[Instr]:
+        for instr in self.instrs:
+            if instr.op != "phi":
+                break
+            yield instr
+
+
+@dataclass
+class IRFunction:
+    name: str
+    params: List[str] = field(default_factory=list)
+    blocks: Dict[int, Block] = field(default_factory=dict)
+    entry: int = 0
+    has_this: bool = False  # `$this` llega como primer parametro
+    min_args: int = 0
+    defaults: List[Any] = field(default_factory=list)  # valores de los parametros opcionales
+    next_label: int = 0
+
+    def new_block(self) -> Block:
+        block = Block(self.next_label)
+        self.blocks[block.label] = block
+        self.next_label += 1
+        return block
+
+    def predecessors(self) -> Dict[int, List[int]]:
+        preds: Dict[int, List[int]] = {label: [] for label in self.blocks}
+        for block in self.blocks.values():
+            for succ in block.successors:
+                preds[succ].append(block.label)
+        return preds
+
+    def instructions(self) -> Iterator[Instr]:
+        for block in self.blocks.values():
+            yield from block.instrs
+            if block.term is not None:
+                yield block.term
+
+    def instruction_count(self) -> int:
+        return sum(1 for _ in self.instructions())
+
+    def dump(self) -> str:
+        header = f"function {self.name}({', '.join(self.params)}):"
+        lines = [header]
+        for block in self.blocks.values():
+            marker = "  ; entrada" if block.label == self.entry else ""
+            lines.append(f"  b{block.label}:{marker}")
+            for instr in block.instrs:
+                lines.append(f"    {format_instr(instr)}")
+            if block.term is not None:
+                lines.append(f"    {format_instr(block.term)}")
+        return "\n".join(lines)
+
+
+@dataclass
+class IRClass:
+    name: str
+    methods: Dict[str, IRFunction] = field(default_factory=dict)
+    static_methods: set = field(default_factory=set)
+
+
+@dataclass
+class IRModule:
+    main: IRFunction
+    functions: Dict[str, IRFunction] = field(default_factory=dict)
+    classes: Dict[str, IRClass] = field(default_factory=dict)
+
+    def all_functions(self) -> Iterator[IRFunction]:
+        yield self.main
+        yield from self.functions.values()
+        for cls in self.classes.values():
+            yield from cls.methods.values()
+
+    def instruction_count(self) -> int:
+        return sum(func.instruction_count() for func in self.all_functions())
+
+    def dump(self) -> str:
+        return "\n\n".join(func.dump() for func in self.all_functions())
+
+
+def format_instr(instr: Instr) -> str:
+    op, attr = instr.op, instr.attr
+    args = ", ".join(map(repr, instr.args))
+    if op == "jump":
+        return f"jump b{attr[0]}"
+    if op == "branch":
+        return f"branch {instr.args[0]!r}, b{attr[0]}, b{attr[1]}"
+    if op == "return":
+        return f"return {args}".rstrip()
+    if op == "phi":
+        rhs = "phi " + " ".join(f"[b{label}: {arg!r}]" for label, arg in zip(attr, instr.args))
+    elif op == "bin":
+        rhs = f"{instr.args[0]!r} {attr} {instr.args[1]!r}"
+    elif op == "un":
+        rhs = f"{attr}{instr.args[0]!r}"
+    elif op == "param":
+        rhs = f"param {attr}"
+    elif attr is not None and op in ("call", "callm", "new", "prop", "setprop", "setpropdim"):
+        rhs = f"{op} {attr}({args})" if op in ("call", "new") else f"{op} {args} ->{attr}"
+    elif op == "calls":
+        rhs = f"calls {attr[0]}::{attr[1]}({args})"
+    elif op == "array":
+        rhs = f"array [{args}]"
+    else:
+        rhs = f"{op} {args}".rstrip()
+    return f"{instr.dest!r} = {rhs}" if instr.dest is not None else rhs
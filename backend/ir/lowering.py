@@ -0,0 +1,443 @@
+"""Baja el AST a la IR de tres direcciones (antes de SSA).
+
+Las variables PHP se convierten en `Var("$x")` con varias asignaciones; cada
+subexpresion produce un temporal `tN` de asignacion unica. Los valores que se
+unen al final de `&&`, `||` y `?:` usan variables internas `%N` que la
+construccion SSA resuelve con `phi`. Llamadas y clases se resuelven con
+`ProgramNames`, igual que en el compilador de bytecode.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from .. import ast_nodes as ast
+from ..semantic.names import SEPARATOR
+from ..semantic.semantic_analyzer import find_lineno
+from ..vm.compiler import MAIN, THIS, CompileError, ProgramNames, constant_value, unescape
+from ..vm.runtime import CONSTANTS
+from .ir import Block, Const, Instr, IRClass, IRFunction, IRModule, Operand, Var
+
+_BINARY = {"+", "-", "*", "/", "%", ".", "<", "<=", ">", ">=", "==", "!=", "===", "!=="}
+_UNARY = {"!": "!", "-": "-", "u-": "-", "+": "+", "u+": "+"}
+NULL = Const(None)
+
+
+class _FunctionLowering:
+    """Emite los bloques de una funcion, metodo o del nivel superior."""
+
+    def __init__(self, owner: "IRBuilder", func: IRFunction, class_key: Optional[str] = None) -> None:
+        self.owner = owner
+        self.func = func
+        self.class_key = class_key
+        self.block: Block = func.new_block()
+        func.entry = self.block.label
+        self.lineno: Optional[int] = None
+        self._temps = 0
+
+    # --- emision ---
+    def temp(self) -> Var:
+        self._temps += 1
+        return Var(f"t{self._temps}")
+
+    def internal(self) -> Var:
+        self._temps += 1
+        return Var(f"%{self._temps}")
+
+    def emit(self, op: str, args: Sequence[Operand] = (), attr: Any = None, dest: Optional[Var] = None,
+             value: bool = True) -> Optional[Var]:
+        if dest is None and value:
+            dest = self.temp()
+        self.block.instrs.append(Instr(op, dest, list(args), attr, self.lineno))
+        return dest
+
+    def terminate(self, op: str, args: Sequence[Operand] = (), targets: Sequence[int] = ()) -> None:
+        if self.block.term is None:
+            self.block.term = Instr(op, None, list(args), tuple(targets) if op != "return" else None, self.lineno)
+
+    def jump(self, target: Block) -> None:
+        self.terminate("jump", targets=[target.label])
+
+    def branch(self, cond: Operand, if_true: Block, if_false: Block) -> None:
+        self.terminate("branch", [cond], [if_true.label, if_false.label])
+
+    def start(self, block: Block) -> None:
+        self.block = block
+
+    def finish(self) -> IRFunction:
+        self.terminate("return", [NULL])
+        for block in self.func.blocks.values():
+            if block.term is None:
+                block.term = Instr("return", None, [NULL], None, self.lineno)
+        return self.func
+
+    def _track(self, node: Any) -> None:
+        lineno = getattr(node, "lineno", None)
+        if lineno is not None:
+            self.lineno = lineno
+
+    def error(self, message: str, node: Any = None) -> CompileError:
+        lineno = find_lineno(node) if node is not None else None
+        return CompileError(message, lineno if lineno is not None else self.lineno)
+
+    # --- sentencias ---
+    def stmts(self, items: Sequence[Any]) -> None:
+        for item in items:
+            self.stmt(item)
+
+    def stmt(self, node: Any) -> None:
+        if self.block.term is not None:
+            # Codigo despues de `return`: se baja a un bloque inalcanzable que DCE elimina.
+            self.start(self.func.new_block())
+        self._track(node)
+        handler = getattr(self, f"stmt_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported statement {node.__class__.__name__}", node)
+        handler(node)
+
+    def stmt_EmptyStmt(self, node: ast.EmptyStmt) -> None:
+        return
+
+    def stmt_Block(self, node: ast.Block) -> None:
+        self.stmts(node.stmts)
+
+    def stmt_NamespaceDecl(self, node: ast.NamespaceDecl) -> None:
+        self.owner.names.enter_namespace(node.name)
+
+    def stmt_UseDecl(self, node: ast.UseDecl) -> None:
+        for parts in node.names:
+            self.owner.names.add_use(parts)
+
+    def stmt_ClassDecl(self, node: ast.ClassDecl) -> None:
+        self.owner.lower_class(node)
+
+    def stmt_FunctionDecl(self, node: ast.FunctionDecl) -> None:
+        self.owner.lower_function(node)
+
+    def stmt_IncludeStmt(self, node: Any) -> None:
+        raise self.error("include/require is not supported by the IR", node.expr)
+
+    stmt_RequireStmt = stmt_IncludeStmt
+
+    def stmt_EchoStmt(self, node: ast.EchoStmt) -> None:
+        for expr in node.exprs:
+            self.emit("echo", [self.expr(expr)], value=False)
+
+    def stmt_PrintStmt(self, node: ast.PrintStmt) -> None:
+        self.emit("echo", [self.expr(node.expr)], value=False)
+
+    def stmt_ReturnStmt(self, node: ast.ReturnStmt) -> None:
+        self.terminate("return", [NULL if node.expr is None else self.expr(node.expr)])
+
+    def stmt_VarDeclStmt(self, node: ast.VarDeclStmt) -> None:
+        for name, init in node.decls:
+            if init is not None:
+                self.emit("copy", [self.expr(init)], dest=Var(name))
+
+    def stmt_ExprStmt(self, node: ast.ExprStmt) -> None:
+        self.expr(node.expr)
+
+    def stmt_IfStmt(self, node: ast.IfStmt) -> None:
+        done = self.func.new_block()
+        for cond, body in [(node.cond, node.then), *node.elifs]:
+            then_block, other = self.func.new_block(), self.func.new_block()
+            self.branch(self.expr(cond), then_block, other)
+            self.start(then_block)
+            self.stmt(body)
+            self.jump(done)
+            self.start(other)
+        if node.els is not None:
+            self.stmt(node.els)
+        self.jump(done)
+        self.start(done)
+
+    def stmt_WhileStmt(self, node: ast.WhileStmt) -> None:
+        header, body, done = self.func.new_block(), self.func.new_block(), self.func.new_block()
+        self.jump(header)
+        self.start(header)
+        self.branch(self.expr(node.cond), body, done)
+        self.start(body)
+        self.stmt(node.body)
+        self.jump(header)
+        self.start(done)
+
+    def stmt_ForStmt(self, node: ast.ForStmt) -> None:
+        for init in node.init or []:
+            if isinstance(init, tuple):
+                self.stmt_VarDeclStmt(ast.VarDeclStmt([init]))
+            else:
+                self.expr(init)
+        header, body, done = self.func.new_block(), self.func.new_block(), self.func.new_block()
+        self.jump(header)
+        self.start(header)
+        if node.cond is not None:
+            self.branch(self.expr(node.cond), body, done)
+        else:
+            self.jump(body)
+        self.start(body)
+        self.stmt(node.body)
+        for step in node.iters or []:
+            self.expr(step)
+        self.jump(header)
+        self.start(done)
+
+    def stmt_ForeachStmt(self, node: ast.ForeachStmt) -> None:
+        items = self.emit("iter", [self.expr(node.iterable)])
+        count = self.emit("itlen", [items])
+        position = self.internal()
+        self.emit("copy", [Const(0)], dest=position)
+        header, body, done = self.func.new_block(), self.func.new_block(), self.func.new_block()
+        self.jump(header)
+        self.start(header)
+        self.branch(self.emit("bin", [position, count], "<"), body, done)
+        self.start(body)
+        self.emit("copy", [self.emit("itval", [items, position])], dest=Var(node.value))
+        if node.key is not None:
+            self.emit("copy", [self.emit("itkey", [items, position])], dest=Var(node.key))
+        self.stmt(node.body)
+        self.emit("bin", [position, Const(1)], "+", dest=position)
+        self.jump(header)
+        self.start(done)
+
+    # --- expresiones ---
+    def expr(self, node: Any) -> Operand:
+        self._track(node)
+        handler = getattr(self, f"expr_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported expression {node.__class__.__name__}", node)
+        return handler(node)
+
+    def expr_NumberLit(self, node: ast.NumberLit) -> Operand:
+        return Const(node.value)
+
+    def expr_StringLit(self, node: ast.StringLit) -> Operand:
+        return Const(unescape(node.value))
+
+    def expr_BoolLit(self, node: ast.BoolLit) -> Operand:
+        return Const(node.value)
+
+    def expr_NullLit(self, node: ast.NullLit) -> Operand:
+        return NULL
+
+    def expr_Name(self, node: ast.Name) -> Operand:
+        name = node.parts[-1]
+        if len(node.parts) == 1 and name in CONSTANTS:
+            return Const(CONSTANTS[name])
+        raise self.error(f"Undefined constant '{SEPARATOR.join(node.parts)}'", node)
+
+    def expr_Var(self, node: ast.Var) -> Operand:
+        return Var(node.name)
+
+    def expr_ArrayLit(self, node: ast.ArrayLit) -> Operand:
+        args: List[Operand] = []
+        for key, value in node.pairs:
+            if key is not None:
+                args.append(self.expr(key))
+            args.append(self.expr(value))
+        return self.emit("array", args, tuple(key is not None for key, _ in node.pairs))
+
+    def expr_Assign(self, node: ast.Assign) -> Operand:
+        return self.assign(node.target, node.value)
+
+    def expr_Binary(self, node: ast.Binary) -> Operand:
+        if node.op in ("&&", "||"):
+            result = self.internal()
+            left = self.emit("un", [self.expr(node.left)], "!!")
+            right_block, short, done = self.func.new_block(), self.func.new_block(), self.func.new_block()
+            if node.op == "&&":
+                self.branch(left, right_block, short)
+            else:
+                self.branch(left, short, right_block)
+            self.start(right_block)
+            self.emit("un", [self.expr(node.right)], "!!", dest=result)
+            self.jump(done)
+            self.start(short)
+            self.emit("copy", [Const(node.op == "||")], dest=result)
+            self.jump(done)
+            self.start(done)
+            return result
+        if node.op not in _BINARY:
+            raise self.error(f"Unsupported operator '{node.op}'", node)
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        return self.emit("bin", [left, right], node.op)
+
+    def expr_Unary(self, node: ast.Unary) -> Operand:
+        if node.op in ("++", "--"):
+            return self.increment(node.expr, node.op, prefix=True)
+        return self.emit("un", [self.expr(node.expr)], _UNARY[node.op])
+
+    def expr_PostfixUnary(self, node: ast.PostfixUnary) -> Operand:
+        return self.increment(node.expr, node.op, prefix=False)
+
+    def increment(self, target: Any, op: str, prefix: bool) -> Operand:
+        old = self.expr(target)
+        if not prefix:
+            old = self.emit("copy", [old])
+        new = self.emit("un", [old], op)
+        self.store(target, new)
+        return new if prefix else old
+
+    def expr_Ternary(self, node: ast.Ternary) -> Operand:
+        result = self.internal()
+        then_block, else_block, done = self.func.new_block(), self.func.new_block(), self.func.new_block()
+        self.branch(self.expr(node.cond), then_block, else_block)
+        self.start(then_block)
+        self.emit("copy", [self.expr(node.if_true)], dest=result)
+        self.jump(done)
+        self.start(else_block)
+        self.emit("copy", [self.expr(node.if_false)], dest=result)
+        self.jump(done)
+        self.start(done)
+        return result
+
+    def expr_Index(self, node: ast.Index) -> Operand:
+        base = self.expr(node.base)
+        return self.emit("index", [base, self.expr(node.index)])
+
+    def expr_Member(self, node: ast.Member) -> Operand:
+        return self.emit("prop", [self.expr(node.obj)], node.name)
+
+    def expr_StaticAccess(self, node: ast.StaticAccess) -> Operand:
+        raise self.error("Class constants and static properties are not supported by the IR", node)
+
+    def expr_New(self, node: ast.New) -> Operand:
+        key = self.class_key_for(node.class_name)
+        return self.emit("new", [self.expr(arg) for arg in node.args], key)
+
+    def expr_Call(self, node: ast.Call) -> Operand:
+        callee = node.callee
+        if isinstance(callee, ast.Member):
+            obj = self.expr(callee.obj)
+            return self.emit("callm", [obj, *(self.expr(arg) for arg in node.args)], callee.name.lower())
+        args = [self.expr(arg) for arg in node.args]
+        if isinstance(callee, ast.StaticAccess):
+            return self.emit("calls", args, (self.class_key_for(callee.qname), callee.name.lower()))
+        if isinstance(callee, ast.Name):
+            return self.emit("call", args, self.owner.names.function_key(callee.parts))
+        raise self.error("Dynamic calls are not supported by the IR", node)
+
+    def class_key_for(self, qname: ast.Name) -> str:
+        if len(qname.parts) == 1 and qname.parts[0].lower() in ("self", "static"):
+            if self.class_key is None:
+                raise self.error(f"Cannot use '{qname.parts[0]}' outside of a class", qname)
+            return self.class_key
+        return self.owner.names.class_key(qname.parts)
+
+    # --- destinos de asignacion ---
+    def assign(self, target: Any, value: Any) -> Operand:
+        if isinstance(target, ast.Index):
+            # Las claves se evaluan antes que el valor, como en la VM.
+            root, keys = self.dim_path(target)
+            result = self.expr(value)
+            self.write_dim(root, keys, result)
+            return result
+        if isinstance(target, ast.Member):
+            obj = self.expr(target.obj)
+            result = self.expr(value)
+            self.emit("setprop", [obj, result], target.name, value=False)
+            return result
+        result = self.expr(value)
+        self.store(target, result)
+        return result
+
+    def store(self, target: Any, value: Operand) -> None:
+        if isinstance(target, ast.Var):
+            self.emit("copy", [value], dest=Var(target.name))
+        elif isinstance(target, ast.Index):
+            root, keys = self.dim_path(target)
+            self.write_dim(root, keys, value)
+        elif isinstance(target, ast.Member):
+            self.emit("setprop", [self.expr(target.obj), value], target.name, value=False)
+        else:
+            raise self.error("Cannot assign to this expression", target)
+
+    def dim_path(self, target: ast.Index) -> tuple:
+        keys: List[Any] = []
+        node: Any = target
+        while isinstance(node, ast.Index):
+            keys.append(node.index)
+            node = node.base
+        if isinstance(node, ast.Var):
+            root: Any = Var(node.name)
+        elif isinstance(node, ast.Member):
+            root = (self.expr(node.obj), node.name)
+        else:
+            raise self.error("Cannot use this expression as an array to write into", node)
+        return root, [self.expr(key) for key in reversed(keys)]
+
+    def write_dim(self, root: Any, keys: List[Operand], value: Operand) -> None:
+        if isinstance(root, Var):
+            self.emit("setdim", [root, value, *keys], dest=root)
+        else:
+            obj, name = root
+            self.emit("setpropdim", [obj, value, *keys], name, value=False)
+
+
+class IRBuilder:
+    """Baja un `Program` completo a un `IRModule`."""
+
+    def __init__(self) -> None:
+        self.names = ProgramNames()
+        self.functions: Dict[str, IRFunction] = {}
+        self.classes: Dict[str, IRClass] = {}
+
+    def build(self, program: ast.Program) -> IRModule:
+        self.names.declare_program(program)
+        lowering = _FunctionLowering(self, IRFunction(MAIN))
+        lowering.stmts(program.items)
+        return IRModule(lowering.finish(), self.functions, self.classes)
+
+    def _function_for(self, func: ast.FunctionDecl, name: str, has_this: bool) -> IRFunction:
+        ir_func = IRFunction(name, has_this=has_this)
+        if has_this:
+            ir_func.params.append(THIS)
+        seen_default = False
+        for param in func.params:
+            ir_func.params.append(param.name)
+            if param.default is None:
+                if seen_default:
+                    raise CompileError(
+                        f"Required parameter {param.name} follows an optional parameter", find_lineno(param)
+                    )
+                ir_func.min_args += 1
+            else:
+                seen_default = True
+                ir_func.defaults.append(constant_value(param.default))
+        return ir_func
+
+    def _lower_body(self, ir_func: IRFunction, func: ast.FunctionDecl, class_key: Optional[str] = None) -> None:
+        lowering = _FunctionLowering(self, ir_func, class_key)
+        lowering.lineno = find_lineno(func)
+        for idx, name in enumerate(ir_func.params):
+            lowering.emit("param", (), idx, dest=Var(name))
+        lowering.stmts(func.body.stmts)
+        lowering.finish()
+
+    def lower_function(self, func: ast.FunctionDecl) -> None:
+        qualified = self.names.qualify(func.name)
+        key = qualified.lower()
+        if key in self.functions:
+            raise CompileError(f"Cannot redeclare function {qualified}()", find_lineno(func))
+        ir_func = self._function_for(func, qualified, has_this=False)
+        self.functions[key] = ir_func
+        self._lower_body(ir_func, func)
+
+    def lower_class(self, node: ast.ClassDecl) -> None:
+        qualified = self.names.qualify(node.name)
+        key = qualified.lower()
+        if key in self.classes:
+            raise CompileError(f"Cannot redeclare class {qualified}", find_lineno(node))
+        cls = IRClass(qualified)
+        self.classes[key] = cls
+        for method in node.members:
+            if not isinstance(method, ast.FunctionDecl):
+                continue
+            ir_func = self._function_for(method, f"{qualified}::{method.name}", has_this=not method.is_static)
+            cls.methods[method.name.lower()] = ir_func
+            if method.is_static:
+                cls.static_methods.add(method.name.lower())
+            self._lower_body(ir_func, method, class_key=key)
+
+
+def lower_program(program: ast.Program) -> IRModule:
+    return IRBuilder().build(program)
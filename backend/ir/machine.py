@@ -0,0 +1,517 @@
+"""Ejecutor de la IR en forma SSA (optimizada o no).
+
+Cada funcion se traduce una sola vez a bloques de cierres de Python que leen y
+escriben una lista de registros (una posicion por variable SSA; las constantes
+vienen precargadas en la plantilla del marco). Las `phi` se resuelven como
+movimientos paralelos en cada arista.
+
+Los arreglos mantienen semantica de valor sin copias de mas: `setdim` escribe
+en sitio cuando la version anterior del arreglo ya no esta viva despues de la
+instruccion (segun el analisis de vivacidad) y el arreglo no esta compartido;
+en otro caso trabaja sobre una copia.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..vm import runtime as rt
+from ..vm.machine import DEFAULT_MAX_DEPTH, ExecutionResult
+from ..vm.runtime import BUILTINS, PhpArray, PhpObject, PhpRuntimeError, type_name
+from .ir import Const, Instr, IRFunction, IRModule, Operand, Var
+from .ssa import liveness, live_out
+
+Op = Callable[[List[Any]], None]
+
+
+def _greater(a: Any, b: Any) -> bool:
+    return rt.less(b, a)
+
+
+def _greater_equal(a: Any, b: Any) -> bool:
+    return rt.less_equal(b, a)
+
+
+_BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": rt.add,
+    "-": rt.sub,
+    "*": rt.mul,
+    "/": rt.div,
+    "%": rt.mod,
+    ".": rt.concat,
+    "<": rt.less,
+    "<=": rt.less_equal,
+    ">": _greater,
+    ">=": _greater_equal,
+    "==": rt.loose_equals,
+    "!=": lambda a, b: not rt.loose_equals(a, b),
+    "===": rt.strict_equals,
+    "!==": lambda a, b: not rt.strict_equals(a, b),
+}
+_UNARY: Dict[str, Callable[[Any], Any]] = {
+    "!": lambda a: not rt.to_bool(a),
+    "!!": rt.to_bool,
+    "-": rt.neg,
+    "+": rt.to_number,
+    "++": rt.inc,
+    "--": rt.dec,
+}
+
+
+class _Frame:
+    """Funcion lista para ejecutar: plantilla de registros y bloques compilados."""
+
+    __slots__ = ("func", "template", "param_slots", "argcount", "blocks", "entry")
+
+    def __init__(self, func: IRFunction) -> None:
+        self.func = func
+        self.template: List[Any] = []
+        self.param_slots: List[Optional[int]] = [None] * len(func.params)
+        self.argcount = len(func.params) - (1 if func.has_this else 0)
+        # etiqueta -> (operaciones, lineas, terminador)
+        self.blocks: Dict[int, Tuple[Tuple[Op, ...], Tuple[Optional[int], ...], Tuple[Any, ...]]] = {}
+        self.entry = func.entry
+
+
+class IRMachine:
+    """Interprete de un `IRModule`; mismos mensajes de error y limites que la VM."""
+
+    def __init__(self, module: IRModule, max_steps: Optional[int] = None, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.module = module
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.output: List[str] = []
+        self.steps = 0
+        self._depth = 0
+        self._frames: Dict[int, _Frame] = {}
+        self._classes: Dict[str, rt.PhpClass] = {}
+
+    def run(self) -> ExecutionResult:
+        self.output.clear()
+        self.steps = 0
+        started = time.perf_counter()
+        try:
+            frame = self.frame_for(self.module.main)
+            self.execute(frame, frame.template[:])
+        except (PhpRuntimeError, RecursionError) as exc:
+            if isinstance(exc, RecursionError):
+                exc = PhpRuntimeError(f"Maximum function nesting level of {self.max_depth} reached")
+            return ExecutionResult(
+                ok=False,
+                output="".join(self.output),
+                error=str(exc),
+                lineno=exc.lineno,
+                steps=self.steps,
+                elapsed=time.perf_counter() - started,
+            )
+        return ExecutionResult(
+            ok=True, output="".join(self.output), steps=self.steps, elapsed=time.perf_counter() - started
+        )
+
+    # --- llamadas ---
+    def frame_for(self, func: IRFunction) -> _Frame:
+        frame = self._frames.get(id(func))
+        if frame is None:
+            frame = self._frames[id(func)] = _FrameCompiler(self, func).compile()
+        return frame
+
+    def invoke(self, func: IRFunction, args: List[Any], this: Any = None) -> Any:
+        if self._depth >= self.max_depth:
+            raise PhpRuntimeError(f"Maximum function nesting level of {self.max_depth} reached")
+        frame = self.frame_for(func)
+        nargs = len(args)
+        if nargs < func.min_args:
+            raise PhpRuntimeError(
+                f"Too few arguments to function {func.name}(), {nargs} passed and "
+                f"{'exactly' if func.min_args == frame.argcount else 'at least'} {func.min_args} expected"
+            )
+        regs = frame.template[:]
+        slots = frame.param_slots
+        base = 0
+        if func.has_this:
+            if slots[0] is not None:
+                regs[slots[0]] = this
+            base = 1
+        for idx in range(frame.argcount):
+            value = args[idx] if idx < nargs else func.defaults[idx - func.min_args]
+            if value.__class__ is PhpArray:
+                value.shared = True
+            slot = slots[base + idx]
+            if slot is not None:
+                regs[slot] = value
+        self._depth += 1
+        try:
+            return self.execute(frame, regs)
+        finally:
+            self._depth -= 1
+
+    def call_function(self, key: str, args: List[Any]) -> Any:
+        func = self.module.functions.get(key)
+        if func is not None:
+            return self.invoke(func, args)
+        builtin = BUILTINS.get(key)
+        if builtin is None:
+            raise PhpRuntimeError(f"Call to undefined function {key}()")
+        try:
+            return builtin(*args)
+        except (TypeError, AttributeError, ValueError) as exc:
+            raise PhpRuntimeError(f"{key}(): invalid arguments ({exc})") from exc
+
+    def call_method(self, obj: Any, name: str, args: List[Any]) -> Any:
+        if not isinstance(obj, PhpObject):
+            raise PhpRuntimeError(f"Call to a member function {name}() on {type_name(obj)}")
+        func = obj.cls.methods.get(name)
+        if func is None:
+            raise PhpRuntimeError(f"Call to undefined method {obj.cls.name}::{name}()")
+        return self.invoke(func, args, obj if func.has_this else None)
+
+    def call_static(self, class_key: str, name: str, args: List[Any]) -> Any:
+        cls = self._class(class_key)
+        func = cls.methods.get(name)
+        if func is None:
+            raise PhpRuntimeError(f"Call to undefined method {cls.name}::{name}()")
+        if func.has_this:
+            raise PhpRuntimeError(f"Non-static method {func.name}() cannot be called statically")
+        return self.invoke(func, args)
+
+    def new_object(self, class_key: str, args: List[Any]) -> PhpObject:
+        cls = self._class(class_key)
+        obj = PhpObject(cls)
+        ctor = cls.methods.get("__construct")
+        if ctor is not None:
+            self.invoke(ctor, args, obj)
+        return obj
+
+    def _class(self, key: str) -> rt.PhpClass:
+        cls = self._classes.get(key)
+        if cls is None:
+            ir_class = self.module.classes.get(key)
+            if ir_class is None:
+                raise PhpRuntimeError(f'Class "{key}" not found')
+            # Los objetos usan `PhpClass` como en la VM; los metodos son `IRFunction`.
+            cls = self._classes[key] = rt.PhpClass(ir_class.name, ir_class.methods, ir_class.static_methods)
+        return cls
+
+    # --- ejecucion ---
+    def execute(self, frame: _Frame, regs: List[Any]) -> Any:
+        blocks = frame.blocks
+        label = frame.entry
+        limit = self.max_steps
+        steps = 0
+        lines: Tuple[Optional[int], ...] = ()
+        done = 0
+        try:
+            while True:
+                ops, lines, term = blocks[label]
+                steps += len(ops) + 1
+                if limit is not None and self.steps + steps > limit:
+                    raise PhpRuntimeError(f"Execution aborted after {limit} steps")
+                done = 0
+                for op in ops:
+                    op(regs)
+                    done += 1
+                kind = term[0]
+                if kind == "branch":
+                    value = regs[term[1]]
+                    label, moves = term[2] if (value if value.__class__ is bool else rt.to_bool(value)) else term[3]
+                elif kind == "jump":
+                    label, moves = term[1]
+                else:
+                    return regs[term[1]]
+                if moves:
+                    values = [regs[src] for _, src, _ in moves]
+                    for (dst, _, shared), value in zip(moves, values):
+                        if shared and value.__class__ is PhpArray:
+                            value.shared = True
+                        regs[dst] = value
+        except PhpRuntimeError as exc:
+            if exc.lineno is None:
+                exc.lineno = lines[min(done, len(lines) - 1)] if lines else None
+            raise
+        finally:
+            self.steps += steps
+
+
+class _FrameCompiler:
+    """Traduce una `IRFunction` en SSA a un `_Frame`."""
+
+    def __init__(self, machine: IRMachine, func: IRFunction) -> None:
+        self.machine = machine
+        self.func = func
+        self.frame = _Frame(func)
+        self.slots: Dict[Any, int] = {}
+
+    def slot(self, operand: Operand) -> int:
+        key = operand if isinstance(operand, Var) else (Const, operand)
+        found = self.slots.get(key)
+        if found is None:
+            found = self.slots[key] = len(self.frame.template)
+            self.frame.template.append(operand.value if isinstance(operand, Const) else None)
+        return found
+
+    def compile(self) -> _Frame:
+        func = self.func
+        live_in = liveness(func)
+        for label, block in func.blocks.items():
+            live = set(live_out(func, label, live_in))
+            live.update(arg for arg in block.term.args if isinstance(arg, Var))
+            # Vivas despues de cada instruccion, recorriendo el bloque hacia atras.
+            after: List[Set[Var]] = []
+            for instr in reversed(block.instrs):
+                after.append(set(live))
+                if instr.dest is not None:
+                    live.discard(instr.dest)
+                if instr.op != "phi":
+                    live.update(arg for arg in instr.args if isinstance(arg, Var))
+            after.reverse()
+            ops: List[Op] = []
+            lines: List[Optional[int]] = []
+            for instr, live_after in zip(block.instrs, after):
+                if instr.op == "phi":
+                    continue
+                if instr.op == "param":
+                    self.frame.param_slots[instr.attr] = self.slot(instr.dest)
+                    continue
+                ops.append(self.op(instr, live_after))
+                lines.append(instr.lineno)
+            lines.append(block.term.lineno)
+            self.frame.blocks[label] = (tuple(ops), tuple(lines), self.terminator(block.term, label, live_in))
+        return self.frame
+
+    # --- terminadores y movimientos de `phi` ---
+    def edge(self, source: int, target: int, live_in: Dict[int, Set[Var]]) -> Tuple[int, Tuple[Any, ...]]:
+        moves = []
+        incoming: List[Operand] = []
+        for phi in self.func.blocks[target].phis():
+            arg = phi.args[phi.attr.index(source)]
+            incoming.append(arg)
+            moves.append((phi.dest, arg))
+        result = []
+        for dest, arg in moves:
+            shared = isinstance(arg, Var) and (arg in live_in[target] or incoming.count(arg) > 1)
+            result.append((self.slot(dest), self.slot(arg), shared))
+        return target, tuple(result)
+
+    def terminator(self, term: Instr, label: int, live_in: Dict[int, Set[Var]]) -> Tuple[Any, ...]:
+        if term.op == "jump":
+            return ("jump", self.edge(label, term.attr[0], live_in))
+        if term.op == "branch":
+            return (
+                "branch",
+                self.slot(term.args[0]),
+                self.edge(label, term.attr[0], live_in),
+                self.edge(label, term.attr[1], live_in),
+            )
+        return ("return", self.slot(term.args[0]) if term.args else self.slot(Const(None)))
+
+    # --- instrucciones ---
+    def op(self, instr: Instr, live_after: Set[Var]) -> Op:
+        handler = getattr(self, f"op_{instr.op}")
+        return handler(instr, live_after)
+
+    def op_copy(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a = self.slot(instr.dest), self.slot(instr.args[0])
+
+        def copy(r: List[Any]) -> None:
+            value = r[a]
+            if value.__class__ is PhpArray:
+                value.shared = True
+            r[d] = value
+        return copy
+
+    def op_bin(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a, b = self.slot(instr.dest), self.slot(instr.args[0]), self.slot(instr.args[1])
+        operator = instr.attr
+        if operator == "+":
+            def add(r: List[Any]) -> None:
+                x, y = r[a], r[b]
+                r[d] = rt.int_result(x + y) if x.__class__ is int and y.__class__ is int else rt.add(x, y)
+            return add
+        if operator == "-":
+            def sub(r: List[Any]) -> None:
+                x, y = r[a], r[b]
+                r[d] = rt.int_result(x - y) if x.__class__ is int and y.__class__ is int else rt.sub(x, y)
+            return sub
+        if operator == "<":
+            def less(r: List[Any]) -> None:
+                x, y = r[a], r[b]
+                r[d] = x < y if x.__class__ is int and y.__class__ is int else rt.less(x, y)
+            return less
+        fn = _BINARY[operator]
+
+        def binary(r: List[Any]) -> None:
+            r[d] = fn(r[a], r[b])
+        return binary
+
+    def op_un(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a = self.slot(instr.dest), self.slot(instr.args[0])
+        if instr.attr == "++":
+            def inc(r: List[Any]) -> None:
+                x = r[a]
+                r[d] = x + 1 if x.__class__ is int and x < rt.INT_MAX else rt.inc(x)
+            return inc
+        fn = _UNARY[instr.attr]
+
+        def unary(r: List[Any]) -> None:
+            r[d] = fn(r[a])
+        return unary
+
+    def _call_args(self, args: List[Operand]) -> Tuple[int, ...]:
+        return tuple(self.slot(arg) for arg in args)
+
+    def op_call(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, args, key = self.slot(instr.dest), self._call_args(instr.args), instr.attr
+        machine = self.machine
+
+        func = machine.module.functions.get(key)
+        if func is not None:
+            # Funcion del programa: se invoca directamente (un marco de Python menos por nivel).
+            invoke = machine.invoke
+
+            def call_user(r: List[Any]) -> None:
+                r[d] = invoke(func, [r[s] for s in args])
+            return call_user
+
+        def call(r: List[Any]) -> None:
+            r[d] = machine.call_function(key, [r[s] for s in args])
+        return call
+
+    def op_callm(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, obj, args, name = self.slot(instr.dest), self.slot(instr.args[0]), self._call_args(instr.args[1:]), instr.attr
+        machine = self.machine
+
+        def callm(r: List[Any]) -> None:
+            r[d] = machine.call_method(r[obj], name, [r[s] for s in args])
+        return callm
+
+    def op_calls(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, args, (cls, name) = self.slot(instr.dest), self._call_args(instr.args), instr.attr
+        machine = self.machine
+
+        def calls(r: List[Any]) -> None:
+            r[d] = machine.call_static(cls, name, [r[s] for s in args])
+        return calls
+
+    def op_new(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, args, cls = self.slot(instr.dest), self._call_args(instr.args), instr.attr
+        machine = self.machine
+
+        def new(r: List[Any]) -> None:
+            r[d] = machine.new_object(cls, [r[s] for s in args])
+        return new
+
+    def op_array(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d = self.slot(instr.dest)
+        pairs: List[Tuple[Optional[int], int]] = []
+        args = iter(instr.args)
+        for has_key in instr.attr:
+            key = self.slot(next(args)) if has_key else None
+            pairs.append((key, self.slot(next(args))))
+
+        def array(r: List[Any]) -> None:
+            r[d] = rt.array_from_pairs([(rt._APPEND if k is None else r[k], r[v]) for k, v in pairs])
+        return array
+
+    def op_index(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a, k = self.slot(instr.dest), self.slot(instr.args[0]), self.slot(instr.args[1])
+
+        def index(r: List[Any]) -> None:
+            value = rt.index(r[a], r[k])
+            if value.__class__ is PhpArray:
+                value.shared = True
+            r[d] = value
+        return index
+
+    def op_setdim(self, instr: Instr, live_after: Set[Var]) -> Op:
+        base_arg = instr.args[0]
+        in_place = (
+            not isinstance(base_arg, Var) or base_arg not in live_after and base_arg not in instr.args[1:]
+        )
+        d, base, value = self.slot(instr.dest), self.slot(base_arg), self.slot(instr.args[1])
+        path = tuple(self.slot(key) for key in instr.args[2:-1])
+        last = self.slot(instr.args[-1])
+
+        def setdim(r: List[Any]) -> None:
+            current = r[base]
+            if in_place or current.__class__ is not PhpArray:
+                container = rt.writable(current)
+            else:
+                container = current.copy()
+            result = container
+            for key in path:
+                container = rt.fetch_dim_w(container, r[key])
+            rt.store_dim(container, r[last], r[value])
+            r[d] = result
+        return setdim
+
+    def op_prop(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, obj, name = self.slot(instr.dest), self.slot(instr.args[0]), instr.attr
+
+        def prop(r: List[Any]) -> None:
+            value = rt.get_prop(r[obj], name)
+            if value.__class__ is PhpArray:
+                value.shared = True
+            r[d] = value
+        return prop
+
+    def op_setprop(self, instr: Instr, live_after: Set[Var]) -> Op:
+        obj, value, name = self.slot(instr.args[0]), self.slot(instr.args[1]), instr.attr
+
+        def setprop(r: List[Any]) -> None:
+            rt.store_prop(r[obj], name, r[value])
+        return setprop
+
+    def op_setpropdim(self, instr: Instr, live_after: Set[Var]) -> Op:
+        obj, value, name = self.slot(instr.args[0]), self.slot(instr.args[1]), instr.attr
+        path = tuple(self.slot(key) for key in instr.args[2:-1])
+        last = self.slot(instr.args[-1])
+
+        def setpropdim(r: List[Any]) -> None:
+            container = rt.fetch_prop_w(r[obj], name)
+            for key in path:
+                container = rt.fetch_dim_w(container, r[key])
+            rt.store_dim(container, r[last], r[value])
+        return setpropdim
+
+    def op_iter(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a = self.slot(instr.dest), self.slot(instr.args[0])
+
+        def iterate(r: List[Any]) -> None:
+            r[d] = rt.iterate(r[a])
+        return iterate
+
+    def op_itlen(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, a = self.slot(instr.dest), self.slot(instr.args[0])
+
+        def itlen(r: List[Any]) -> None:
+            r[d] = len(r[a])
+        return itlen
+
+    def op_itkey(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, it, pos = self.slot(instr.dest), self.slot(instr.args[0]), self.slot(instr.args[1])
+
+        def itkey(r: List[Any]) -> None:
+            r[d] = r[it][r[pos]][0]
+        return itkey
+
+    def op_itval(self, instr: Instr, live_after: Set[Var]) -> Op:
+        d, it, pos = self.slot(instr.dest), self.slot(instr.args[0]), self.slot(instr.args[1])
+
+        def itval(r: List[Any]) -> None:
+            value = r[it][r[pos]][1]
+            if value.__class__ is PhpArray:
+                value.shared = True
+            r[d] = value
+        return itval
+
+    def op_echo(self, instr: Instr, live_after: Set[Var]) -> Op:
+        a = self.slot(instr.args[0])
+        append = self.machine.output.append
+
+        def echo(r: List[Any]) -> None:
+            append(rt.to_str(r[a]))
+        return echo
+
+
+def run_ir(module: IRModule, max_steps: Optional[int] = None) -> ExecutionResult:
+    return IRMachine(module, max_steps=max_steps).run()
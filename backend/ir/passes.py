@@ -0,0 +1,386 @@
+"""Optimizaciones escalares sobre la IR en forma SSA.
+
+- Propagacion de copias y constantes: elimina `copy` y `phi` triviales,
+  pliega `bin`/`un` con operandos constantes (misma semantica que el plegado
+  del AST) y convierte `branch` sobre constantes en `jump`.
+- CSE: reutiliza el resultado de una expresion pura identica que domina al
+  uso, con una tabla por ambito al recorrer el arbol de dominadores.
+- DCE: marcado y barrido desde las instrucciones con efectos; tambien quita
+  bloques inalcanzables y fusiona bloques en linea recta.
+- Inlining de funciones pequenas: copia el cuerpo SSA del llamado en el sitio
+  de la llamada, sustituyendo parametros por argumentos y los `return` por una
+  `phi` en el bloque de continuacion.
+
+Se asume que la aritmetica (`+ - * .`), las comparaciones y las lecturas
+(`index`, `prop`) no tienen efectos: si su resultado no se usa se eliminan
+aunque en tiempo de ejecucion hubieran fallado. `/` y `%` solo se eliminan con
+divisor constante distinto de cero.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..optimizer.folding import NOT_CONSTANT, evaluate_binary, evaluate_unary
+from ..vm import runtime as rt
+from .ir import Block, Const, Instr, IRFunction, IRModule, Operand, Var
+from .ssa import dominator_tree, dominators, remove_unreachable
+
+INLINE_LIMIT = 24
+_EFFECTS = {"param", "call", "callm", "calls", "new", "echo", "setprop", "setpropdim", "iter"}
+_CSE_OPS = {"bin", "un", "index", "itlen", "itkey", "itval"}
+
+
+@dataclass
+class OptimizationReport:
+    before: int = 0
+    after: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, name: str, amount: int) -> None:
+        if amount:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"before": self.before, "after": self.after, "counts": dict(self.counts)}
+
+
+def _has_effects(instr: Instr) -> bool:
+    if instr.op in _EFFECTS:
+        return True
+    if instr.op == "bin" and instr.attr in ("/", "%"):
+        divisor = instr.args[1]
+        return not (isinstance(divisor, Const) and isinstance(divisor.value, (int, float)) and divisor.value != 0)
+    return False
+
+
+def _replace_uses(func: IRFunction, mapping: Dict[Var, Operand]) -> None:
+    def resolve(arg: Operand) -> Operand:
+        seen = 0
+        while isinstance(arg, Var) and arg in mapping and seen < 64:
+            arg = mapping[arg]
+            seen += 1
+        return arg
+
+    for instr in func.instructions():
+        instr.args = [resolve(arg) for arg in instr.args]
+
+
+def _fold(instr: Instr) -> Any:
+    args = instr.args
+    if not all(isinstance(arg, Const) for arg in args):
+        return NOT_CONSTANT
+    if instr.op == "bin":
+        return evaluate_binary(instr.attr, args[0].value, args[1].value)
+    if instr.op == "un":
+        value = args[0].value
+        if instr.attr == "!!":
+            return rt.to_bool(value)
+        if instr.attr in ("++", "--"):
+            if value is None or isinstance(value, (int, float)):
+                return (rt.inc if instr.attr == "++" else rt.dec)(value)
+            return NOT_CONSTANT
+        return evaluate_unary(instr.attr, value)
+    return NOT_CONSTANT
+
+
+# === PROPAGACION ===
+def propagate(func: IRFunction, report: OptimizationReport) -> bool:
+    """Propagacion de copias/constantes y plegado; devuelve True si hubo cambios."""
+    changed_any = False
+    while True:
+        mapping: Dict[Var, Operand] = {}
+        folded = copies = 0
+        for block in func.blocks.values():
+            kept: List[Instr] = []
+            for instr in block.instrs:
+                if instr.op == "copy":
+                    mapping[instr.dest] = instr.args[0]
+                    copies += 1
+                    continue
+                if instr.op == "phi":
+                    distinct = {arg for arg in instr.args if arg != instr.dest}
+                    if len(distinct) == 1:
+                        mapping[instr.dest] = distinct.pop()
+                        copies += 1
+                        continue
+                value = _fold(instr)
+                if value is not NOT_CONSTANT:
+                    mapping[instr.dest] = Const(value)
+                    folded += 1
+                    continue
+                kept.append(instr)
+            block.instrs = kept
+        branches = _fold_branches(func)
+        if not mapping and not branches:
+            return changed_any
+        _replace_uses(func, mapping)
+        report.add("copias propagadas", copies)
+        report.add("constantes plegadas", folded)
+        report.add("saltos resueltos", branches)
+        changed_any = True
+
+
+def _fold_branches(func: IRFunction) -> int:
+    resolved = 0
+    for block in func.blocks.values():
+        term = block.term
+        if term.op != "branch" or not isinstance(term.args[0], Const):
+            continue
+        taken, other = term.attr if rt.to_bool(term.args[0].value) else term.attr[::-1]
+        if taken != other:
+            _drop_phi_edge(func.blocks[other], block.label)
+        block.term = Instr("jump", None, [], (taken,), term.lineno)
+        resolved += 1
+    if resolved:
+        remove_unreachable(func)
+    return resolved
+
+
+def _drop_phi_edge(block: Block, pred: int) -> None:
+    for phi in block.phis():
+        idx = phi.attr.index(pred)
+        phi.args = phi.args[:idx] + phi.args[idx + 1:]
+        phi.attr = phi.attr[:idx] + phi.attr[idx + 1:]
+
+
+# === CSE ===
+def _cse_key(instr: Instr) -> Optional[Tuple[Any, ...]]:
+    if instr.op not in _CSE_OPS:
+        return None
+    args = tuple((arg.value.__class__, arg.value) if isinstance(arg, Const) else arg for arg in instr.args)
+    # `+` no conmuta: sobre arreglos es una union que prefiere el lado izquierdo.
+    if instr.op == "bin" and instr.attr in ("*", "==", "!=", "===", "!==") and len(args) == 2:
+        args = tuple(sorted(args, key=repr))
+    return instr.op, instr.attr, args
+
+
+def eliminate_common_subexpressions(func: IRFunction, report: OptimizationReport) -> bool:
+    idom = dominators(func)
+    children = dominator_tree(idom)
+    mapping: Dict[Var, Operand] = {}
+    scopes: List[Dict[Tuple[Any, ...], Var]] = []
+    removed = 0
+
+    def lookup(key: Tuple[Any, ...]) -> Optional[Var]:
+        for scope in reversed(scopes):
+            found = scope.get(key)
+            if found is not None:
+                return found
+        return None
+
+    stack: List[Tuple[int, bool]] = [(func.entry, False)]
+    while stack:
+        label, leaving = stack.pop()
+        if leaving:
+            scopes.pop()
+            continue
+        scopes.append({})
+        stack.append((label, True))
+        block = func.blocks[label]
+        kept: List[Instr] = []
+        for instr in block.instrs:
+            instr.args = [mapping.get(arg, arg) if isinstance(arg, Var) else arg for arg in instr.args]
+            key = _cse_key(instr)
+            if key is not None:
+                previous = lookup(key)
+                if previous is not None:
+                    mapping[instr.dest] = previous
+                    removed += 1
+                    continue
+                scopes[-1][key] = instr.dest
+            kept.append(instr)
+        block.instrs = kept
+        stack.extend((child, False) for child in reversed(children[label]))
+    if mapping:
+        _replace_uses(func, mapping)
+    report.add("subexpresiones comunes", removed)
+    return bool(removed)
+
+
+# === DCE ===
+def eliminate_dead_code(func: IRFunction, report: OptimizationReport) -> bool:
+    definitions: Dict[Var, Instr] = {}
+    for block in func.blocks.values():
+        for instr in block.instrs:
+            if instr.dest is not None:
+                definitions[instr.dest] = instr
+    live: Set[int] = set()
+    work: List[Instr] = []
+    for block in func.blocks.values():
+        for instr in block.instrs:
+            if _has_effects(instr):
+                live.add(id(instr))
+                work.append(instr)
+        work.append(block.term)
+    while work:
+        instr = work.pop()
+        for arg in instr.args:
+            if isinstance(arg, Var):
+                definition = definitions.get(arg)
+                if definition is not None and id(definition) not in live:
+                    live.add(id(definition))
+                    work.append(definition)
+    removed = 0
+    for block in func.blocks.values():
+        kept = [instr for instr in block.instrs if id(instr) in live]
+        removed += len(block.instrs) - len(kept)
+        block.instrs = kept
+    report.add("instrucciones muertas", removed)
+    merged = merge_blocks(func)
+    report.add("bloques fusionados", merged)
+    return bool(removed or merged)
+
+
+def merge_blocks(func: IRFunction) -> int:
+    """Une `A -> B` cuando A solo salta a B y B solo tiene a A como predecesor."""
+    remove_unreachable(func)
+    merged = 0
+    changed = True
+    while changed:
+        changed = False
+        preds = func.predecessors()
+        for label in list(func.blocks):
+            block = func.blocks.get(label)
+            if block is None or block.term.op != "jump":
+                continue
+            target = block.term.attr[0]
+            if target == label or target == func.entry or len(preds[target]) != 1:
+                continue
+            succ = func.blocks[target]
+            if any(True for _ in succ.phis()):
+                continue
+            block.instrs.extend(succ.instrs)
+            block.term = succ.term
+            del func.blocks[target]
+            for after in block.successors:
+                for phi in func.blocks[after].phis():
+                    phi.attr = tuple(label if pred == target else pred for pred in phi.attr)
+            merged += 1
+            changed = True
+            break
+    return merged
+
+
+# === INLINING ===
+def _inlinable(callee: IRFunction, nargs: int, limit: int) -> bool:
+    if callee.has_this or nargs < callee.min_args:
+        return False
+    if any(isinstance(value, rt.PhpArray) for value in callee.defaults):
+        return False
+    if callee.predecessors()[callee.entry]:
+        return False
+    size = sum(1 for instr in callee.instructions() if instr.op != "param")
+    return size <= limit
+
+
+def inline_small_functions(module: IRModule, report: OptimizationReport, limit: int = INLINE_LIMIT) -> bool:
+    snapshots = {key: _clone_function(func) for key, func in module.functions.items()}
+    sites = 0
+    for func in module.all_functions():
+        work = list(func.blocks)
+        while work:
+            label = work.pop()
+            block = func.blocks.get(label)
+            if block is None:
+                continue
+            for idx, instr in enumerate(block.instrs):
+                if instr.op != "call":
+                    continue
+                callee = snapshots.get(instr.attr)
+                if callee is None or module.functions.get(instr.attr) is func:
+                    continue
+                if not _inlinable(callee, len(instr.args), limit):
+                    continue
+                sites += 1
+                cont = _inline_call(func, block, idx, callee, f"@{sites}")
+                work.append(cont.label)
+                break
+    report.add("llamadas expandidas en linea", sites)
+    return bool(sites)
+
+
+def _clone_function(func: IRFunction) -> IRFunction:
+    clone = IRFunction(func.name, list(func.params), {}, func.entry, func.has_this, func.min_args,
+                       list(func.defaults), func.next_label)
+    for label, block in func.blocks.items():
+        clone.blocks[label] = Block(
+            label,
+            [Instr(i.op, i.dest, list(i.args), i.attr, i.lineno) for i in block.instrs],
+            Instr(block.term.op, None, list(block.term.args), block.term.attr, block.term.lineno),
+        )
+    return clone
+
+
+def _inline_call(func: IRFunction, block: Block, idx: int, callee: IRFunction, suffix: str) -> Block:
+    call = block.instrs[idx]
+    cont = func.new_block()
+    cont.instrs = block.instrs[idx + 1:]
+    cont.term = block.term
+    block.instrs = block.instrs[:idx]
+    for succ in cont.successors:
+        for phi in func.blocks[succ].phis():
+            phi.attr = tuple(cont.label if pred == block.label else pred for pred in phi.attr)
+
+    labels = {old: func.new_block().label for old in callee.blocks}
+    substitution: Dict[Var, Operand] = {}
+    for instr in callee.blocks[callee.entry].instrs:
+        if instr.op == "param":
+            position = instr.attr
+            if position < len(call.args):
+                substitution[instr.dest] = call.args[position]
+            else:
+                substitution[instr.dest] = Const(callee.defaults[position - callee.min_args])
+
+    def rename(arg: Operand) -> Operand:
+        if isinstance(arg, Var):
+            if arg in substitution:
+                return substitution[arg]
+            return Var(arg.name + suffix, arg.version)
+        return arg
+
+    returns: List[Tuple[int, Operand]] = []
+    for old, source in callee.blocks.items():
+        target = func.blocks[labels[old]]
+        for instr in source.instrs:
+            if instr.op == "param":
+                continue
+            attr = tuple(labels[pred] for pred in instr.attr) if instr.op == "phi" else instr.attr
+            dest = Var(instr.dest.name + suffix, instr.dest.version) if instr.dest is not None else None
+            target.instrs.append(Instr(instr.op, dest, [rename(arg) for arg in instr.args], attr, instr.lineno))
+        term = source.term
+        if term.op == "return":
+            returns.append((target.label, rename(term.args[0]) if term.args else Const(None)))
+            target.term = Instr("jump", None, [], (cont.label,), term.lineno)
+        else:
+            target.term = Instr(term.op, None, [rename(arg) for arg in term.args],
+                                tuple(labels[succ] for succ in term.attr), term.lineno)
+
+    block.term = Instr("jump", None, [], (labels[callee.entry],), call.lineno)
+    if len(returns) == 1:
+        cont.instrs.insert(0, Instr("copy", call.dest, [returns[0][1]], None, call.lineno))
+    else:
+        cont.instrs.insert(0, Instr("phi", call.dest, [value for _, value in returns],
+                                    tuple(label for label, _ in returns), call.lineno))
+    return cont
+
+
+# === PIPELINE ===
+def simplify(func: IRFunction, report: OptimizationReport, rounds: int = 4) -> None:
+    for _ in range(rounds):
+        changed = propagate(func, report)
+        changed |= eliminate_common_subexpressions(func, report)
+        changed |= eliminate_dead_code(func, report)
+        if not changed:
+            break
+
+
+def optimize_module(module: IRModule, inline: bool = True) -> OptimizationReport:
+    report = OptimizationReport(before=module.instruction_count())
+    for func in module.all_functions():
+        simplify(func, report)
+    if inline and inline_small_functions(module, report):
+        for func in module.all_functions():
+            simplify(func, report)
+    report.after = module.instruction_count()
+    return report
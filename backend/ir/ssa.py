@@ -0,0 +1,220 @@
+"""Construccion SSA (Cytron et al.) y analisis auxiliares sobre la IR.
+
+Dominadores con el algoritmo iterativo de Cooper, Harvey y Kennedy sobre el
+orden postorden inverso; `phi` en la frontera de dominancia iterada solo para
+nombres vivos entre bloques (SSA semi-podada) y renombrado recorriendo el
+arbol de dominadores. Una variable leida antes de asignarse toma `null`, como
+en PHP.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from .ir import Const, Instr, IRFunction, Operand, Var
+
+NULL = Const(None)
+
+
+# === ORDEN Y DOMINADORES ===
+def reverse_postorder(func: IRFunction) -> List[int]:
+    seen: Set[int] = set()
+    order: List[int] = []
+    stack = [(func.entry, iter(func.blocks[func.entry].successors))]
+    seen.add(func.entry)
+    while stack:
+        label, succs = stack[-1]
+        for succ in succs:
+            if succ not in seen:
+                seen.add(succ)
+                stack.append((succ, iter(func.blocks[succ].successors)))
+                break
+        else:
+            order.append(label)
+            stack.pop()
+    order.reverse()
+    return order
+
+
+def remove_unreachable(func: IRFunction) -> bool:
+    """Elimina bloques inalcanzables y sus entradas en las `phi`."""
+    reachable = set(reverse_postorder(func))
+    dead = [label for label in func.blocks if label not in reachable]
+    if not dead:
+        return False
+    for label in dead:
+        del func.blocks[label]
+    for block in func.blocks.values():
+        for phi in block.phis():
+            keep = [idx for idx, pred in enumerate(phi.attr) if pred in reachable]
+            phi.args = [phi.args[idx] for idx in keep]
+            phi.attr = tuple(phi.attr[idx] for idx in keep)
+    return True
+
+
+def dominators(func: IRFunction, order: Optional[List[int]] = None) -> Dict[int, int]:
+    """Dominador inmediato de cada bloque alcanzable (la entrada se domina a si misma)."""
+    order = order or reverse_postorder(func)
+    index = {label: idx for idx, label in enumerate(order)}
+    preds = func.predecessors()
+    idom: Dict[int, int] = {func.entry: func.entry}
+
+    def intersect(a: int, b: int) -> int:
+        while a != b:
+            while index[a] > index[b]:
+                a = idom[a]
+            while index[b] > index[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for label in order[1:]:
+            candidates = [p for p in preds[label] if p in idom]
+            new = candidates[0]
+            for pred in candidates[1:]:
+                new = intersect(pred, new)
+            if idom.get(label) != new:
+                idom[label] = new
+                changed = True
+    return idom
+
+
+def dominator_tree(idom: Dict[int, int]) -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {label: [] for label in idom}
+    for label, parent in idom.items():
+        if label != parent:
+            children[parent].append(label)
+    return children
+
+
+def dominance_frontiers(func: IRFunction, idom: Dict[int, int]) -> Dict[int, Set[int]]:
+    frontier: Dict[int, Set[int]] = {label: set() for label in idom}
+    for label, preds in func.predecessors().items():
+        preds = [p for p in preds if p in idom]
+        if label not in idom or len(preds) < 2:
+            continue
+        for pred in preds:
+            runner = pred
+            while runner != idom[label]:
+                frontier[runner].add(label)
+                runner = idom[runner]
+    return frontier
+
+
+# === CONSTRUCCION ===
+def _uses(instr: Instr) -> Iterable[Var]:
+    return (arg for arg in instr.args if isinstance(arg, Var))
+
+
+def to_ssa(func: IRFunction) -> None:
+    """Convierte `func` a SSA en sitio."""
+    remove_unreachable(func)
+    order = reverse_postorder(func)
+    idom = dominators(func, order)
+    frontier = dominance_frontiers(func, idom)
+
+    # Nombres globales: leidos en un bloque antes de asignarse en el.
+    global_names: Set[str] = set()
+    def_blocks: Dict[str, Set[int]] = {}
+    for block in func.blocks.values():
+        defined: Set[str] = set()
+        for instr in [*block.instrs, block.term]:
+            for var in _uses(instr):
+                if var.name not in defined:
+                    global_names.add(var.name)
+            if instr.dest is not None:
+                defined.add(instr.dest.name)
+                def_blocks.setdefault(instr.dest.name, set()).add(block.label)
+
+    preds = func.predecessors()
+    for name in global_names:
+        work = list(def_blocks.get(name, ()))
+        placed: Set[int] = set()
+        while work:
+            label = work.pop()
+            for target in frontier.get(label, ()):
+                if target in placed:
+                    continue
+                placed.add(target)
+                block = func.blocks[target]
+                incoming = tuple(preds[target])
+                block.instrs.insert(0, Instr("phi", Var(name), [Var(name)] * len(incoming), incoming))
+                if target not in def_blocks.get(name, ()):
+                    work.append(target)
+
+    counters: Dict[str, int] = {}
+    stacks: Dict[str, List[Operand]] = {}
+    children = dominator_tree(idom)
+
+    def current(var: Var) -> Operand:
+        stack = stacks.get(var.name)
+        return stack[-1] if stack else NULL
+
+    def fresh(var: Var) -> Var:
+        counters[var.name] = counters.get(var.name, 0) + 1
+        new = Var(var.name, counters[var.name])
+        stacks.setdefault(var.name, []).append(new)
+        return new
+
+    def rename(label: int) -> None:
+        block = func.blocks[label]
+        pushed: List[str] = []
+        for instr in block.instrs:
+            if instr.op != "phi":
+                instr.args = [current(arg) if isinstance(arg, Var) else arg for arg in instr.args]
+            if instr.dest is not None:
+                instr.dest = fresh(instr.dest)
+                pushed.append(instr.dest.name)
+        term = block.term
+        term.args = [current(arg) if isinstance(arg, Var) else arg for arg in term.args]
+        for succ in block.successors:
+            for phi in func.blocks[succ].phis():
+                for idx, pred in enumerate(phi.attr):
+                    if pred == label and isinstance(phi.args[idx], Var) and phi.args[idx].version == 0:
+                        phi.args[idx] = current(phi.args[idx])
+        for child in children[label]:
+            rename(child)
+        for name in pushed:
+            stacks[name].pop()
+
+    rename(func.entry)
+
+
+# === VIVACIDAD ===
+def liveness(func: IRFunction) -> Dict[int, Set[Var]]:
+    """Variables vivas a la entrada de cada bloque (sin contar las `phi` del propio bloque).
+
+    Los argumentos de una `phi` se consideran usados al final del predecesor
+    correspondiente, por lo que forman parte de su `live_out`.
+    """
+    live_in: Dict[int, Set[Var]] = {label: set() for label in func.blocks}
+    order = reverse_postorder(func)
+    changed = True
+    while changed:
+        changed = False
+        for label in reversed(order):
+            live = live_out(func, label, live_in)
+            block = func.blocks[label]
+            for instr in reversed([*block.instrs, block.term]):
+                if instr.op == "phi":
+                    live.discard(instr.dest)
+                    continue
+                if instr.dest is not None:
+                    live.discard(instr.dest)
+                live.update(_uses(instr))
+            if live != live_in[label]:
+                live_in[label] = live
+                changed = True
+    return live_in
+
+
+def live_out(func: IRFunction, label: int, live_in: Dict[int, Set[Var]]) -> Set[Var]:
+    live: Set[Var] = set()
+    for succ in func.blocks[label].successors:
+        live |= live_in[succ]
+        for phi in func.blocks[succ].phis():
+            for pred, arg in zip(phi.attr, phi.args):
+                if pred == label and isinstance(arg, Var):
+                    live.add(arg)
+    return live
@@ -0,0 +1,72 @@
+"""Trabajos de analisis en segundo plano, cancelables y con el mas nuevo ganando.
+
+La GUI puede pedir `analyze` varias veces seguidas (o editar mientras un
+analisis corre). Cada trabajo se registra con `(grupo, tipo)` (documento y
+etapas pedidas): uno nuevo del mismo tipo marca como cancelado al anterior, y
+una edicion cancela todos los del documento. La cancelacion es cooperativa: el
+trabajo llama `CancelToken.check()` entre etapas y dentro de los recorridos
+del AST, y termina con `Cancelled` en el siguiente punto de control (ambos en
+`cancel.py`, que el analisis semantico usa sin depender del pool de hilos).
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .cancel import Cancelled, CancelToken
+
+__all__ = ["Cancelled", "CancelToken", "JobManager"]
+
+
+class JobManager:
+    """Ejecuta trabajos en un pool de hilos; por `(grupo, tipo)` solo vale el ultimo.
+
+    Con un solo hilo (por defecto) los trabajos no corren en paralelo, asi que
+    pueden compartir el motor de lint y los trabajos reemplazados mientras
+    esperan en la cola se descartan sin empezar.
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._tokens: Dict[Tuple[Hashable, Hashable], CancelToken] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, group: Hashable, kind: Hashable, fn: Callable[[CancelToken], Any]) -> Future:
+        """Encola `fn(token)` y cancela el trabajo anterior del mismo `(group, kind)`."""
+        key = (group, kind)
+        token = CancelToken()
+        with self._lock:
+            previous = self._tokens.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._tokens[key] = token
+
+        def job() -> Any:
+            try:
+                token.check()
+                return fn(token)
+            finally:
+                with self._lock:
+                    if self._tokens.get(key) is token:
+                        del self._tokens[key]
+
+        return self._pool.submit(job)
+
+    def run(self, group: Hashable, kind: Hashable, fn: Callable[[CancelToken], Any]) -> Any:
+        """Como `submit` pero espera el resultado; lanza `Cancelled` si fue reemplazado."""
+        return self.submit(group, kind, fn).result()
+
+    def cancel(self, group: Hashable) -> int:
+        """Cancela todos los trabajos pendientes o en curso de `group`."""
+        with self._lock:
+            tokens = [token for (owner, _), token in self._tokens.items() if owner == group]
+        for token in tokens:
+            token.cancel()
+        return len(tokens)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for token in self._tokens.values():
+                token.cancel()
+        self._pool.shutdown(wait=True)
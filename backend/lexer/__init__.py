@@ -1,6 +1,7 @@
 """Puerta de entrada del paquete lexer."""
 
 from .core import LexerConfig, PhpLexer  # re-export principales
+from .incremental import IncrementalLexer, LexChange
 
 
 def demo(code: str) -> None:
@@ -113,6 +113,16 @@ class PhpLexer:
             return original_input(data, *args, **kwargs)
 
         self.lexer.input = _input_with_reset  # type: ignore[assignment]
+        original_token = self.lexer.token
+
+        def _token_with_end():
+            # `endlexpos` (fin exclusivo del token) lo propaga el parser a los rangos de los nodos.
+            tok = original_token()
+            if tok is not None:
+                tok.endlexpos = self.lexer.lexpos
+            return tok
+
+        self.lexer.token = _token_with_end  # type: ignore[assignment]
 
     def reset_errors(self) -> None:
         self.error_count = 0
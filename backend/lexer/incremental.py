@@ -0,0 +1,303 @@
+"""Relexeo incremental: aplica ediciones de texto sobre el flujo de tokens previo.
+
+El lexer no tiene estados: lo que produce a partir de una posicion donde
+termina un token depende solo del texto que sigue y del numero de linea. Por
+eso, ante una edicion basta con volver a tokenizar desde el final del ultimo
+token que no pudo ver el cambio hasta que un token nuevo empiece exactamente
+donde empezaba uno viejo (ya desplazado); desde ahi el resto es identico y se
+reutiliza moviendo posiciones y lineas.
+
+Un token "vio" el texto hasta `LOOKAHEAD` caracteres despues de su final (por
+ejemplo `<` frente a `<?php`). Las unicas lecturas sin limite son los intentos
+fallidos de comentario `/*` sin cerrar (que se tokeniza como `/` `*`) y de
+strings sin cerrar (error en la comilla); esas posiciones se guardan como
+"abiertas" y obligan a relexear desde antes de ellas.
+
+Los tokens se guardan en bloques con posiciones relativas al inicio del bloque,
+asi que desplazar la cola tras una edicion no toca cada token: solo cambian el
+largo y las lineas del bloque editado.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from operator import itemgetter
+from typing import Any, Iterator, List, Optional, Tuple
+
+import ply.lex as lex
+
+from .core import LexerConfig, PhpLexer
+
+BLOCK_SIZE = 256
+LOOKAHEAD = 4
+_OPEN_ENDED = frozenset("\"'$")
+
+# (tipo, valor, inicio, fin, linea); (posicion, linea, antes, despues, abierto)
+Token = Tuple[str, Any, int, int, int]
+LexIssue = Tuple[int, int, str, Optional[str], bool]
+
+_END = itemgetter(3)
+
+
+@dataclass(frozen=True)
+class LexChange:
+    """Efecto de una edicion: los tokens `[start, start + removed)` pasan a ser `added`.
+
+    `relexed_from`/`relexed_to` delimitan (en el texto nuevo) lo que se volvio a
+    tokenizar; `resynced` es falso si hubo que llegar hasta el final del texto.
+    `lines` es cuanto se movieron las lineas de los tokens reutilizados.
+    """
+
+    start: int
+    removed: int
+    added: int
+    relexed_from: int
+    relexed_to: int
+    resynced: bool
+    lines: int = 0
+
+
+class _Block:
+    __slots__ = ("tokens", "issues", "sites")
+
+    def __init__(self) -> None:
+        self.tokens: List[Token] = []
+        self.issues: List[LexIssue] = []
+        self.sites: List[int] = []
+
+
+class IncrementalLexer:
+    """Mantiene los tokens de un texto y los actualiza con `edit(offset, borrados, insertado)`."""
+
+    def __init__(self, text: str = "", config: LexerConfig | None = None) -> None:
+        self._issues: List[LexIssue] = []
+        self._lexer = PhpLexer(config=config or LexerConfig(), reporter=self._record)
+        self.text = ""
+        self.reset(text)
+
+    # === LEXEO ===
+    def _record(self, level: str, message: str) -> None:
+        lexer = self._lexer.lexer
+        pos, line = lexer.lexpos, lexer.lineno
+        before, found, after = message.partition(f"linea {line}")
+        open_ended = lexer.lexdata[pos:pos + 1] in _OPEN_ENDED
+        self._issues.append((pos, line, before, after if found else None, open_ended))
+
+    def _scan(self, text: str, pos: int, line: int) -> Iterator[Token]:
+        lexer = self._lexer.lexer
+        lexer.input(text)
+        lexer.lexpos = pos
+        lexer.lineno = line
+        while True:
+            tok = lexer.token()
+            if tok is None:
+                return
+            yield (tok.type, tok.value, tok.lexpos, lexer.lexpos, tok.lineno)
+
+    def reset(self, text: str) -> None:
+        """Tokeniza `text` completo y descarta el estado anterior."""
+        self._issues = []
+        tokens = list(self._scan(text, 0, 1))
+        self.text = text
+        self._blocks: List[_Block] = []
+        self._spans: List[int] = []
+        self._lines: List[int] = []
+        self._counts: List[int] = []
+        self._open_sites = 0
+        self._replace(0, 0, tokens, self._issues, 0, 1, len(text), 1, None)
+
+    # === BLOQUES ===
+    def _replace(self, first: int, last: int, tokens: List[Token], issues: List[LexIssue],
+                 start: int, line: int, end: int, end_line: int, following: Optional[Token]) -> None:
+        """Reemplaza los bloques `[first, last)` por bloques nuevos con `tokens` absolutos."""
+        count = max(1, -(-len(tokens) // BLOCK_SIZE))
+        size = -(-len(tokens) // count) if tokens else 1
+        groups = [tokens[idx:idx + size] for idx in range(0, max(len(tokens), 1), size)]
+        starts = [start] + [group[0][2] for group in groups[1:]]
+        bases = [line] + [group[0][4] for group in groups[1:]]
+        blocks = []
+        for group, base, origin in zip(groups, bases, starts):
+            block = _Block()
+            block.tokens = [(kind, value, lo - origin, hi - origin, ln - base) for kind, value, lo, hi, ln in group]
+            blocks.append(block)
+
+        # Una posicion pertenece al ultimo bloque que empieza antes que ella.
+        def owner(pos: int) -> int:
+            return max(bisect_left(starts, pos) - 1, 0)
+
+        for pos, ln, before, after, open_ended in issues:
+            idx = owner(pos)
+            blocks[idx].issues.append((pos - starts[idx], ln - bases[idx], before, after, open_ended))
+            if open_ended:
+                blocks[idx].sites.append(pos - starts[idx])
+        for prev, nxt in zip(tokens, tokens[1:] + ([following] if following else [])):
+            # `/*` sin cerrar: `/` seguido de `*` pegado.
+            if prev[0] == "DIVIDE" and nxt[0] == "TIMES" and prev[3] == nxt[2]:
+                idx = owner(prev[2] + 1)
+                blocks[idx].sites.append(prev[2] - starts[idx])
+        for block in blocks:
+            block.sites.sort()
+
+        self._open_sites -= sum(len(block.sites) for block in self._blocks[first:last])
+        self._blocks[first:last] = blocks
+        self._spans[first:last] = [b - a for a, b in zip(starts, starts[1:] + [end])]
+        self._lines[first:last] = [b - a for a, b in zip(bases, bases[1:] + [end_line])]
+        self._counts[first:last] = [len(block.tokens) for block in blocks]
+        self._open_sites += sum(len(block.sites) for block in blocks)
+
+    def _block_starts(self) -> Tuple[List[int], List[int]]:
+        return list(accumulate(self._spans, initial=0)), list(accumulate(self._lines, initial=1))
+
+    def _absolute(self, idx: int, starts: List[int], bases: List[int]) -> List[Token]:
+        origin, base = starts[idx], bases[idx]
+        return [(kind, value, lo + origin, hi + origin, ln + base)
+                for kind, value, lo, hi, ln in self._blocks[idx].tokens]
+
+    def _first_site(self, starts: List[int]) -> Optional[int]:
+        if not self._open_sites:
+            return None
+        for idx, block in enumerate(self._blocks):
+            if block.sites:
+                return starts[idx] + block.sites[0]
+        return None
+
+    # === EDICION ===
+    def edit(self, offset: int, deleted: int, inserted: str) -> LexChange:
+        """Reemplaza `deleted` caracteres desde `offset` por `inserted` y relexea lo necesario."""
+        old_end = offset + deleted
+        if offset < 0 or deleted < 0 or old_end > len(self.text):
+            raise ValueError(f"edicion fuera del texto: {offset}+{deleted} (largo {len(self.text)})")
+        text = self.text[:offset] + inserted + self.text[old_end:]
+        delta = len(inserted) - deleted
+        starts, bases = self._block_starts()
+        blocks = self._blocks
+
+        # Punto de reinicio: ultimo token cuyo final (mas la anticipacion) no alcanza la edicion.
+        limit = offset - LOOKAHEAD
+        site = self._first_site(starts)
+        if site is not None:
+            limit = min(limit, site)
+        first = min(max(bisect_right(starts, limit) - 1, 0), len(blocks) - 1)
+        keep = bisect_right(blocks[first].tokens, limit - starts[first], key=_END)
+        while not keep and first > 0 and limit >= 0:
+            first -= 1
+            keep = len(blocks[first].tokens)
+        if limit < 0:
+            first, keep = 0, 0
+        head = self._absolute(first, starts, bases)[:keep]
+        restart, line = (head[-1][3], head[-1][4]) if head else (0, 1)
+
+        # Relexeo hasta que un token nuevo caiga sobre el inicio de uno viejo.
+        self._issues = []
+        new_tokens: List[Token] = []
+        fresh_edge = offset + len(inserted)
+        old_tokens = self._iter_from(first, keep, starts, bases)
+        candidate = next(old_tokens, None)
+        sync: Optional[Tuple[int, int, Token]] = None
+        for tok in self._scan(text, restart, line):
+            if tok[2] >= fresh_edge:
+                target = tok[2] - delta
+                while candidate is not None and (candidate[2][2] < target or candidate[2][2] < old_end):
+                    candidate = next(old_tokens, None)
+                if candidate is not None and candidate[2][2] == target:
+                    sync, shift_line = candidate, tok[4] - candidate[2][4]
+                    break
+            new_tokens.append(tok)
+        issues = self._issues
+
+        tail: List[Token] = []
+        if sync is None:
+            last, tail_at, shift_line = len(blocks) - 1, len(blocks[-1].tokens), 0
+        else:
+            last, tail_at, (_, _, sync_old, _, _) = sync
+            tail = [(kind, value, lo + delta, hi + delta, ln + shift_line)
+                    for kind, value, lo, hi, ln in self._absolute(last, starts, bases)[tail_at:]]
+            origin, base = starts[last], bases[last]
+            issues = issues + [
+                (pos + origin + delta, ln + base + shift_line, before, after, open_ended)
+                for pos, ln, before, after, open_ended in blocks[last].issues
+                if pos + origin > sync_old
+            ]
+        origin, base = starts[first], bases[first]
+        head_issues = [
+            (pos + origin, ln + base, before, after, open_ended)
+            for pos, ln, before, after, open_ended in blocks[first].issues
+            if pos + origin < restart
+        ]
+        following = None
+        if last + 1 < len(blocks) and blocks[last + 1].tokens:
+            following = self._absolute(last + 1, starts, bases)[0]
+        end = starts[last + 1] + delta if last + 1 < len(blocks) else len(text)
+        end_line = bases[last + 1] + shift_line if last + 1 < len(blocks) else 1
+
+        removed = sum(self._counts[first:last]) + tail_at - keep
+        index = sum(self._counts[:first]) + keep
+        self.text = text
+        self._replace(first, last + 1, head + new_tokens + tail, head_issues + issues,
+                      starts[first], bases[first], end, end_line, following)
+        relexed_to = tail[0][2] if tail else len(text)
+        return LexChange(index, removed, len(new_tokens), restart, relexed_to, sync is not None, shift_line)
+
+    def _iter_from(self, idx: int, pos: int, starts: List[int], bases: List[int]) -> Iterator[Tuple[int, int, Token]]:
+        """Tokens viejos (absolutos) desde el bloque `idx`, indice `pos`, con su ubicacion."""
+        for block_idx in range(idx, len(self._blocks)):
+            block = self._blocks[block_idx]
+            origin, base = starts[block_idx], bases[block_idx]
+            for tok_idx in range(pos if block_idx == idx else 0, len(block.tokens)):
+                kind, value, lo, hi, ln = block.tokens[tok_idx]
+                yield block_idx, tok_idx, (kind, value, lo + origin, hi + origin, ln + base)
+
+    # === CONSULTA ===
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def spans(self, start: int = 0) -> Iterator[Token]:
+        """Tokens desde el indice `start` como tuplas `(tipo, valor, inicio, fin, linea)` absolutas."""
+        starts, bases = self._block_starts()
+        counts = list(accumulate(self._counts, initial=0))
+        first = max(bisect_right(counts, start) - 1, 0)
+        skip = start - counts[first]
+        for idx in range(first, len(self._blocks)):
+            yield from self._absolute(idx, starts, bases)[skip:]
+            skip = 0
+
+    def spans_between(self, start: int, end: int) -> Iterator[Token]:
+        """Tokens absolutos que se solapan con el rango de texto `[start, end)`."""
+        starts, bases = self._block_starts()
+        # Los tokens de bloques anteriores terminan antes de que empiece el bloque de `start`.
+        first = max(bisect_right(starts, start) - 1, 0)
+        for idx in range(first, len(self._blocks)):
+            if starts[idx] >= end and idx > first:
+                return
+            for span in self._absolute(idx, starts, bases):
+                if span[2] >= end:
+                    return
+                if span[3] > start:
+                    yield span
+
+    def tokens(self) -> Iterator[lex.LexToken]:
+        """Tokens como `LexToken`, iguales a los de `PhpLexer.tokenize(self.text)`."""
+        for kind, value, start, end, line in self.spans():
+            tok = lex.LexToken()
+            tok.type, tok.value, tok.lineno, tok.lexpos, tok.endlexpos = kind, value, line, start, end
+            yield tok
+
+    @property
+    def errors(self) -> List[str]:
+        """Mensajes de error lexico con la linea vigente."""
+        return [message for _, message in self.located_errors]
+
+    @property
+    def located_errors(self) -> List[Tuple[int, str]]:
+        """`(linea, mensaje)` de cada error lexico, en el orden de `errors`."""
+        _, bases = self._block_starts()
+        return [
+            (ln + bases[idx], before if after is None else f"{before}linea {ln + bases[idx]}{after}")
+            for idx, block in enumerate(self._blocks)
+            for _, ln, before, after, _ in block.issues
+        ]
+
+    @property
+    def error_count(self) -> int:
+        return sum(len(block.issues) for block in self._blocks)
@@ -0,0 +1,423 @@
+"""Metricas de codigo por archivo y por funcion sobre columnas de tokens y nodos.
+
+Cada archivo se lexea y parsea una vez (`collect_columns`) y deja arreglos
+compactos de `array`, sin objetos por token:
+
+- tokens: tipo (un byte, `corpus.KIND_IDS`), linea, id del valor si es operando
+  y funcion que lo contiene (asignada por los rangos `start`/`end` de cada
+  `FunctionDecl`);
+- nodos: tipo (`NODE_KINDS`; `&&`/`||` y cada `elseif` como tipos propios),
+  nivel de anidamiento de control y funcion.
+
+Los tokens se anotan mientras el parser los pide (se envuelve `lexer.token`,
+igual que `PhpLexer` agrega `endlexpos`) y los nodos en un recorrido del AST
+terminado. Las columnas de todo el corpus se concatenan y las metricas salen de
+operaciones por lote sobre ellas (conteos por grupo, maximos por grupo, valores
+distintos por grupo): con numpy si esta instalado y, si no, con `array` y
+bucles simples; el resultado es el mismo.
+
+Metricas de cada archivo y de cada funcion o metodo (`Clase::metodo`):
+
+- `loc` (lineas fisicas) y `sloc` (lineas con algun token);
+- tokens, operadores y operandos de Halstead (operandos: variables, nombres,
+  literales, `true`/`false`/`null`; los cierres `)`, `]` y `}` no cuentan) y
+  sus derivados (`volume`, `difficulty`, `effort`);
+- complejidad ciclomatica: 1 + `if`, `elseif`, `while`, `for`, `foreach`,
+  ternarios, `&&` y `||`;
+- `max_nesting`: if/while/for/foreach anidados (se reinicia en cada funcion).
+
+Las tablas son columnas (`{columna: [valores]}`) y se escriben como CSV o como
+JSON en columnas (`write_table`).
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import ast_nodes as ast
+from .corpus import KIND_IDS, KIND_NAMES, default_workers, parallel_map, php_files
+from .lexer import PhpLexer
+from .parser import build_parser
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional
+    np = None
+
+Table = Dict[str, List[Any]]
+
+NODE_KINDS = (
+    "",
+    *(name for name, value in vars(ast).items() if isinstance(value, type) and hasattr(value, "__dataclass_fields__")),
+    "ElseIf",
+    "Binary:&&",
+    "Binary:||",
+)
+NODE_IDS = {name: idx for idx, name in enumerate(NODE_KINDS)}
+CONTROL = ("IfStmt", "WhileStmt", "ForStmt", "ForeachStmt")
+DECISIONS = CONTROL + ("ElseIf", "Ternary", "Binary:&&", "Binary:||")
+
+OPERANDS = ("VARIABLE", "ID", "NUMBER", "STRING", "TRUE", "FALSE", "NULL")
+_UNCOUNTED = ("PHP_OPEN", "PHP_CLOSE")
+_CLOSERS = ("RPAREN", "RBRACKET", "RBRACE")
+
+FILE_COLUMNS = (
+    "path", "loc", "sloc", "tokens", "functions", "complexity", "max_nesting",
+    "operators", "operands", "distinct_operators", "distinct_operands", "volume", "difficulty", "effort",
+    "lexical_errors", "syntax_errors",
+)
+FUNCTION_COLUMNS = (
+    "path", "name", "start_line", "end_line", "loc", "sloc", "tokens", "complexity", "max_nesting",
+    "operators", "operands", "distinct_operators", "distinct_operands", "volume", "difficulty", "effort",
+)
+
+
+def _lookup(names: Sequence[str], wanted: Iterable[str]) -> List[bool]:
+    """Tabla id -> pertenece a `wanted`, indexable con los bytes de tipo."""
+    wanted = set(wanted)
+    return [name in wanted for name in names] + [False] * (256 - len(names))
+
+
+_IS_OPERAND = _lookup(KIND_NAMES, OPERANDS)
+_IS_OPERATOR = _lookup(KIND_NAMES, set(KIND_NAMES[1:]) - set(OPERANDS + _UNCOUNTED + _CLOSERS))
+_IS_DECISION = _lookup(NODE_KINDS, DECISIONS)
+
+
+@dataclass
+class FileColumns:
+    path: str
+    loc: int = 0
+    lexical_errors: int = 0
+    syntax_errors: int = 0
+    token_kinds: array = field(default_factory=lambda: array("B"))
+    token_lines: array = field(default_factory=lambda: array("I"))
+    # Id del valor (por archivo) de los operandos; 0 en los operadores.
+    token_operands: array = field(default_factory=lambda: array("I"))
+    # Funcion que contiene al token (1..n en `functions`); 0 fuera de funciones.
+    token_functions: array = field(default_factory=lambda: array("I"))
+    node_kinds: array = field(default_factory=lambda: array("B"))
+    node_levels: array = field(default_factory=lambda: array("H"))
+    node_functions: array = field(default_factory=lambda: array("I"))
+    functions: List[Tuple[str, int, int]] = field(default_factory=list)  # (nombre, linea inicial, final)
+    error: Optional[str] = None
+
+
+_parser = None
+
+
+def _quiet(level: str, message: str) -> None:
+    pass
+
+
+def collect_columns(code: str, path: str = "") -> FileColumns:
+    """Columnas de tokens y nodos de `code` con un solo lexeo y parseo."""
+    global _parser
+    if _parser is None:
+        _parser = build_parser(reporter=_quiet)  # construir las tablas LALR cuesta mas que parsear
+    columns = FileColumns(path, loc=code.count("\n") + 1 if code else 0)
+    lexer = PhpLexer(reporter=_quiet)
+    starts = array("I")
+    operands: Dict[Tuple[str, Any], int] = {}
+    next_token = lexer.lexer.token
+
+    def _recording_token():
+        tok = next_token()
+        if tok is not None and tok.type not in _UNCOUNTED:
+            columns.token_kinds.append(KIND_IDS.get(tok.type, 0))
+            columns.token_lines.append(tok.lineno)
+            starts.append(tok.lexpos)
+            operand = 0
+            if tok.type in OPERANDS:
+                operand = operands.setdefault((tok.type, tok.value), len(operands) + 1)
+            columns.token_operands.append(operand)
+        return tok
+
+    lexer.lexer.token = _recording_token  # type: ignore[assignment]
+    program = _parser.parse(code, lexer=lexer.lexer)
+    while lexer.lexer.token() is not None:
+        pass  # tras un error el parser puede no pedir el resto
+    columns.lexical_errors = lexer.error_count
+    columns.syntax_errors = _parser.error_count
+    columns.token_functions = array("I", bytes(4 * len(starts)))
+    if program is not None:
+        _record_nodes(program, columns, starts)
+    return columns
+
+
+def _record_nodes(program: Any, columns: FileColumns, starts: array) -> None:
+    lines = columns.token_lines
+    stack: List[Tuple[Any, int, int, Optional[str]]] = [(program, 0, 0, None)]
+    while stack:
+        node, level, function, klass = stack.pop()
+        kind = type(node).__name__
+        if isinstance(node, ast.Binary) and node.op in ("&&", "||"):
+            kind = f"Binary:{node.op}"
+        if isinstance(node, ast.FunctionDecl) and getattr(node, "start", None) is not None:
+            first = bisect_left(starts, node.start)
+            last = bisect_left(starts, node.end)
+            name = f"{klass}::{node.name}" if klass else node.name
+            start_line = lines[first] if first < len(lines) else node.lineno
+            columns.functions.append((name, start_line, lines[last - 1] if last > first else start_line))
+            function = len(columns.functions)
+            level = 0
+            # Las funciones se visitan en orden de texto: las anidadas pisan a la que las contiene.
+            columns.token_functions[first:last] = array("I", [function]) * (last - first)
+        elif isinstance(node, ast.ClassDecl):
+            klass = node.name
+        elif kind in CONTROL:
+            level += 1
+        columns.node_kinds.append(NODE_IDS.get(kind, 0))
+        columns.node_levels.append(level)
+        columns.node_functions.append(function)
+        if isinstance(node, ast.IfStmt):
+            for _ in node.elifs:
+                columns.node_kinds.append(NODE_IDS["ElseIf"])
+                columns.node_levels.append(level)
+                columns.node_functions.append(function)
+        children = list(ast.iter_child_nodes(node))
+        stack.extend((child, level, function, klass) for child in reversed(children))
+
+
+def collect_file(path: str) -> FileColumns:
+    """Columnas de un archivo; corre en los procesos de trabajo."""
+    try:
+        code = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        return FileColumns(path, error=str(exc))
+    return collect_columns(code, path)
+
+
+# --- operaciones por lote ---
+class _ArrayOps:
+    """Operaciones por grupo sobre `array` con bucles de Python (sin numpy)."""
+
+    name = "array"
+
+    def wrap(self, values: array) -> Any:
+        return values
+
+    def offset(self, local: array, bases: array) -> Any:
+        """`local + base` donde `local` no es 0 (ids de funcion del corpus)."""
+        return array("I", (value + base if value else 0 for value, base in zip(local, bases)))
+
+    def select(self, values: Any, keys: Any, wanted: Sequence[bool]) -> Any:
+        return array(values.typecode, (value for value, key in zip(values, keys) if wanted[key]))
+
+    def pairs(self, ids: Any, values: Any, width: int) -> Any:
+        """Clave `id * width + valor` de cada elemento."""
+        return array("Q", (idx * width + value for idx, value in zip(ids, values)))
+
+    def bincount(self, ids: Any, size: int) -> List[int]:
+        counts = [0] * size
+        for idx in ids:
+            counts[idx] += 1
+        return counts
+
+    def group_max(self, ids: Any, values: Any, size: int) -> List[int]:
+        out = [0] * size
+        for idx, value in zip(ids, values):
+            if value > out[idx]:
+                out[idx] = value
+        return out
+
+    def count_distinct(self, ids: Any, values: Any, size: int) -> List[int]:
+        counts = [0] * size
+        for idx, _ in set(zip(ids, values)):
+            counts[idx] += 1
+        return counts
+
+
+class _NumpyOps:
+    """Las mismas operaciones con numpy (`bincount`, `maximum.at`, `unique`)."""
+
+    name = "numpy"
+
+    def wrap(self, values: array) -> Any:
+        return np.frombuffer(values, dtype=np.dtype(values.typecode)) if len(values) else np.zeros(0, values.typecode)
+
+    def offset(self, local: array, bases: array) -> Any:
+        local, bases = self.wrap(local), self.wrap(bases)
+        return np.where(local > 0, local + bases, 0)
+
+    def select(self, values: Any, keys: Any, wanted: Sequence[bool]) -> Any:
+        return values[np.asarray(wanted, dtype=bool)[keys]]
+
+    def pairs(self, ids: Any, values: Any, width: int) -> Any:
+        return ids.astype(np.int64) * width + values
+
+    def bincount(self, ids: Any, size: int) -> List[int]:
+        return np.bincount(ids, minlength=size).tolist() if len(ids) else [0] * size
+
+    def group_max(self, ids: Any, values: Any, size: int) -> List[int]:
+        out = np.zeros(size, dtype=np.int64)
+        np.maximum.at(out, ids, values)
+        return out.tolist()
+
+    def count_distinct(self, ids: Any, values: Any, size: int) -> List[int]:
+        if not len(ids):
+            return [0] * size
+        base = int(values.max()) + 1
+        keys = np.unique(self.pairs(ids, values, base))
+        return np.bincount(keys // base, minlength=size).tolist()
+
+
+def batch_ops(use_numpy: Optional[bool] = None) -> Any:
+    """Operaciones con numpy si esta instalado (o si `use_numpy`), si no con `array`."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ValueError("numpy no esta instalado")
+    return _NumpyOps() if use_numpy else _ArrayOps()
+
+
+# --- agregados ---
+def _halstead(operators: int, operands: int, distinct_operators: int, distinct_operands: int) -> Tuple[float, ...]:
+    """(volumen, dificultad, esfuerzo) de Halstead."""
+    vocabulary = distinct_operators + distinct_operands
+    volume = (operators + operands) * math.log2(vocabulary) if vocabulary > 1 else 0.0
+    difficulty = distinct_operators / 2 * operands / distinct_operands if distinct_operands else 0.0
+    return round(volume, 2), round(difficulty, 2), round(volume * difficulty, 2)
+
+
+def _measures(ops: Any, tokens: Dict[str, Any], nodes: Dict[str, Any], size: int) -> Table:
+    groups, kinds = tokens["groups"], tokens["kinds"]
+    operator_groups = ops.select(groups, kinds, _IS_OPERATOR)
+    operand_groups = ops.select(groups, kinds, _IS_OPERAND)
+    decisions = ops.bincount(ops.select(nodes["groups"], nodes["kinds"], _IS_DECISION), size)
+    out: Table = {
+        "tokens": ops.bincount(groups, size),
+        "sloc": ops.count_distinct(groups, tokens["lines"], size),
+        "operators": ops.bincount(operator_groups, size),
+        "operands": ops.bincount(operand_groups, size),
+        "distinct_operators": ops.count_distinct(operator_groups, ops.select(kinds, kinds, _IS_OPERATOR), size),
+        "distinct_operands": ops.count_distinct(
+            operand_groups, ops.select(tokens["operands"], kinds, _IS_OPERAND), size
+        ),
+        "complexity": [count + 1 for count in decisions],
+        "max_nesting": ops.group_max(nodes["groups"], nodes["levels"], size),
+    }
+    derived = [
+        _halstead(*row)
+        for row in zip(out["operators"], out["operands"], out["distinct_operators"], out["distinct_operands"])
+    ]
+    for idx, name in enumerate(("volume", "difficulty", "effort")):
+        out[name] = [row[idx] for row in derived]
+    return out
+
+
+@dataclass
+class MetricsReport:
+    files: Table
+    functions: Table
+    token_kinds: Table
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    backend: str = "array"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "functions": self.functions,
+            "token_kinds": self.token_kinds,
+            "errors": self.errors,
+            "backend": self.backend,
+        }
+
+
+def aggregate(items: Sequence[FileColumns], ops: Any = None) -> MetricsReport:
+    """Metricas de archivos y funciones a partir de las columnas de cada archivo."""
+    ops = ops or batch_ops()
+    kinds, lines, operands = array("B"), array("I"), array("I")
+    files, local, bases = array("I"), array("I"), array("I")
+    node_kinds, node_levels, node_files = array("B"), array("H"), array("I")
+    node_local, node_bases = array("I"), array("I")
+    base = 0
+    for file_id, item in enumerate(items):
+        count, node_count = len(item.token_kinds), len(item.node_kinds)
+        kinds.extend(item.token_kinds)
+        lines.extend(item.token_lines)
+        operands.extend(item.token_operands)
+        local.extend(item.token_functions)
+        files.extend(array("I", [file_id]) * count)
+        bases.extend(array("I", [base]) * count)
+        node_kinds.extend(item.node_kinds)
+        node_levels.extend(item.node_levels)
+        node_local.extend(item.node_functions)
+        node_files.extend(array("I", [file_id]) * node_count)
+        node_bases.extend(array("I", [base]) * node_count)
+        base += len(item.functions)
+
+    tokens = {"kinds": ops.wrap(kinds), "lines": ops.wrap(lines), "operands": ops.wrap(operands)}
+    nodes = {"kinds": ops.wrap(node_kinds), "levels": ops.wrap(node_levels)}
+    file_tokens = {**tokens, "groups": ops.wrap(files)}
+    per_file = _measures(ops, file_tokens, {**nodes, "groups": ops.wrap(node_files)}, len(items))
+    function_tokens = {**tokens, "groups": ops.offset(local, bases)}
+    function_nodes = {**nodes, "groups": ops.offset(node_local, node_bases)}
+    per_function = _measures(ops, function_tokens, function_nodes, base + 1)
+
+    file_table: Table = {name: [] for name in FILE_COLUMNS}
+    function_table: Table = {name: [] for name in FUNCTION_COLUMNS}
+    function_id = 0
+    for file_id, item in enumerate(items):
+        extra = {
+            "path": item.path,
+            "loc": item.loc,
+            "functions": len(item.functions),
+            "lexical_errors": item.lexical_errors,
+            "syntax_errors": item.syntax_errors,
+        }
+        for name in FILE_COLUMNS:
+            file_table[name].append(extra[name] if name in extra else per_file[name][file_id])
+        for name, start_line, end_line in item.functions:
+            function_id += 1
+            extra = {"path": item.path, "name": name, "start_line": start_line, "end_line": end_line}
+            extra["loc"] = end_line - start_line + 1
+            for column in FUNCTION_COLUMNS:
+                function_table[column].append(extra[column] if column in extra else per_function[column][function_id])
+
+    width = len(KIND_NAMES)
+    counts = ops.bincount(ops.pairs(file_tokens["groups"], tokens["kinds"], width), len(items) * width)
+    kind_table: Table = {"path": [], "kind": [], "count": []}
+    for key, count in enumerate(counts):
+        if count:
+            kind_table["path"].append(items[key // width].path)
+            kind_table["kind"].append(KIND_NAMES[key % width])
+            kind_table["count"].append(count)
+    return MetricsReport(file_table, function_table, kind_table, backend=ops.name)
+
+
+def collect_metrics(
+    paths: Iterable[str | Path], workers: Optional[int] = None, use_numpy: Optional[bool] = None
+) -> MetricsReport:
+    """Metricas de los archivos `.php` de `paths`; lexea y parsea en procesos."""
+    ops = batch_ops(use_numpy)
+    items: List[FileColumns] = []
+    errors: List[Dict[str, str]] = []
+    files = php_files(paths)
+    for item in parallel_map(collect_file, (files,), default_workers(workers)):
+        if item.error is not None:
+            errors.append({"path": item.path, "message": item.error})
+        else:
+            items.append(item)
+    report = aggregate(items, ops)
+    report.errors = errors
+    return report
+
+
+def write_table(table: Table, path: str | Path) -> None:
+    """Escribe `table` como CSV (`.csv`) o JSON en columnas (cualquier otra extension)."""
+    target = Path(path)
+    names = list(table)
+    if target.suffix.lower() == ".csv":
+        with target.open("w", encoding="utf-8", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(names)
+            writer.writerows(zip(*(table[name] for name in names)))
+        return
+    rows = len(table[names[0]]) if names else 0
+    target.write_text(json.dumps({"rows": rows, "columns": table}, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,10 @@
+"""Pases de optimizacion sobre el AST."""
+
+from .folding import ConstantFolder, FoldChange, FoldReport, fold_constants
+
+__all__ = [
+    "ConstantFolder",
+    "FoldChange",
+    "FoldReport",
+    "fold_constants",
+]
@@ -0,0 +1,402 @@
+"""Plegado de constantes y eliminacion de ramas muertas sobre el AST.
+
+El pase es AST -> AST: devuelve un programa nuevo (los nodos sin cambios se
+comparten con el original) y un `FoldReport` con cada simplificacion aplicada.
+Las operaciones se evaluan con la semantica de `vm.runtime`, la misma que usan
+los backends de ejecucion, de modo que plegar nunca cambia la salida: un
+entero que se sale de 64 bits pasa a float (`rt.int_result`) y se pliega como
+literal float. Si una operacion fallaria en ejecucion (division por cero,
+string no numerico en aritmetica) se deja intacta para que el error ocurra
+donde corresponde.
+"""
+from __future__ import annotations
+
+import copy
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import ast_nodes as ast
+from ..semantic.semantic_analyzer import find_lineno
+from ..vm import runtime as rt
+from ..vm.compiler import unescape
+
+_NEGATE = ("-", "u-")
+_PLUS = ("+", "u+")
+_ARITHMETIC = {"+": rt.add, "-": rt.sub, "*": rt.mul, "/": rt.div, "%": rt.mod}
+_COMPARISON = {
+    "==": rt.loose_equals,
+    "!=": lambda a, b: not rt.loose_equals(a, b),
+    "===": rt.strict_equals,
+    "!==": lambda a, b: not rt.strict_equals(a, b),
+    "<": rt.less,
+    "<=": rt.less_equal,
+    ">": rt.greater,
+    ">=": rt.greater_equal,
+}
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "$": "\\$", "\n": "\\n", "\t": "\\t", "\r": "\\r", "\0": "\\0"}
+
+# Centinela: el nodo u operacion no tiene valor constante plegable.
+NOT_CONSTANT = object()
+
+
+@dataclass
+class FoldChange:
+    kind: str  # "expr" | "concat" | "ternary" | "if" | "while"
+    detail: str
+    lineno: Optional[int] = None
+
+
+@dataclass
+class FoldReport:
+    changes: List[FoldChange] = field(default_factory=list)
+    nodes_before: int = 0
+    nodes_after: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.changes)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(change.kind for change in self.changes))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "changes": [
+                {"kind": change.kind, "detail": change.detail, "lineno": change.lineno} for change in self.changes
+            ],
+            "counts": self.counts(),
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+        }
+
+    def format(self) -> str:
+        lines = [f"[fold] linea {change.lineno or '-'}: {change.detail}" for change in self.changes]
+        lines.append(f"{len(self.changes)} cambios, nodos {self.nodes_before} -> {self.nodes_after}")
+        return "\n".join(lines)
+
+
+# === LITERALES ===
+def escape(text: str) -> str:
+    """Inversa de `unescape`: contenido de un literal de string entre comillas dobles."""
+    return "".join(_ESCAPES.get(ch, ch) for ch in text)
+
+
+def constant_of(node: Any) -> Any:
+    """Valor PHP de un nodo constante, o `NOT_CONSTANT` si no lo es."""
+    if isinstance(node, ast.NumberLit):
+        return node.value
+    if isinstance(node, ast.StringLit):
+        return unescape(node.value)
+    if isinstance(node, ast.BoolLit):
+        return node.value
+    if isinstance(node, ast.NullLit):
+        return None
+    if isinstance(node, ast.Name) and len(node.parts) == 1 and node.parts[0] in rt.CONSTANTS:
+        return rt.CONSTANTS[node.parts[0]]
+    if isinstance(node, ast.Unary) and node.op in _NEGATE and isinstance(node.expr, ast.NumberLit):
+        return -node.expr.value
+    return NOT_CONSTANT
+
+
+def literal(value: Any, lineno: Optional[int]) -> Any:
+    """Nodo literal para un valor escalar; `None` si no tiene representacion."""
+    if value is None:
+        node = ast.NullLit()
+    elif value.__class__ is bool:
+        node = ast.BoolLit(value)
+    elif value.__class__ is str:
+        node = ast.StringLit(escape(value))
+    elif value.__class__ is int:
+        if not rt.INT_MIN <= value <= rt.INT_MAX:
+            return None
+        node = ast.NumberLit(abs(value))
+    elif value.__class__ is float:
+        if not math.isfinite(value) or (value == 0 and math.copysign(1.0, value) < 0):
+            return None
+        node = ast.NumberLit(abs(value))
+    else:
+        return None
+    node.lineno = lineno
+    if isinstance(node, ast.NumberLit) and value < 0:
+        node = ast.Unary("-", node)
+        node.lineno = lineno
+    return node
+
+
+def render(node: Any) -> str:
+    """Forma corta de una expresion para el reporte."""
+    value = constant_of(node)
+    if value is not NOT_CONSTANT and not isinstance(node, ast.Name):
+        if isinstance(value, str):
+            text = value if len(value) <= 30 else value[:27] + "..."
+            return '"' + escape(text) + '"'
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return rt.to_str(value)
+    if isinstance(node, ast.Name):
+        return "\\".join(node.parts)
+    if isinstance(node, ast.Var):
+        return node.name
+    if isinstance(node, ast.Binary):
+        return f"{render(node.left)} {node.op} {render(node.right)}"
+    if isinstance(node, ast.Unary):
+        return f"{node.op.lstrip('u')}{render(node.expr)}"
+    if isinstance(node, ast.Ternary):
+        return f"{render(node.cond)} ? {render(node.if_true)} : {render(node.if_false)}"
+    if isinstance(node, ast.Call):
+        return f"{render(node.callee)}(...)"
+    return "..."
+
+
+def _numeric_operand(value: Any) -> bool:
+    if isinstance(value, str):
+        return rt.is_numeric_string(value)
+    return value is None or isinstance(value, (int, float, bool))
+
+
+def evaluate_binary(op: str, left: Any, right: Any) -> Any:
+    """Resultado de `left op right` o `NOT_CONSTANT` si no es seguro plegarlo."""
+    try:
+        if op == ".":
+            return rt.concat(left, right)
+        if op in _COMPARISON:
+            return _COMPARISON[op](left, right)
+        if op == "&&":
+            return rt.to_bool(left) and rt.to_bool(right)
+        if op == "||":
+            return rt.to_bool(left) or rt.to_bool(right)
+        if op in _ARITHMETIC and _numeric_operand(left) and _numeric_operand(right):
+            return _ARITHMETIC[op](left, right)
+    except (rt.PhpRuntimeError, ArithmeticError, ValueError, TypeError):
+        return NOT_CONSTANT
+    return NOT_CONSTANT
+
+
+def evaluate_unary(op: str, value: Any) -> Any:
+    try:
+        if op == "!":
+            return not rt.to_bool(value)
+        if op in _NEGATE and _numeric_operand(value):
+            return rt.neg(value)
+        if op in _PLUS and _numeric_operand(value):
+            return rt.to_number(value)
+    except (rt.PhpRuntimeError, ArithmeticError, ValueError, TypeError):
+        return NOT_CONSTANT
+    return NOT_CONSTANT
+
+
+# === PASE ===
+class ConstantFolder:
+    """Reescribe un `Program` plegando expresiones constantes y podando ramas."""
+
+    def __init__(self) -> None:
+        self.report = FoldReport()
+
+    def fold(self, program: ast.Program) -> Tuple[ast.Program, FoldReport]:
+        self.report = FoldReport(nodes_before=_count_nodes(program))
+        result = self.visit(program)
+        self.report.nodes_after = _count_nodes(result)
+        return result, self.report
+
+    def note(self, kind: str, detail: str, node: Any) -> None:
+        self.report.changes.append(FoldChange(kind, detail, find_lineno(node)))
+
+    # --- recorrido generico ---
+    def visit(self, node: Any) -> Any:
+        handler = getattr(self, f"visit_{node.__class__.__name__}", None)
+        if handler is not None:
+            return handler(node)
+        return self.generic_visit(node)
+
+    def generic_visit(self, node: Any) -> Any:
+        updates = {}
+        for name in ast.node_fields(node):
+            value = getattr(node, name)
+            new = self._visit_value(value)
+            if new is not value:
+                updates[name] = new
+        if not updates:
+            return node
+        clone = copy.copy(node)
+        for name, value in updates.items():
+            setattr(clone, name, value)
+        return clone
+
+    def _visit_value(self, value: Any) -> Any:
+        if ast.is_node(value):
+            new = self.visit(value)
+            return ast.EmptyStmt() if new is None else new
+        if isinstance(value, list):
+            items = []
+            changed = False
+            for item in value:
+                new = self._visit_item(item)
+                changed = changed or new is not item
+                if new is not None:
+                    items.append(new)
+            return items if changed else value
+        if isinstance(value, tuple):
+            items = tuple(self._visit_item(item) for item in value)
+            return items if any(a is not b for a, b in zip(items, value)) else value
+        return value
+
+    def _visit_item(self, item: Any) -> Any:
+        if ast.is_node(item):
+            return self.visit(item)  # None elimina la sentencia de la lista
+        if isinstance(item, tuple):
+            # Solo una sentencia eliminada pasa a `EmptyStmt`; un `None` original (clave de
+            # `ArrayLit` sin clave, rama ausente) queda como esta.
+            items = tuple(self._visit_entry(entry) for entry in item)
+            return items if any(a is not b for a, b in zip(items, item)) else item
+        return item
+
+    def _visit_entry(self, entry: Any) -> Any:
+        if entry is None:
+            return None
+        new = self._visit_value(entry)
+        return ast.EmptyStmt() if new is None else new
+
+    # --- expresiones ---
+    def visit_Binary(self, node: ast.Binary) -> Any:
+        if node.op == ".":
+            return self._fold_concat(node)
+        mark = len(self.report.changes)
+        folded = self.generic_visit(node)
+        left = constant_of(folded.left)
+        if node.op in ("&&", "||") and left is not NOT_CONSTANT and rt.to_bool(left) == (node.op == "||"):
+            # `false && x` / `true || x`: el lado derecho nunca se evalua.
+            return self._replace("expr", node, node.op == "||", folded, mark)
+        right = constant_of(folded.right)
+        if left is NOT_CONSTANT or right is NOT_CONSTANT:
+            return folded
+        return self._replace("expr", node, evaluate_binary(node.op, left, right), folded, mark)
+
+    def visit_Unary(self, node: ast.Unary) -> Any:
+        mark = len(self.report.changes)
+        folded = self.generic_visit(node)
+        if node.op in _NEGATE and isinstance(folded.expr, ast.NumberLit):
+            return folded  # ya es un literal negativo
+        value = constant_of(folded.expr)
+        if value is NOT_CONSTANT:
+            return folded
+        return self._replace("expr", node, evaluate_unary(node.op, value), folded, mark)
+
+    def visit_Ternary(self, node: ast.Ternary) -> Any:
+        mark = len(self.report.changes)
+        folded = self.generic_visit(node)
+        cond = constant_of(folded.cond)
+        if cond is NOT_CONSTANT:
+            return folded
+        chosen = folded.if_true if rt.to_bool(cond) else folded.if_false
+        del self.report.changes[mark:]
+        self.note("ternary", f"{render(node)} -> {render(chosen)}", node)
+        return chosen
+
+    def _replace(self, kind: str, node: Any, value: Any, fallback: Any, mark: int) -> Any:
+        if value is NOT_CONSTANT:
+            return fallback
+        replacement = literal(value, find_lineno(node))
+        if replacement is None:
+            return fallback
+        # Un solo cambio por expresion plegada: los plegados internos quedan subsumidos.
+        del self.report.changes[mark:]
+        self.note(kind, f"{render(node)} -> {render(replacement)}", node)
+        return replacement
+
+    def _fold_concat(self, node: ast.Binary) -> Any:
+        """Aplana la cadena `a . b . c` y une los tramos constantes contiguos."""
+        originals: List[Any] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, ast.Binary) and current.op == ".":
+                stack.append(current.right)
+                stack.append(current.left)
+            else:
+                originals.append(current)
+        operands = [self.visit(operand) for operand in originals]
+
+        # Cada grupo es un nodo no constante o un tramo [texto, nodos] de constantes contiguas.
+        groups: List[Any] = []
+        for operand in operands:
+            value = constant_of(operand)
+            if value is NOT_CONSTANT:
+                groups.append(operand)
+            elif groups and isinstance(groups[-1], list):
+                groups[-1][0] += rt.to_str(value)
+                groups[-1][1].append(operand)
+            else:
+                groups.append([rt.to_str(value), [operand]])
+        if all(not isinstance(group, list) or len(group[1]) == 1 for group in groups):
+            if all(new is old for new, old in zip(operands, originals)):
+                return node
+            return self._rebuild(node, operands)
+        lineno = find_lineno(node)
+        nodes = []
+        for group in groups:
+            if not isinstance(group, list):
+                nodes.append(group)
+            elif len(group[1]) == 1:
+                nodes.append(group[1][0])
+            else:
+                nodes.append(literal(group[0], lineno))
+        result = self._rebuild(node, nodes)
+        self.note("concat", f"{render(node)} -> {render(result)}", node)
+        return result
+
+    @staticmethod
+    def _rebuild(original: ast.Binary, operands: List[Any]) -> Any:
+        result = operands[0]
+        for operand in operands[1:]:
+            result = ast.Binary(".", result, operand)
+            result.lineno = getattr(original, "lineno", None)
+        return result
+
+    # --- sentencias ---
+    def visit_IfStmt(self, node: ast.IfStmt) -> Any:
+        folded = self.generic_visit(node)
+        branches = [(folded.cond, folded.then), *folded.elifs]
+        kept: List[Tuple[Any, Any]] = []
+        els = folded.els
+        pruned = False
+        for cond, body in branches:
+            value = constant_of(cond)
+            if value is NOT_CONSTANT:
+                kept.append((cond, body))
+            elif rt.to_bool(value):
+                pruned = True
+                els = body  # el resto de ramas es inalcanzable
+                break
+            else:
+                pruned = True
+        if not pruned:
+            return folded
+        if not kept:
+            self.note("if", f"if ({render(node.cond)}): se conserva solo la rama alcanzable", node)
+            return els  # None si no habia else: la sentencia desaparece
+        self.note("if", f"if ({render(node.cond)}): {len(branches) - len(kept)} rama(s) constante(s) podada(s)", node)
+        clone = copy.copy(folded)
+        clone.cond, clone.then = kept[0]
+        clone.elifs = kept[1:]
+        clone.els = els
+        return clone
+
+    def visit_WhileStmt(self, node: ast.WhileStmt) -> Any:
+        folded = self.generic_visit(node)
+        value = constant_of(folded.cond)
+        if value is not NOT_CONSTANT and not rt.to_bool(value):
+            self.note("while", f"while ({render(node.cond)}): cuerpo inalcanzable eliminado", node)
+            return None
+        return folded
+
+
+def _count_nodes(node: Any) -> int:
+    return sum(1 for _ in ast.walk(node))
+
+
+def fold_constants(program: ast.Program) -> Tuple[ast.Program, FoldReport]:
+    return ConstantFolder().fold(program)
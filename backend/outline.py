@@ -0,0 +1,240 @@
+"""Esquema rapido (namespaces, use, clases, funciones y metodos) leyendo solo tokens.
+
+No parsea ni analiza: recorre el flujo de tokens una vez reconociendo las
+cabeceras `namespace`, `use`, `class` y `function` y salta los cuerpos de las
+funciones contando llaves, asi que cuesta lo mismo que tokenizar (y nada si los
+tokens ya estan, como en un documento abierto). Tolera codigo incompleto: una
+llave sin cerrar extiende el elemento hasta el final del texto.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .lexer import PhpLexer
+from .lexer.incremental import Token
+
+_MODIFIERS = {"PUBLIC": "visibility", "PRIVATE": "visibility", "PROTECTED": "visibility", "STATIC": "static"}
+
+
+@dataclass
+class OutlineItem:
+    kind: str  # namespace | use | class | function | method
+    name: str
+    lineno: int
+    end_lineno: int
+    start: int
+    end: int
+    qualified: str = ""
+    params: List[str] = field(default_factory=list)
+    visibility: Optional[str] = None
+    is_static: bool = False
+    children: List["OutlineItem"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "qualified": self.qualified or self.name,
+            "lineno": self.lineno,
+            "end_lineno": self.end_lineno,
+            "start": self.start,
+            "end": self.end,
+            "params": list(self.params),
+            "visibility": self.visibility,
+            "is_static": self.is_static,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def walk(self) -> Iterator["OutlineItem"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def scan_spans(code: str) -> List[Token]:
+    """Tokens de `code` como `(tipo, valor, inicio, fin, linea)`, sin reportar errores."""
+    lexer = PhpLexer(reporter=lambda level, message: None).lexer
+    lexer.input(code)
+    spans: List[Token] = []
+    while True:
+        tok = lexer.token()
+        if tok is None:
+            return spans
+        spans.append((tok.type, tok.value, tok.lexpos, lexer.lexpos, tok.lineno))
+
+
+class _Skimmer:
+    def __init__(self, spans: Sequence[Token], code: str) -> None:
+        self.spans = spans
+        self.code = code
+        self.pos = 0
+        self.items: List[OutlineItem] = []
+        self.namespace: Optional[OutlineItem] = None
+
+    # --- utilidades ---
+    def kind(self, offset: int = 0) -> Optional[str]:
+        idx = self.pos + offset
+        return self.spans[idx][0] if idx < len(self.spans) else None
+
+    def text(self, first: Token, last: Token) -> str:
+        return " ".join(self.code[first[2]:last[3]].split())
+
+    def qname(self) -> Optional[str]:
+        """Nombre `A\\B\\C` desde la posicion actual (deja `pos` despues)."""
+        parts: List[str] = []
+        if self.kind() == "NAMESPACE_SEPARATOR":
+            self.pos += 1
+        while self.kind() == "ID":
+            parts.append(self.spans[self.pos][1])
+            self.pos += 1
+            if self.kind() == "NAMESPACE_SEPARATOR" and self.kind(1) == "ID":
+                self.pos += 1
+            else:
+                break
+        return "\\".join(parts) or None
+
+    def matching(self, opener: str, closer: str) -> int:
+        """Indice del cierre que corresponde a la apertura en `pos` (o el ultimo token)."""
+        depth = 0
+        for idx in range(self.pos, len(self.spans)):
+            kind = self.spans[idx][0]
+            if kind == opener:
+                depth += 1
+            elif kind == closer:
+                depth -= 1
+                if depth == 0:
+                    return idx
+        return len(self.spans) - 1
+
+    def qualify(self, name: str) -> str:
+        prefix = self.namespace.name if self.namespace is not None else ""
+        return f"{prefix}\\{name}" if prefix else name
+
+    def add(self, item: OutlineItem, parent: Optional[OutlineItem]) -> None:
+        target = parent if parent is not None else self.namespace
+        (target.children if target is not None else self.items).append(item)
+        if target is not None and item.end > target.end:
+            target.end, target.end_lineno = item.end, item.end_lineno
+
+    # --- cabeceras ---
+    def namespace_decl(self) -> None:
+        first = self.spans[self.pos]
+        self.pos += 1
+        name = self.qname()
+        if name is None:
+            return
+        last = self.spans[self.pos - 1]
+        if self.kind() == "SEMICOLON":
+            last = self.spans[self.pos]
+            self.pos += 1
+        self.namespace = OutlineItem("namespace", name, first[4], last[4], first[2], last[3], qualified=name)
+        self.items.append(self.namespace)
+
+    def use_decl(self) -> None:
+        self.pos += 1
+        while True:
+            first = self.spans[self.pos] if self.pos < len(self.spans) else None
+            name = self.qname()
+            if name is None or first is None:
+                return
+            last = self.spans[self.pos - 1]
+            self.add(OutlineItem("use", name, first[4], last[4], first[2], last[3], qualified=name), None)
+            if self.kind() != "COMMA":
+                break
+            self.pos += 1
+        if self.kind() == "SEMICOLON":
+            self.pos += 1
+
+    def function_decl(self, first: Token, parent: Optional[OutlineItem], modifiers: Dict[str, Any]) -> None:
+        """`pos` en `function`; consume cabecera y cuerpo."""
+        if self.kind(1) != "ID" or self.kind(2) != "LPAREN":
+            self.pos += 1
+            return
+        name = self.spans[self.pos + 1][1]
+        self.pos += 2
+        close = self.matching("LPAREN", "RPAREN")
+        params = self.params(self.pos + 1, close)
+        self.pos = close + 1
+        if self.kind() == "LBRACE":
+            close = self.matching("LBRACE", "RBRACE")
+            self.pos = close + 1
+        last = self.spans[close]
+        kind = "method" if parent is not None else "function"
+        qualified = f"{parent.qualified}::{name}" if parent is not None else self.qualify(name)
+        item = OutlineItem(kind, name, first[4], last[4], first[2], last[3], qualified=qualified, params=params,
+                           visibility=modifiers.get("visibility"), is_static=modifiers.get("static", False))
+        self.add(item, parent)
+
+    def params(self, begin: int, end: int) -> List[str]:
+        params: List[str] = []
+        depth, first = 0, begin
+        for idx in range(begin, end + 1):
+            kind = self.spans[idx][0] if idx < end else "COMMA"
+            if kind in ("LPAREN", "LBRACKET", "LBRACE"):
+                depth += 1
+            elif kind in ("RPAREN", "RBRACKET", "RBRACE"):
+                depth -= 1
+            elif kind == "COMMA" and depth == 0:
+                if idx > first:
+                    params.append(self.text(self.spans[first], self.spans[idx - 1]))
+                first = idx + 1
+        return params
+
+    def class_decl(self) -> None:
+        first = self.spans[self.pos]
+        if self.kind(1) != "ID":
+            self.pos += 1
+            return
+        name = self.spans[self.pos + 1][1]
+        self.pos += 2
+        while self.kind() not in (None, "LBRACE", "SEMICOLON"):
+            self.pos += 1
+        if self.kind() != "LBRACE":
+            return
+        close = self.matching("LBRACE", "RBRACE")
+        item = OutlineItem("class", name, first[4], self.spans[close][4], first[2], self.spans[close][3],
+                           qualified=self.qualify(name))
+        self.add(item, None)
+        self.pos += 1
+        # Modificadores (`public static`) vistos desde `member`, el primer token del miembro.
+        modifiers: Dict[str, Any] = {}
+        member = self.pos
+        while self.pos < close:
+            kind = self.kind()
+            if kind in _MODIFIERS:
+                if not modifiers:
+                    member = self.pos
+                modifiers[_MODIFIERS[kind]] = True if kind == "STATIC" else self.spans[self.pos][1].lower()
+                self.pos += 1
+                continue
+            if kind == "FUNCTION":
+                self.function_decl(self.spans[member if modifiers else self.pos], item, modifiers)
+            else:
+                self.pos += 1
+            modifiers = {}
+        self.pos = max(self.pos, close + 1)
+
+    def run(self) -> List[OutlineItem]:
+        while self.pos < len(self.spans):
+            kind = self.kind()
+            if kind == "NAMESPACE":
+                self.namespace_decl()
+            elif kind == "USE":
+                self.use_decl()
+            elif kind == "CLASS":
+                self.class_decl()
+            elif kind == "FUNCTION":
+                self.function_decl(self.spans[self.pos], None, {})
+            else:
+                self.pos += 1
+        return self.items
+
+
+def skim(spans: Sequence[Token], code: str) -> List[OutlineItem]:
+    """Esquema a partir de tokens ya calculados (`IncrementalLexer.spans()`) y su texto."""
+    return _Skimmer(list(spans), code).run()
+
+
+def outline(code: str) -> List[OutlineItem]:
+    return skim(scan_spans(code), code)
@@ -40,6 +40,7 @@ from .core import (
     New,
     Ternary,
 )
+from .incremental import IncrementalParser, ParseChange
 
 
 def demo(code: str) -> None:
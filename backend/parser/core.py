@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, is_dataclass
 from typing import Any, Callable, List, Optional
 
 import ply.yacc as yacc
@@ -437,7 +437,8 @@ def p_postfix(p):
                | postfix LBRACKET expr RBRACKET
                | postfix LPAREN args_opt RPAREN
                | postfix ARROW ID
-               | qname SCOPE ID"""
+               | qname SCOPE ID
+               | STATIC SCOPE ID"""
     if len(p) == 3 and p.slice[2].type in ('INC','DEC'):
         p[0] = PostfixUnary('++' if p.slice[2].type=='INC' else '--', p[1])
     elif len(p) == 5 and p.slice[2].type == 'LBRACKET':
@@ -447,7 +448,9 @@ def p_postfix(p):
     elif len(p) == 4 and p.slice[2].type == 'ARROW':
         p[0] = Member(p[1], p[3]); p[0].lineno = p.lineno(2)
     elif len(p) == 4 and p.slice[2].type == 'SCOPE':
-        p[0] = StaticAccess(p[1], p[3]); p[0].lineno = p.lineno(2)
+        # `static::` llega como palabra reservada; se guarda como un nombre mas.
+        qname = p[1] if p.slice[1].type == 'qname' else Name(['static'])
+        p[0] = StaticAccess(qname, p[3]); p[0].lineno = p.lineno(2)
     else:
         p[0] = p[1]
 
@@ -556,6 +559,43 @@ def p_error(tok):
         _recover_parser()
         return
 
+def _extent(p) -> Optional[tuple]:
+    """Rango `[inicio, fin)` en el texto de los simbolos no vacios de la produccion."""
+    start = end = None
+    for sym in p.slice[1:]:
+        lo = sym.lexpos
+        hi = getattr(sym, "endlexpos", lo)
+        if hi <= lo:  # produccion vacia: PLY le da la posicion del siguiente token
+            continue
+        if start is None:
+            start = lo
+        end = hi
+    return None if start is None else (start, end)
+
+
+def _with_span(rule: Callable[[Any], None]) -> Callable[[Any], None]:
+    """Envuelve una regla para que el nodo que devuelve lleve `start`/`end` (offsets del texto).
+
+    Como `lineno`, son atributos de instancia y no campos del dataclass. Un nodo
+    que sube por varias producciones (p. ej. `( expr )` o `vardecl ;`) termina
+    abarcando la mas externa.
+    """
+    def rule_with_span(p):
+        rule(p)
+        extent = _extent(p)
+        if extent is None:
+            return
+        sym = p.slice[0]
+        # El rango corregido sube a las producciones que contienen a esta.
+        sym.lexpos, sym.endlexpos = extent
+        node = p[0]
+        if is_dataclass(node) and not isinstance(node, type):
+            node.start, node.end = extent
+
+    rule_with_span.with_span = True
+    return rule_with_span
+
+
 class ParserWrapper:
     """Envoltura alrededor del parser PLY para manejar el estado y los errores."""
     def __init__(self, debug: bool = False, reporter: Callable[[str, str], None] | None = None):
@@ -567,6 +607,9 @@ class ParserWrapper:
             debug=debug,
             write_tables=False,
         )
+        for production in self._parser.productions:
+            if production.callable is not None and not getattr(production.callable, "with_span", False):
+                production.callable = _with_span(production.callable)
         self.errors: List[SyntaxErrorInfo] = []
         self.error_count: int = 0
 
@@ -0,0 +1,271 @@
+"""Reparseo incremental por elementos de nivel superior.
+
+Entre `<?php` y `?>` el programa es una secuencia de elementos (clases,
+funciones, sentencias) que terminan en `;` o `}` a profundidad 0 (salvo que
+siga un `else`/`elseif`). El parser de un elemento no depende de los vecinos,
+asi que tras una edicion solo se vuelven a parsear los grupos de tokens entre
+el elemento anterior al cambio y el primer limite que coincide con un limite
+viejo; los nodos del resto se reutilizan, corrigiendo sus lineas.
+
+Los offsets (`start`/`end`) de los elementos reutilizados no se corrigen en
+cada tecla: se acumula el corrimiento por elemento y `settle_offsets` lo aplica
+cuando alguien necesita posiciones (p. ej. el indice de hover).
+
+Si algun grupo no parsea, `program` es None y los errores son los de cada
+grupo roto parseado por separado: el primero coincide con el de un parseo
+completo, pero la recuperacion no arrastra errores en cascada a los elementos
+vecinos. Solo si se pierde la forma `<?php ... ?>` se parsea el flujo entero.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate, islice
+from typing import Any, Iterator, List, Optional, Tuple
+
+import ply.lex as lex
+
+from ..ast_nodes import Program, walk
+from ..lexer import IncrementalLexer, LexChange
+from ..lexer.incremental import Token
+from .core import SyntaxErrorInfo, build_parser
+
+_OPENERS = {"LBRACE", "LPAREN", "LBRACKET"}
+_CLOSERS = {"RBRACE", "RPAREN", "RBRACKET"}
+
+
+class TokenFeed:
+    """Fuente de tokens con la interfaz de lexer que espera PLY."""
+
+    def __init__(self, tokens: List[lex.LexToken]) -> None:
+        self._tokens = iter(tokens)
+        self.lineno = tokens[0].lineno if tokens else 1
+        self.lexpos = 0
+
+    def input(self, data: Any) -> None:
+        return None
+
+    def token(self) -> Optional[lex.LexToken]:
+        tok = next(self._tokens, None)
+        if tok is not None:
+            self.lineno, self.lexpos = tok.lineno, tok.lexpos
+        return tok
+
+
+def marker(kind: str, like: lex.LexToken) -> lex.LexToken:
+    """Token `<?php` o `?>` sintetico para parsear un elemento suelto."""
+    tok = lex.LexToken()
+    tok.type, tok.value, tok.lineno, tok.lexpos = kind, "<?php" if kind == "PHP_OPEN" else "?>", like.lineno, like.lexpos
+    tok.endlexpos = like.lexpos  # sin ancho: no cuenta en el rango de los nodos
+    return tok
+
+
+def _lex_token(span: Token) -> lex.LexToken:
+    tok = lex.LexToken()
+    tok.type, tok.value, tok.lexpos, tok.endlexpos, tok.lineno = span
+    return tok
+
+
+def shift_positions(node: Any, lines: int = 0, chars: int = 0, after: int = 0) -> None:
+    """Suma `lines` al `lineno` de `node` y sus descendientes, y `chars` a sus offsets desde `after`.
+
+    `node` puede ser un nodo o una lista de nodos (los elementos de un grupo).
+    """
+    for root in node if isinstance(node, list) else [node]:
+        for item in walk(root):
+            if lines and getattr(item, "lineno", None) is not None:
+                item.lineno += lines
+            start = getattr(item, "start", None) if chars else None
+            if start is not None:
+                if start >= after:
+                    item.start = start + chars
+                if item.end > after:
+                    item.end += chars
+
+
+# (nodos, errores): los nodos son None si el grupo no parsea.
+_Unit = Tuple[Optional[list], List[SyntaxErrorInfo]]
+
+
+class _BrokenStructure(Exception):
+    """El flujo no tiene la forma `<?php ... ?>` agrupable."""
+
+
+def _groups(spans: Iterator[Token], index: int) -> Iterator[Tuple[int, int, List[Token], Token]]:
+    """Grupos `(inicio, fin, tokens, siguiente)` desde el indice `index` hasta el `?>` final."""
+    group: List[Token] = []
+    begin, depth, complete = index, 0, False
+    for span in spans:
+        kind = span[0]
+        if complete and kind not in ("ELSE", "ELSEIF"):
+            yield begin, index, group, span
+            group, begin, complete = [], index, False
+        if kind == "PHP_CLOSE" and depth == 0:
+            if group:
+                yield begin, index, group, span
+            if next(spans, None) is not None:
+                raise _BrokenStructure()
+            return
+        group.append(span)
+        if kind in _OPENERS:
+            depth += 1
+        elif kind in _CLOSERS:
+            depth -= 1
+        complete = depth == 0 and kind in ("SEMICOLON", "RBRACE")
+        index += 1
+    raise _BrokenStructure()
+
+
+@dataclass(frozen=True)
+class ParseChange:
+    """Efecto de una edicion sobre el programa: grupos parseados y elementos reutilizados."""
+
+    lex: LexChange
+    reparsed: int
+    reused: int
+    full: bool
+
+
+class IncrementalParser:
+    """Mantiene tokens y AST de un documento y los actualiza con `edit(offset, borrados, insertado)`."""
+
+    def __init__(self, text: str = "") -> None:
+        self._parser = build_parser(reporter=lambda level, message: None)
+        self.lexer = IncrementalLexer()
+        self.program: Optional[Program] = None
+        self.errors: List[SyntaxErrorInfo] = []
+        self._sizes: Optional[List[int]] = None
+        self._units: List[_Unit] = []
+        # Corrimiento de offsets pendiente por elemento (ver `settle_offsets`).
+        self._drift: List[int] = []
+        self.reset(text)
+
+    @property
+    def text(self) -> str:
+        return self.lexer.text
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    def reset(self, text: str) -> None:
+        """Tokeniza y parsea `text` completo."""
+        self.lexer.reset(text)
+        self._parse_all()
+
+    # === PARSEO ===
+    def _parse_group(self, group: List[Token], following: Token) -> _Unit:
+        tokens = [_lex_token(span) for span in group]
+        feed = TokenFeed([marker("PHP_OPEN", tokens[0]), *tokens, marker("PHP_CLOSE", _lex_token(following))])
+        program = self._parser.parse(None, lexer=feed)
+        return (None, list(self._parser.errors)) if program is None else (program.items, [])
+
+    def _parse_all(self) -> int:
+        self._sizes, self._units = None, []
+        spans = self.lexer.spans()
+        first = next(spans, None)
+        if first is not None and first[0] == "PHP_OPEN":
+            sizes: List[int] = []
+            try:
+                for begin, end, group, following in _groups(spans, 1):
+                    self._units.append(self._parse_group(group, following))
+                    sizes.append(end - begin)
+                self._sizes = sizes
+            except _BrokenStructure:
+                self._units = []
+        self._drift = [0] * len(self._units)
+        self._publish()
+        return len(self._units)
+
+    def _publish(self) -> None:
+        """Arma `program` y `errors` a partir de los grupos (o del flujo completo si no hay estructura)."""
+        if self._sizes is None:
+            self.program = self._parser.parse(None, lexer=TokenFeed(list(self.lexer.tokens())))
+            self.errors = list(self._parser.errors)
+            return
+        self.errors = [error for _, errors in self._units for error in errors]
+        self.program = None if self.errors else Program([node for items, _ in self._units for node in items])
+        if self.program is not None:
+            # Como en un parseo completo, el programa va de `<?php` a `?>`.
+            self.program.start = next(self.lexer.spans())[2]
+            self.program.end = next(self.lexer.spans(len(self.lexer) - 1))[3]
+
+    def settle_offsets(self) -> None:
+        """Aplica a los nodos reutilizados los corrimientos de offsets pendientes."""
+        for idx, chars in enumerate(self._drift):
+            if chars:
+                items = self._units[idx][0]
+                if items:
+                    shift_positions(items, chars=chars)
+                self._drift[idx] = 0
+
+    def _shift_untouched(self, start: int, offset: int, chars: int) -> None:
+        """Corre los offsets tras una edicion que no cambio tokens (solo espacios o comentarios)."""
+        if self._sizes is None:
+            if self.program is not None:
+                shift_positions(self.program, chars=chars, after=offset)
+            return
+        unit = bisect_right(list(accumulate(self._sizes, initial=1)), start) - 1
+        if 0 <= unit < len(self._units):
+            items = self._units[unit][0]
+            if items:
+                # Los offsets del elemento todavia no incluyen su corrimiento pendiente.
+                shift_positions(items, chars=chars, after=offset - self._drift[unit])
+        first = max(unit + 1, 0)
+        self._drift[first:] = [drift + chars for drift in self._drift[first:]]
+        self._publish()
+
+    # === EDICION ===
+    def edit(self, offset: int, deleted: int, inserted: str) -> ParseChange:
+        """Aplica la edicion al texto y reparsea solo los elementos afectados."""
+        change = self.lexer.edit(offset, deleted, inserted)
+        start, removed, added = change.start, change.removed, change.added
+        chars = len(inserted) - deleted
+        if not removed and not added and not change.lines:
+            if chars:
+                self._shift_untouched(start, offset, chars)
+            return ParseChange(change, 0, len(self._units), False)
+        sizes = self._sizes
+        starts = list(accumulate(sizes, initial=1)) if sizes is not None else []
+        if sizes is None or start == 0 or start + removed > starts[-1]:
+            return ParseChange(change, self._parse_all(), 0, True)
+
+        first = 0 if start <= 1 else bisect_right(starts, start - 1) - 1
+        shift = added - removed
+        units: List[_Unit] = []
+        new_sizes: List[int] = []
+        reuse = len(sizes)
+        try:
+            for begin, end, group, following in _groups(self.lexer.spans(starts[first]), starts[first]):
+                units.append(self._parse_group(group, following))
+                new_sizes.append(end - begin)
+                old_end = end - shift
+                if end >= start + added and old_end >= start + removed:
+                    boundary = bisect_left(starts, old_end)
+                    if boundary < len(sizes) and starts[boundary] == old_end:
+                        reuse = boundary
+                        break
+        except _BrokenStructure:
+            return ParseChange(change, self._parse_all(), 0, True)
+
+        reparsed = len(units)
+        drift = self._drift
+        drift[reuse:] = [pending + chars for pending in drift[reuse:]]
+        if change.lines:
+            index = starts[reuse] + shift
+            for offset_in_tail, (items, errors) in enumerate(self._units[reuse:]):
+                size = sizes[reuse + offset_in_tail]
+                if errors:
+                    # Los mensajes llevan la linea en el texto: se vuelve a parsear el grupo.
+                    group = list(islice(self.lexer.spans(index), size + 1))
+                    self._units[reuse + offset_in_tail] = self._parse_group(group[:size], group[size])
+                    drift[reuse + offset_in_tail] = 0
+                    reparsed += 1
+                else:
+                    shift_positions(items, lines=change.lines)
+                index += size
+        sizes[first:reuse] = new_sizes
+        self._units[first:reuse] = units
+        drift[first:reuse] = [0] * len(units)
+        self._publish()
+        return ParseChange(change, reparsed, len(sizes) - reparsed, False)
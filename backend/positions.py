@@ -0,0 +1,102 @@
+"""Indice de posiciones: que nodo del AST (y con que tipo) hay bajo un offset.
+
+El parser deja en cada nodo `start`/`end` (offsets `[inicio, fin)` del texto).
+`SpanIndex` guarda esos rangos en un arbol de intervalos estatico: los rangos
+ordenados por inicio forman un arbol binario balanceado implicito (la mitad de
+cada tramo es la raiz) y cada raiz recuerda el mayor `end` de su subarbol, asi
+que una consulta descarta subarboles enteros y cuesta O(log n) por cada nodo
+que contiene al offset (la profundidad de anidamiento, no el tamano del archivo).
+Los tipos son los que infiere `SemanticAnalyzer` al recorrer (`analyzer.types`).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import ast_nodes as ast
+
+
+@dataclass(frozen=True)
+class NodeSpan:
+    start: int
+    end: int
+    node: Any
+    type: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        name = getattr(self.node, "name", None)
+        if isinstance(name, list):  # NamespaceDecl y Name guardan partes
+            name = "\\".join(name)
+        elif name is None and hasattr(self.node, "parts"):
+            name = "\\".join(self.node.parts)
+        return {
+            "kind": type(self.node).__name__,
+            "name": name if isinstance(name, str) else None,
+            "start": self.start,
+            "end": self.end,
+            "lineno": getattr(self.node, "lineno", None),
+            "type": self.type,
+        }
+
+
+class SpanIndex:
+    """Arbol de intervalos sobre los rangos de los nodos."""
+
+    def __init__(self, spans: Iterable[NodeSpan] = ()) -> None:
+        # A igual inicio va primero el mas largo (el que contiene al otro).
+        self._spans: List[NodeSpan] = sorted(spans, key=lambda span: (span.start, -span.end))
+        self._starts = [span.start for span in self._spans]
+        self._ends = [span.end for span in self._spans]
+        self._max_end = [0] * len(self._spans)
+        self._build(0, len(self._spans))
+
+    def _build(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def _stab(self, lo: int, hi: int, offset: int, out: List[int]) -> None:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._max_end[mid] <= offset:
+                return
+            self._stab(lo, mid, offset, out)
+            if self._starts[mid] > offset:
+                return
+            if offset < self._ends[mid]:
+                out.append(mid)
+            lo = mid + 1
+
+    def containing(self, offset: int) -> List[NodeSpan]:
+        """Nodos cuyo rango contiene `offset`, del mas externo al mas interno."""
+        found: List[int] = []
+        self._stab(0, len(self._spans), offset, found)
+        return [self._spans[idx] for idx in found]
+
+    def node_at(self, offset: int) -> Optional[NodeSpan]:
+        """Nodo mas interno bajo `offset` (None fuera de todo nodo)."""
+        found = self.containing(offset)
+        return found[-1] if found else None
+
+    def type_at(self, offset: int) -> Optional[NodeSpan]:
+        """Nodo mas interno bajo `offset` con tipo inferido."""
+        for span in reversed(self.containing(offset)):
+            if span.type is not None:
+                return span
+        return None
+
+
+def index_program(program: Any, types: Optional[Dict[int, Any]] = None) -> SpanIndex:
+    """`SpanIndex` con todos los nodos de `program` que tienen rango."""
+    types = types or {}
+    spans: List[NodeSpan] = []
+    for item in ast.walk(program):
+        start = getattr(item, "start", None)
+        if start is not None:
+            spans.append(NodeSpan(start, item.end, item, types.get(id(item))))
+    return SpanIndex(spans)
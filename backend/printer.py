@@ -0,0 +1,706 @@
+"""Emision de PHP desde el AST (formateo legible o minificado) y desde tokens.
+
+`PhpPrinter` recorre el AST escribiendo en un `write(str)` a medida que avanza,
+con parentesis solo donde la precedencia lo exige: los operadores binarios se
+ordenan segun la tabla `precedence` del parser y asignacion y ternario, que la
+gramatica estratifica en las reglas `assign` y `conditional`, quedan por debajo.
+Ademas se agregan parentesis que PHP 8 exige y esta gramatica no (`.` mezclado
+con `+`/`-`, comparaciones encadenadas, ternarios anidados, `(new A())->m()`).
+
+Para archivos grandes, `format_stream` lee el fuente por bloques: cada bloque se
+corta en un limite seguro entre tokens (fuera de strings y comentarios), se
+tokeniza, se agrupa en elementos de nivel superior y cada uno se parsea,
+imprime y descarta. La memoria queda acotada por el elemento de nivel superior
+mas grande, no por el tamano del archivo. `minify_stream` hace lo mismo sin
+parsear, reescribiendo el texto de los tokens.
+
+El AST no guarda comentarios ni lineas en blanco: el modo legible los descarta.
+Imprimir, volver a parsear e imprimir da el mismo texto (y el mismo AST).
+"""
+from __future__ import annotations
+
+import io
+import re
+import string
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import ply.lex as lex
+
+from . import ast_nodes as ast
+from .lexer import PhpLexer
+from .parser import build_parser
+from .parser.core import precedence
+from .parser.incremental import TokenFeed, marker
+
+CHUNK_SIZE = 1 << 20
+_FLUSH_SIZE = 1 << 16
+
+# --- niveles de precedencia ---
+ASSIGN, TERNARY = 0, 1
+_TOKEN_OF = {
+    "||": "OR", "&&": "AND",
+    "==": "EQUAL", "!=": "NOTEQUAL", "===": "IDENT", "!==": "NIDENT",
+    "<": "LT", "<=": "LE", ">": "GT", ">=": "GE",
+    "+": "PLUS", "-": "MINUS", ".": "CONCAT",
+    "*": "TIMES", "/": "DIVIDE", "%": "MOD",
+}
+_TABLE = {token: idx for idx, (_, *names) in enumerate(precedence) for token in names}
+BINARY_LEVEL = {op: TERNARY + 1 + _TABLE[token] for op, token in _TOKEN_OF.items()}
+UNARY = max(BINARY_LEVEL.values()) + 1
+POSTFIX = UNARY + 1
+PRIMARY = POSTFIX + 1
+# Niveles que PHP 8 no permite encadenar sin parentesis.
+_NON_ASSOCIATIVE = {BINARY_LEVEL["=="], BINARY_LEVEL["<"]}
+
+# Pares de caracteres que, pegados, formarian otro token.
+_JOINS = {"==", "!=", "<=", ">=", "&&", "||", "++", "--", "->", "::", "=>", "//", "/*", "?>", "<?"}
+
+
+class FormatError(Exception):
+    """Fuente que no se puede tokenizar o parsear al formatear."""
+
+    def __init__(self, message: str, lineno: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.lineno = lineno
+
+
+_WORD = frozenset(string.ascii_letters + string.digits + "_")
+
+
+def needs_space(prev: str, nxt: str) -> bool:
+    """True si el ultimo caracter emitido y el siguiente no pueden ir pegados."""
+    if prev in _WORD and nxt in _WORD:
+        return True
+    if (prev == "." and nxt.isdigit()) or (prev.isdigit() and nxt == "."):
+        return True
+    return prev + nxt in _JOINS
+
+
+# === SALIDA ===
+class _Writer:
+    """Acumula la salida en bloques y la entrega a `write` al superar un tamano."""
+
+    def __init__(self, write: Callable[[str], Any], pretty: bool, indent: str = "    ") -> None:
+        self._write = write
+        self.pretty = pretty
+        self._indent = indent
+        self.level = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._last = "\n"
+
+    def _emit(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        self._last = text[-1]
+        if self._size >= _FLUSH_SIZE:
+            self.flush()
+
+    def token(self, text: str) -> None:
+        if needs_space(self._last, text[0]):
+            self._emit(" ")
+        self._emit(text)
+
+    def space(self) -> None:
+        if self.pretty and self._last not in " \n":
+            self._emit(" ")
+
+    def newline(self) -> None:
+        if self.pretty:
+            self._emit("\n" + self._indent * self.level)
+
+    def blank_line(self) -> None:
+        if self.pretty:
+            self._emit("\n")
+
+    def raw(self, text: str) -> None:
+        self._emit(text)
+
+    def flush(self) -> None:
+        if self._parts:
+            self._write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+# === IMPRESOR ===
+def _expr_level(node: Any) -> int:
+    if isinstance(node, ast.Assign):
+        return ASSIGN
+    if isinstance(node, ast.Ternary):
+        return TERNARY
+    if isinstance(node, ast.Binary):
+        return BINARY_LEVEL[node.op]
+    if isinstance(node, ast.Unary):
+        return UNARY
+    if isinstance(node, ast.NumberLit) and node.value < 0:
+        return UNARY
+    if isinstance(node, (ast.PostfixUnary, ast.Call, ast.Index, ast.Member, ast.StaticAccess)):
+        return POSTFIX
+    return PRIMARY
+
+
+def _group(op: str) -> str:
+    # `.` comparte nivel con `+`/`-` en esta gramatica pero no en PHP 8.
+    return "concat" if op == "." else "arith"
+
+
+def format_number(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, float):
+        return str(int(value))
+    text = format(Decimal(repr(value)), "f")
+    return text if "." in text else text + ".0"
+
+
+def quote_string(value: str) -> str:
+    """Comillas para el valor crudo de un `StringLit` (el lexer no guarda cuales eran)."""
+    fits_single = re.fullmatch(r"(?:\\.|[^'\\])*", value, re.S) is not None
+    if fits_single and "\\'" in value:
+        return f"'{value}'"
+    if re.fullmatch(r'(?:\\.|[^"\\])*', value, re.S):
+        return f'"{value}"'
+    return f"'{value}'"
+
+
+class PhpPrinter:
+    """Imprime nodos del AST en `write`; `minify=True` omite espacios y saltos opcionales."""
+
+    def __init__(self, write: Callable[[str], Any], minify: bool = False, indent: str = "    ") -> None:
+        self.out = _Writer(write, pretty=not minify, indent=indent)
+        self._previous: Any = None
+
+    # --- programa ---
+    def begin(self) -> None:
+        self.out.raw("<?php")
+        self.out.raw("\n" if self.out.pretty else " ")
+        self.out.level = 0
+        self._previous = None
+
+    def item(self, node: Any) -> None:
+        """Imprime un elemento de nivel superior (sentencia, clase, funcion...)."""
+        self._separate(node)
+        self.stmt(node)
+
+    def end(self) -> None:
+        if self.out.pretty:
+            self.out.raw("\n?>\n" if self._previous is not None else "?>\n")
+        else:
+            self.out.token("?>")
+        self.out.flush()
+
+    def program(self, program: ast.Program) -> None:
+        self.begin()
+        for node in program.items:
+            self.item(node)
+        self.end()
+
+    def _separate(self, node: Any) -> None:
+        previous, self._previous = self._previous, node
+        if previous is None:
+            return
+        if isinstance(previous, (ast.FunctionDecl, ast.ClassDecl)) or isinstance(node, (ast.FunctionDecl, ast.ClassDecl)):
+            self.out.blank_line()
+        self.out.newline()
+
+    # --- sentencias ---
+    def stmt(self, node: Any) -> None:
+        getattr(self, f"stmt_{node.__class__.__name__}")(node)
+
+    def stmts(self, nodes: List[Any]) -> None:
+        saved, self._previous = self._previous, None
+        for node in nodes:
+            self._separate(node)
+            self.stmt(node)
+        self._previous = saved
+
+    def body(self, node: Any) -> None:
+        """Cuerpo de `if`/`while`/`for`/`foreach`: bloque en la misma linea o sentencia indentada."""
+        if isinstance(node, ast.Block):
+            self.out.space()
+            self.stmt_Block(node)
+            return
+        self.out.level += 1
+        self.out.newline()
+        self.stmt(node)
+        self.out.level -= 1
+
+    def _after_body(self, body: Any) -> None:
+        if isinstance(body, ast.Block):
+            self.out.space()
+        else:
+            self.out.newline()
+
+    def stmt_Block(self, node: ast.Block) -> None:
+        self.out.token("{")
+        if node.stmts:
+            self.out.level += 1
+            self.out.newline()
+            self.stmts(node.stmts)
+            self.out.level -= 1
+            self.out.newline()
+        self.out.token("}")
+
+    def stmt_EmptyStmt(self, node: ast.EmptyStmt) -> None:
+        self.out.token(";")
+
+    def stmt_NamespaceDecl(self, node: ast.NamespaceDecl) -> None:
+        self.out.token("namespace")
+        self.qname(node.name)
+        self.out.token(";")
+
+    def stmt_UseDecl(self, node: ast.UseDecl) -> None:
+        self.out.token("use")
+        for idx, parts in enumerate(node.names):
+            if idx:
+                self.out.token(",")
+            self.out.space()
+            self.qname(parts)
+        self.out.token(";")
+
+    def stmt_ClassDecl(self, node: ast.ClassDecl) -> None:
+        self.out.token("class")
+        self.out.token(node.name)
+        self.out.space()
+        self.stmt_Block(ast.Block(node.members))
+
+    def stmt_FunctionDecl(self, node: ast.FunctionDecl) -> None:
+        if node.visibility:
+            self.out.token(node.visibility)
+        if node.is_static:
+            self.out.token("static")
+        self.out.token("function")
+        self.out.token(node.name)
+        self.out.token("(")
+        for idx, param in enumerate(node.params):
+            if idx:
+                self.out.token(",")
+                self.out.space()
+            self.out.token(param.name)
+            if param.default is not None:
+                self.assign_op()
+                self.expr(param.default)
+        self.out.token(")")
+        self.out.space()
+        self.stmt_Block(node.body)
+
+    def stmt_EchoStmt(self, node: ast.EchoStmt) -> None:
+        self.out.token("echo")
+        self.out.space()
+        self.expr_list(node.exprs)
+        self.out.token(";")
+
+    def _keyword_expr(self, keyword: str, expr: Any) -> None:
+        self.out.token(keyword)
+        if expr is not None:
+            self.out.space()
+            self.expr(expr)
+        self.out.token(";")
+
+    def stmt_PrintStmt(self, node: ast.PrintStmt) -> None:
+        self._keyword_expr("print", node.expr)
+
+    def stmt_ReturnStmt(self, node: ast.ReturnStmt) -> None:
+        self._keyword_expr("return", node.expr)
+
+    def stmt_IncludeStmt(self, node: ast.IncludeStmt) -> None:
+        self._keyword_expr("include", node.expr)
+
+    def stmt_RequireStmt(self, node: ast.RequireStmt) -> None:
+        self._keyword_expr("require", node.expr)
+
+    def stmt_VarDeclStmt(self, node: ast.VarDeclStmt) -> None:
+        self.var_binds(node.decls)
+        self.out.token(";")
+
+    def var_binds(self, decls: List[Any]) -> None:
+        for idx, (name, value) in enumerate(decls):
+            if idx:
+                self.out.token(",")
+                self.out.space()
+            self.out.token(name)
+            if value is not None:
+                self.assign_op()
+                self.expr(value)
+
+    def stmt_ExprStmt(self, node: ast.ExprStmt) -> None:
+        self.statement_expr(node.expr)
+        self.out.token(";")
+
+    def statement_expr(self, expr: Any) -> None:
+        # `$x;` y `$x = ...;` se parsean como declaracion: la expresion va entre parentesis.
+        if isinstance(expr, ast.Var) or (isinstance(expr, ast.Assign) and isinstance(expr.target, ast.Var)):
+            self.out.token("(")
+            self.expr(expr)
+            self.out.token(")")
+        else:
+            self.expr(expr)
+
+    def _header(self, keyword: str, cond: Any) -> None:
+        self.out.token(keyword)
+        self.out.space()
+        self.out.token("(")
+        self.expr(cond)
+        self.out.token(")")
+
+    def stmt_IfStmt(self, node: ast.IfStmt) -> None:
+        self._header("if", node.cond)
+        self.body(node.then)
+        last = node.then
+        for cond, body in node.elifs:
+            self._after_body(last)
+            self._header("elseif", cond)
+            self.body(body)
+            last = body
+        if node.els is not None:
+            self._after_body(last)
+            self.out.token("else")
+            self.body(node.els)
+
+    def stmt_WhileStmt(self, node: ast.WhileStmt) -> None:
+        self._header("while", node.cond)
+        self.body(node.body)
+
+    def stmt_ForStmt(self, node: ast.ForStmt) -> None:
+        self.out.token("for")
+        self.out.space()
+        self.out.token("(")
+        init = node.init or []
+        if init and isinstance(init[0], tuple):
+            self.var_binds(init)
+        else:
+            for idx, expr in enumerate(init):
+                if idx:
+                    self.out.token(",")
+                    self.out.space()
+                self.statement_expr(expr)
+        self.out.token(";")
+        if node.cond is not None:
+            self.out.space()
+            self.expr(node.cond)
+        self.out.token(";")
+        if node.iters:
+            self.out.space()
+            self.expr_list(node.iters)
+        self.out.token(")")
+        self.body(node.body)
+
+    def stmt_ForeachStmt(self, node: ast.ForeachStmt) -> None:
+        self.out.token("foreach")
+        self.out.space()
+        self.out.token("(")
+        self.expr(node.iterable)
+        self.out.space()
+        self.out.token("as")
+        self.out.space()
+        if node.key is not None:
+            self.out.token(node.key)
+            self.binary_op("=>")
+        self.out.token(node.value)
+        self.out.token(")")
+        self.body(node.body)
+
+    # --- expresiones ---
+    def qname(self, parts: List[str]) -> None:
+        for idx, part in enumerate(parts):
+            if idx:
+                self.out.token("\\")
+            self.out.token(part)
+
+    def binary_op(self, op: str) -> None:
+        self.out.space()
+        self.out.token(op)
+        self.out.space()
+
+    def assign_op(self) -> None:
+        self.binary_op("=")
+
+    def expr_list(self, exprs: List[Any]) -> None:
+        for idx, expr in enumerate(exprs):
+            if idx:
+                self.out.token(",")
+                self.out.space()
+            self.expr(expr)
+
+    def expr(self, node: Any, min_level: int = ASSIGN) -> None:
+        if _expr_level(node) < min_level:
+            self.out.token("(")
+            getattr(self, f"expr_{node.__class__.__name__}")(node)
+            self.out.token(")")
+        else:
+            getattr(self, f"expr_{node.__class__.__name__}")(node)
+
+    def postfix_base(self, node: Any) -> None:
+        if isinstance(node, ast.New):
+            self.out.token("(")
+            self.expr_New(node)
+            self.out.token(")")
+        else:
+            self.expr(node, POSTFIX)
+
+    def expr_Name(self, node: ast.Name) -> None:
+        self.qname(node.parts)
+
+    def expr_Var(self, node: ast.Var) -> None:
+        self.out.token(node.name)
+
+    def expr_NumberLit(self, node: ast.NumberLit) -> None:
+        self.out.token(format_number(node.value))
+
+    def expr_StringLit(self, node: ast.StringLit) -> None:
+        self.out.token(quote_string(node.value))
+
+    def expr_BoolLit(self, node: ast.BoolLit) -> None:
+        self.out.token("true" if node.value else "false")
+
+    def expr_NullLit(self, node: ast.NullLit) -> None:
+        self.out.token("null")
+
+    def expr_ArrayLit(self, node: ast.ArrayLit) -> None:
+        self.out.token("[")
+        for idx, (key, value) in enumerate(node.pairs):
+            if idx:
+                self.out.token(",")
+                self.out.space()
+            if key is not None:
+                self.expr(key)
+                self.binary_op("=>")
+            self.expr(value)
+        self.out.token("]")
+
+    def expr_Assign(self, node: ast.Assign) -> None:
+        self.postfix_base(node.target)
+        self.assign_op()
+        self.expr(node.value, ASSIGN)
+
+    def expr_Ternary(self, node: ast.Ternary) -> None:
+        self.expr(node.cond, TERNARY + 1)
+        self.binary_op("?")
+        self.expr(node.if_true, ASSIGN)
+        self.binary_op(":")
+        # `a ? b : (c ? d : e)`: PHP 8 exige los parentesis del ternario anidado.
+        self.expr(node.if_false, TERNARY + 1)
+
+    def expr_Binary(self, node: ast.Binary) -> None:
+        # Las cadenas asociativas por la izquierda (`a . b . c ...`) se recorren sin recursion.
+        chain = [node]
+        while isinstance(chain[-1].left, ast.Binary) and not self._left_needs_parens(chain[-1].left, chain[-1].op):
+            chain.append(chain[-1].left)
+        first = chain[-1]
+        self._operand(first.left, first.op, right=False)
+        for current in reversed(chain):
+            self.binary_op(current.op)
+            self._operand(current.right, current.op, right=True)
+
+    @staticmethod
+    def _left_needs_parens(child: Any, op: str) -> bool:
+        level, parent = _expr_level(child), BINARY_LEVEL[op]
+        if level != parent:
+            return level < parent
+        return parent in _NON_ASSOCIATIVE or _group(child.op) != _group(op)
+
+    def _operand(self, child: Any, op: str, right: bool) -> None:
+        parent = BINARY_LEVEL[op]
+        if right:
+            paren = _expr_level(child) <= parent
+        else:
+            paren = isinstance(child, ast.Binary) and self._left_needs_parens(child, op) or _expr_level(child) < parent
+        if paren:
+            self.out.token("(")
+            self.expr(child)
+            self.out.token(")")
+        else:
+            self.expr(child)
+
+    def expr_Unary(self, node: ast.Unary) -> None:
+        self.out.token(node.op)
+        self.expr(node.expr, UNARY)
+
+    def expr_PostfixUnary(self, node: ast.PostfixUnary) -> None:
+        self.postfix_base(node.expr)
+        self.out.token(node.op)
+
+    def expr_Call(self, node: ast.Call) -> None:
+        self.postfix_base(node.callee)
+        self.out.token("(")
+        self.expr_list(node.args)
+        self.out.token(")")
+
+    def expr_Index(self, node: ast.Index) -> None:
+        self.postfix_base(node.base)
+        self.out.token("[")
+        self.expr(node.index)
+        self.out.token("]")
+
+    def expr_Member(self, node: ast.Member) -> None:
+        self.postfix_base(node.obj)
+        self.out.token("->")
+        self.out.token(node.name)
+
+    def expr_StaticAccess(self, node: ast.StaticAccess) -> None:
+        self.qname(node.qname.parts)
+        self.out.token("::")
+        self.out.token(node.name)
+
+    def expr_New(self, node: ast.New) -> None:
+        self.out.token("new")
+        self.qname(node.class_name.parts)
+        self.out.token("(")
+        self.expr_list(node.args)
+        self.out.token(")")
+
+
+# === LECTURA POR BLOQUES ===
+_SCAN = re.compile(
+    r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/|//[^\n]*|\#[^\n]*|(?P<open>["']|/\*)""",
+    re.S,
+)
+_SEPARATORS = " \t\r\n;{}(),"
+
+
+def safe_cut(text: str) -> int:
+    """Mayor posicion donde `text` puede cortarse entre tokens (0 si no hay ninguna).
+
+    El corte cae justo despues de un espacio o de `; { } ( ) ,` que no este
+    dentro de un string ni de un comentario, asi que tokenizar `text[:corte]`
+    por separado da los mismos tokens que tokenizar el texto completo.
+    """
+    spans = []
+    limit = len(text)
+    for match in _SCAN.finditer(text):
+        if match.group("open") is not None:
+            limit = match.start()
+            break
+        spans.append(match.span())
+    end = limit
+    for start, stop in reversed([(0, 0), *spans]):
+        if stop <= end:
+            best = max(text.rfind(ch, stop, end) for ch in _SEPARATORS)
+            if best >= 0:
+                return best + 1
+            end = start
+    return 0
+
+
+def _read_chunks(source: Any, size: int = CHUNK_SIZE) -> Iterator[str]:
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    while True:
+        chunk = source.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_tokens(source: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[lex.LexToken]:
+    """Tokens de `source` (texto o archivo abierto) leyendo por bloques.
+
+    Cada token lleva ademas `raw`, su texto exacto en el fuente.
+    """
+    errors: List[str] = []
+    lexer = PhpLexer(reporter=lambda level, message: errors.append(message))
+    lineno = 1
+    offset = 0
+    pending = ""
+    chunks = _read_chunks(source, chunk_size)
+    done = False
+    while not done:
+        chunk = next(chunks, None)
+        if chunk is None:
+            done = True
+            text, pending = pending, ""
+        else:
+            pending += chunk
+            cut = safe_cut(pending)
+            if not cut:
+                continue
+            text, pending = pending[:cut], pending[cut:]
+        lexer.lexer.input(text)
+        lexer.lexer.lineno = lineno
+        while True:
+            tok = lexer.lexer.token()
+            if errors:
+                raise FormatError(errors[0], lexer.lexer.lineno)
+            if tok is None:
+                break
+            tok.raw = text[tok.lexpos:lexer.lexer.lexpos]
+            tok.lexpos += offset
+            yield tok
+        lineno = lexer.lexer.lineno
+        offset += len(text)
+
+
+# === MINIFICADO POR TOKENS ===
+def minify_stream(source: Any, write: Callable[[str], Any], chunk_size: int = CHUNK_SIZE) -> None:
+    """Reescribe `source` sin comentarios ni espacios innecesarios, sin parsear."""
+    out = _Writer(write, pretty=False)
+    for tok in iter_tokens(source, chunk_size):
+        out.token(tok.raw)
+        if tok.type == "PHP_OPEN":
+            out.raw(" ")
+    out.flush()
+
+
+# === FORMATEO POR ELEMENTOS DE NIVEL SUPERIOR ===
+def _top_level_groups(tokens: Iterable[lex.LexToken]) -> Iterator[List[lex.LexToken]]:
+    """Agrupa los tokens entre `<?php` y `?>` en elementos de nivel superior."""
+    stream = iter(tokens)
+    first = next(stream, None)
+    if first is None or first.type != "PHP_OPEN":
+        raise FormatError("[Parser] Se esperaba '<?php' al inicio", first.lineno if first else None)
+    group: List[lex.LexToken] = []
+    depth = 0
+    complete = False
+    for tok in stream:
+        if complete and tok.type not in ("ELSE", "ELSEIF"):
+            yield group
+            group, complete = [], False
+        if tok.type == "PHP_CLOSE" and depth == 0:
+            if group:
+                yield group
+            trailing = next(stream, None)
+            if trailing is not None:
+                raise FormatError(f"[Parser] Error de sintaxis en token {trailing.type} (linea {trailing.lineno})")
+            return
+        group.append(tok)
+        if tok.type in ("LBRACE", "LPAREN", "LBRACKET"):
+            depth += 1
+        elif tok.type in ("RBRACE", "RPAREN", "RBRACKET"):
+            depth -= 1
+        complete = depth == 0 and tok.type in ("SEMICOLON", "RBRACE")
+    raise FormatError("[Parser] Falta '?>' al final del programa")
+
+
+def iter_items(source: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Nodos de nivel superior de `source`, parseando un elemento a la vez."""
+    messages: List[str] = []
+    parser = build_parser(reporter=lambda level, message: messages.append(message))
+    for group in _top_level_groups(iter_tokens(source, chunk_size)):
+        feed = TokenFeed([marker("PHP_OPEN", group[0]), *group, marker("PHP_CLOSE", group[-1])])
+        program = parser.parse(None, lexer=feed)
+        if program is None:
+            raise FormatError(messages[0] if messages else "Parse error", group[0].lineno)
+        yield from program.items
+
+
+def format_stream(source: Any, write: Callable[[str], Any], minify: bool = False,
+                  chunk_size: int = CHUNK_SIZE) -> None:
+    printer = PhpPrinter(write, minify=minify)
+    printer.begin()
+    for node in iter_items(source, chunk_size):
+        printer.item(node)
+    printer.end()
+
+
+def format_program(program: ast.Program, minify: bool = False) -> str:
+    buffer = io.StringIO()
+    PhpPrinter(buffer.write, minify=minify).program(program)
+    return buffer.getvalue()
+
+
+def format_code(code: str, minify: bool = False) -> str:
+    """Formatea (o minifica) codigo PHP; lanza `FormatError` si no parsea."""
+    buffer = io.StringIO()
+    format_stream(code, buffer.write, minify=minify)
+    return buffer.getvalue()
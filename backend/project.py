@@ -0,0 +1,302 @@
+"""Analisis de proyecto completo siguiendo include/require entre archivos."""
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import ast_nodes as ast
+from .facade import parse_source
+from .semantic import SemanticAnalyzer
+from .semantic.names import qualify
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IncludeSpec:
+    """Ruta literal de un include; `dir_relative` indica `__DIR__ . '...'`."""
+
+    target: str
+    dir_relative: bool = False
+    lineno: Optional[int] = None
+
+
+@dataclass
+class FileSummary:
+    """Simbolos exportados por un archivo; depende solo de su contenido."""
+
+    content_hash: str
+    ast: Any
+    functions: Dict[str, ast.FunctionDecl] = field(default_factory=dict)
+    classes: Dict[str, ast.ClassDecl] = field(default_factory=dict)
+    variables: List[str] = field(default_factory=list)
+    includes: List[IncludeSpec] = field(default_factory=list)
+    lexical_errors: int = 0
+    syntax_errors: int = 0
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class FileReport:
+    path: str
+    ok: bool
+    lexical_errors: int
+    syntax_errors: int
+    semantic_errors: int
+    messages: List[Dict[str, Any]]
+    includes: List[str]
+    cached: bool = False
+
+
+@dataclass
+class ProjectResult:
+    entry: str
+    ok: bool
+    files: Dict[str, FileReport]
+    graph: Dict[str, List[str]]
+    order: List[str]
+    messages: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entry": self.entry,
+            "ok": self.ok,
+            "files": {path: report.__dict__ for path, report in self.files.items()},
+            "graph": self.graph,
+            "order": self.order,
+            "messages": self.messages,
+        }
+
+
+def _literal_include(expr: Any) -> Optional[IncludeSpec]:
+    if isinstance(expr, ast.StringLit):
+        return IncludeSpec(expr.value)
+    if (
+        isinstance(expr, ast.Binary)
+        and expr.op == "."
+        and isinstance(expr.left, ast.Name)
+        and expr.left.parts == ["__DIR__"]
+        and isinstance(expr.right, ast.StringLit)
+    ):
+        return IncludeSpec(expr.right.value.lstrip("/\\"), dir_relative=True)
+    return None
+
+
+def summarize(code: str) -> FileSummary:
+    """Parsea un archivo y extrae sus exportaciones y sus includes literales."""
+    parsed = parse_source(code)
+    summary = FileSummary(
+        content_hash=content_hash(code),
+        ast=parsed.ast,
+        lexical_errors=parsed.lexical_errors,
+        syntax_errors=parsed.syntax_errors,
+        messages=parsed.lexical_messages + parsed.syntax_messages,
+    )
+    program = parsed.ast
+    if program is None or parsed.lexical_errors or parsed.syntax_errors:
+        return summary
+
+    namespace: List[str] = []
+    for item in program.items:
+        if isinstance(item, ast.NamespaceDecl):
+            namespace = list(item.name)
+        elif isinstance(item, ast.FunctionDecl):
+            summary.functions.setdefault(qualify(namespace, item.name), item)
+        elif isinstance(item, ast.ClassDecl):
+            summary.classes.setdefault(qualify(namespace, item.name), item)
+        elif isinstance(item, ast.VarDeclStmt):
+            for name, _ in item.decls:
+                if name not in summary.variables:
+                    summary.variables.append(name)
+    for node in ast.walk(program):
+        if isinstance(node, (ast.IncludeStmt, ast.RequireStmt)):
+            spec = _literal_include(node.expr)
+            if spec is not None:
+                spec.lineno = getattr(node.expr, "lineno", None)
+                summary.includes.append(spec)
+    return summary
+
+
+class SummaryCache:
+    """Resumenes por hash de contenido: archivos identicos se analizan una vez."""
+
+    def __init__(self) -> None:
+        self._by_hash: Dict[str, FileSummary] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code: str) -> Tuple[FileSummary, bool]:
+        digest = content_hash(code)
+        found = self._by_hash.get(digest)
+        if found is not None:
+            self.hits += 1
+            return found, True
+        self.misses += 1
+        summary = summarize(code)
+        self._by_hash[digest] = summary
+        return summary, False
+
+
+def _read(path: Path) -> Tuple[Path, Optional[str], Optional[str]]:
+    try:
+        return path, path.read_text(encoding="utf-8"), None
+    except OSError as exc:
+        return path, None, str(exc)
+
+
+class ProjectAnalyzer:
+    """Construye el grafo de includes y analiza cada archivo una sola vez.
+
+    La lectura de archivos se hace en paralelo por niveles del grafo; el parseo
+    es secuencial porque el parser PLY comparte estado a nivel de modulo.
+    """
+
+    def __init__(self, cache: SummaryCache | None = None, max_workers: int = 8) -> None:
+        self.cache = cache or SummaryCache()
+        self.max_workers = max_workers
+
+    def resolve_include(self, including: Path, spec: IncludeSpec) -> Path:
+        target = Path(spec.target)
+        if target.is_absolute():
+            return target.resolve()
+        return (including.parent / target).resolve()
+
+    def analyze(self, entry: str | Path) -> ProjectResult:
+        entry_path = Path(entry).expanduser().resolve()
+        summaries: Dict[Path, Tuple[FileSummary, bool]] = {}
+        graph: Dict[str, List[str]] = {}
+        messages: List[Dict[str, Any]] = []
+
+        frontier = [entry_path]
+        seen = {entry_path}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while frontier:
+                next_frontier: List[Path] = []
+                for path, text, err in pool.map(_read, frontier):
+                    if text is None:
+                        messages.append({"level": "error", "message": f"[Project] Cannot read '{path}': {err}"})
+                        continue
+                    summary, cached = self.cache.get(text)
+                    summaries[path] = (summary, cached)
+                    deps: List[str] = []
+                    for spec in summary.includes:
+                        dep = self.resolve_include(path, spec)
+                        if not dep.is_file():
+                            suffix = f" (linea {spec.lineno})" if spec.lineno is not None else ""
+                            messages.append(
+                                {
+                                    "level": "error",
+                                    "message": f"[Project] Included file '{spec.target}' not found from '{path}'{suffix}",
+                                }
+                            )
+                            continue
+                        if str(dep) not in deps:
+                            deps.append(str(dep))
+                        if dep not in seen:
+                            seen.add(dep)
+                            next_frontier.append(dep)
+                    graph[str(path)] = deps
+                frontier = next_frontier
+
+        order = self._topological_order(str(entry_path), graph)
+        files: Dict[str, FileReport] = {}
+        declared: Dict[Tuple[str, str], str] = {}
+        for path_str in order:
+            summary, cached = summaries[Path(path_str)]
+            closure = self._closure(path_str, graph)
+            imports = [summaries[Path(dep)][0] for dep in closure]
+            files[path_str] = self._report(path_str, summary, imports, graph[path_str], cached)
+            messages += self._redeclarations(path_str, summary, closure, declared)
+
+        ok = not messages and all(report.ok for report in files.values())
+        return ProjectResult(str(entry_path), ok, files, graph, order, messages)
+
+    def _report(
+        self, path: str, summary: FileSummary, imports: List[FileSummary], deps: List[str], cached: bool
+    ) -> FileReport:
+        messages = list(summary.messages)
+        semantic_errors = 0
+        if summary.ast is not None and not summary.lexical_errors and not summary.syntax_errors:
+            errors = SemanticAnalyzer(imports=imports).analyze(summary.ast)
+            semantic_errors = len(errors)
+            messages += [
+                {"level": "error", "message": str(err), "lineno": err.lineno, "col": err.col}
+                for err in errors
+            ]
+        ok = summary.ast is not None and not (summary.lexical_errors or summary.syntax_errors or semantic_errors)
+        return FileReport(
+            path=path,
+            ok=ok,
+            lexical_errors=summary.lexical_errors,
+            syntax_errors=summary.syntax_errors,
+            semantic_errors=semantic_errors,
+            messages=messages,
+            includes=deps,
+            cached=cached,
+        )
+
+    @staticmethod
+    def _redeclarations(
+        path: str, summary: FileSummary, closure: List[str], declared: Dict[Tuple[str, str], str]
+    ) -> List[Dict[str, Any]]:
+        """Funciones y clases que otro archivo del proyecto ya declaro.
+
+        Si ese archivo esta entre los que `path` incluye, el analisis semantico de
+        `path` ya reporta la redeclaracion; aca quedan las de archivos hermanos.
+        """
+        found: List[Dict[str, Any]] = []
+        for kind, decls in (("function", summary.functions), ("class", summary.classes)):
+            for qualified, decl in decls.items():
+                first = declared.setdefault((kind, qualified.lower()), path)
+                if first == path or first in closure:
+                    continue
+                lineno = getattr(decl, "lineno", None)
+                suffix = f" (linea {lineno})" if lineno is not None else ""
+                found.append(
+                    {
+                        "level": "error",
+                        "message": f"[Project] Cannot redeclare {kind} '{qualified}' in '{path}', "
+                        f"already declared in '{first}'{suffix}",
+                    }
+                )
+        return found
+
+    @staticmethod
+    def _closure(start: str, graph: Dict[str, List[str]]) -> List[str]:
+        """Archivos alcanzables por includes desde `start` (sin incluirlo)."""
+        found: List[str] = []
+        seen = {start}
+        stack = list(reversed(graph.get(start, [])))
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            found.append(node)
+            stack.extend(reversed(graph.get(node, [])))
+        return found
+
+    @staticmethod
+    def _topological_order(entry: str, graph: Dict[str, List[str]]) -> List[str]:
+        """Dependencias primero; los ciclos se cortan en la arista de retorno."""
+        order: List[str] = []
+        visited = set()
+        stack: List[Tuple[str, int]] = [(entry, 0)]
+        visited.add(entry)
+        while stack:
+            node, idx = stack.pop()
+            deps = graph.get(node, [])
+            if idx < len(deps):
+                stack.append((node, idx + 1))
+                dep = deps[idx]
+                if dep not in visited and dep in graph:
+                    visited.add(dep)
+                    stack.append((dep, 0))
+            elif node in graph:
+                order.append(node)
+        return order
@@ -0,0 +1,234 @@
+"""Indice invertido de identificadores: simbolo -> rangos de sus declaraciones y usos.
+
+`collect_occurrences` cruza una vez los tokens `ID`/`VARIABLE` con lo que resolvio
+`SemanticAnalyzer` (los simbolos declarados y `analyzer.references`) y devuelve
+cada aparicion con el rango exacto de su token. Los simbolos se identifican con
+una clave estable entre analisis:
+
+- `func:<nombre calificado>` y `class:<nombre calificado>` (en minusculas, PHP no
+  distingue mayusculas en esos nombres);
+- `method:<clase>::<metodo>` (tambien en minusculas);
+- `var:<contenedor>:<$nombre>`, donde el contenedor es la funcion o metodo
+  (`Clase::metodo`) que declara la variable, o vacio en el scope global.
+
+`ReferenceIndex` guarda las apariciones por archivo y las listas invertidas por
+simbolo; actualizar un archivo solo reemplaza sus entradas, asi que buscar
+referencias es una consulta y no un recorrido del AST. `rename_text` reescribe
+todas las apariciones en una pasada sobre el texto.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import ast_nodes as ast
+
+# (tipo, valor, inicio, fin, linea), como `IncrementalLexer.spans` y `outline.scan_spans`.
+Token = Tuple[str, Any, int, int, int]
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_VARIABLE = re.compile(r"\$[A-Za-z_][A-Za-z0-9_]*")
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    start: int
+    end: int
+    lineno: int
+    symbol: str
+    declaration: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "lineno": self.lineno, "declaration": self.declaration}
+
+
+def symbol_key(symbol: Any, container: str = "") -> str:
+    """Clave estable de un `Symbol`; `container` es el de su scope (solo para variables)."""
+    if symbol.kind in ("func", "class"):
+        return f"{symbol.kind}:{symbol.name.lower()}"
+    if symbol.kind == "method":
+        return f"method:{(symbol.owner or '').lower()}::{symbol.name.lower()}"
+    return f"var:{container}:{symbol.name}"
+
+
+class IdentifierTokens:
+    """Tokens identificadores ordenados por inicio, para buscar dentro del rango de un nodo."""
+
+    def __init__(self, spans: Iterable[Token]) -> None:
+        self.spans = [span for span in spans if span[0] in ("ID", "VARIABLE")]
+        self.starts = [span[2] for span in self.spans]
+
+    def find(self, start: int, end: int, kind: str, value: Optional[str] = None, last: bool = False) -> Optional[Token]:
+        lo = bisect_right(self.starts, start - 1)
+        hi = bisect_right(self.starts, end - 1)
+        order = range(hi - 1, lo - 1, -1) if last else range(lo, hi)
+        for idx in order:
+            span = self.spans[idx]
+            if span[0] == kind and (value is None or span[1] == value):
+                return span
+        return None
+
+
+def _declaration_token(symbol: Any, tokens: IdentifierTokens) -> Optional[Token]:
+    node = symbol.node
+    start = getattr(node, "start", None)
+    if start is None:
+        return None  # importado de otro archivo
+    if symbol.kind in ("func", "method", "class"):
+        return tokens.find(start, node.end, "ID")
+    if isinstance(node, ast.FunctionDecl):
+        return None  # `$this` no se declara en el texto
+    return tokens.find(start, node.end, "VARIABLE", symbol.name)
+
+
+def use_token(ref: Any, tokens: IdentifierTokens) -> Optional[Token]:
+    """Token que nombra la referencia `ref` de `SemanticAnalyzer.references`, por el rango de su nodo."""
+    node = ref.node
+    if ref.kind == "var":  # `Var` o la `VarDeclStmt` que reasigna una variable existente
+        start = getattr(node, "start", None)
+        return tokens.find(start, node.end, "VARIABLE", ref.name) if start is not None else None
+    if ref.kind == "new":
+        target = node.class_name
+    elif ref.kind == "class":  # el `Name` de `K::m()` / `K::x`
+        target = node
+    else:  # call / method_call: el ultimo nombre del callee (`f`, `A\\f`, `$o->m`, `A::m`)
+        target = node.callee
+    start = getattr(target, "start", None)
+    if start is None:
+        return None
+    return tokens.find(start, target.end, "ID", last=True)
+
+
+def _ref_key(ref: Any, keys: Dict[int, str]) -> Optional[str]:
+    if ref.kind == "var":
+        return keys.get(id(ref.symbol)) if ref.symbol is not None else None
+    # Por nombre: las llamadas a funciones y metodos declarados mas adelante no traen simbolo.
+    if ref.kind == "call":
+        return f"func:{ref.name.lower()}"
+    if ref.kind in ("new", "class"):
+        return f"class:{ref.name.lower()}"
+    return f"method:{ref.owner.lower()}::{ref.name.lower()}" if ref.owner else None
+
+
+def collect_occurrences(analyzer: Any, spans: Iterable[Token]) -> List[Occurrence]:
+    """Declaraciones y usos resueltos por `analyzer` (ya ejecutado), ordenados por inicio.
+
+    `spans` son los tokens del mismo texto que el programa analizado, con offsets
+    al dia (ver `IncrementalParser.settle_offsets`). Los usos sin simbolo resuelto
+    (p. ej. variables sin declarar) no se indexan.
+    """
+    tokens = IdentifierTokens(spans)
+    symtab = analyzer.symtab
+    containers = symtab.containers()
+    keys: Dict[int, str] = {}
+    found: Dict[int, Occurrence] = {}
+    for meta, symbols in symtab.all_scopes():
+        container = containers[meta["id"]][1]
+        for symbol in symbols.values():
+            key = keys[id(symbol)] = symbol_key(symbol, container)
+            token = _declaration_token(symbol, tokens)
+            if token is not None:
+                found[token[2]] = Occurrence(token[2], token[3], token[4], key, True)
+    declared = set(keys.values())
+    for ref in analyzer.references:
+        key = _ref_key(ref, keys)
+        token = use_token(ref, tokens) if key in declared else None
+        if token is not None and token[2] not in found:
+            found[token[2]] = Occurrence(token[2], token[3], token[4], key)
+    return [found[start] for start in sorted(found)]
+
+
+def rename_text(text: str, occurrences: Sequence[Occurrence], new_name: str) -> str:
+    """`text` con cada aparicion reemplazada por `new_name`, en una sola pasada."""
+    parts: List[str] = []
+    pos = 0
+    for occ in sorted(occurrences, key=lambda occ: occ.start):
+        parts.append(text[pos:occ.start])
+        parts.append(new_name)
+        pos = occ.end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def check_new_name(symbol: str, new_name: str) -> None:
+    """ValueError si `new_name` no sirve como nombre para `symbol`."""
+    pattern = _VARIABLE if symbol.startswith("var:") else _IDENTIFIER
+    if not pattern.fullmatch(new_name):
+        raise ValueError(f"Nombre no valido para {symbol}: {new_name!r}")
+
+
+def renamed_symbol(symbol: str, new_name: str) -> str:
+    """Clave que tendria `symbol` llamandose `new_name`, en el mismo contenedor o namespace."""
+    kind, _, rest = symbol.partition(":")
+    if kind == "var":
+        return f"var:{rest.rsplit(':', 1)[0]}:{new_name}"
+    if kind == "method":
+        return f"method:{rest.rsplit('::', 1)[0]}::{new_name.lower()}"
+    namespace = rest.rsplit("\\", 1)[0] + "\\" if "\\" in rest else ""
+    return f"{kind}:{namespace}{new_name.lower()}"
+
+
+class ReferenceIndex:
+    """Apariciones por archivo y listas invertidas simbolo -> archivo -> apariciones."""
+
+    def __init__(self) -> None:
+        self._files: Dict[str, List[Occurrence]] = {}
+        self._starts: Dict[str, List[int]] = {}
+        self._stamps: Dict[str, Any] = {}
+        self._postings: Dict[str, Dict[str, List[Occurrence]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def stamp(self, path: str) -> Any:
+        """Marca (version o hash) con la que se indexo `path`; None si no esta."""
+        return self._stamps.get(path)
+
+    def update(self, path: str, occurrences: Sequence[Occurrence], stamp: Any = None) -> None:
+        """Reemplaza las apariciones de `path`; solo toca las listas de los simbolos del archivo."""
+        self.remove(path)
+        by_symbol: Dict[str, List[Occurrence]] = {}
+        for occ in occurrences:
+            by_symbol.setdefault(occ.symbol, []).append(occ)
+        for symbol, items in by_symbol.items():
+            self._postings.setdefault(symbol, {})[path] = items
+        self._files[path] = list(occurrences)
+        self._starts[path] = [occ.start for occ in occurrences]
+        self._stamps[path] = stamp
+
+    def remove(self, path: str) -> None:
+        for occ in self._files.pop(path, ()):
+            files = self._postings.get(occ.symbol)
+            if files is not None and files.pop(path, None) is not None and not files:
+                del self._postings[occ.symbol]
+        self._starts.pop(path, None)
+        self._stamps.pop(path, None)
+
+    def occurrence_at(self, path: str, offset: int) -> Optional[Occurrence]:
+        """Aparicion cuyo token contiene `offset` (o termina justo ahi, con el cursor detras)."""
+        starts = self._starts.get(path)
+        if not starts:
+            return None
+        idx = bisect_right(starts, offset) - 1
+        if idx < 0:
+            return None
+        occ = self._files[path][idx]
+        return occ if occ.start <= offset <= occ.end else None
+
+    def occurrences(self, symbol: str) -> Dict[str, List[Occurrence]]:
+        """Archivo -> apariciones de `symbol`, en orden de texto."""
+        return dict(self._postings.get(symbol, {}))
+
+    def references(self, path: str, offset: int) -> Optional[Dict[str, Any]]:
+        """Declaraciones y usos del simbolo bajo `offset`, con el archivo de cada uno."""
+        occ = self.occurrence_at(path, offset)
+        if occ is None:
+            return None
+        declarations: List[Dict[str, Any]] = []
+        uses: List[Dict[str, Any]] = []
+        for file, items in sorted(self.occurrences(occ.symbol).items()):
+            for item in items:
+                (declarations if item.declaration else uses).append({"path": file, **item.to_dict()})
+        return {"symbol": occ.symbol, "declarations": declarations, "uses": uses}
@@ -0,0 +1,140 @@
+"""Resultados de analisis guardados en el backend y servidos por paginas.
+
+Las listas grandes de un resultado (tokens, simbolos) no cruzan el puente de
+PyWebView enteras: `BackendAPI` las guarda aqui bajo un `result_id` y la GUI
+pide solo las filas visibles con `get_tokens(result_id, offset, limit)` y
+`get_symbols(...)`. Cada `(grupo, tipo)` (documento y etapas, como en `jobs`)
+conserva solo su ultimo resultado y el total de resultados vivos esta acotado.
+
+Las paginas de tokens viajan en columnas (`encode_tokens`): ids de tipo sobre
+una tabla de tipos, lineas como diferencias y valores internados, en vez de un
+dict por token con las mismas claves repetidas. El AST se guarda como seccion
+`ast` y solo se envia cuando la GUI abre su pestana.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+MAX_RESULTS = 16
+MAX_PAGE = 1000
+
+
+class ResultError(Exception):
+    """Resultado descartado o seccion inexistente."""
+
+
+def _intern(values: Iterable[Any]) -> Tuple[List[Any], List[int]]:
+    """(tabla de valores distintos, id de cada valor en la tabla).
+
+    La clave lleva el tipo para no confundir `1`, `1.0` y `True`.
+    """
+    table: Dict[Tuple[type, Any], int] = {}
+    ids = [table.setdefault((type(value), value), len(table)) for value in values]
+    return [value for _, value in table], ids
+
+
+def encode_tokens(rows: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Columnas de `rows` (`{lineno, type, value}`): tipos y valores internados, lineas en deltas.
+
+    `lines[0]` es la linea absoluta del primer token y cada siguiente la
+    diferencia con el anterior. Los valores no hasheables (no los produce el
+    lexer) se internan por su `repr`.
+    """
+    types, type_ids = _intern(row["type"] for row in rows)
+    values, value_ids = _intern(
+        row["value"] if isinstance(row["value"], (str, int, float, type(None))) else repr(row["value"]) for row in rows
+    )
+    lines: List[int] = []
+    previous = 0
+    for row in rows:
+        lineno = row["lineno"] or 0
+        lines.append(lineno - previous)
+        previous = lineno
+    return {"types": types, "type_ids": type_ids, "lines": lines, "values": values, "value_ids": value_ids}
+
+
+def decode_tokens(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Inversa de `encode_tokens` (la GUI hace lo mismo en `backend.js`)."""
+    rows = []
+    lineno = 0
+    for type_id, delta, value_id in zip(columns["type_ids"], columns["lines"], columns["value_ids"]):
+        lineno += delta
+        rows.append({"lineno": lineno, "type": columns["types"][type_id], "value": columns["values"][value_id]})
+    return rows
+
+
+def flatten_symbols(symbol_table: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Una fila por simbolo con el id de su scope, en el orden del snapshot."""
+    return [
+        {
+            "scope": scope.get("scope") or 0,
+            "name": sym.get("name"),
+            "type": sym.get("type"),
+            "kind": sym.get("kind"),
+            "value": sym.get("value"),
+            "lineno": sym.get("lineno"),
+        }
+        for scope in symbol_table
+        for sym in scope.get("symbols") or []
+    ]
+
+
+class ResultStore:
+    """Secciones de resultados por id, con reemplazo por `(grupo, tipo)` y expulsion LRU."""
+
+    def __init__(self, limit: int = MAX_RESULTS) -> None:
+        self.limit = limit
+        self._results: "OrderedDict[str, Dict[str, Sequence[Any]]]" = OrderedDict()
+        self._owners: Dict[Tuple[Hashable, Hashable], str] = {}
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def store(self, group: Hashable, kind: Hashable, sections: Dict[str, Sequence[Any]]) -> str:
+        """Guarda `sections` y descarta el resultado anterior del mismo `(group, kind)`."""
+        result_id = f"res-{next(self._ids)}"
+        owner = (group, kind)
+        with self._lock:
+            previous = self._owners.pop(owner, None)
+            if previous is not None:
+                self._results.pop(previous, None)
+            self._results[result_id] = sections
+            self._owners[owner] = result_id
+            while len(self._results) > self.limit:
+                expired, _ = self._results.popitem(last=False)
+                self._owners = {key: rid for key, rid in self._owners.items() if rid != expired}
+        return result_id
+
+    def find(self, group: Hashable, kind: Hashable) -> Optional[str]:
+        """Id del resultado vivo de `(group, kind)`, si lo hay."""
+        with self._lock:
+            return self._owners.get((group, kind))
+
+    def get(self, result_id: str, section: str) -> Any:
+        """Seccion completa de un resultado vivo."""
+        with self._lock:
+            sections = self._results.get(result_id)
+            if sections is None:
+                raise ResultError(f"Resultado no disponible: {result_id}")
+            self._results.move_to_end(result_id)
+        if section not in sections:
+            raise ResultError(f"El resultado {result_id} no tiene {section}")
+        return sections[section]
+
+    def page(self, result_id: str, section: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Filas `[offset, offset + limit)` de `section`; `limit` se recorta a `MAX_PAGE`."""
+        rows = self.get(result_id, section)
+        start = max(int(offset), 0)
+        size = MAX_PAGE if limit is None else min(max(int(limit), 0), MAX_PAGE)
+        return {"result_id": result_id, "offset": start, "total": len(rows), "rows": list(rows[start:start + size])}
+
+    def discard(self, group: Hashable) -> None:
+        """Descarta todos los resultados de `group` (p. ej. al cerrar el documento)."""
+        with self._lock:
+            for owner in [owner for owner in self._owners if owner[0] == group]:
+                self._results.pop(self._owners.pop(owner), None)
@@ -3,8 +3,35 @@
 from .errors import SemanticError
 from .symbol_table import Symbol, SymbolTable
 from .semantic_analyzer import SemanticAnalyzer
-
-__all__ = ["SemanticError", "Symbol", "SymbolTable", "SemanticAnalyzer"]
+from .members import ClassEntry, ClassMemberIndex, MethodEntry
+from .names import NameResolver, NamespaceTrie
+from .cfg import CFG, BasicBlock, CFGBuilder, build_all
+from .dataflow import DataflowProblem, FunctionDataflow, solve
+from .lint import LintConfig, LintEngine, LintMessage, LintRule, register_rule
+
+__all__ = [
+    "SemanticError",
+    "Symbol",
+    "SymbolTable",
+    "SemanticAnalyzer",
+    "ClassEntry",
+    "ClassMemberIndex",
+    "MethodEntry",
+    "NameResolver",
+    "NamespaceTrie",
+    "CFG",
+    "BasicBlock",
+    "CFGBuilder",
+    "build_all",
+    "DataflowProblem",
+    "FunctionDataflow",
+    "solve",
+    "LintConfig",
+    "LintEngine",
+    "LintMessage",
+    "LintRule",
+    "register_rule",
+]
 
 
 def demo(code: str) -> None:
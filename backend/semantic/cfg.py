@@ -0,0 +1,205 @@
+"""Grafo de flujo de control (CFG) por funcion y para el codigo de nivel superior."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import ast_nodes as ast
+
+MAIN = "<main>"
+
+
+@dataclass
+class BasicBlock:
+    id: int
+    items: List[Any] = field(default_factory=list)
+    succs: List[int] = field(default_factory=list)
+    preds: List[int] = field(default_factory=list)
+
+
+@dataclass
+class CFG:
+    name: str
+    blocks: List[BasicBlock]
+    entry: int
+    exit: int
+    params: List[str] = field(default_factory=list)
+
+    def reachable(self) -> set:
+        seen = {self.entry}
+        stack = [self.entry]
+        while stack:
+            for succ in self.blocks[stack.pop()].succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return seen
+
+
+@dataclass
+class ForeachBind:
+    """Item sintetico de la cabecera de foreach: asigna clave/valor."""
+
+    stmt: ast.ForeachStmt
+
+
+@dataclass
+class DeclItem:
+    """Item sintetico para `for ($i = 0; ...)`, que el parser entrega como tupla."""
+
+    name: str
+    init: Any
+    owner: Any
+
+
+class CFGBuilder:
+    """Construye un CFG sobre un cuerpo de funcion o sobre `Program.items`."""
+
+    def __init__(self, name: str, params: Optional[List[str]] = None) -> None:
+        self.blocks: List[BasicBlock] = []
+        self.entry = self._new_block()
+        self.exit = self._new_block()
+        self.current: Optional[int] = self.entry
+        self.cfg = CFG(name, self.blocks, self.entry, self.exit, list(params or []))
+
+    # --- primitivas ---
+    def _new_block(self) -> int:
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block.id
+
+    def _edge(self, src: Optional[int], dst: int) -> None:
+        if src is None:
+            return
+        self.blocks[src].succs.append(dst)
+        self.blocks[dst].preds.append(src)
+
+    def _emit(self, item: Any) -> None:
+        if self.current is None:
+            # codigo tras return: bloque sin predecesores (inalcanzable)
+            self.current = self._new_block()
+        self.blocks[self.current].items.append(item)
+
+    def _start(self, block: int) -> None:
+        self.current = block
+
+    # --- construccion ---
+    def build(self, stmts: List[Any]) -> CFG:
+        self._stmts(stmts)
+        self._edge(self.current, self.exit)
+        return self.cfg
+
+    def _stmts(self, stmts: List[Any]) -> None:
+        for stmt in stmts:
+            self._stmt(stmt)
+
+    def _stmt(self, node: Any) -> None:
+        if isinstance(node, (ast.FunctionDecl, ast.ClassDecl, ast.NamespaceDecl, ast.UseDecl, ast.EmptyStmt)):
+            return
+        if isinstance(node, ast.Block):
+            self._stmts(node.stmts)
+        elif isinstance(node, ast.IfStmt):
+            self._if(node)
+        elif isinstance(node, ast.WhileStmt):
+            self._loop(node.cond, node.body, None)
+        elif isinstance(node, ast.ForStmt):
+            for init in node.init or []:
+                if isinstance(init, tuple):
+                    self._emit(DeclItem(init[0], init[1], node))
+                else:
+                    self._emit(init)
+            self._loop(node.cond, node.body, node.iters or [])
+        elif isinstance(node, ast.ForeachStmt):
+            self._foreach(node)
+        elif isinstance(node, ast.ReturnStmt):
+            self._emit(node)
+            self._edge(self.current, self.exit)
+            self.current = None
+        else:
+            self._emit(node)
+
+    def _if(self, node: ast.IfStmt) -> None:
+        join = self._new_block()
+        branches = [(node.cond, node.then)] + list(node.elifs)
+        for cond, body in branches:
+            self._emit(cond)
+            test = self.current
+            then_block = self._new_block()
+            self._edge(test, then_block)
+            self._start(then_block)
+            self._stmt(body)
+            self._edge(self.current, join)
+            else_block = self._new_block()
+            self._edge(test, else_block)
+            self._start(else_block)
+        if node.els is not None:
+            self._stmt(node.els)
+        self._edge(self.current, join)
+        self._start(join)
+
+    def _loop(self, cond: Any, body: Any, iters: Optional[List[Any]]) -> None:
+        header = self._new_block()
+        self._edge(self.current, header)
+        self._start(header)
+        if cond is not None:
+            self._emit(cond)
+        body_block = self._new_block()
+        after = self._new_block()
+        self._edge(header, body_block)
+        if cond is not None:
+            self._edge(header, after)
+        self._start(body_block)
+        self._stmt(body)
+        for it in iters or []:
+            self._emit(it)
+        self._edge(self.current, header)
+        self._start(after)
+
+    def _foreach(self, node: ast.ForeachStmt) -> None:
+        self._emit(node.iterable)
+        header = self._new_block()
+        self._edge(self.current, header)
+        body_block = self._new_block()
+        after = self._new_block()
+        self._edge(header, body_block)
+        self._edge(header, after)
+        self._start(body_block)
+        self._emit(ForeachBind(node))
+        self._stmt(node.body)
+        self._edge(self.current, header)
+        self._start(after)
+
+
+def build_function_cfg(func: ast.FunctionDecl, owner: Optional[str] = None) -> CFG:
+    params = [p.name for p in func.params]
+    if owner is not None and not func.is_static:
+        params.append("$this")
+    name = f"{owner}::{func.name}" if owner else func.name
+    return CFGBuilder(name, params).build(func.body.stmts)
+
+
+def build_program_cfg(program: ast.Program) -> CFG:
+    return CFGBuilder(MAIN).build(program.items)
+
+
+def build_all(program: ast.Program) -> Dict[str, CFG]:
+    """CFG del nivel superior y de cada funcion/metodo (nombres `Clase::metodo`)."""
+    graphs: Dict[str, CFG] = {MAIN: build_program_cfg(program)}
+    for func, owner in _functions(program):
+        cfg = build_function_cfg(func, owner)
+        graphs.setdefault(cfg.name, cfg)
+    return graphs
+
+
+def _functions(program: ast.Program) -> List[Tuple[ast.FunctionDecl, Optional[str]]]:
+    found: List[Tuple[ast.FunctionDecl, Optional[str]]] = []
+    methods: set = set()
+    for node in ast.walk(program):
+        if isinstance(node, ast.ClassDecl):
+            for member in node.members:
+                if isinstance(member, ast.FunctionDecl):
+                    methods.add(id(member))
+                    found.append((member, node.name))
+        elif isinstance(node, ast.FunctionDecl) and id(node) not in methods:
+            found.append((node, None))
+    return found
@@ -0,0 +1,269 @@
+"""Solver de flujo de datos por worklist con conjuntos representados como bitsets (int)."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import ast_nodes as ast
+from .cfg import CFG, DeclItem, ForeachBind
+
+USE = "use"
+DEF = "def"
+
+Effect = Tuple[str, str, Any]  # (USE|DEF, nombre de variable, nodo)
+
+
+def item_effects(item: Any) -> List[Effect]:
+    """Usos y definiciones de un item del CFG en orden de evaluacion."""
+    out: List[Effect] = []
+    _collect(item, out)
+    return out
+
+
+def _collect(node: Any, out: List[Effect]) -> None:
+    if node is None:
+        return
+    if isinstance(node, ForeachBind):
+        if node.stmt.key:
+            out.append((DEF, node.stmt.key, node.stmt))
+        out.append((DEF, node.stmt.value, node.stmt))
+    elif isinstance(node, DeclItem):
+        _collect(node.init, out)
+        out.append((DEF, node.name, node.owner))
+    elif isinstance(node, ast.VarDeclStmt):
+        for name, init in node.decls:
+            if init is not None:
+                _collect(init, out)
+                out.append((DEF, name, node))
+    elif isinstance(node, ast.Assign):
+        if isinstance(node.target, ast.Var):
+            _collect(node.value, out)
+            out.append((DEF, node.target.name, node.target))
+        else:
+            _collect(node.target, out)
+            _collect(node.value, out)
+    elif isinstance(node, (ast.Unary, ast.PostfixUnary)) and node.op in ("++", "--") and isinstance(node.expr, ast.Var):
+        out.append((USE, node.expr.name, node.expr))
+        out.append((DEF, node.expr.name, node.expr))
+    elif isinstance(node, ast.Var):
+        out.append((USE, node.name, node))
+    elif isinstance(node, (ast.FunctionDecl, ast.ClassDecl)):
+        return
+    else:
+        for child in ast.iter_child_nodes(node):
+            _collect(child, out)
+
+
+@dataclass
+class DataflowProblem:
+    direction: str  # "forward" | "backward"
+    meet: str  # "union" | "intersection"
+    gen: List[int]
+    kill: List[int]
+    boundary: int  # valor en la entrada (forward) o en la salida (backward)
+    init: int  # valor inicial de los demas bloques
+
+
+def _order(cfg: CFG) -> List[int]:
+    """Postorden inverso desde la entrada; bloques inalcanzables al final."""
+    seen = set()
+    post: List[int] = []
+    stack: List[Tuple[int, int]] = [(cfg.entry, 0)]
+    seen.add(cfg.entry)
+    while stack:
+        block, idx = stack.pop()
+        succs = cfg.blocks[block].succs
+        if idx < len(succs):
+            stack.append((block, idx + 1))
+            nxt = succs[idx]
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append((nxt, 0))
+        else:
+            post.append(block)
+    post.reverse()
+    return post + [b.id for b in cfg.blocks if b.id not in seen]
+
+
+def solve(cfg: CFG, problem: DataflowProblem) -> Tuple[List[int], List[int]]:
+    """Itera hasta punto fijo; devuelve (IN, OUT) por bloque."""
+    n = len(cfg.blocks)
+    forward = problem.direction == "forward"
+    union = problem.meet == "union"
+    gen, kill = problem.gen, problem.kill
+    start = cfg.entry if forward else cfg.exit
+
+    before = [problem.init] * n  # IN si forward, OUT si backward
+    after = [problem.init] * n
+    before[start] = problem.boundary
+
+    order = _order(cfg)
+    if not forward:
+        order.reverse()
+    worklist = deque(order)
+    queued = set(order)
+    while worklist:
+        b = worklist.popleft()
+        queued.discard(b)
+        block = cfg.blocks[b]
+        sources = block.preds if forward else block.succs
+        if b != start and sources:
+            acc = after[sources[0]]
+            for s in sources[1:]:
+                acc = acc | after[s] if union else acc & after[s]
+            before[b] = acc
+        value = gen[b] | (before[b] & ~kill[b])
+        if value != after[b]:
+            after[b] = value
+            for t in (block.succs if forward else block.preds):
+                if t not in queued:
+                    queued.add(t)
+                    worklist.append(t)
+
+    if forward:
+        return before, after
+    return after, before
+
+
+class FunctionDataflow:
+    """Definiciones alcanzables, vivacidad y asignacion definida sobre un CFG."""
+
+    def __init__(self, cfg: CFG) -> None:
+        self.cfg = cfg
+        self.effects: List[List[List[Effect]]] = [
+            [item_effects(item) for item in block.items] for block in cfg.blocks
+        ]
+        self.var_index: Dict[str, int] = {}
+        self.defs: List[Tuple[str, int, Any]] = []  # (variable, bloque, nodo)
+        self._defs_of_var: Dict[str, int] = {}
+        self._param_defs = 0
+        for name in cfg.params:
+            self._var_bit(name)
+            self._add_def(name, cfg.entry, None)
+            self._param_defs |= 1 << (len(self.defs) - 1)
+        self._def_ids: List[List[List[int]]] = []
+        for b, per_item in enumerate(self.effects):
+            ids_block = []
+            for effects in per_item:
+                ids = []
+                for kind, name, node in effects:
+                    self._var_bit(name)
+                    if kind == DEF:
+                        ids.append(self._add_def(name, b, node))
+                ids_block.append(ids)
+            self._def_ids.append(ids_block)
+        self.universe = (1 << len(self.var_index)) - 1
+
+        self.reaching_in, self.reaching_out = self._reaching_definitions()
+        self.live_in, self.live_out = self._liveness()
+        self.assigned_in, self.assigned_out = self._definite_assignment()
+
+    # --- indices ---
+    def _var_bit(self, name: str) -> int:
+        idx = self.var_index.get(name)
+        if idx is None:
+            idx = self.var_index[name] = len(self.var_index)
+        return idx
+
+    def _add_def(self, name: str, block: int, node: Any) -> int:
+        idx = len(self.defs)
+        self.defs.append((name, block, node))
+        self._defs_of_var[name] = self._defs_of_var.get(name, 0) | (1 << idx)
+        return idx
+
+    def vars_of(self, bits: int) -> List[str]:
+        return [name for name, idx in self.var_index.items() if bits >> idx & 1]
+
+    # --- analisis ---
+    def _reaching_definitions(self) -> Tuple[List[int], List[int]]:
+        n = len(self.cfg.blocks)
+        gen = [0] * n
+        kill = [0] * n
+        gen[self.cfg.entry] = self._param_defs
+        for b in range(n):
+            for effects, ids in zip(self.effects[b], self._def_ids[b]):
+                defs_here = [e for e in effects if e[0] == DEF]
+                for (_, name, _), d in zip(defs_here, ids):
+                    every = self._defs_of_var[name]
+                    gen[b] = (gen[b] & ~every) | (1 << d)
+                    kill[b] |= every
+            kill[b] &= ~gen[b]
+        problem = DataflowProblem("forward", "union", gen, kill, self._param_defs, 0)
+        return solve(self.cfg, problem)
+
+    def _liveness(self) -> Tuple[List[int], List[int]]:
+        n = len(self.cfg.blocks)
+        use = [0] * n
+        defined = [0] * n
+        for b in range(n):
+            for effects in self.effects[b]:
+                for kind, name, _ in effects:
+                    bit = 1 << self.var_index[name]
+                    if kind == USE and not defined[b] & bit:
+                        use[b] |= bit
+                    elif kind == DEF:
+                        defined[b] |= bit
+        return solve(self.cfg, DataflowProblem("backward", "union", use, defined, 0, 0))
+
+    def _definite_assignment(self) -> Tuple[List[int], List[int]]:
+        n = len(self.cfg.blocks)
+        gen = [0] * n
+        for b in range(n):
+            for effects in self.effects[b]:
+                for kind, name, _ in effects:
+                    if kind == DEF:
+                        gen[b] |= 1 << self.var_index[name]
+        params = 0
+        for name in self.cfg.params:
+            params |= 1 << self.var_index[name]
+        problem = DataflowProblem("forward", "intersection", gen, [0] * n, params, self.universe)
+        return solve(self.cfg, problem)
+
+    # --- consultas ---
+    def unreachable_blocks(self) -> List[int]:
+        reachable = self.cfg.reachable()
+        return [b.id for b in self.cfg.blocks if b.id not in reachable and b.items]
+
+    def maybe_unassigned(self) -> List[Tuple[str, Any]]:
+        """Usos de variables que no estan asignadas en todos los caminos previos.
+
+        Solo se consideran variables con al menos una definicion; las que nunca
+        se asignan ya las reporta el analizador semantico.
+        """
+        reachable = self.cfg.reachable()
+        defined_somewhere = 0
+        for name, _, _ in self.defs:
+            defined_somewhere |= 1 << self.var_index[name]
+        found: List[Tuple[str, Any]] = []
+        for b in sorted(reachable):
+            state = self.assigned_in[b]
+            for effects in self.effects[b]:
+                for kind, name, node in effects:
+                    bit = 1 << self.var_index[name]
+                    if kind == USE and defined_somewhere & bit and not state & bit:
+                        found.append((name, node))
+                    elif kind == DEF:
+                        state |= bit
+        return found
+
+    def dead_stores(self) -> List[Tuple[str, Any]]:
+        """Definiciones cuyo valor no se lee en ningun camino posterior."""
+        found: List[Tuple[str, Any]] = []
+        for b in sorted(self.cfg.reachable()):
+            live = self.live_out[b]
+            for effects in reversed(self.effects[b]):
+                for kind, name, node in reversed(effects):
+                    bit = 1 << self.var_index[name]
+                    if kind == DEF:
+                        if not live & bit:
+                            found.append((name, node))
+                        live &= ~bit
+                    else:
+                        live |= bit
+        found.reverse()
+        return found
+
+    def reaching_at_block(self, block: int) -> List[Tuple[str, Optional[Any]]]:
+        bits = self.reaching_in[block]
+        return [(name, node) for idx, (name, _, node) in enumerate(self.defs) if bits >> idx & 1]
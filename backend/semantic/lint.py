@@ -0,0 +1,280 @@
+"""Motor de lint con reglas fusionadas en un unico recorrido del AST."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from .. import ast_nodes as ast
+from ..cancel import CancelToken
+from .cfg import build_function_cfg, build_program_cfg
+from .dataflow import FunctionDataflow
+from .semantic_analyzer import find_lineno
+
+
+@dataclass
+class LintMessage:
+    rule: str
+    message: str
+    lineno: Optional[int] = None
+    level: str = "warning"
+
+    def __str__(self) -> str:  # pragma: no cover - str solo para logging/UI
+        suffix = f" (linea {self.lineno})" if self.lineno is not None else ""
+        return f"[Lint:{self.rule}] {self.message}{suffix}"
+
+
+@dataclass
+class RuleStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class LintConfig:
+    """Activa/desactiva reglas por codigo; las no listadas usan `default_enabled`."""
+
+    enabled: Dict[str, bool] = field(default_factory=dict)
+    default_enabled: bool = True
+
+    def is_enabled(self, code: str) -> bool:
+        return self.enabled.get(code, self.default_enabled)
+
+
+class LintContext:
+    """Estado compartido del recorrido: pila de padres y buzón de mensajes."""
+
+    def __init__(self, cancel: Optional[CancelToken] = None) -> None:
+        self.parents: List[Any] = []
+        self.messages: List[LintMessage] = []
+        self.cancel = cancel
+
+    @property
+    def parent(self) -> Any:
+        return self.parents[-1] if self.parents else None
+
+    def report(self, rule: "LintRule", message: str, node=None, level: Optional[str] = None) -> None:
+        self.messages.append(LintMessage(rule.code, message, find_lineno(node), level or rule.level))
+
+
+class LintRule:
+    """Regla base.
+
+    Las subclases declaran interes en un tipo de nodo definiendo metodos
+    `visit_<Nodo>` (preorden) y/o `leave_<Nodo>` (postorden), igual que los
+    visitadores del analizador semantico.
+    """
+
+    code: str = ""
+    description: str = ""
+    level: str = "warning"
+
+    def begin(self, ctx: LintContext) -> None:
+        """Se invoca antes de cada recorrido; reinicia estado propio."""
+
+    def handlers(self) -> Dict[Tuple[str, str], Callable[[Any, LintContext], None]]:
+        found = {}
+        for attr in dir(self):
+            for phase in ("visit", "leave"):
+                prefix = phase + "_"
+                if attr.startswith(prefix):
+                    found[(phase, attr[len(prefix):])] = getattr(self, attr)
+        return found
+
+
+RULES: Dict[str, Type[LintRule]] = {}
+
+
+def register_rule(cls: Type[LintRule]) -> Type[LintRule]:
+    """Decorador que agrega una regla al registro global."""
+    RULES[cls.code] = cls
+    return cls
+
+
+class LintEngine:
+    """Ejecuta todas las reglas activas en un solo recorrido del arbol."""
+
+    def __init__(self, config: LintConfig | None = None, rules: List[LintRule] | None = None) -> None:
+        self.config = config or LintConfig()
+        candidates = rules if rules is not None else [cls() for cls in RULES.values()]
+        self.rules = [rule for rule in candidates if self.config.is_enabled(rule.code)]
+        self.stats: Dict[str, RuleStats] = {rule.code: RuleStats() for rule in self.rules}
+        # (fase, tipo de nodo) -> [(codigo, handler)]
+        self._dispatch: Dict[Tuple[str, str], List[Tuple[str, Callable]]] = {}
+        for rule in self.rules:
+            for key, handler in rule.handlers().items():
+                self._dispatch.setdefault(key, []).append((rule.code, handler))
+
+    def run(self, program: Any, cancel: Optional[CancelToken] = None) -> List[LintMessage]:
+        ctx = LintContext(cancel)
+        for rule in self.rules:
+            rule.begin(ctx)
+        if program is not None and self._dispatch:
+            self._walk(program, ctx)
+        return ctx.messages
+
+    def _call(self, key: Tuple[str, str], node: Any, ctx: LintContext) -> None:
+        handlers = self._dispatch.get(key)
+        if not handlers:
+            return
+        for code, handler in handlers:
+            stats = self.stats[code]
+            start = time.perf_counter()
+            handler(node, ctx)
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+
+    def _walk(self, node: Any, ctx: LintContext) -> None:
+        if ctx.cancel is not None:
+            ctx.cancel.check()
+        kind = node.__class__.__name__
+        self._call(("visit", kind), node, ctx)
+        ctx.parents.append(node)
+        for child in ast.iter_child_nodes(node):
+            self._walk(child, ctx)
+        ctx.parents.pop()
+        self._call(("leave", kind), node, ctx)
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """Vista serializable de los contadores por regla."""
+        return [
+            {"rule": code, "calls": st.calls, "seconds": st.seconds}
+            for code, st in self.stats.items()
+        ]
+
+
+# === REGLAS INCLUIDAS ===
+@register_rule
+class UnusedVariableRule(LintRule):
+    code = "unused-variable"
+    description = "Variable declarada que nunca se lee en su funcion o en el ambito global."
+
+    def begin(self, ctx: LintContext) -> None:
+        # Cada entrada: nombre -> nodo de declaracion, y conjunto de lecturas.
+        self._frames: List[Tuple[Dict[str, Any], set]] = [({}, set())]
+
+    def visit_FunctionDecl(self, node, ctx):
+        self._frames.append(({}, set()))
+
+    def leave_FunctionDecl(self, node, ctx):
+        self._flush(ctx)
+
+    def leave_Program(self, node, ctx):
+        self._flush(ctx)
+
+    def visit_VarDeclStmt(self, node, ctx):
+        declared, _ = self._frames[-1]
+        for name, _init in node.decls:
+            declared.setdefault(name, node)
+
+    def visit_Var(self, node, ctx):
+        parent = ctx.parent
+        if isinstance(parent, ast.Assign) and parent.target is node:
+            return
+        self._frames[-1][1].add(node.name)
+
+    def _flush(self, ctx: LintContext) -> None:
+        declared, used = self._frames.pop()
+        for name, decl in declared.items():
+            if name not in used:
+                ctx.report(self, f"Variable '{name}' is declared but never used", decl)
+
+
+@register_rule
+class UnreachableCodeRule(LintRule):
+    code = "unreachable-code"
+    description = "Sentencias ubicadas despues de un return en el mismo bloque."
+
+    def visit_Block(self, node, ctx):
+        self._check(node.stmts, ctx)
+
+    def visit_Program(self, node, ctx):
+        self._check(node.items, ctx)
+
+    def _check(self, stmts: List[Any], ctx: LintContext) -> None:
+        for idx, stmt in enumerate(stmts[:-1]):
+            if isinstance(stmt, ast.ReturnStmt):
+                nxt = stmts[idx + 1]
+                if not isinstance(nxt, (ast.FunctionDecl, ast.ClassDecl)):
+                    ctx.report(self, "Unreachable code after return", nxt)
+                return
+
+
+def _array_key(node) -> Any:
+    """Normaliza claves literales como lo hace PHP; None si no es constante."""
+    if isinstance(node, ast.NumberLit):
+        return int(node.value)
+    if isinstance(node, ast.BoolLit):
+        return int(node.value)
+    if isinstance(node, ast.NullLit):
+        return ""
+    if isinstance(node, ast.StringLit):
+        text = node.value
+        if text.isdigit() and (text == "0" or not text.startswith("0")):
+            return int(text)
+        return text
+    return None
+
+
+@register_rule
+class DuplicateArrayKeyRule(LintRule):
+    code = "duplicate-array-key"
+    description = "Claves literales repetidas dentro de un mismo arreglo."
+
+    def visit_ArrayLit(self, node, ctx):
+        seen = set()
+        for key, _value in node.pairs:
+            if key is None:
+                continue
+            norm = _array_key(key)
+            if norm is None:
+                continue
+            if norm in seen:
+                ctx.report(self, f"Duplicate array key {norm!r}", key)
+            seen.add(norm)
+
+
+_LOOSE_SUSPECTS = (ast.BoolLit, ast.NullLit)
+
+
+@register_rule
+class LooseComparisonRule(LintRule):
+    code = "loose-comparison"
+    description = "Comparaciones '=='/'!=' con literales que dependen de conversiones implicitas."
+
+    def visit_Binary(self, node, ctx):
+        if node.op not in ("==", "!="):
+            return
+        left, right = node.left, node.right
+        if not (self._suspicious(left, right) or self._suspicious(right, left)):
+            return
+        strict = "===" if node.op == "==" else "!=="
+        ctx.report(self, f"Loose comparison '{node.op}' may coerce types; consider '{strict}'", node)
+
+    @staticmethod
+    def _suspicious(lit, other) -> bool:
+        if isinstance(lit, _LOOSE_SUSPECTS):
+            return True
+        if isinstance(lit, ast.NumberLit) and lit.value == 0:
+            return True
+        if isinstance(lit, ast.StringLit) and lit.value in ("", "0"):
+            return True
+        literal_types = (ast.NumberLit, ast.StringLit)
+        return isinstance(lit, literal_types) and isinstance(other, literal_types) and type(lit) is not type(other)
+
+
+@register_rule
+class PossiblyUnassignedRule(LintRule):
+    code = "possibly-unassigned"
+    description = "Lectura de una variable que no esta asignada en todos los caminos previos."
+
+    def visit_Program(self, node, ctx):
+        self._report(build_program_cfg(node), ctx)
+
+    def visit_FunctionDecl(self, node, ctx):
+        owner = ctx.parent.name if isinstance(ctx.parent, ast.ClassDecl) else None
+        self._report(build_function_cfg(node, owner), ctx)
+
+    def _report(self, cfg, ctx: LintContext) -> None:
+        for name, use in FunctionDataflow(cfg).maybe_unassigned():
+            ctx.report(self, f"Variable '{name}' may be used before assignment", use)
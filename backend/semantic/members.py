@@ -0,0 +1,104 @@
+"""Indice de miembros por clase para resolver `new`, `->` y `::` en O(1)."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from .. import ast_nodes as ast
+from .symbol_table import Symbol
+
+CONSTRUCTOR = "__construct"
+
+
+@dataclass
+class MethodEntry:
+    name: str
+    owner: str
+    node: ast.FunctionDecl
+    visibility: str = "public"
+    is_static: bool = False
+    min_args: int = 0
+    max_args: int = 0
+    symbol: Optional[Symbol] = None
+
+    def accepts(self, count: int) -> bool:
+        return self.min_args <= count <= self.max_args
+
+    def arity_text(self) -> str:
+        if self.min_args == self.max_args:
+            return str(self.max_args)
+        return f"{self.min_args} to {self.max_args}"
+
+
+@dataclass
+class ClassEntry:
+    name: str
+    node: ast.ClassDecl
+    methods: Dict[str, MethodEntry] = field(default_factory=dict)
+
+
+class ClassMemberIndex:
+    """Nombre de clase -> metodos, construido en la pasada de declaraciones.
+
+    PHP trata nombres de clase y de metodo sin distinguir mayusculas, por lo que
+    las claves se normalizan en minusculas. Las resoluciones (incluidos los
+    fallos) se memorizan por par (clase, metodo).
+    """
+
+    def __init__(self) -> None:
+        self.classes: Dict[str, ClassEntry] = {}
+        self._method_cache: Dict[Tuple[str, str], Optional[MethodEntry]] = {}
+
+    @classmethod
+    def build(cls, program: Any) -> "ClassMemberIndex":
+        index = cls()
+        if program is not None:
+            for node in ast.walk(program):
+                if isinstance(node, ast.ClassDecl):
+                    index.add_class(node)
+        return index
+
+    def add_class(self, node: ast.ClassDecl, name: Optional[str] = None) -> ClassEntry:
+        key = (name or node.name).lower()
+        existing = self.classes.get(key)
+        if existing is not None:
+            return existing
+        entry = ClassEntry(name or node.name, node)
+        for member in node.members:
+            if not isinstance(member, ast.FunctionDecl):
+                continue
+            mkey = member.name.lower()
+            if mkey in entry.methods:
+                continue
+            required = sum(1 for p in member.params if p.default is None)
+            entry.methods[mkey] = MethodEntry(
+                name=member.name,
+                owner=entry.name,
+                node=member,
+                visibility=member.visibility or "public",
+                is_static=member.is_static,
+                min_args=required,
+                max_args=len(member.params),
+            )
+        self.classes[key] = entry
+        return entry
+
+    def lookup_class(self, name: Optional[str]) -> Optional[ClassEntry]:
+        if not isinstance(name, str):
+            return None
+        return self.classes.get(name.lower())
+
+    def lookup_method(self, class_name: str, method: str) -> Optional[MethodEntry]:
+        key = (class_name.lower(), method.lower())
+        if key in self._method_cache:
+            return self._method_cache[key]
+        entry = self.classes.get(key[0])
+        found = entry.methods.get(key[1]) if entry is not None else None
+        self._method_cache[key] = found
+        return found
+
+    def attach_symbol(self, class_name: str, method: str, symbol: Symbol) -> None:
+        """Asocia el simbolo declarado por el analizador con su entrada del indice."""
+        found = self.lookup_method(class_name, method)
+        if found is not None and found.symbol is None:
+            found.symbol = symbol
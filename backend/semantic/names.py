@@ -0,0 +1,121 @@
+"""Resolucion de nombres calificados con `namespace` y `use`."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+FUNCTION = "function"
+CLASS = "class"
+SEPARATOR = "\\"
+
+
+def qualify(namespace: Sequence[str], name: str) -> str:
+    """Nombre completamente calificado (`A\\B\\nombre`)."""
+    return SEPARATOR.join([*namespace, name])
+
+
+@dataclass
+class NamespaceNode:
+    """Nodo del trie: un segmento de namespace y sus simbolos por tipo."""
+
+    children: Dict[str, "NamespaceNode"] = field(default_factory=dict)
+    symbols: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class ResolvedName:
+    qualified: str
+    entry: Any
+
+
+class NamespaceTrie:
+    """Trie por segmentos de namespace; busquedas proporcionales al largo del nombre.
+
+    Las claves se guardan en minusculas porque PHP no distingue mayusculas en
+    nombres de namespace, funcion ni clase.
+    """
+
+    def __init__(self) -> None:
+        self.root = NamespaceNode()
+
+    def _node(self, namespace: Sequence[str], create: bool = False) -> Optional[NamespaceNode]:
+        node = self.root
+        for part in namespace:
+            key = part.lower()
+            nxt = node.children.get(key)
+            if nxt is None:
+                if not create:
+                    return None
+                nxt = node.children[key] = NamespaceNode()
+            node = nxt
+        return node
+
+    def declare(self, kind: str, namespace: Sequence[str], name: str, entry: Any) -> bool:
+        """Registra `entry`; devuelve False si el nombre ya existia en ese namespace."""
+        table = self._node(namespace, create=True).symbols.setdefault(kind, {})
+        key = name.lower()
+        if key in table:
+            return False
+        table[key] = ResolvedName(qualify(namespace, name), entry)
+        return True
+
+    def lookup(self, kind: str, parts: Sequence[str]) -> Optional[ResolvedName]:
+        if not parts:
+            return None
+        node = self._node(parts[:-1])
+        if node is None:
+            return None
+        return node.symbols.get(kind, {}).get(parts[-1].lower())
+
+
+@dataclass
+class FileScope:
+    """Namespace actual y alias de `use` de un archivo."""
+
+    namespace: List[str] = field(default_factory=list)
+    aliases: Dict[str, List[str]] = field(default_factory=dict)
+
+
+class NameResolver:
+    """Aplica las reglas de PHP para nombres no calificados y calificados."""
+
+    def __init__(self, trie: NamespaceTrie | None = None) -> None:
+        self.trie = trie or NamespaceTrie()
+        self.scope = FileScope()
+
+    # --- estado del archivo ---
+    def enter_namespace(self, parts: Sequence[str]) -> None:
+        self.scope = FileScope(namespace=list(parts))
+
+    def add_use(self, parts: Sequence[str]) -> None:
+        self.scope.aliases[parts[-1].lower()] = list(parts)
+
+    def qualify(self, name: str) -> str:
+        return qualify(self.scope.namespace, name)
+
+    def declare(self, kind: str, name: str, entry: Any) -> bool:
+        return self.trie.declare(kind, self.scope.namespace, name, entry)
+
+    # --- resolucion ---
+    def _expand(self, parts: Sequence[str]) -> List[str]:
+        alias = self.scope.aliases.get(parts[0].lower())
+        if alias is not None:
+            return alias + list(parts[1:])
+        return self.scope.namespace + list(parts)
+
+    def resolve_function(self, parts: Sequence[str]) -> Optional[ResolvedName]:
+        """`f()` busca en el namespace actual y cae al global; `A\\f()` expande alias."""
+        if len(parts) == 1:
+            found = self.trie.lookup(FUNCTION, self.scope.namespace + list(parts))
+            if found is None and self.scope.namespace:
+                found = self.trie.lookup(FUNCTION, parts)
+            return found
+        return self.trie.lookup(FUNCTION, self._expand(parts))
+
+    def resolve_class(self, parts: Sequence[str]) -> Optional[ResolvedName]:
+        """Las clases usan alias o el namespace actual; no hay respaldo global."""
+        return self.trie.lookup(CLASS, self._expand(parts))
+
+    def class_name(self, parts: Sequence[str]) -> str:
+        """Nombre calificado que tendria la clase, exista o no."""
+        return SEPARATOR.join(self._expand(parts))
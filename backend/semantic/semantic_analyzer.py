@@ -1,39 +1,69 @@
 from __future__ import annotations
+from dataclasses import dataclass
 from typing import Any, List, Optional
 from .. import ast_nodes as ast
+from ..cancel import CancelToken
 from .errors import SemanticError
+from .members import CONSTRUCTOR, ClassMemberIndex, MethodEntry
+from .names import CLASS, FUNCTION, SEPARATOR, NameResolver
 from .symbol_table import Symbol, SymbolTable
 
 
+def find_lineno(node) -> Optional[int]:
+    """Obtiene la linea del nodo o de alguno de sus hijos inmediatos."""
+    if node is None:
+        return None
+    ln = getattr(node, "lineno", None)
+    if ln is not None:
+        return ln
+    for attr in ("left", "right", "target", "value", "expr", "callee", "base", "index"):
+        child = getattr(node, attr, None)
+        ln = getattr(child, "lineno", None)
+        if ln is not None:
+            return ln
+    for child in getattr(node, "__dict__", {}).values():
+        ln = getattr(child, "lineno", None) if hasattr(child, "__dict__") else None
+        if ln is not None:
+            return ln
+    return None
+
+
+@dataclass
+class Reference:
+    """Uso resuelto de un nombre: 'var', 'call', 'method_call', 'new' o 'class' (`K::` en accesos estaticos)."""
+
+    kind: str
+    name: str
+    node: Any
+    owner: Optional[str] = None  # funcion (var) o clase (method_call)
+    symbol: Optional[Symbol] = None
+    write: bool = False
+
+
 class SemanticAnalyzer:
     """Recorrido semantico sobre el AST."""
 
-    def __init__(self) -> None:
+    def __init__(self, imports: Optional[List[Any]] = None, cancel: Optional[CancelToken] = None) -> None:
+        # imports: resumenes de archivos incluidos (con `functions`, `classes`, `variables`)
+        self.imports = list(imports or [])
+        # cancel: se consulta en cada nodo visitado para abandonar analisis reemplazados
+        self.cancel = cancel
         self.symtab = SymbolTable()
         self.errors: List[SemanticError] = []
+        self.references: List[Reference] = []
         self.current_function: Optional[Symbol] = None
         self.current_class: Optional[Symbol] = None
         self.snapshot_data: List[dict] = []
+        # id(nodo) -> tipo inferido por el visitor (para `type_at`, ver `backend.positions`).
+        self.types: dict[int, Any] = {}
         self._func_params: dict[str, List[Symbol]] = {}
         self._func_nodes: dict[str, Any] = {}
+        self.members = ClassMemberIndex()
+        self.names = NameResolver()
 
     def _get_lineno(self, node) -> Optional[int]:
         """Obtiene la linea del nodo o de alguno de sus hijos inmediatos."""
-        if node is None:
-            return None
-        ln = getattr(node, "lineno", None)
-        if ln is not None:
-            return ln
-        for attr in ("left", "right", "target", "value", "expr", "callee", "base", "index"):
-            child = getattr(node, attr, None)
-            ln = getattr(child, "lineno", None)
-            if ln is not None:
-                return ln
-        for child in getattr(node, "__dict__", {}).values():
-            ln = getattr(child, "lineno", None) if hasattr(child, "__dict__") else None
-            if ln is not None:
-                return ln
-        return None
+        return find_lineno(node)
 
     def error(self, msg: str, node=None) -> None:
         lineno = self._get_lineno(node)
@@ -42,7 +72,13 @@ class SemanticAnalyzer:
     def analyze(self, program: Any) -> List[SemanticError]:
         """Punto de entrada: recibe Program (raiz del AST)."""
         self.errors.clear()
+        self.references = []
+        self.types = {}
         self.symtab = SymbolTable()
+        self.members = ClassMemberIndex()
+        self.names = NameResolver()
+        self._declaration_pass(program)
+        self._declare_imports()
         self.visit(program)
         self.snapshot_data = self.symtab.snapshot()
         return self.errors
@@ -51,9 +87,14 @@ class SemanticAnalyzer:
     def visit(self, node):
         if node is None:
             return None
+        if self.cancel is not None:
+            self.cancel.check()
         method = "visit_" + node.__class__.__name__
         visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        result = visitor(node)
+        if result is not None:
+            self.types[id(node)] = result
+        return result
 
     def generic_visit(self, node):
         # Recorre atributos que son nodos o listas de nodos
@@ -65,7 +106,65 @@ class SemanticAnalyzer:
             elif hasattr(value, "__class__"):
                 self.visit(value)
 
+    def _declaration_pass(self, program: Any) -> None:
+        """Registra clases y funciones de nivel superior con su nombre calificado.
+
+        Llena el trie de namespaces y el indice de miembros antes del recorrido
+        principal, de modo que las referencias hacia adelante se resuelvan.
+        """
+        for item in getattr(program, "items", []):
+            if isinstance(item, ast.NamespaceDecl):
+                self.names.enter_namespace(item.name)
+            elif isinstance(item, ast.ClassDecl):
+                qualified = self.names.qualify(item.name)
+                self.names.declare(CLASS, item.name, item)
+                self.members.add_class(item, name=qualified)
+            elif isinstance(item, ast.FunctionDecl):
+                self.names.declare(FUNCTION, item.name, item)
+        self.names.enter_namespace([])
+
+    def _declare_imports(self) -> None:
+        """Declara en el scope global los simbolos exportados por archivos incluidos."""
+        for summary in self.imports:
+            for qualified, decl in summary.functions.items():
+                *namespace, name = qualified.split(SEPARATOR)
+                self.names.trie.declare(FUNCTION, namespace, name, decl)
+                sym = Symbol(
+                    name=qualified,
+                    kind="func",
+                    type={"params": [None for _ in decl.params], "ret": None},
+                    node=decl,
+                    lineno=getattr(decl, "lineno", None),
+                )
+                if self.symtab.declare(qualified, sym):
+                    self._func_nodes[qualified] = decl
+            for qualified, decl in summary.classes.items():
+                *namespace, name = qualified.split(SEPARATOR)
+                self.names.trie.declare(CLASS, namespace, name, decl)
+                self.members.add_class(decl, name=qualified)
+                methods = [m.name for m in decl.members if isinstance(m, ast.FunctionDecl)]
+                sym = Symbol(
+                    name=qualified,
+                    kind="class",
+                    type={"members": []},
+                    node=decl,
+                    lineno=getattr(decl, "lineno", None),
+                    value={"methods": methods},
+                )
+                self.symtab.declare(qualified, sym)
+            for name in summary.variables:
+                self.symtab.declare(name, Symbol(name=name, kind="var"))
+
+    def _at_top_level(self) -> bool:
+        return len(self.symtab.scopes) == 1
+
     # --- Helpers ---
+    def _ref(self, kind: str, name: str, node, owner=None, symbol=None, write: bool = False) -> None:
+        self.references.append(Reference(kind, name, node, owner, symbol, write))
+
+    def _scope_owner(self) -> Optional[str]:
+        return self.current_function.name if self.current_function else None
+
     def is_lvalue(self, node) -> bool:
         """Determina si un nodo es un destino valido para asignacion."""
         return isinstance(node, (ast.Var, ast.Index, ast.Member, ast.StaticAccess))
@@ -75,8 +174,15 @@ class SemanticAnalyzer:
         for it in node.items:
             self.visit(it)
 
+    def visit_NamespaceDecl(self, node):
+        self.names.enter_namespace(node.name)
+
+    def visit_UseDecl(self, node):
+        for parts in node.names:
+            self.names.add_use(parts)
+
     def visit_ClassDecl(self, node):
-        cname = node.name
+        cname = self.names.qualify(node.name) if self._at_top_level() else node.name
         if self.symtab.lookup_current(cname):
             self.error(f"Class '{cname}' already declared in this scope", node)
             return
@@ -96,7 +202,7 @@ class SemanticAnalyzer:
         self.current_class = cls_sym
         member_names: List[str] = []
 
-        self.symtab.enter_scope(name=cname, kind="class")
+        self.symtab.enter_scope(name=cname, kind="class", node=node)
         for member in node.members:
             self.visit(member)
             if isinstance(member, ast.FunctionDecl):
@@ -108,6 +214,8 @@ class SemanticAnalyzer:
 
     def visit_FunctionDecl(self, node):
         fname = node.name
+        if self.current_class is None and self._at_top_level():
+            fname = self.names.qualify(fname)
         if self.symtab.lookup_current(fname):
             self.error(f"Function '{fname}' already declared in this scope", node)
             return
@@ -126,8 +234,13 @@ class SemanticAnalyzer:
         )
         self.symtab.declare(fname, sym)
         self._func_nodes[fname] = node
+        if self.current_class:
+            self.members.attach_symbol(self.current_class.name, fname, sym)
 
-        self.symtab.enter_scope(name=fname, kind="function" if not self.current_class else "method")
+        self.symtab.enter_scope(name=fname, kind="function" if not self.current_class else "method", node=node)
+        if self.current_class and not node.is_static:
+            this_sym = Symbol(name="$this", kind="var", type=self.current_class.name, node=node, owner=fname)
+            self.symtab.declare("$this", this_sym)
         params_syms: List[Symbol] = []
         for idx, p in enumerate(node.params):
             pname = p.name
@@ -161,6 +274,7 @@ class SemanticAnalyzer:
             existing = self.symtab.lookup(name)
             if existing:
                 # En PHP las variables son dinamicas: actualizar tipo/valor, sin marcar redeclaracion.
+                self._ref("var", name, node, self._scope_owner(), existing, write=True)
                 if init is not None:
                     init_type = self.visit(init)
                     if init_type and not existing.type:
@@ -196,6 +310,7 @@ class SemanticAnalyzer:
         if isinstance(tgt, ast.Var):
             name = tgt.name
             sym = self.symtab.lookup(name)
+            self._ref("var", name, tgt, self._scope_owner(), sym, write=True)
 
             if not sym:
                 self.error(f"Variable '{name}' used before declaration", tgt)
@@ -221,6 +336,7 @@ class SemanticAnalyzer:
     def visit_Var(self, node: ast.Var):
         name = node.name
         sym = self.symtab.lookup(name)
+        self._ref("var", name, node, self._scope_owner(), sym)
         if not sym:
             self.error(f"Variable '{name}' not declared", node)
             return None
@@ -308,12 +424,28 @@ class SemanticAnalyzer:
         callee = node.callee
         args = node.args
 
+        if isinstance(callee, ast.Member):
+            return self._call_method(node, self.visit(callee.obj), callee.name, static=False)
+        if isinstance(callee, ast.StaticAccess):
+            cls = self._resolve_class(callee.qname, node)
+            self._static_class_ref(callee.qname, cls)
+            return self._call_method(node, cls.name if cls else None, callee.name, static=True)
+
         if isinstance(callee, ast.Name):
-            fname = "::".join(callee.parts)
+            written = SEPARATOR.join(callee.parts)
+            resolved = self.names.resolve_function(callee.parts)
+            fname = resolved.qualified if resolved is not None else written
             sym = self.symtab.lookup(fname)
+            self._ref("call", fname, node, symbol=sym)
+
+            if not sym and resolved is not None:
+                # Declarada mas adelante en el archivo: PHP eleva las funciones.
+                for a in args:
+                    self.visit(a)
+                return None
 
             if not sym:
-                self.error(f"Call to undefined function '{fname}'", node)
+                self.error(f"Call to undefined function '{written}'", node)
                 for a in args:
                     self.visit(a)
                 return None
@@ -381,7 +513,7 @@ class SemanticAnalyzer:
 
     # --- Control Flow ---
     def visit_Block(self, node):
-        self.symtab.enter_scope(kind="block")
+        self.symtab.enter_scope(kind="block", node=node)
         for s in node.stmts:
             self.visit(s)
         self.symtab.exit_scope()
@@ -425,7 +557,7 @@ class SemanticAnalyzer:
         if iterable_type != "array":
             self.error(f"Foreach expects an array, got '{iterable_type}'", node.iterable)
 
-        self.symtab.enter_scope(kind="block")
+        self.symtab.enter_scope(kind="block", node=node)
         if node.key:
             self.symtab.declare(node.key, Symbol(name=node.key, kind="var", type=None, node=node))
         if node.value:
@@ -449,16 +581,86 @@ class SemanticAnalyzer:
         return None
 
     def visit_Member(self, node):
+        # Las clases del subconjunto solo declaran metodos: las propiedades son dinamicas.
         self.visit(node.obj)
         return None
 
     def visit_StaticAccess(self, node):
+        self._static_class_ref(node.qname, self._resolve_class(node.qname, node))
         return None
 
     def visit_New(self, node):
+        cls = self._resolve_class(node.class_name, node)
+        cname = cls.name if cls is not None else self.names.class_name(node.class_name.parts)
+        self._ref("new", cname, node, symbol=self.symtab.lookup(cname))
+        if cls is not None:
+            ctor = self.members.lookup_method(cls.name, CONSTRUCTOR)
+            if ctor is not None:
+                self._check_method_args(ctor, node)
+            elif node.args:
+                self.error(f"Class '{cls.name}' has no constructor but {len(node.args)} args were given", node)
         for a in node.args:
             self.visit(a)
-        return None
+        return cls.name if cls is not None else None
+
+    # --- Miembros de clase ---
+    def _resolve_class(self, qname: ast.Name, node):
+        if len(qname.parts) == 1 and qname.parts[0].lower() in ("self", "static", "parent"):
+            keyword = qname.parts[0].lower()
+            if self.current_class is None:
+                self.error(f"Cannot use '{keyword}' outside of a class", node)
+                return None
+            if keyword == "parent":
+                # El subconjunto no tiene `extends`: ninguna clase tiene padre.
+                self.error(f"Cannot use 'parent' in class '{self.current_class.name}': it has no parent class", node)
+                return None
+            return self.members.lookup_class(self.current_class.name)
+        resolved = self.names.resolve_class(qname.parts)
+        cls = self.members.lookup_class(resolved.qualified) if resolved is not None else None
+        if cls is None:
+            self.error(f"Class '{self.names.class_name(qname.parts)}' not found", node)
+        return cls
+
+    def _static_class_ref(self, qname: ast.Name, cls) -> None:
+        """Registra el nombre de clase de `K::m()`/`K::x` como uso de la clase."""
+        if len(qname.parts) == 1 and qname.parts[0].lower() in ("self", "static", "parent"):
+            return  # no nombran a la clase en el texto
+        cname = cls.name if cls is not None else self.names.class_name(qname.parts)
+        self._ref("class", cname, qname, symbol=self.symtab.lookup(cname))
+
+    def _call_method(self, node: ast.Call, class_name: Optional[str], mname: str, static: bool):
+        cls = self.members.lookup_class(class_name)
+        method = self.members.lookup_method(cls.name, mname) if cls is not None else None
+        self._ref("method_call", method.name if method else mname, node, cls.name if cls else None,
+                  method.symbol if method else None)
+        if cls is not None and method is None:
+            self.error(f"Call to undefined method {cls.name}::{mname}()", node)
+        elif method is not None:
+            if static and not method.is_static:
+                self.error(f"Non-static method {method.owner}::{method.name}() cannot be called statically", node)
+            inside = self.current_class is not None and self.current_class.name.lower() == method.owner.lower()
+            if method.visibility != "public" and not inside:
+                self.error(f"Call to {method.visibility} method {method.owner}::{method.name}() from outside the class", node)
+            self._check_method_args(method, node)
+
+        for a in node.args:
+            self.visit(a)
+
+        if method is None:
+            return None
+        sig = method.symbol.type if method.symbol is not None and isinstance(method.symbol.type, dict) else {}
+        ret_type = sig.get("ret")
+        if ret_type is None:
+            ret_type = self._infer_return_from_body(method.node.body, {})
+        return ret_type
+
+    def _check_method_args(self, method: MethodEntry, node) -> None:
+        count = len(node.args)
+        if not method.accepts(count):
+            self.error(
+                f"Method '{method.owner}::{method.name}' expects {method.arity_text()} args, got {count}",
+                node,
+            )
 
     # --- Utilities ---
     def _literal_value(self, node) -> Any:
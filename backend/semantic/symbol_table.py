@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -21,8 +21,16 @@ class SymbolTable:
         self.closed_scopes: List[Dict[str, Any]] = []
         self._next_scope_id = 1
 
-    def enter_scope(self, name: Optional[str] = None, kind: str = "block") -> None:
-        meta = {"name": name, "kind": kind, "id": self._next_scope_id}
+    def enter_scope(self, name: Optional[str] = None, kind: str = "block", node: Any = None) -> None:
+        # `parent` y `node` (la declaracion que abre el scope) sirven para ubicar
+        # los scopes en el texto, p. ej. para el autocompletado.
+        meta = {
+            "name": name,
+            "kind": kind,
+            "id": self._next_scope_id,
+            "parent": self.scopes_meta[-1]["id"],
+            "node": node,
+        }
         self._next_scope_id += 1
         self.scopes.append({})
         self.scopes_meta.append(meta)
@@ -52,6 +60,42 @@ class SymbolTable:
     def lookup_current(self, name: str) -> Optional[Symbol]:
         return self.scopes[-1].get(name)
 
+    def all_scopes(self) -> List[Tuple[Dict[str, Any], Dict[str, Symbol]]]:
+        """Scopes cerrados y abiertos como pares `(meta, simbolos)`."""
+        scopes = [(entry["meta"], entry["symbols"]) for entry in self.closed_scopes]
+        scopes.extend(zip(self.scopes_meta, self.scopes))
+        return scopes
+
+    def containers(self) -> Dict[int, Tuple[str, str]]:
+        """Id de scope -> `(kind, nombre)` de la funcion, metodo, clase o global que lo contiene.
+
+        Los bloques pertenecen a su contenedor; los metodos se nombran `Clase::metodo`
+        y el global es `("global", "")`.
+        """
+        metas = {meta["id"]: meta for meta, _ in self.all_scopes()}
+        found: Dict[int, Tuple[str, str]] = {}
+
+        def resolve(meta: Dict[str, Any]) -> Tuple[str, str]:
+            key = found.get(meta["id"])
+            if key is not None:
+                return key
+            kind = meta["kind"]
+            parent = metas.get(meta.get("parent"))
+            if kind in ("function", "class"):
+                key = (kind, str(meta["name"]))
+            elif kind == "method":
+                key = (kind, f"{parent['name'] if parent is not None else ''}::{meta['name']}")
+            elif parent is not None:
+                key = resolve(parent)
+            else:
+                key = ("global", "")
+            found[meta["id"]] = key
+            return key
+
+        for meta in metas.values():
+            resolve(meta)
+        return found
+
     def snapshot(self) -> List[Dict[str, Any]]:
         """Devuelve una vista serializable de la tabla de simbolos."""
         serializable: List[Dict[str, Any]] = []
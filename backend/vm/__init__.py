@@ -0,0 +1,45 @@
+"""Paquete de ejecucion: compilador a bytecode, maquina virtual de pila y backend Python."""
+
+from .runtime import PhpArray, PhpClass, PhpObject, PhpRuntimeError
+from .compiler import BytecodeCompiler, CodeObject, CompileError, Module, compile_program, parse_program
+from .machine import ExecutionResult, VirtualMachine, run_module
+from .transpiler import CodeCache, CompiledProgram, PythonBackend, Transpiler, transpile
+
+__all__ = [
+    "PhpArray",
+    "PhpClass",
+    "PhpObject",
+    "PhpRuntimeError",
+    "BytecodeCompiler",
+    "CodeObject",
+    "CompileError",
+    "Module",
+    "compile_program",
+    "parse_program",
+    "ExecutionResult",
+    "VirtualMachine",
+    "run_module",
+    "CodeCache",
+    "CompiledProgram",
+    "PythonBackend",
+    "Transpiler",
+    "transpile",
+    "run_source",
+]
+
+
+def run_source(code: str, max_steps: int | None = None) -> ExecutionResult:
+    """Parsea, compila y ejecuta codigo PHP; los errores se devuelven en el resultado."""
+    program, error = parse_program(code)
+    if program is None:
+        return ExecutionResult(ok=False, output="", error=error)
+    try:
+        module = compile_program(program)
+    except CompileError as exc:
+        return ExecutionResult(ok=False, output="", error=str(exc), lineno=exc.lineno)
+    return run_module(module, max_steps=max_steps)
+
+
+if __name__ == "__main__":
+    sample = "<?php function fib($n){ if ($n < 2) { return $n; } return fib($n-1) + fib($n-2); } echo fib(15); ?>"
+    print(run_source(sample))
@@ -0,0 +1,631 @@
+"""Generacion de bytecode: baja el AST a objetos de codigo para la VM de pila."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .. import ast_nodes as ast
+from ..semantic.names import CLASS, FUNCTION, SEPARATOR, NameResolver
+from ..semantic.semantic_analyzer import find_lineno
+from . import opcodes as op
+from .runtime import BUILTINS, CONSTANTS, PhpArray, PhpClass
+
+THIS = "$this"
+MAIN = "<main>"
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", '"': '"', "'": "'", "$": "$", "0": "\0"}
+
+
+class CompileError(Exception):
+    """Construccion del AST que la VM no sabe ejecutar."""
+
+    def __init__(self, message: str, lineno: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.lineno = lineno
+
+    def __str__(self) -> str:
+        suffix = f" (linea {self.lineno})" if self.lineno is not None else ""
+        return f"[Codegen] {self.message}{suffix}"
+
+
+def unescape(text: str) -> str:
+    """Procesa las secuencias de escape de un literal de string."""
+    if "\\" not in text:
+        return text
+    out: List[str] = []
+    idx = 0
+    while idx < len(text):
+        ch = text[idx]
+        if ch == "\\" and idx + 1 < len(text) and text[idx + 1] in _ESCAPES:
+            out.append(_ESCAPES[text[idx + 1]])
+            idx += 2
+            continue
+        out.append(ch)
+        idx += 1
+    return "".join(out)
+
+
+@dataclass
+class CodeObject:
+    """Codigo de una funcion, metodo o del nivel superior.
+
+    `code` intercala opcode y argumento; `lines` guarda la linea fuente de cada
+    instruccion (indice = offset // 2) para reportar errores de ejecucion.
+    Los parametros ocupan los slots `first_param .. first_param + argcount`.
+    """
+
+    name: str
+    code: List[int] = field(default_factory=list)
+    consts: List[Any] = field(default_factory=list)
+    varnames: List[str] = field(default_factory=list)
+    lines: List[Optional[int]] = field(default_factory=list)
+    argcount: int = 0
+    min_args: int = 0
+    defaults: List[Any] = field(default_factory=list)
+    first_param: int = 0
+    is_static: bool = True
+
+    @property
+    def nlocals(self) -> int:
+        return len(self.varnames)
+
+    def line_at(self, offset: int) -> Optional[int]:
+        idx = offset // 2
+        return self.lines[idx] if 0 <= idx < len(self.lines) else None
+
+    def disassemble(self) -> str:
+        rows = [f"== {self.name} (locals={self.varnames}) =="]
+        for offset, opcode, arg in op.instructions(self.code):
+            detail = ""
+            if opcode in (op.LOAD_FAST, op.STORE_FAST, op.FETCH_FAST_W, op.INC_FAST, op.DEC_FAST):
+                detail = self.varnames[arg]
+            elif opcode in (
+                op.LOAD_CONST, op.CALL_FUNCTION, op.CALL_METHOD, op.CALL_STATIC,
+                op.NEW_OBJECT, op.LOAD_PROP, op.STORE_PROP, op.FETCH_PROP_W,
+            ):
+                detail = repr(self.consts[arg])
+            elif opcode in op.JUMPS:
+                detail = f"-> {arg}"
+            line = self.line_at(offset)
+            rows.append(f"{line or '':>4} {offset:>5} {op.opname(opcode):<18} {arg:<4} {detail}".rstrip())
+        return "\n".join(rows)
+
+
+@dataclass
+class Module:
+    """Resultado de compilar un programa: codigo principal, funciones y clases."""
+
+    main: CodeObject
+    functions: Dict[str, CodeObject] = field(default_factory=dict)
+    classes: Dict[str, PhpClass] = field(default_factory=dict)
+
+    def code_objects(self) -> List[CodeObject]:
+        objects = [self.main, *self.functions.values()]
+        for cls in self.classes.values():
+            objects.extend(cls.methods.values())
+        return objects
+
+    def disassemble(self) -> str:
+        return "\n\n".join(co.disassemble() for co in self.code_objects())
+
+
+_BINARY_OPS = {
+    "+": op.BINARY_ADD,
+    "-": op.BINARY_SUB,
+    "*": op.BINARY_MUL,
+    "/": op.BINARY_DIV,
+    "%": op.BINARY_MOD,
+    ".": op.BINARY_CONCAT,
+    "<": op.COMPARE_LT,
+    "<=": op.COMPARE_LE,
+    ">": op.COMPARE_GT,
+    ">=": op.COMPARE_GE,
+    "==": op.COMPARE_EQ,
+    "!=": op.COMPARE_NE,
+    "===": op.COMPARE_IDENT,
+    "!==": op.COMPARE_NIDENT,
+}
+
+# El parser produce "-"/"+" para los unarios (su tabla `opmap` admite tambien "u-"/"u+").
+_UNARY_OPS = {"!": op.UNARY_NOT, "-": op.UNARY_NEG, "+": op.UNARY_PLUS, "u-": op.UNARY_NEG, "u+": op.UNARY_PLUS}
+
+
+def constant_value(node: Any) -> Any:
+    """Evalua expresiones constantes (valores por defecto de parametros)."""
+    if isinstance(node, ast.NumberLit):
+        return node.value
+    if isinstance(node, ast.StringLit):
+        return unescape(node.value)
+    if isinstance(node, ast.BoolLit):
+        return node.value
+    if isinstance(node, ast.NullLit):
+        return None
+    if isinstance(node, ast.Unary) and node.op in ("-", "+", "u-", "u+"):
+        value = constant_value(node.expr)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return -value if node.op in ("-", "u-") else value
+    if isinstance(node, ast.Name) and len(node.parts) == 1 and node.parts[0] in CONSTANTS:
+        return CONSTANTS[node.parts[0]]
+    if isinstance(node, ast.ArrayLit):
+        arr = PhpArray()
+        for key, value in node.pairs:
+            if key is None:
+                arr.append(constant_value(value))
+            else:
+                arr.set(constant_value(key), constant_value(value))
+        return arr
+    raise CompileError("Expected a constant expression", find_lineno(node))
+
+
+class _CodeBuilder:
+    """Emite instrucciones para un solo objeto de codigo."""
+
+    def __init__(self, module: "BytecodeCompiler", co: CodeObject, class_key: Optional[str] = None) -> None:
+        self.module = module
+        self.co = co
+        self.class_key = class_key
+        self.lineno: Optional[int] = None
+        self._slots: Dict[str, int] = {name: idx for idx, name in enumerate(co.varnames)}
+        self._consts: Dict[Any, int] = {}
+
+    # --- emision ---
+    def emit(self, opcode: int, arg: int = 0) -> int:
+        offset = len(self.co.code)
+        self.co.code.append(opcode)
+        self.co.code.append(arg)
+        self.co.lines.append(self.lineno)
+        return offset
+
+    def here(self) -> int:
+        return len(self.co.code)
+
+    def patch(self, offset: int, target: Optional[int] = None) -> None:
+        self.co.code[offset + 1] = self.here() if target is None else target
+
+    def const(self, value: Any) -> int:
+        try:
+            key = (value.__class__, value)
+            hash(key)
+        except TypeError:
+            key = (value.__class__, id(value))
+        idx = self._consts.get(key)
+        if idx is None:
+            idx = self._consts[key] = len(self.co.consts)
+            self.co.consts.append(value)
+        return idx
+
+    def slot(self, name: str) -> int:
+        idx = self._slots.get(name)
+        if idx is None:
+            idx = self._slots[name] = len(self.co.varnames)
+            self.co.varnames.append(name)
+        return idx
+
+    def _track(self, node: Any) -> None:
+        lineno = getattr(node, "lineno", None)
+        if lineno is not None:
+            self.lineno = lineno
+
+    def error(self, message: str, node: Any = None) -> CompileError:
+        lineno = find_lineno(node) if node is not None else None
+        return CompileError(message, lineno if lineno is not None else self.lineno)
+
+    def finish(self) -> CodeObject:
+        self.emit(op.LOAD_CONST, self.const(None))
+        self.emit(op.RETURN_VALUE)
+        return self.co
+
+    # --- sentencias ---
+    def stmts(self, items: Sequence[Any]) -> None:
+        for item in items:
+            self.stmt(item)
+
+    def stmt(self, node: Any) -> None:
+        self._track(node)
+        handler: Optional[Callable[[Any], None]] = getattr(self, f"stmt_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported statement {node.__class__.__name__}", node)
+        handler(node)
+
+    def stmt_EmptyStmt(self, node: ast.EmptyStmt) -> None:
+        return
+
+    def stmt_Block(self, node: ast.Block) -> None:
+        self.stmts(node.stmts)
+
+    def stmt_NamespaceDecl(self, node: ast.NamespaceDecl) -> None:
+        self.module.names.enter_namespace(node.name)
+
+    def stmt_UseDecl(self, node: ast.UseDecl) -> None:
+        for parts in node.names:
+            self.module.names.add_use(parts)
+
+    def stmt_ClassDecl(self, node: ast.ClassDecl) -> None:
+        self.module.compile_class(node)
+
+    def stmt_FunctionDecl(self, node: ast.FunctionDecl) -> None:
+        self.module.compile_function(node)
+
+    def stmt_EchoStmt(self, node: ast.EchoStmt) -> None:
+        for expr in node.exprs:
+            self.expr(expr)
+            self.emit(op.ECHO)
+
+    def stmt_PrintStmt(self, node: ast.PrintStmt) -> None:
+        self.expr(node.expr)
+        self.emit(op.PRINT)
+        self.emit(op.POP_TOP)
+
+    def stmt_ReturnStmt(self, node: ast.ReturnStmt) -> None:
+        if node.expr is None:
+            self.emit(op.LOAD_CONST, self.const(None))
+        else:
+            self.expr(node.expr)
+        self.emit(op.RETURN_VALUE)
+
+    def stmt_IncludeStmt(self, node: Any) -> None:
+        raise self.error("include/require is not supported by the VM", node.expr)
+
+    stmt_RequireStmt = stmt_IncludeStmt
+
+    def stmt_VarDeclStmt(self, node: ast.VarDeclStmt) -> None:
+        for name, init in node.decls:
+            if init is not None:
+                self.expr(init)
+                self.emit(op.STORE_FAST, self.slot(name))
+            else:
+                self.slot(name)
+
+    def stmt_ExprStmt(self, node: ast.ExprStmt) -> None:
+        self.effect(node.expr)
+
+    def stmt_IfStmt(self, node: ast.IfStmt) -> None:
+        exits: List[int] = []
+        branches = [(node.cond, node.then), *node.elifs]
+        for idx, (cond, body) in enumerate(branches):
+            self.expr(cond)
+            skip = self.emit(op.POP_JUMP_IF_FALSE)
+            self.stmt(body)
+            if idx < len(branches) - 1 or node.els is not None:
+                exits.append(self.emit(op.JUMP))
+            self.patch(skip)
+        if node.els is not None:
+            self.stmt(node.els)
+        for jump in exits:
+            self.patch(jump)
+
+    def stmt_WhileStmt(self, node: ast.WhileStmt) -> None:
+        top = self.here()
+        self.expr(node.cond)
+        exit_jump = self.emit(op.POP_JUMP_IF_FALSE)
+        self.stmt(node.body)
+        self.emit(op.JUMP, top)
+        self.patch(exit_jump)
+
+    def stmt_ForStmt(self, node: ast.ForStmt) -> None:
+        for init in node.init or []:
+            if isinstance(init, tuple):
+                self.stmt_VarDeclStmt(ast.VarDeclStmt([init]))
+            else:
+                self.effect(init)
+        top = self.here()
+        exit_jump = None
+        if node.cond is not None:
+            self.expr(node.cond)
+            exit_jump = self.emit(op.POP_JUMP_IF_FALSE)
+        self.stmt(node.body)
+        for step in node.iters or []:
+            self.effect(step)
+        self.emit(op.JUMP, top)
+        if exit_jump is not None:
+            self.patch(exit_jump)
+
+    def stmt_ForeachStmt(self, node: ast.ForeachStmt) -> None:
+        self.expr(node.iterable)
+        self.emit(op.GET_ITER)
+        top = self.here()
+        loop = self.emit(op.FOR_ITER)
+        self.emit(op.STORE_FAST, self.slot(node.value))
+        if node.key is not None:
+            self.emit(op.STORE_FAST, self.slot(node.key))
+        else:
+            self.emit(op.POP_TOP)
+        self.stmt(node.body)
+        self.emit(op.JUMP, top)
+        self.patch(loop)
+
+    # --- expresiones ---
+    def effect(self, node: Any) -> None:
+        """Compila una expresion cuyo valor se descarta."""
+        self._track(node)
+        if isinstance(node, ast.Assign):
+            self.assign(node.target, node.value, keep=False)
+            return
+        if isinstance(node, (ast.PostfixUnary, ast.Unary)) and node.op in ("++", "--"):
+            if isinstance(node.expr, ast.Var):
+                self.emit(op.INC_FAST if node.op == "++" else op.DEC_FAST, self.slot(node.expr.name))
+            else:
+                self.assign(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)), keep=False)
+            return
+        self.expr(node)
+        self.emit(op.POP_TOP)
+
+    def expr(self, node: Any) -> None:
+        self._track(node)
+        handler = getattr(self, f"expr_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported expression {node.__class__.__name__}", node)
+        handler(node)
+
+    def expr_NumberLit(self, node: ast.NumberLit) -> None:
+        self.emit(op.LOAD_CONST, self.const(node.value))
+
+    def expr_StringLit(self, node: ast.StringLit) -> None:
+        self.emit(op.LOAD_CONST, self.const(unescape(node.value)))
+
+    def expr_BoolLit(self, node: ast.BoolLit) -> None:
+        self.emit(op.LOAD_CONST, self.const(node.value))
+
+    def expr_NullLit(self, node: ast.NullLit) -> None:
+        self.emit(op.LOAD_CONST, self.const(None))
+
+    def expr_Name(self, node: ast.Name) -> None:
+        name = node.parts[-1]
+        if len(node.parts) == 1 and name in CONSTANTS:
+            self.emit(op.LOAD_CONST, self.const(CONSTANTS[name]))
+            return
+        raise self.error(f"Undefined constant '{SEPARATOR.join(node.parts)}'", node)
+
+    def expr_Var(self, node: ast.Var) -> None:
+        self.emit(op.LOAD_FAST, self.slot(node.name))
+
+    def expr_ArrayLit(self, node: ast.ArrayLit) -> None:
+        for key, value in node.pairs:
+            if key is None:
+                self.emit(op.LOAD_CONST, self.const(op.NO_KEY))
+            else:
+                self.expr(key)
+            self.expr(value)
+        self.emit(op.BUILD_ARRAY, len(node.pairs))
+
+    def expr_Assign(self, node: ast.Assign) -> None:
+        self.assign(node.target, node.value, keep=True)
+
+    def expr_Binary(self, node: ast.Binary) -> None:
+        if node.op in ("&&", "||"):
+            self.expr(node.left)
+            short = self.emit(op.POP_JUMP_IF_FALSE if node.op == "&&" else op.POP_JUMP_IF_TRUE)
+            self.expr(node.right)
+            self.emit(op.TO_BOOL)
+            done = self.emit(op.JUMP)
+            self.patch(short)
+            self.emit(op.LOAD_CONST, self.const(node.op == "||"))
+            self.patch(done)
+            return
+        opcode = _BINARY_OPS.get(node.op)
+        if opcode is None:
+            raise self.error(f"Unsupported operator '{node.op}'", node)
+        self.expr(node.left)
+        self.expr(node.right)
+        self.emit(opcode)
+
+    def expr_Unary(self, node: ast.Unary) -> None:
+        if node.op in ("++", "--"):
+            # Prefijo: el resultado es el valor ya incrementado.
+            self.assign(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)), keep=True)
+            return
+        self.expr(node.expr)
+        self.emit(_UNARY_OPS[node.op])
+
+    def expr_PostfixUnary(self, node: ast.PostfixUnary) -> None:
+        # Sufijo: deja el valor anterior y descarta el resultado de la asignacion.
+        self.expr(node.expr)
+        self.assign(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)), keep=False)
+
+    def expr_Ternary(self, node: ast.Ternary) -> None:
+        self.expr(node.cond)
+        other = self.emit(op.POP_JUMP_IF_FALSE)
+        self.expr(node.if_true)
+        done = self.emit(op.JUMP)
+        self.patch(other)
+        self.expr(node.if_false)
+        self.patch(done)
+
+    def expr_Index(self, node: ast.Index) -> None:
+        self.expr(node.base)
+        self.expr(node.index)
+        self.emit(op.BINARY_INDEX)
+
+    def expr_Member(self, node: ast.Member) -> None:
+        self.expr(node.obj)
+        self.emit(op.LOAD_PROP, self.const(node.name))
+
+    def expr_StaticAccess(self, node: ast.StaticAccess) -> None:
+        raise self.error("Class constants and static properties are not supported by the VM", node)
+
+    def expr_New(self, node: ast.New) -> None:
+        for arg in node.args:
+            self.expr(arg)
+        self.emit(op.NEW_OBJECT, self.const((self.class_key_for(node.class_name), len(node.args))))
+
+    def expr_Call(self, node: ast.Call) -> None:
+        callee = node.callee
+        nargs = len(node.args)
+        if isinstance(callee, ast.Member):
+            self.expr(callee.obj)
+            for arg in node.args:
+                self.expr(arg)
+            self.emit(op.CALL_METHOD, self.const((callee.name.lower(), nargs)))
+            return
+        for arg in node.args:
+            self.expr(arg)
+        if isinstance(callee, ast.StaticAccess):
+            key = self.class_key_for(callee.qname)
+            self.emit(op.CALL_STATIC, self.const((key, callee.name.lower(), nargs)))
+        elif isinstance(callee, ast.Name):
+            self.emit(op.CALL_FUNCTION, self.const((self.module.names.function_key(callee.parts), nargs)))
+        else:
+            raise self.error("Dynamic calls are not supported by the VM", node)
+
+    def class_key_for(self, qname: ast.Name) -> str:
+        if len(qname.parts) == 1 and qname.parts[0].lower() in ("self", "static"):
+            if self.class_key is None:
+                raise self.error(f"Cannot use '{qname.parts[0]}' outside of a class", qname)
+            return self.class_key
+        return self.module.names.class_key(qname.parts)
+
+    # --- destinos de asignacion ---
+    def assign(self, target: Any, value: Any, keep: bool) -> None:
+        if isinstance(target, ast.Var):
+            self.expr(value)
+            if keep:
+                self.emit(op.DUP_TOP)
+            self.emit(op.STORE_FAST, self.slot(target.name))
+            return
+        if isinstance(target, ast.Index):
+            self.fetch_for_write(target.base)
+            self.expr(target.index)
+            self.expr(value)
+            self.emit(op.STORE_DIM)
+        elif isinstance(target, ast.Member):
+            self.expr(target.obj)
+            self.expr(value)
+            self.emit(op.STORE_PROP, self.const(target.name))
+        else:
+            raise self.error("Cannot assign to this expression", target)
+        if not keep:
+            self.emit(op.POP_TOP)
+
+    def fetch_for_write(self, node: Any) -> None:
+        """Apila el arreglo contenedor listo para modificarse en sitio."""
+        if isinstance(node, ast.Var):
+            self.emit(op.FETCH_FAST_W, self.slot(node.name))
+        elif isinstance(node, ast.Index):
+            self.fetch_for_write(node.base)
+            self.expr(node.index)
+            self.emit(op.FETCH_DIM_W)
+        elif isinstance(node, ast.Member):
+            self.expr(node.obj)
+            self.emit(op.FETCH_PROP_W, self.const(node.name))
+        else:
+            raise self.error("Cannot use this expression as an array to write into", node)
+
+
+class ProgramNames(NameResolver):
+    """Resolucion de funciones y clases de un programa a claves en minusculas.
+
+    Las declaraciones se registran antes de generar codigo para que las llamadas
+    se resuelvan en compilacion con las mismas reglas de namespaces que el
+    analizador semantico; los backends de ejecucion comparten esta clase.
+    """
+
+    def declare_program(self, program: ast.Program) -> None:
+        for item in program.items:
+            if isinstance(item, ast.NamespaceDecl):
+                self.enter_namespace(item.name)
+            elif isinstance(item, ast.ClassDecl):
+                self.declare(CLASS, item.name, item)
+            elif not isinstance(item, ast.UseDecl):
+                for node in ast.walk(item):
+                    if isinstance(node, ast.FunctionDecl):
+                        self.declare(FUNCTION, node.name, node)
+        self.enter_namespace([])
+
+    def function_key(self, parts: Sequence[str]) -> str:
+        found = self.resolve_function(parts)
+        if found is not None:
+            return found.qualified.lower()
+        if len(parts) == 1 and parts[0].lower() in BUILTINS:
+            return parts[0].lower()
+        return SEPARATOR.join(parts).lower()
+
+    def class_key(self, parts: Sequence[str]) -> str:
+        found = self.resolve_class(parts)
+        if found is not None:
+            return found.qualified.lower()
+        return self.class_name(parts).lower()
+
+
+class BytecodeCompiler:
+    """Compila un `Program` completo a un `Module`."""
+
+    def __init__(self) -> None:
+        self.names = ProgramNames()
+        self.functions: Dict[str, CodeObject] = {}
+        self.classes: Dict[str, PhpClass] = {}
+
+    def compile(self, program: ast.Program) -> Module:
+        self.names.declare_program(program)
+        builder = _CodeBuilder(self, CodeObject(MAIN))
+        builder.stmts(program.items)
+        return Module(builder.finish(), self.functions, self.classes)
+
+    # --- declaraciones ---
+    def _code_for(self, func: ast.FunctionDecl, name: str, is_method: bool) -> CodeObject:
+        co = CodeObject(name, is_static=not is_method or func.is_static)
+        if not co.is_static:
+            co.varnames.append(THIS)
+            co.first_param = 1
+        required = 0
+        seen_default = False
+        for param in func.params:
+            co.varnames.append(param.name)
+            if param.default is None:
+                if seen_default:
+                    raise CompileError(
+                        f"Required parameter {param.name} follows an optional parameter", find_lineno(param)
+                    )
+                required += 1
+            else:
+                seen_default = True
+                co.defaults.append(constant_value(param.default))
+        co.argcount = len(func.params)
+        co.min_args = required
+        return co
+
+    def compile_function(self, func: ast.FunctionDecl) -> None:
+        qualified = self.names.qualify(func.name)
+        key = qualified.lower()
+        if key in self.functions:
+            raise CompileError(f"Cannot redeclare function {qualified}()", find_lineno(func))
+        co = self._code_for(func, qualified, is_method=False)
+        self.functions[key] = co
+        builder = _CodeBuilder(self, co)
+        builder.lineno = find_lineno(func)
+        builder.stmts(func.body.stmts)
+        builder.finish()
+
+    def compile_class(self, node: ast.ClassDecl) -> None:
+        qualified = self.names.qualify(node.name)
+        key = qualified.lower()
+        if key in self.classes:
+            raise CompileError(f"Cannot redeclare class {qualified}", find_lineno(node))
+        cls = PhpClass(qualified, {})
+        self.classes[key] = cls
+        for method in node.members:
+            if not isinstance(method, ast.FunctionDecl):
+                continue
+            co = self._code_for(method, f"{qualified}::{method.name}", is_method=True)
+            cls.methods[method.name.lower()] = co
+            if method.is_static:
+                cls.static_methods.add(method.name.lower())
+            builder = _CodeBuilder(self, co, class_key=key)
+            builder.lineno = find_lineno(method)
+            builder.stmts(method.body.stmts)
+            builder.finish()
+
+
+def compile_program(program: ast.Program) -> Module:
+    return BytecodeCompiler().compile(program)
+
+
+def parse_program(code: str) -> Tuple[Optional[ast.Program], Optional[str]]:
+    """Parsea codigo para ejecutarlo: `(ast, None)` o `(None, mensajes de error)`."""
+    from ..facade import parse_source
+
+    parsed = parse_source(code)
+    if parsed.ast is None or parsed.lexical_errors or parsed.syntax_errors:
+        messages = [msg["message"] for msg in parsed.lexical_messages + parsed.syntax_messages]
+        return None, "\n".join(messages) or "Parse error"
+    return parsed.ast, None
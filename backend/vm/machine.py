@@ -0,0 +1,461 @@
+"""Maquina virtual de pila que ejecuta los objetos de codigo del compilador."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .compiler import CodeObject, Module
+from .opcodes import (
+    BINARY_ADD,
+    BINARY_CONCAT,
+    BINARY_DIV,
+    BINARY_INDEX,
+    BINARY_MOD,
+    BINARY_MUL,
+    BINARY_SUB,
+    BUILD_ARRAY,
+    CALL_FUNCTION,
+    CALL_METHOD,
+    CALL_STATIC,
+    COMPARE_EQ,
+    COMPARE_GE,
+    COMPARE_GT,
+    COMPARE_IDENT,
+    COMPARE_LE,
+    COMPARE_LT,
+    COMPARE_NE,
+    COMPARE_NIDENT,
+    DEC_FAST,
+    DUP_TOP,
+    ECHO,
+    FETCH_DIM_W,
+    FETCH_FAST_W,
+    FETCH_PROP_W,
+    FOR_ITER,
+    GET_ITER,
+    INC_FAST,
+    JUMP,
+    LOAD_CONST,
+    LOAD_FAST,
+    LOAD_PROP,
+    NEW_OBJECT,
+    NO_KEY,
+    POP_JUMP_IF_FALSE,
+    POP_JUMP_IF_TRUE,
+    POP_TOP,
+    PRINT,
+    RETURN_VALUE,
+    STORE_DIM,
+    STORE_FAST,
+    STORE_PROP,
+    TO_BOOL,
+    UNARY_NEG,
+    UNARY_NOT,
+    UNARY_PLUS,
+    opname,
+)
+from .runtime import (
+    BUILTINS,
+    INT_MAX,
+    INT_MIN,
+    PhpArray,
+    PhpObject,
+    PhpRuntimeError,
+    add,
+    concat,
+    dec,
+    div,
+    inc,
+    int_result,
+    less,
+    less_equal,
+    loose_equals,
+    mod,
+    mul,
+    neg,
+    normalize_key,
+    strict_equals,
+    sub,
+    to_bool,
+    to_number,
+    to_str,
+    type_name,
+    writable,
+)
+
+DEFAULT_MAX_DEPTH = 256
+
+_STOP = object()
+
+
+@dataclass
+class ExecutionResult:
+    ok: bool
+    output: str
+    error: Optional[str] = None
+    lineno: Optional[int] = None
+    steps: int = 0
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class VirtualMachine:
+    """Interprete de bytecode con despacho por cadena de comparaciones.
+
+    Cada marco usa una lista de slots locales y una pila de operandos propia; las
+    instrucciones mas frecuentes van primero en la cadena y las operaciones entre
+    enteros se resuelven en linea antes de recurrir a `runtime`.
+    """
+
+    def __init__(self, module: Module, max_steps: Optional[int] = None, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.module = module
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.output: List[str] = []
+        self.steps = 0
+        self._depth = 0
+
+    def run(self) -> ExecutionResult:
+        self.output = []
+        self.steps = 0
+        started = time.perf_counter()
+        try:
+            self.execute(self.module.main, [None] * self.module.main.nlocals)
+        except PhpRuntimeError as exc:
+            return ExecutionResult(
+                ok=False,
+                output="".join(self.output),
+                error=str(exc),
+                lineno=exc.lineno,
+                steps=self.steps,
+                elapsed=time.perf_counter() - started,
+            )
+        return ExecutionResult(
+            ok=True, output="".join(self.output), steps=self.steps, elapsed=time.perf_counter() - started
+        )
+
+    # --- llamadas ---
+    def _frame(self, co: CodeObject, args: List[Any], this: Any = None) -> List[Any]:
+        nargs = len(args)
+        if nargs < co.min_args:
+            raise PhpRuntimeError(
+                f"Too few arguments to function {co.name}(), {nargs} passed and "
+                f"{'exactly' if co.min_args == co.argcount else 'at least'} {co.min_args} expected"
+            )
+        fast: List[Any] = [None] * co.nlocals
+        base = co.first_param
+        if base:
+            fast[0] = this
+        for idx in range(min(nargs, co.argcount)):
+            value = args[idx]
+            if value.__class__ is PhpArray:
+                value.shared = True
+            fast[base + idx] = value
+        for idx in range(nargs, co.argcount):
+            value = co.defaults[idx - co.min_args]
+            if value.__class__ is PhpArray:
+                value.shared = True
+            fast[base + idx] = value
+        return fast
+
+    def call(self, co: CodeObject, args: List[Any], this: Any = None) -> Any:
+        if self._depth >= self.max_depth:
+            raise PhpRuntimeError(f"Maximum function nesting level of {self.max_depth} reached")
+        self._depth += 1
+        try:
+            return self.execute(co, self._frame(co, args, this))
+        finally:
+            self._depth -= 1
+
+    def call_function(self, key: str, args: List[Any]) -> Any:
+        co = self.module.functions.get(key)
+        if co is not None:
+            return self.call(co, args)
+        builtin = BUILTINS.get(key)
+        if builtin is None:
+            raise PhpRuntimeError(f"Call to undefined function {key}()")
+        try:
+            return builtin(*args)
+        except (TypeError, AttributeError, ValueError) as exc:
+            raise PhpRuntimeError(f"{key}(): invalid arguments ({exc})") from exc
+
+    def call_method(self, obj: Any, name: str, args: List[Any]) -> Any:
+        if not isinstance(obj, PhpObject):
+            raise PhpRuntimeError(f"Call to a member function {name}() on {type_name(obj)}")
+        co = obj.cls.methods.get(name)
+        if co is None:
+            raise PhpRuntimeError(f"Call to undefined method {obj.cls.name}::{name}()")
+        return self.call(co, args, None if co.is_static else obj)
+
+    def call_static(self, class_key: str, name: str, args: List[Any]) -> Any:
+        cls = self._class(class_key)
+        co = cls.methods.get(name)
+        if co is None:
+            raise PhpRuntimeError(f"Call to undefined method {cls.name}::{name}()")
+        if not co.is_static:
+            raise PhpRuntimeError(f"Non-static method {co.name}() cannot be called statically")
+        return self.call(co, args)
+
+    def new_object(self, class_key: str, args: List[Any]) -> PhpObject:
+        cls = self._class(class_key)
+        obj = PhpObject(cls)
+        ctor = cls.methods.get("__construct")
+        if ctor is not None:
+            self.call(ctor, args, obj)
+        return obj
+
+    def _class(self, key: str):
+        cls = self.module.classes.get(key)
+        if cls is None:
+            raise PhpRuntimeError(f'Class "{key}" not found')
+        return cls
+
+    # --- bucle de despacho ---
+    def execute(self, co: CodeObject, fast: List[Any]) -> Any:
+        code = co.code
+        consts = co.consts
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        steps = 0
+        limit = self.max_steps
+        try:
+            while True:
+                opcode = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+                steps += 1
+                if opcode == LOAD_FAST:
+                    push(fast[arg])
+                elif opcode == LOAD_CONST:
+                    push(consts[arg])
+                elif opcode == STORE_FAST:
+                    value = pop()
+                    if value.__class__ is PhpArray:
+                        value.shared = True
+                    fast[arg] = value
+                elif opcode == POP_JUMP_IF_FALSE:
+                    value = pop()
+                    if not (value if value.__class__ is bool else to_bool(value)):
+                        pc = arg
+                elif opcode == JUMP:
+                    if arg < pc and limit is not None and self.steps + steps > limit:
+                        raise PhpRuntimeError(f"Execution aborted after {limit} steps")
+                    pc = arg
+                elif opcode == INC_FAST:
+                    value = fast[arg]
+                    fast[arg] = value + 1 if value.__class__ is int and value < INT_MAX else inc(value)
+                elif opcode == COMPARE_LT:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = left < right if left.__class__ is int and right.__class__ is int else less(left, right)
+                elif opcode == BINARY_ADD:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = int_result(left + right) if left.__class__ is int and right.__class__ is int else add(left, right)
+                elif opcode == BINARY_SUB:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = int_result(left - right) if left.__class__ is int and right.__class__ is int else sub(left, right)
+                elif opcode == BINARY_MUL:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = int_result(left * right) if left.__class__ is int and right.__class__ is int else mul(left, right)
+                elif opcode == BINARY_INDEX:
+                    key = pop()
+                    base = stack[-1]
+                    if base.__class__ is PhpArray:
+                        stack[-1] = base.data.get(key if key.__class__ is int else normalize_key(key))
+                    else:
+                        stack[-1] = self._index_scalar(base, key)
+                elif opcode == POP_TOP:
+                    pop()
+                elif opcode == DUP_TOP:
+                    push(stack[-1])
+                elif opcode == COMPARE_LE:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = left <= right if left.__class__ is int and right.__class__ is int else less_equal(left, right)
+                elif opcode == COMPARE_GT:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = left > right if left.__class__ is int and right.__class__ is int else less(right, left)
+                elif opcode == COMPARE_GE:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = left >= right if left.__class__ is int and right.__class__ is int else less_equal(right, left)
+                elif opcode == COMPARE_EQ:
+                    right = pop()
+                    left = stack[-1]
+                    stack[-1] = left == right if left.__class__ is int and right.__class__ is int else loose_equals(left, right)
+                elif opcode == COMPARE_NE:
+                    right = pop()
+                    stack[-1] = not loose_equals(stack[-1], right)
+                elif opcode == COMPARE_IDENT:
+                    right = pop()
+                    stack[-1] = strict_equals(stack[-1], right)
+                elif opcode == COMPARE_NIDENT:
+                    right = pop()
+                    stack[-1] = not strict_equals(stack[-1], right)
+                elif opcode == BINARY_MOD:
+                    right = pop()
+                    stack[-1] = mod(stack[-1], right)
+                elif opcode == BINARY_DIV:
+                    right = pop()
+                    stack[-1] = div(stack[-1], right)
+                elif opcode == BINARY_CONCAT:
+                    right = pop()
+                    stack[-1] = concat(stack[-1], right)
+                elif opcode == POP_JUMP_IF_TRUE:
+                    if to_bool(pop()):
+                        pc = arg
+                elif opcode == CALL_FUNCTION:
+                    key, nargs = consts[arg]
+                    args = stack[len(stack) - nargs:] if nargs else []
+                    del stack[len(stack) - nargs:]
+                    self.steps += steps
+                    steps = 0
+                    push(self.call_function(key, args))
+                elif opcode == CALL_METHOD:
+                    name, nargs = consts[arg]
+                    args = stack[len(stack) - nargs:] if nargs else []
+                    del stack[len(stack) - nargs:]
+                    obj = pop()
+                    self.steps += steps
+                    steps = 0
+                    push(self.call_method(obj, name, args))
+                elif opcode == RETURN_VALUE:
+                    return pop()
+                elif opcode == FETCH_FAST_W:
+                    value = fast[arg]
+                    if value.__class__ is not PhpArray or value.shared:
+                        value = fast[arg] = writable(value)
+                    push(value)
+                elif opcode == STORE_DIM:
+                    value = pop()
+                    key = pop()
+                    if value.__class__ is PhpArray:
+                        value.shared = True
+                    pop().set(key, value)
+                    push(value)
+                elif opcode == FETCH_DIM_W:
+                    key = pop()
+                    container = stack[-1]
+                    child = container.data.get(normalize_key(key))
+                    if child.__class__ is not PhpArray or child.shared:
+                        child = writable(child)
+                        container.set(key, child)
+                    stack[-1] = child
+                elif opcode == LOAD_PROP:
+                    obj = stack[-1]
+                    if obj.__class__ is PhpObject:
+                        stack[-1] = obj.props.get(consts[arg])
+                    else:
+                        stack[-1] = None
+                elif opcode == STORE_PROP:
+                    value = pop()
+                    obj = pop()
+                    if obj.__class__ is not PhpObject:
+                        raise PhpRuntimeError(f"Attempt to assign property \"{consts[arg]}\" on {type_name(obj)}")
+                    if value.__class__ is PhpArray:
+                        value.shared = True
+                    obj.props[consts[arg]] = value
+                    push(value)
+                elif opcode == FETCH_PROP_W:
+                    obj = pop()
+                    if obj.__class__ is not PhpObject:
+                        raise PhpRuntimeError(f"Attempt to modify property \"{consts[arg]}\" on {type_name(obj)}")
+                    value = obj.props.get(consts[arg])
+                    if value.__class__ is not PhpArray or value.shared:
+                        value = obj.props[consts[arg]] = writable(value)
+                    push(value)
+                elif opcode == FOR_ITER:
+                    item = next(stack[-1], _STOP)
+                    if item is _STOP:
+                        pop()
+                        pc = arg
+                    else:
+                        push(item[0])
+                        push(item[1])
+                elif opcode == GET_ITER:
+                    iterable = pop()
+                    if iterable.__class__ is PhpArray:
+                        push(iter(iterable.items()))
+                    elif iterable.__class__ is PhpObject:
+                        push(iter(list(iterable.props.items())))
+                    else:
+                        raise PhpRuntimeError(
+                            f"foreach() argument must be of type array|object, {type_name(iterable)} given"
+                        )
+                elif opcode == BUILD_ARRAY:
+                    arr = PhpArray()
+                    if arg:
+                        items = stack[len(stack) - 2 * arg:]
+                        del stack[len(stack) - 2 * arg:]
+                        for idx in range(0, len(items), 2):
+                            value = items[idx + 1]
+                            if value.__class__ is PhpArray:
+                                value.shared = True
+                            if items[idx] is NO_KEY:
+                                arr.append(value)
+                            else:
+                                arr.set(items[idx], value)
+                    push(arr)
+                elif opcode == ECHO:
+                    self.output.append(to_str(pop()))
+                elif opcode == PRINT:
+                    self.output.append(to_str(pop()))
+                    push(1)
+                elif opcode == UNARY_NOT:
+                    stack[-1] = not to_bool(stack[-1])
+                elif opcode == UNARY_NEG:
+                    stack[-1] = neg(stack[-1])
+                elif opcode == UNARY_PLUS:
+                    stack[-1] = to_number(stack[-1])
+                elif opcode == TO_BOOL:
+                    stack[-1] = to_bool(stack[-1])
+                elif opcode == DEC_FAST:
+                    value = fast[arg]
+                    fast[arg] = value - 1 if value.__class__ is int and value > INT_MIN else dec(value)
+                elif opcode == CALL_STATIC:
+                    class_key, name, nargs = consts[arg]
+                    args = stack[len(stack) - nargs:] if nargs else []
+                    del stack[len(stack) - nargs:]
+                    self.steps += steps
+                    steps = 0
+                    push(self.call_static(class_key, name, args))
+                elif opcode == NEW_OBJECT:
+                    class_key, nargs = consts[arg]
+                    args = stack[len(stack) - nargs:] if nargs else []
+                    del stack[len(stack) - nargs:]
+                    self.steps += steps
+                    steps = 0
+                    push(self.new_object(class_key, args))
+                else:
+                    raise PhpRuntimeError(f"Unknown opcode {opname(opcode)}")
+        except PhpRuntimeError as exc:
+            if exc.lineno is None:
+                exc.lineno = co.line_at(pc - 2)
+            raise
+        finally:
+            self.steps += steps
+
+    @staticmethod
+    def _index_scalar(base: Any, key: Any) -> Any:
+        if base is None:
+            return None
+        if isinstance(base, str):
+            idx = int(to_number(key))
+            if -len(base) <= idx < len(base):
+                return base[idx]
+            return ""
+        raise PhpRuntimeError(f"Cannot use a scalar value of type {type_name(base)} as an array")
+
+
+def run_module(module: Module, max_steps: Optional[int] = None) -> ExecutionResult:
+    return VirtualMachine(module, max_steps=max_steps).run()
+
@@ -0,0 +1,99 @@
+"""Conjunto de instrucciones de la VM de pila.
+
+Cada instruccion ocupa dos enteros en el arreglo de codigo: `opcode, argumento`.
+Las instrucciones sin argumento usan 0. Los numeros se agrupan de forma que las
+mas frecuentes en bucles queden primero en la cadena de despacho de la VM.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+# --- pila y variables ---
+LOAD_FAST = 1  # arg: slot local
+STORE_FAST = 2  # arg: slot local
+LOAD_CONST = 3  # arg: indice en el pool de constantes
+POP_TOP = 4
+DUP_TOP = 5
+
+# --- saltos ---
+JUMP = 10  # arg: destino absoluto
+POP_JUMP_IF_FALSE = 11
+POP_JUMP_IF_TRUE = 12
+
+# --- aritmetica y comparacion ---
+BINARY_ADD = 20
+BINARY_SUB = 21
+BINARY_MUL = 22
+BINARY_DIV = 23
+BINARY_MOD = 24
+BINARY_CONCAT = 25
+COMPARE_LT = 26
+COMPARE_LE = 27
+COMPARE_GT = 28
+COMPARE_GE = 29
+COMPARE_EQ = 30
+COMPARE_NE = 31
+COMPARE_IDENT = 32
+COMPARE_NIDENT = 33
+UNARY_NOT = 34
+UNARY_NEG = 35
+UNARY_PLUS = 36
+TO_BOOL = 37
+INC_FAST = 38  # arg: slot; incremento in situ para `$i++` como sentencia
+DEC_FAST = 39
+
+# --- llamadas ---
+CALL_FUNCTION = 40  # arg: constante (nombre, nargs)
+CALL_METHOD = 41  # arg: constante (metodo, nargs); pila: objeto, args...
+CALL_STATIC = 42  # arg: constante (clase, metodo, nargs)
+NEW_OBJECT = 43  # arg: constante (clase, nargs)
+RETURN_VALUE = 44
+
+# --- arreglos y objetos ---
+BUILD_ARRAY = 50  # arg: pares; pila: clave, valor, ... (clave NO_KEY => append)
+BINARY_INDEX = 51
+FETCH_FAST_W = 52  # arg: slot; arreglo propio del slot para escribir
+FETCH_DIM_W = 53  # pila: contenedor, clave -> subarreglo propio
+STORE_DIM = 54  # pila: contenedor, clave, valor -> valor
+LOAD_PROP = 55  # arg: constante (nombre)
+STORE_PROP = 56  # pila: objeto, valor -> valor
+FETCH_PROP_W = 57  # pila: objeto -> arreglo propio de la propiedad
+GET_ITER = 58
+FOR_ITER = 59  # arg: destino al agotarse; apila clave, valor
+
+# --- salida ---
+ECHO = 60
+PRINT = 61
+
+NAMES: Dict[int, str] = {
+    value: name for name, value in dict(globals()).items() if name.isupper() and isinstance(value, int)
+}
+
+JUMPS = frozenset({JUMP, POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE, FOR_ITER})
+
+
+class _NoKey:
+    """Marcador de `[valor]` sin clave en BUILD_ARRAY."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "NO_KEY"
+
+
+NO_KEY = _NoKey()
+
+
+def opname(op: int) -> str:
+    return NAMES.get(op, f"<{op}>")
+
+
+def instructions(code: List[int]):
+    """Itera `(offset, opcode, arg)` sobre un arreglo de codigo."""
+    for offset in range(0, len(code), 2):
+        yield offset, code[offset], code[offset + 1]
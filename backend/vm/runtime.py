@@ -0,0 +1,628 @@
+"""Semantica de valores PHP compartida por los backends de ejecucion."""
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class PhpRuntimeError(Exception):
+    """Error fatal durante la ejecucion de un programa PHP."""
+
+    def __init__(self, message: str, lineno: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.lineno = lineno
+
+    def __str__(self) -> str:
+        suffix = f" (linea {self.lineno})" if self.lineno is not None else ""
+        return f"[Runtime] {self.message}{suffix}"
+
+
+# === ARREGLOS ===
+def normalize_key(key: Any) -> Any:
+    """Normaliza claves como PHP: "5" -> 5, true -> 1, null -> "", 1.7 -> 1."""
+    if isinstance(key, bool):
+        return int(key)
+    if isinstance(key, int):
+        return key
+    if isinstance(key, str):
+        if key.isdigit() and (key == "0" or key[0] != "0"):
+            return int(key)
+        if key.startswith("-") and key[1:].isdigit() and key[1:2] != "0":
+            return int(key)
+        return key
+    if isinstance(key, float):
+        return int(key)
+    if key is None:
+        return ""
+    raise PhpRuntimeError(f"Illegal offset type {type_name(key)}")
+
+
+# Clave de `PhpArray.set` que agrega al final (`$a[] = v`, `[v]`); `None` es la clave null de PHP.
+_APPEND = object()
+
+
+class PhpArray:
+    """Arreglo ordenado de PHP con copia perezosa al asignar.
+
+    Asignar un arreglo a una variable o pasarlo como argumento lo marca como
+    compartido (`shared`); la primera escritura sobre un arreglo compartido
+    trabaja sobre una copia, lo que reproduce la semantica de copia por valor
+    sin copiar en cada asignacion.
+    """
+
+    __slots__ = ("data", "next_index", "shared")
+
+    def __init__(self, data: Optional[Dict[Any, Any]] = None, next_index: int = 0) -> None:
+        self.data: Dict[Any, Any] = data if data is not None else {}
+        self.next_index = next_index
+        self.shared = False
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "PhpArray":
+        return cls(dict(enumerate(values)), len(values))
+
+    def copy(self) -> "PhpArray":
+        # La copia es superficial: los subarreglos pasan a estar compartidos.
+        for value in self.data.values():
+            if value.__class__ is PhpArray:
+                value.shared = True
+        return PhpArray(dict(self.data), self.next_index)
+
+    def append(self, value: Any) -> None:
+        self.data[self.next_index] = value
+        self.next_index += 1
+
+    def set(self, key: Any, value: Any) -> None:
+        if key is _APPEND:
+            self.append(value)
+            return
+        key = normalize_key(key)
+        self.data[key] = value
+        if isinstance(key, int) and key >= self.next_index:
+            self.next_index = key + 1
+
+    def get(self, key: Any) -> Any:
+        return self.data.get(normalize_key(key))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.data)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        return list(self.data.items())
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PhpArray) and strict_equals(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:  # pragma: no cover - depuracion
+        return f"PhpArray({self.data!r})"
+
+
+def share(value: Any) -> Any:
+    """Marca un arreglo como compartido al copiarse por asignacion."""
+    if value.__class__ is PhpArray:
+        value.shared = True
+    return value
+
+
+def writable(value: Any) -> PhpArray:
+    """Devuelve un arreglo propio para escribir (copia si estaba compartido)."""
+    if value.__class__ is PhpArray:
+        return value.copy() if value.shared else value
+    if value is None:
+        return PhpArray()
+    raise PhpRuntimeError(f"Cannot use a scalar value of type {type_name(value)} as an array")
+
+
+def array_from_list(values: List[Any]) -> PhpArray:
+    """`[a, b, c]`: los subarreglos quedan compartidos con su origen."""
+    for value in values:
+        if value.__class__ is PhpArray:
+            value.shared = True
+    return PhpArray.from_list(values)
+
+
+def array_from_pairs(pairs: List[Tuple[Any, Any]]) -> PhpArray:
+    """`[k => v, ...]`; la clave `_APPEND` agrega al final (`None` es la clave `""`)."""
+    arr = PhpArray()
+    for key, value in pairs:
+        if value.__class__ is PhpArray:
+            value.shared = True
+        arr.set(key, value)
+    return arr
+
+
+def index(base: Any, key: Any) -> Any:
+    """Lectura `$base[$key]`; claves ausentes producen null."""
+    if base.__class__ is PhpArray:
+        return base.data.get(key if key.__class__ is int else normalize_key(key))
+    if base is None:
+        return None
+    if isinstance(base, str):
+        idx = int(to_number(key))
+        if -len(base) <= idx < len(base):
+            return base[idx]
+        return ""
+    raise PhpRuntimeError(f"Cannot use a scalar value of type {type_name(base)} as an array")
+
+
+def fetch_dim_w(container: PhpArray, key: Any) -> PhpArray:
+    """Subarreglo `$container[$key]` listo para escribir en sitio."""
+    child = container.data.get(normalize_key(key))
+    if child.__class__ is not PhpArray or child.shared:
+        child = writable(child)
+        container.set(key, child)
+    return child
+
+
+def store_dim(container: PhpArray, key: Any, value: Any) -> Any:
+    if value.__class__ is PhpArray:
+        value.shared = True
+    container.set(key, value)
+    return value
+
+
+# === OBJETOS ===
+class PhpClass:
+    """Clase en tiempo de ejecucion: nombre y tabla de metodos (en minusculas)."""
+
+    __slots__ = ("name", "methods", "static_methods")
+
+    def __init__(self, name: str, methods: Dict[str, Any], static_methods: Optional[set] = None) -> None:
+        self.name = name
+        self.methods = methods
+        self.static_methods = static_methods or set()
+
+
+class PhpObject:
+    __slots__ = ("cls", "props")
+
+    def __init__(self, cls: PhpClass) -> None:
+        self.cls = cls
+        self.props: Dict[str, Any] = {}
+
+
+def get_prop(obj: Any, name: str) -> Any:
+    if obj.__class__ is PhpObject:
+        return obj.props.get(name)
+    return None
+
+
+def store_prop(obj: Any, name: str, value: Any) -> Any:
+    if obj.__class__ is not PhpObject:
+        raise PhpRuntimeError(f'Attempt to assign property "{name}" on {type_name(obj)}')
+    if value.__class__ is PhpArray:
+        value.shared = True
+    obj.props[name] = value
+    return value
+
+
+def fetch_prop_w(obj: Any, name: str) -> PhpArray:
+    if obj.__class__ is not PhpObject:
+        raise PhpRuntimeError(f'Attempt to modify property "{name}" on {type_name(obj)}')
+    value = obj.props.get(name)
+    if value.__class__ is not PhpArray or value.shared:
+        value = obj.props[name] = writable(value)
+    return value
+
+
+def iterate(value: Any) -> List[Tuple[Any, Any]]:
+    """Pares `clave, valor` que recorre `foreach` (instantanea del contenido)."""
+    if value.__class__ is PhpArray:
+        return value.items()
+    if value.__class__ is PhpObject:
+        return list(value.props.items())
+    raise PhpRuntimeError(f"foreach() argument must be of type array|object, {type_name(value)} given")
+
+
+# === CONVERSIONES ===
+def type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, PhpArray):
+        return "array"
+    if isinstance(value, PhpObject):
+        return value.cls.name
+    return type(value).__name__
+
+
+def to_bool(value: Any) -> bool:
+    if value.__class__ is bool:
+        return value
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value != "" and value != "0"
+    if isinstance(value, PhpArray):
+        return len(value) > 0
+    if isinstance(value, PhpObject):
+        return True
+    return value != 0
+
+
+def _numeric_prefix(text: str) -> Tuple[Any, bool]:
+    """Convierte un string a numero; el booleano indica si era numerico completo."""
+    stripped = text.strip()
+    try:
+        return int(stripped), True
+    except ValueError:
+        pass
+    try:
+        number = float(stripped)
+        if math.isfinite(number) or stripped.lower() in ("inf", "-inf"):
+            return number, True
+    except ValueError:
+        pass
+    end = 0
+    for idx, ch in enumerate(stripped):
+        if ch.isdigit() or (ch in "+-" and idx == 0) or ch == ".":
+            end = idx + 1
+        else:
+            break
+    head = stripped[:end]
+    for conv in (int, float):
+        try:
+            return conv(head), False
+        except ValueError:
+            continue
+    return 0, False
+
+
+def is_numeric_string(value: Any) -> bool:
+    return isinstance(value, str) and _numeric_prefix(value)[1]
+
+
+def to_number(value: Any) -> Any:
+    cls = value.__class__
+    if cls is int or cls is float:
+        return value
+    if cls is bool:
+        return int(value)
+    if value is None:
+        return 0
+    if cls is str:
+        return _numeric_prefix(value)[0]
+    if cls is PhpArray:
+        raise PhpRuntimeError("Unsupported operand types: array")
+    raise PhpRuntimeError(f"Unsupported operand types: {type_name(value)}")
+
+
+def to_int(value: Any) -> int:
+    number = to_number(value)
+    return int(number) if isinstance(number, float) and math.isfinite(number) else number
+
+
+def format_float(value: float) -> str:
+    if math.isnan(value):
+        return "NAN"
+    if math.isinf(value):
+        return "INF" if value > 0 else "-INF"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    text = f"{value:.14G}"
+    if "E" in text:
+        mantissa, exp = text.split("E")
+        return f"{mantissa}E{'+' if not exp.startswith('-') else '-'}{exp.lstrip('+-').lstrip('0') or '0'}"
+    return text
+
+
+def to_str(value: Any) -> str:
+    cls = value.__class__
+    if cls is str:
+        return value
+    if cls is int:
+        return str(value)
+    if cls is bool:
+        return "1" if value else ""
+    if value is None:
+        return ""
+    if cls is float:
+        return format_float(value)
+    if cls is PhpArray:
+        return "Array"
+    if cls is PhpObject:
+        raise PhpRuntimeError(f"Object of class {value.cls.name} could not be converted to string")
+    return str(value)
+
+
+# === OPERADORES ===
+INT_MAX = 2**63 - 1
+INT_MIN = -(2**63)
+
+
+def int_result(value: Any) -> Any:
+    """Resultado aritmetico como en PHP: un entero fuera de 64 bits con signo pasa a float.
+
+    Es el unico punto de desborde: lo usan estos operadores y los caminos rapidos
+    de la VM, del codigo transpilado y de la maquina del IR.
+    """
+    if value.__class__ is int and not INT_MIN <= value <= INT_MAX:
+        return float(value)
+    return value
+
+
+def add(a: Any, b: Any) -> Any:
+    if a.__class__ is int and b.__class__ is int:
+        return int_result(a + b)
+    if isinstance(a, PhpArray) and isinstance(b, PhpArray):
+        result = a.copy()
+        for key, val in b.data.items():
+            if key not in result.data:
+                result.set(key, val)
+        return result
+    return int_result(to_number(a) + to_number(b))
+
+
+def sub(a: Any, b: Any) -> Any:
+    if a.__class__ is int and b.__class__ is int:
+        return int_result(a - b)
+    return int_result(to_number(a) - to_number(b))
+
+
+def mul(a: Any, b: Any) -> Any:
+    if a.__class__ is int and b.__class__ is int:
+        return int_result(a * b)
+    return int_result(to_number(a) * to_number(b))
+
+
+def div(a: Any, b: Any) -> Any:
+    x, y = to_number(a), to_number(b)
+    if y == 0:
+        raise PhpRuntimeError("Division by zero")
+    if isinstance(x, int) and isinstance(y, int) and x % y == 0:
+        return int_result(x // y)
+    return x / y
+
+
+def mod(a: Any, b: Any) -> int:
+    x, y = to_int(a), to_int(b)
+    if y == 0:
+        raise PhpRuntimeError("Modulo by zero")
+    result = abs(x) % abs(y)
+    return -result if x < 0 else result
+
+
+def concat(a: Any, b: Any) -> str:
+    if a.__class__ is str and b.__class__ is str:
+        return a + b
+    return to_str(a) + to_str(b)
+
+
+def concat_all(*parts: Any) -> str:
+    """Cadena `a . b . c ...` en una sola union."""
+    return "".join([p if p.__class__ is str else to_str(p) for p in parts])
+
+
+def neg(a: Any) -> Any:
+    return int_result(-to_number(a))
+
+
+_INC_RANGES = (("a", "z"), ("A", "Z"), ("0", "9"))
+
+
+def _increment_string(text: str) -> str:
+    """`"a"++ -> "b"`, `"Az"++ -> "Ba"`, `"zz"++ -> "aaa"`, `"a9"++ -> "b0"` como en PHP."""
+    chars = list(text)
+    for pos in range(len(chars) - 1, -1, -1):
+        for first, last in _INC_RANGES:
+            if first <= chars[pos] <= last:
+                break
+        else:
+            return "".join(chars)  # un caracter no alfanumerico corta el acarreo
+        if chars[pos] != last:
+            chars[pos] = chr(ord(chars[pos]) + 1)
+            return "".join(chars)
+        chars[pos] = first
+    return ("1" if first == "0" else first) + "".join(chars)
+
+
+def inc(a: Any) -> Any:
+    if a is None:
+        return 1
+    if a.__class__ is bool:
+        return a
+    if a.__class__ is str:
+        if a == "":
+            return "1"
+        if not is_numeric_string(a):
+            return _increment_string(a)
+    return add(a, 1)
+
+
+def dec(a: Any) -> Any:
+    # En PHP `null--` sigue siendo null y los strings no numericos no cambian.
+    if a is None or a.__class__ is bool:
+        return a
+    if a.__class__ is str:
+        if a == "":
+            return -1
+        if not is_numeric_string(a):
+            return a
+    return sub(a, 1)
+
+
+def strict_equals(a: Any, b: Any) -> bool:
+    if a.__class__ is not b.__class__:
+        return False
+    if isinstance(a, PhpArray):
+        if len(a) != len(b):
+            return False
+        return all(
+            ka == kb and strict_equals(va, vb)
+            for (ka, va), (kb, vb) in zip(a.data.items(), b.data.items())
+        )
+    if isinstance(a, PhpObject):
+        return a is b
+    return a == b
+
+
+def _compare_scalars(a: Any, b: Any) -> int:
+    """Comparacion `<=>` de PHP 8 entre escalares."""
+    if a is None and b is None:
+        return 0
+    if isinstance(a, bool) or isinstance(b, bool) or a is None or b is None:
+        x, y = to_bool(a), to_bool(b)
+        return (x > y) - (x < y)
+    if isinstance(a, str) and isinstance(b, str):
+        if is_numeric_string(a) and is_numeric_string(b):
+            x, y = to_number(a), to_number(b)
+        else:
+            x, y = a, b
+        return (x > y) - (x < y)
+    if isinstance(a, str):
+        if not is_numeric_string(a):
+            x, y = a, to_str(b)
+            return (x > y) - (x < y)
+        a = to_number(a)
+    if isinstance(b, str):
+        if not is_numeric_string(b):
+            x, y = to_str(a), b
+            return (x > y) - (x < y)
+        b = to_number(b)
+    return (a > b) - (a < b)
+
+
+def compare(a: Any, b: Any) -> int:
+    if isinstance(a, PhpArray) and isinstance(b, PhpArray):
+        if len(a) != len(b):
+            return (len(a) > len(b)) - (len(a) < len(b))
+        for key, val in a.data.items():
+            if key not in b.data:
+                return 1
+            result = compare(val, b.data[key])
+            if result:
+                return result
+        return 0
+    if isinstance(a, PhpArray) or isinstance(b, PhpArray):
+        if a is None or b is None or isinstance(a, bool) or isinstance(b, bool):
+            return _compare_scalars(to_bool(a), to_bool(b))
+        return 1 if isinstance(a, PhpArray) else -1
+    if isinstance(a, PhpObject) or isinstance(b, PhpObject):
+        if a is b:
+            return 0
+        if isinstance(a, PhpObject) and isinstance(b, PhpObject) and a.cls is b.cls:
+            return 0 if loose_equals(_props(a), _props(b)) else 1
+        return _compare_scalars(to_bool(a), to_bool(b))
+    return _compare_scalars(a, b)
+
+
+def _props(obj: PhpObject) -> PhpArray:
+    return PhpArray(dict(obj.props))
+
+
+def loose_equals(a: Any, b: Any) -> bool:
+    if a.__class__ is b.__class__ and a.__class__ in (int, str, float, bool):
+        if a.__class__ is str and is_numeric_string(a) and is_numeric_string(b):
+            return to_number(a) == to_number(b)
+        return a == b
+    return compare(a, b) == 0
+
+
+def less(a: Any, b: Any) -> bool:
+    if a.__class__ is int and b.__class__ is int:
+        return a < b
+    return compare(a, b) < 0
+
+
+def less_equal(a: Any, b: Any) -> bool:
+    if a.__class__ is int and b.__class__ is int:
+        return a <= b
+    return compare(a, b) <= 0
+
+
+def greater(a: Any, b: Any) -> bool:
+    if a.__class__ is int and b.__class__ is int:
+        return a > b
+    return compare(a, b) > 0
+
+
+def greater_equal(a: Any, b: Any) -> bool:
+    if a.__class__ is int and b.__class__ is int:
+        return a >= b
+    return compare(a, b) >= 0
+
+
+# === CONSTANTES Y FUNCIONES NATIVAS ===
+CONSTANTS: Dict[str, Any] = {
+    "PHP_EOL": "\n",
+    "PHP_INT_MAX": INT_MAX,
+    "PHP_INT_MIN": INT_MIN,
+    "M_PI": math.pi,
+}
+
+
+def _count(value: Any) -> int:
+    if isinstance(value, PhpArray):
+        return len(value)
+    raise PhpRuntimeError(f"count(): Argument #1 must be of type array, {type_name(value)} given")
+
+
+def _implode(sep: Any, pieces: Any = None) -> str:
+    if isinstance(sep, PhpArray):
+        sep, pieces = "", sep
+    return to_str(sep).join(to_str(v) for v in pieces.data.values())
+
+
+def _round(value: Any, precision: Any = 0) -> float:
+    number = to_number(value)
+    factor = 10 ** to_int(precision)
+    scaled = abs(number) * factor
+    rounded = math.floor(scaled + 0.5) / factor
+    return float(math.copysign(rounded, number))
+
+
+def _minmax(pick: Callable[[int], bool]) -> Callable[..., Any]:
+    def _impl(*args: Any) -> Any:
+        values = list(args[0].data.values()) if len(args) == 1 and isinstance(args[0], PhpArray) else list(args)
+        if not values:
+            raise PhpRuntimeError("min/max expects at least one value")
+        best = values[0]
+        for candidate in values[1:]:
+            if pick(compare(candidate, best)):
+                best = candidate
+        return best
+
+    return _impl
+
+
+BUILTINS: Dict[str, Callable[..., Any]] = {
+    "count": _count,
+    "strlen": lambda s: len(to_str(s).encode("utf-8")),
+    "strtoupper": lambda s: to_str(s).upper(),
+    "strtolower": lambda s: to_str(s).lower(),
+    "str_repeat": lambda s, n: to_str(s) * to_int(n),
+    "substr": lambda s, start, length=None: (
+        to_str(s)[to_int(start):] if length is None else to_str(s)[to_int(start):][: to_int(length)]
+    ),
+    "implode": _implode,
+    "array_keys": lambda a: PhpArray.from_list(list(a.data.keys())),
+    "array_values": lambda a: PhpArray.from_list(list(a.data.values())),
+    "in_array": lambda needle, a: any(loose_equals(needle, v) for v in a.data.values()),
+    "abs": lambda x: abs(to_number(x)),
+    "intdiv": lambda a, b: int(to_int(a) / to_int(b)) if to_int(b) else div(a, b),
+    "floor": lambda x: float(math.floor(to_number(x))),
+    "ceil": lambda x: float(math.ceil(to_number(x))),
+    "round": _round,
+    "sqrt": lambda x: math.sqrt(to_number(x)),
+    "max": _minmax(lambda c: c > 0),
+    "min": _minmax(lambda c: c < 0),
+    "is_array": lambda x: isinstance(x, PhpArray),
+    "is_int": lambda x: x.__class__ is int,
+    "is_string": lambda x: isinstance(x, str),
+    "is_null": lambda x: x is None,
+    "intval": to_int,
+    "strval": to_str,
+}
@@ -0,0 +1,904 @@
+"""Backend de ejecucion que traduce el AST a codigo Python.
+
+El programa se convierte en funciones Python (una por funcion/metodo PHP y
+`_main` para el nivel superior) que usan la semantica de `runtime`; el texto se
+compila con `compile()` y el objeto de codigo se cachea por hash del fuente PHP,
+de modo que reejecutar un programa sin cambios evita el parser y la compilacion.
+Las operaciones entre enteros y los accesos a arreglos con operandos simples se
+emiten en linea con una comprobacion de tipo, por lo que los bucles calientes
+corren como Python nativo.
+"""
+from __future__ import annotations
+
+import marshal
+import re
+import sys
+import time
+import types
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .. import ast_nodes as ast
+from ..project import content_hash
+from . import runtime as rt
+from .compiler import THIS, CompileError, ProgramNames, constant_value, parse_program, unescape
+from .machine import ExecutionResult
+
+INT, FLOAT, STR, BOOL, ARRAY, NULL = "int", "float", "str", "bool", "array", "null"
+_NUMERIC = (INT, FLOAT)
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_ARITH = {"+": ("+", "_add"), "-": ("-", "_sub"), "*": ("*", "_mul")}
+_COMPARE = {"<": ("<", "_lt"), "<=": ("<=", "_le"), ">": (">", "_gt"), ">=": (">=", "_ge")}
+
+# (codigo Python, tipo estatico o None si se desconoce)
+Expr = Tuple[str, Optional[str]]
+
+
+def _simple(src: str) -> bool:
+    return bool(_IDENT.match(src))
+
+
+def _first_line(node: Any) -> Optional[int]:
+    for child in ast.walk(node):
+        lineno = getattr(child, "lineno", None)
+        if lineno is not None:
+            return lineno
+    return None
+
+
+def _py_literal(value: Any) -> str:
+    if isinstance(value, rt.PhpArray):
+        pairs = ", ".join(f"({_py_literal(k)}, {_py_literal(v)})" for k, v in value.data.items())
+        return f"_arr_pairs([{pairs}])"
+    if isinstance(value, float) and (value != value or value in (float("inf"), float("-inf"))):
+        return f"float({str(value)!r})"
+    return repr(value)
+
+
+def _py_type(value: Any) -> Optional[str]:
+    if value is None:
+        return NULL
+    return {bool: BOOL, int: INT, float: FLOAT, str: STR}.get(value.__class__)
+
+
+def _local(name: str) -> str:
+    return "v_" + name[1:]
+
+
+def _dim_roots(body: Sequence[Any]) -> Set[str]:
+    """Variables que se modifican como arreglo (`$a[...] = ...`)."""
+    roots: Set[str] = set()
+
+    def root_of(node: Any) -> None:
+        while isinstance(node, ast.Index):
+            node = node.base
+        if isinstance(node, ast.Var):
+            roots.add(node.name)
+
+    for stmt in body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Assign) and isinstance(node.target, ast.Index):
+                root_of(node.target)
+            elif isinstance(node, (ast.Unary, ast.PostfixUnary)) and isinstance(node.expr, ast.Index):
+                root_of(node.expr)
+    return roots
+
+
+def _declared_vars(body: Sequence[Any]) -> List[str]:
+    """Variables usadas en un cuerpo, sin entrar en funciones anidadas."""
+    found: Dict[str, None] = {}
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDecl, ast.ClassDecl)):
+            continue
+        if isinstance(node, ast.Var):
+            found[node.name] = None
+        elif isinstance(node, ast.ForeachStmt):
+            found[node.value] = None
+            if node.key is not None:
+                found[node.key] = None
+        elif isinstance(node, ast.VarDeclStmt):
+            for name, _ in node.decls:
+                found[name] = None
+        elif isinstance(node, ast.ForStmt):
+            for init in node.init or []:
+                if isinstance(init, tuple):
+                    found[init[0]] = None
+        children = list(ast.iter_child_nodes(node))
+        children.reverse()
+        stack.extend(children)
+    return list(found)
+
+
+@dataclass
+class _MethodInfo:
+    pyname: str
+    is_static: bool
+
+
+@dataclass
+class _ClassInfo:
+    pyname: str
+    name: str
+    node: ast.ClassDecl
+    namespace: List[str]
+    methods: Dict[str, _MethodInfo] = field(default_factory=dict)
+
+
+class _Emitter:
+    """Acumula lineas de Python con sangria y la linea PHP de origen de cada una."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.line_map: List[Optional[int]] = []
+        self.depth = 0
+        self.php_line: Optional[int] = None
+
+    def line(self, text: str) -> None:
+        self.lines.append("    " * self.depth + text)
+        self.line_map.append(self.php_line)
+
+    def source(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class _FunctionWriter:
+    """Traduce el cuerpo de una funcion, metodo o del nivel superior."""
+
+    def __init__(self, owner: "Transpiler", out: _Emitter, body: Sequence[Any], cls: Optional[_ClassInfo] = None,
+                 has_this: bool = False) -> None:
+        self.owner = owner
+        self.out = out
+        self.cls = cls
+        self.has_this = has_this
+        self.dim_roots = _dim_roots(body)
+
+    # --- utilidades ---
+    def var(self, name: str) -> str:
+        if name == THIS and self.has_this:
+            return "this"
+        return _local(name)
+
+    def error(self, message: str, node: Any) -> CompileError:
+        return CompileError(message, _first_line(node) or self.out.php_line)
+
+    def cond(self, node: Any) -> str:
+        src, typ = self.expr(node)
+        return src if typ == BOOL else f"_bool({src})"
+
+    def tick(self) -> None:
+        if self.owner.guard:
+            self.out.line("_tick()")
+
+    def block(self, stmts: Sequence[Any], tick: bool = False) -> None:
+        self.out.depth += 1
+        before = len(self.out.lines)
+        if tick:
+            self.tick()
+        for stmt in stmts:
+            self.stmt(stmt)
+        if len(self.out.lines) == before:
+            self.out.line("pass")
+        self.out.depth -= 1
+
+    def body_of(self, node: Any) -> List[Any]:
+        return list(node.stmts) if isinstance(node, ast.Block) else [node]
+
+    # --- sentencias ---
+    def stmt(self, node: Any) -> None:
+        lineno = _first_line(node)
+        if lineno is not None:
+            self.out.php_line = lineno
+        handler = getattr(self, f"stmt_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported statement {node.__class__.__name__}", node)
+        handler(node)
+
+    def stmt_EmptyStmt(self, node: ast.EmptyStmt) -> None:
+        return
+
+    def stmt_FunctionDecl(self, node: ast.FunctionDecl) -> None:
+        return  # se emiten al inicio del modulo
+
+    def stmt_ClassDecl(self, node: ast.ClassDecl) -> None:
+        return
+
+    def stmt_NamespaceDecl(self, node: ast.NamespaceDecl) -> None:
+        self.owner.names.enter_namespace(node.name)
+
+    def stmt_UseDecl(self, node: ast.UseDecl) -> None:
+        for parts in node.names:
+            self.owner.names.add_use(parts)
+
+    def stmt_IncludeStmt(self, node: Any) -> None:
+        raise self.error("include/require is not supported by the Python backend", node)
+
+    stmt_RequireStmt = stmt_IncludeStmt
+
+    def stmt_Block(self, node: ast.Block) -> None:
+        for stmt in node.stmts:
+            self.stmt(stmt)
+
+    def stmt_EchoStmt(self, node: ast.EchoStmt) -> None:
+        for expr in node.exprs:
+            src, typ = self.expr(expr)
+            self.out.line(f"_echo({src})" if typ == STR else f"_echo(_str({src}))")
+
+    def stmt_PrintStmt(self, node: ast.PrintStmt) -> None:
+        src, _ = self.expr(node.expr)
+        self.out.line(f"_echo(_str({src}))")
+
+    def stmt_ReturnStmt(self, node: ast.ReturnStmt) -> None:
+        self.out.line("return None" if node.expr is None else f"return {self.expr(node.expr)[0]}")
+
+    def stmt_VarDeclStmt(self, node: ast.VarDeclStmt) -> None:
+        for name, init in node.decls:
+            if init is not None:
+                self.assign_stmt(ast.Var(name), init)
+
+    def stmt_ExprStmt(self, node: ast.ExprStmt) -> None:
+        self.effect(node.expr)
+
+    def stmt_IfStmt(self, node: ast.IfStmt) -> None:
+        self.out.line(f"if {self.cond(node.cond)}:")
+        self.block(self.body_of(node.then))
+        for cond, body in node.elifs:
+            self.out.php_line = _first_line(cond) or self.out.php_line
+            self.out.line(f"elif {self.cond(cond)}:")
+            self.block(self.body_of(body))
+        if node.els is not None:
+            self.out.line("else:")
+            self.block(self.body_of(node.els))
+
+    def stmt_WhileStmt(self, node: ast.WhileStmt) -> None:
+        self.out.line(f"while {self.cond(node.cond)}:")
+        self.block(self.body_of(node.body), tick=True)
+
+    def stmt_ForStmt(self, node: ast.ForStmt) -> None:
+        for init in node.init or []:
+            if isinstance(init, tuple):
+                self.assign_stmt(ast.Var(init[0]), init[1])
+            else:
+                self.effect(init)
+        cond = self.cond(node.cond) if node.cond is not None else "True"
+        self.out.line(f"while {cond}:")
+        self.block([*self.body_of(node.body), *(ast.ExprStmt(step) for step in node.iters or [])], tick=True)
+
+    def stmt_ForeachStmt(self, node: ast.ForeachStmt) -> None:
+        key = self.var(node.key) if node.key is not None else "_"
+        value = self.var(node.value)
+        src, _ = self.expr(node.iterable)
+        self.out.line(f"for {key}, {value} in _iter({src}):")
+        if node.value in self.dim_roots:
+            self.out.depth += 1
+            self.out.line(f"if {value}.__class__ is _A: {value}.shared = True")
+            self.out.depth -= 1
+        self.block(self.body_of(node.body), tick=True)
+
+    # --- expresiones como sentencia ---
+    def effect(self, node: Any) -> None:
+        if isinstance(node, ast.Assign):
+            self.assign_stmt(node.target, node.value)
+        elif isinstance(node, (ast.Unary, ast.PostfixUnary)) and node.op in ("++", "--"):
+            if isinstance(node.expr, ast.Var):
+                name = self.var(node.expr.name)
+                self.out.line(f"{name} = {self._step(name, node.op)}")
+            else:
+                self.assign_stmt(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)))
+        else:
+            self.out.line(self.expr(node)[0])
+
+    @staticmethod
+    def _step(name: str, op: str) -> str:
+        sym, helper = ("+", "_inc") if op == "++" else ("-", "_dec")
+        bound = f"< {rt.INT_MAX}" if op == "++" else f"> {rt.INT_MIN}"
+        return f"{name} {sym} 1 if {name}.__class__ is int and {name} {bound} else {helper}({name})"
+
+    def assign_stmt(self, target: Any, value: Any) -> None:
+        if isinstance(target, ast.Var):
+            name = self.var(target.name)
+            self.out.line(f"{name} = {self.shared_value(value)}")
+        elif isinstance(target, ast.Index) and isinstance(target.base, ast.Var):
+            name = self.var(target.base.name)
+            key, _ = self.expr(target.index)
+            val, typ = self.expr(value)
+            self.out.line(f"if {name}.__class__ is not _A or {name}.shared: {name} = _writable({name})")
+            if typ in (INT, FLOAT, STR, BOOL, NULL):
+                self.out.line(f"{name}.set({key}, {val})")
+            else:
+                self.out.line(f"_store_dim({name}, {key}, {val})")
+        elif isinstance(target, ast.Member) and self.is_this(target.obj):
+            self.out.line(f"this.props[{target.name!r}] = {self.shared_value(value)}")
+        else:
+            self.out.line(self.assign_expr(target, value)[0])
+
+    def shared_value(self, node: Any) -> str:
+        src, typ = self.expr(node)
+        if typ is None and not isinstance(node, ast.ArrayLit):
+            return f"_share({src})"
+        return src
+
+    def is_this(self, node: Any) -> bool:
+        return self.has_this and isinstance(node, ast.Var) and node.name == THIS
+
+    # --- expresiones ---
+    def expr(self, node: Any) -> Expr:
+        handler = getattr(self, f"expr_{node.__class__.__name__}", None)
+        if handler is None:
+            raise self.error(f"Unsupported expression {node.__class__.__name__}", node)
+        return handler(node)
+
+    def expr_NumberLit(self, node: ast.NumberLit) -> Expr:
+        return repr(node.value), INT if isinstance(node.value, int) else FLOAT
+
+    def expr_StringLit(self, node: ast.StringLit) -> Expr:
+        return repr(unescape(node.value)), STR
+
+    def expr_BoolLit(self, node: ast.BoolLit) -> Expr:
+        return repr(node.value), BOOL
+
+    def expr_NullLit(self, node: ast.NullLit) -> Expr:
+        return "None", NULL
+
+    def expr_Name(self, node: ast.Name) -> Expr:
+        if len(node.parts) == 1 and node.parts[0] in rt.CONSTANTS:
+            value = rt.CONSTANTS[node.parts[0]]
+            return _py_literal(value), _py_type(value)
+        raise self.error(f"Undefined constant '{node.parts[-1]}'", node)
+
+    def expr_Var(self, node: ast.Var) -> Expr:
+        return self.var(node.name), None
+
+    def expr_ArrayLit(self, node: ast.ArrayLit) -> Expr:
+        if not node.pairs:
+            return "_A()", ARRAY
+        if all(key is None for key, _ in node.pairs):
+            return f"_arr_list([{', '.join(self.expr(v)[0] for _, v in node.pairs)}])", ARRAY
+        pairs = ", ".join(
+            f"({'_APPEND' if key is None else self.expr(key)[0]}, {self.expr(value)[0]})" for key, value in node.pairs
+        )
+        return f"_arr_pairs([{pairs}])", ARRAY
+
+    def expr_Assign(self, node: ast.Assign) -> Expr:
+        return self.assign_expr(node.target, node.value)
+
+    def assign_expr(self, target: Any, value: Any) -> Expr:
+        if isinstance(target, ast.Var):
+            val, typ = self.expr(value)
+            if typ is None and not isinstance(value, ast.ArrayLit):
+                val = f"_share({val})"
+            return f"({self.var(target.name)} := {val})", typ
+        if isinstance(target, ast.Index):
+            container = self.fetch_for_write(target.base)
+            key, _ = self.expr(target.index)
+            val, typ = self.expr(value)
+            return f"_store_dim({container}, {key}, {val})", typ
+        if isinstance(target, ast.Member):
+            obj, _ = self.expr(target.obj)
+            val, typ = self.expr(value)
+            return f"_store_prop({obj}, {target.name!r}, {val})", typ
+        raise self.error("Cannot assign to this expression", target)
+
+    def fetch_for_write(self, node: Any) -> str:
+        if isinstance(node, ast.Var):
+            name = self.var(node.name)
+            return f"({name} if {name}.__class__ is _A and not {name}.shared else ({name} := _writable({name})))"
+        if isinstance(node, ast.Index):
+            key, _ = self.expr(node.index)
+            return f"_fetch_dim_w({self.fetch_for_write(node.base)}, {key})"
+        if isinstance(node, ast.Member):
+            obj, _ = self.expr(node.obj)
+            return f"_fetch_prop_w({obj}, {node.name!r})"
+        raise self.error("Cannot use this expression as an array to write into", node)
+
+    def expr_Binary(self, node: ast.Binary) -> Expr:
+        op = node.op
+        if op in ("&&", "||"):
+            return f"({self.cond(node.left)} {'and' if op == '&&' else 'or'} {self.cond(node.right)})", BOOL
+        if op == ".":
+            return self._concat(node)
+        left, right = self.expr(node.left), self.expr(node.right)
+        if op in _ARITH:
+            return self._arith(*_ARITH[op], left, right)
+        if op in _COMPARE:
+            src, _ = self._arith(*_COMPARE[op], left, right)
+            return src, BOOL
+        (ls, lt), (rs, rt_) = left, right
+        if op in ("==", "!="):
+            if (lt in _NUMERIC and rt_ in _NUMERIC) or (lt == rt_ == BOOL):
+                return f"({ls} {op} {rs})", BOOL
+            src, _ = self._arith("==", "_eq", left, right)
+            return (src if op == "==" else f"(not {src})"), BOOL
+        if op in ("===", "!=="):
+            if lt is not None and lt == rt_ and lt != ARRAY:
+                src = f"({ls} == {rs})"
+            else:
+                src = f"_ident({ls}, {rs})"
+            return (src if op == "===" else f"(not {src})"), BOOL
+        if op == "/":
+            return f"_div({ls}, {rs})", None
+        if op == "%":
+            return f"_mod({ls}, {rs})", INT
+        raise self.error(f"Unsupported operator '{op}'", node)
+
+    def _arith(self, sym: str, helper: str, left: Expr, right: Expr) -> Expr:
+        (ls, lt), (rs, rt_) = left, right
+        # La aritmetica entera puede desbordar a float (`_int`); las comparaciones no.
+        fast = f"_int({ls} {sym} {rs})" if sym in _ARITH else f"({ls} {sym} {rs})"
+        if lt in _NUMERIC and rt_ in _NUMERIC:
+            if lt == rt_ == INT:
+                return fast, None if sym in _ARITH else INT
+            return f"({ls} {sym} {rs})", FLOAT
+        if lt in (INT, None) and rt_ in (INT, None) and _simple(ls) | (lt == INT) and _simple(rs) | (rt_ == INT):
+            checks = " and ".join(f"{s}.__class__ is int" for s, t in ((ls, lt), (rs, rt_)) if t is None)
+            return f"({fast} if {checks} else {helper}({ls}, {rs}))", None
+        return f"{helper}({ls}, {rs})", None
+
+    def _concat(self, node: ast.Binary) -> Expr:
+        parts: List[Any] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, ast.Binary) and current.op == ".":
+                stack.append(current.right)
+                stack.append(current.left)
+            else:
+                parts.append(current)
+        compiled = [self.expr(part) for part in parts]
+        if all(typ == STR for _, typ in compiled):
+            return f"({' + '.join(src for src, _ in compiled)})", STR
+        if len(compiled) == 2:
+            return f"_concat({compiled[0][0]}, {compiled[1][0]})", STR
+        return f"_cat({', '.join(src for src, _ in compiled)})", STR
+
+    def expr_Unary(self, node: ast.Unary) -> Expr:
+        if node.op in ("++", "--"):
+            if isinstance(node.expr, ast.Var):
+                name = self.var(node.expr.name)
+                return f"({name} := ({self._step(name, node.op)}))", None
+            return self.assign_expr(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)))
+        if node.op == "!":
+            return f"(not {self.cond(node.expr)})", BOOL
+        src, typ = self.expr(node.expr)
+        if node.op in ("-", "u-"):
+            return (f"(-{src})", typ) if typ == FLOAT else (f"_neg({src})", None)
+        return (src, typ) if typ in _NUMERIC else (f"_num({src})", None)
+
+    def expr_PostfixUnary(self, node: ast.PostfixUnary) -> Expr:
+        if isinstance(node.expr, ast.Var):
+            name = self.var(node.expr.name)
+            return f"({name}, {name} := ({self._step(name, node.op)}))[0]", None
+        old, _ = self.expr(node.expr)
+        new, _ = self.assign_expr(node.expr, ast.Binary("+" if node.op == "++" else "-", node.expr, ast.NumberLit(1)))
+        return f"({old}, {new})[0]", None
+
+    def expr_Ternary(self, node: ast.Ternary) -> Expr:
+        (ts, tt), (fs, ft) = self.expr(node.if_true), self.expr(node.if_false)
+        return f"({ts} if {self.cond(node.cond)} else {fs})", tt if tt == ft else None
+
+    def expr_Index(self, node: ast.Index) -> Expr:
+        base, _ = self.expr(node.base)
+        key, key_type = self.expr(node.index)
+        if _simple(base) and key_type == INT or (_simple(base) and _simple(key)):
+            lookup = key if key_type == INT else f"{key} if {key}.__class__ is int else _key({key})"
+            return f"({base}.data.get({lookup}) if {base}.__class__ is _A else _index({base}, {key}))", None
+        return f"_index({base}, {key})", None
+
+    def expr_Member(self, node: ast.Member) -> Expr:
+        if self.is_this(node.obj):
+            return f"this.props.get({node.name!r})", None
+        obj, _ = self.expr(node.obj)
+        return f"_prop({obj}, {node.name!r})", None
+
+    def expr_StaticAccess(self, node: ast.StaticAccess) -> Expr:
+        raise self.error("Class constants and static properties are not supported by the Python backend", node)
+
+    def args(self, nodes: Sequence[Any]) -> List[str]:
+        return [self.expr(arg)[0] for arg in nodes]
+
+    def expr_New(self, node: ast.New) -> Expr:
+        key = self.class_key(node.class_name)
+        info = self.owner.classes.get(key)
+        args = self.args(node.args)
+        if info is None:
+            return self.fail(f'Class "{key}" not found')
+        return f"_new({', '.join([info.pyname, *args])})", None
+
+    @staticmethod
+    def fail(message: str) -> Expr:
+        return f"_fail({message!r})", None
+
+    def class_key(self, qname: ast.Name) -> str:
+        if len(qname.parts) == 1 and qname.parts[0].lower() in ("self", "static"):
+            if self.cls is None:
+                raise self.error(f"Cannot use '{qname.parts[0]}' outside of a class", qname)
+            return self.cls.name.lower()
+        return self.owner.names.class_key(qname.parts)
+
+    def expr_Call(self, node: ast.Call) -> Expr:
+        callee = node.callee
+        args = self.args(node.args)
+        if isinstance(callee, ast.Member):
+            name = callee.name.lower()
+            if self.is_this(callee.obj) and name in self.cls.methods:
+                method = self.cls.methods[name]
+                call_args = args if method.is_static else ["this", *args]
+                return f"{method.pyname}({', '.join(call_args)})", None
+            obj, _ = self.expr(callee.obj)
+            return f"_call_method({', '.join([obj, repr(name), *args])})", None
+        if isinstance(callee, ast.StaticAccess):
+            key = self.class_key(callee.qname)
+            info = self.owner.classes.get(key)
+            if info is None:
+                return self.fail(f'Class "{key}" not found')
+            method = info.methods.get(callee.name.lower())
+            if method is None:
+                return self.fail(f"Call to undefined method {info.name}::{callee.name.lower()}()")
+            if not method.is_static:
+                return self.fail(f"Non-static method {info.name}::{callee.name}() cannot be called statically")
+            return f"{method.pyname}({', '.join(args)})", None
+        if isinstance(callee, ast.Name):
+            key = self.owner.names.function_key(callee.parts)
+            pyname = self.owner.functions.get(key)
+            if pyname is not None:
+                return f"{pyname}({', '.join(args)})", None
+            if key in rt.BUILTINS:
+                return f"_b_{key}({', '.join(args)})", _BUILTIN_TYPES.get(key)
+            return self.fail(f"Call to undefined function {key}()")
+        raise self.error("Dynamic calls are not supported by the Python backend", node)
+
+
+_BUILTIN_TYPES = {"count": INT, "strlen": INT, "implode": STR, "str_repeat": STR, "strtoupper": STR,
+                  "strtolower": STR, "substr": STR, "strval": STR, "intval": INT, "is_array": BOOL,
+                  "is_int": BOOL, "is_string": BOOL, "is_null": BOOL, "in_array": BOOL}
+
+
+class Transpiler:
+    """Genera el modulo Python de un `Program`."""
+
+    def __init__(self, guard: bool = False) -> None:
+        self.guard = guard
+        self.names = ProgramNames()
+        self.functions: Dict[str, str] = {}
+        self.classes: Dict[str, _ClassInfo] = {}
+        self._function_nodes: List[Tuple[str, ast.FunctionDecl, List[str]]] = []
+
+    def transpile(self, program: ast.Program) -> Tuple[str, List[Optional[int]]]:
+        self.names.declare_program(program)
+        self._collect(program)
+        out = _Emitter()
+        for pyname, func, namespace in self._function_nodes:
+            self.names.enter_namespace(namespace)
+            self._function(out, pyname, func, cls=None)
+        for info in self.classes.values():
+            self.names.enter_namespace(info.namespace)
+            out.php_line = _first_line(info.node)
+            out.line(f"{info.pyname} = _PhpClass({info.name!r}, {{}}, set())")
+            for method in info.node.members:
+                if not isinstance(method, ast.FunctionDecl):
+                    continue
+                entry = info.methods[method.name.lower()]
+                self._function(out, entry.pyname, method, cls=info)
+                out.line(f"{info.pyname}.methods[{method.name.lower()!r}] = {entry.pyname}")
+                if entry.is_static:
+                    out.line(f"{info.pyname}.static_methods.add({method.name.lower()!r})")
+        self.names.enter_namespace([])
+        self._main(out, program)
+        return out.source(), out.line_map
+
+    # --- declaraciones ---
+    def _collect(self, program: ast.Program) -> None:
+        namespace: List[str] = []
+        for item in program.items:
+            if isinstance(item, ast.NamespaceDecl):
+                namespace = list(item.name)
+            elif isinstance(item, ast.ClassDecl):
+                qualified = "\\".join([*namespace, item.name])
+                key = qualified.lower()
+                if key in self.classes:
+                    raise CompileError(f"Cannot redeclare class {qualified}", _first_line(item))
+                info = _ClassInfo(f"C{len(self.classes)}_{item.name}", qualified, item, namespace)
+                for method in item.members:
+                    if isinstance(method, ast.FunctionDecl):
+                        info.methods[method.name.lower()] = _MethodInfo(
+                            f"m{len(self.classes)}_{item.name}_{method.name}", method.is_static
+                        )
+                self.classes[key] = info
+            elif not isinstance(item, ast.UseDecl):
+                for node in ast.walk(item):
+                    if isinstance(node, ast.FunctionDecl):
+                        qualified = "\\".join([*namespace, node.name])
+                        key = qualified.lower()
+                        if key in self.functions:
+                            raise CompileError(f"Cannot redeclare function {qualified}()", _first_line(node))
+                        pyname = f"f{len(self.functions)}_{node.name}"
+                        self.functions[key] = pyname
+                        self._function_nodes.append((pyname, node, namespace))
+
+    def _signature(self, func: ast.FunctionDecl, has_this: bool) -> Tuple[str, List[str]]:
+        params = ["this"] if has_this else []
+        required: List[str] = []
+        for param in func.params:
+            name = _local(param.name)
+            if param.default is None:
+                params.append(f"{name}=_MISSING")
+                required.append(name)
+            else:
+                value = constant_value(param.default)
+                literal = _py_literal(value)
+                if isinstance(value, rt.PhpArray):
+                    literal = f"_share({literal})"
+                params.append(f"{name}={literal}")
+        params.append("*_extra")
+        return ", ".join(params), required
+
+    def _function(self, out: _Emitter, pyname: str, func: ast.FunctionDecl, cls: Optional[_ClassInfo]) -> None:
+        has_this = cls is not None and not func.is_static
+        out.php_line = _first_line(func)
+        signature, required = self._signature(func, has_this)
+        out.line(f"def {pyname}({signature}):")
+        out.depth += 1
+        label = f"{cls.name}::{func.name}" if cls is not None else func.name
+        if required:
+            passed = ", ".join(required)
+            out.line(f"if {required[-1]} is _MISSING: _too_few({label!r}, ({passed},), {len(required)})")
+        writer = _FunctionWriter(self, out, func.body.stmts, cls=cls, has_this=has_this)
+        params = {p.name for p in func.params}
+        for param in func.params:
+            if param.name in writer.dim_roots:
+                name = _local(param.name)
+                out.line(f"if {name}.__class__ is _A: {name}.shared = True")
+        self._locals(out, writer, func.body.stmts, exclude=params | ({THIS} if has_this else set()))
+        out.depth -= 1
+        writer.block(func.body.stmts, tick=True)
+
+    def _main(self, out: _Emitter, program: ast.Program) -> None:
+        out.php_line = None
+        out.line("def _main():")
+        writer = _FunctionWriter(self, out, program.items)
+        out.depth += 1
+        self._locals(out, writer, program.items, exclude=set())
+        out.depth -= 1
+        writer.block(program.items)
+
+    @staticmethod
+    def _locals(out: _Emitter, writer: _FunctionWriter, body: Sequence[Any], exclude: Set[str]) -> None:
+        names = [writer.var(name) for name in _declared_vars(body) if name not in exclude]
+        if names:
+            out.line(" = ".join(names) + " = None")
+
+
+# === EJECUCION Y CACHE ===
+class _Missing:
+    def __repr__(self) -> str:
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+def _too_few(name: str, passed: Tuple[Any, ...], expected: int) -> None:
+    count = sum(1 for value in passed if value is not _MISSING)
+    raise rt.PhpRuntimeError(f"Too few arguments to function {name}(), {count} passed and at least {expected} expected")
+
+
+def _fail(message: str) -> None:
+    raise rt.PhpRuntimeError(message)
+
+
+def _new(cls: rt.PhpClass, *args: Any) -> rt.PhpObject:
+    obj = rt.PhpObject(cls)
+    ctor = cls.methods.get("__construct")
+    if ctor is not None:
+        ctor(obj, *args)
+    return obj
+
+
+def _call_method(obj: Any, name: str, *args: Any) -> Any:
+    if obj.__class__ is not rt.PhpObject:
+        raise rt.PhpRuntimeError(f"Call to a member function {name}() on {rt.type_name(obj)}")
+    method = obj.cls.methods.get(name)
+    if method is None:
+        raise rt.PhpRuntimeError(f"Call to undefined method {obj.cls.name}::{name}()")
+    if name in obj.cls.static_methods:
+        return method(*args)
+    return method(obj, *args)
+
+
+RUNTIME_GLOBALS: Dict[str, Any] = {
+    "_A": rt.PhpArray,
+    "_PhpClass": rt.PhpClass,
+    "_MISSING": _MISSING,
+    "_too_few": _too_few,
+    "_fail": _fail,
+    "_new": _new,
+    "_call_method": _call_method,
+    "_share": rt.share,
+    "_writable": rt.writable,
+    "_arr_list": rt.array_from_list,
+    "_arr_pairs": rt.array_from_pairs,
+    "_index": rt.index,
+    "_key": rt.normalize_key,
+    "_APPEND": rt._APPEND,
+    "_store_dim": rt.store_dim,
+    "_fetch_dim_w": rt.fetch_dim_w,
+    "_prop": rt.get_prop,
+    "_store_prop": rt.store_prop,
+    "_fetch_prop_w": rt.fetch_prop_w,
+    "_iter": rt.iterate,
+    "_bool": rt.to_bool,
+    "_str": rt.to_str,
+    "_num": rt.to_number,
+    "_int": rt.int_result,
+    "_add": rt.add,
+    "_sub": rt.sub,
+    "_mul": rt.mul,
+    "_div": rt.div,
+    "_mod": rt.mod,
+    "_neg": rt.neg,
+    "_inc": rt.inc,
+    "_dec": rt.dec,
+    "_concat": rt.concat,
+    "_cat": rt.concat_all,
+    "_lt": rt.less,
+    "_le": rt.less_equal,
+    "_gt": rt.greater,
+    "_ge": rt.greater_equal,
+    "_eq": rt.loose_equals,
+    "_ident": rt.strict_equals,
+    **{f"_b_{name}": func for name, func in rt.BUILTINS.items()},
+}
+
+
+@dataclass
+class CompiledProgram:
+    """Objeto de codigo Python listo para ejecutar y su mapa de lineas PHP."""
+
+    digest: str
+    python_source: str
+    code: types.CodeType
+    line_map: List[Optional[int]]
+    guarded: bool = False
+
+    @property
+    def filename(self) -> str:
+        return self.code.co_filename
+
+    def run(self, max_steps: Optional[int] = None) -> ExecutionResult:
+        output: List[str] = []
+        ticks = [0]
+
+        def _tick() -> None:
+            ticks[0] += 1
+            if max_steps is not None and ticks[0] > max_steps:
+                raise rt.PhpRuntimeError(f"Execution aborted after {max_steps} steps")
+
+        env = dict(RUNTIME_GLOBALS)
+        env["_echo"] = output.append
+        env["_tick"] = _tick
+        started = time.perf_counter()
+        try:
+            exec(self.code, env)
+            env["_main"]()
+        except rt.PhpRuntimeError as exc:
+            if exc.lineno is None:
+                exc.lineno = self._php_line(exc.__traceback__)
+            return self._result(False, output, started, ticks[0], str(exc), exc.lineno)
+        except (RecursionError, TypeError, AttributeError, ValueError, KeyError, ZeroDivisionError) as exc:
+            lineno = self._php_line(exc.__traceback__)
+            if isinstance(exc, RecursionError):
+                message = "Maximum function nesting level reached"
+            else:
+                message = f"{type(exc).__name__}: {exc}"
+            error = rt.PhpRuntimeError(message, lineno)
+            return self._result(False, output, started, ticks[0], str(error), lineno)
+        return self._result(True, output, started, ticks[0])
+
+    @staticmethod
+    def _result(ok: bool, output: List[str], started: float, steps: int, error: Optional[str] = None,
+                lineno: Optional[int] = None) -> ExecutionResult:
+        return ExecutionResult(ok, "".join(output), error, lineno, steps, time.perf_counter() - started)
+
+    def _php_line(self, tb: Optional[types.TracebackType]) -> Optional[int]:
+        lineno = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == self.filename:
+                idx = tb.tb_lineno - 1
+                if 0 <= idx < len(self.line_map) and self.line_map[idx] is not None:
+                    lineno = self.line_map[idx]
+            tb = tb.tb_next
+        return lineno
+
+
+class CodeCache:
+    """Cache LRU de programas por hash del fuente PHP, opcionalmente en disco.
+
+    En disco se guarda `marshal` del objeto de codigo junto con el mapa de
+    lineas; el nombre incluye la etiqueta del interprete (`cpython-311`) porque
+    el formato de bytecode cambia entre versiones.
+    """
+
+    def __init__(self, max_entries: int = 64, directory: str | Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self._entries: "OrderedDict[Tuple[str, bool], CompiledProgram]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str, guarded: bool) -> Path:
+        suffix = "g" if guarded else "p"
+        return self.directory / f"{digest}.{suffix}.{sys.implementation.cache_tag}.marshal"
+
+    def get(self, digest: str, guarded: bool) -> Optional[CompiledProgram]:
+        key = (digest, guarded)
+        program = self._entries.get(key)
+        if program is None and self.directory is not None:
+            program = self._load(digest, guarded)
+            if program is not None:
+                self._remember(key, program)
+        if program is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return program
+
+    def put(self, program: CompiledProgram) -> None:
+        self._remember((program.digest, program.guarded), program)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            payload = marshal.dumps((program.python_source, program.line_map, program.code))
+            self._path(program.digest, program.guarded).write_bytes(payload)
+
+    def _remember(self, key: Tuple[str, bool], program: CompiledProgram) -> None:
+        self._entries[key] = program
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, digest: str, guarded: bool) -> Optional[CompiledProgram]:
+        path = self._path(digest, guarded)
+        try:
+            python_source, line_map, code = marshal.loads(path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        return CompiledProgram(digest, python_source, code, line_map, guarded)
+
+
+class PythonBackend:
+    """Parsea, traduce y ejecuta programas reutilizando el cache de codigo."""
+
+    def __init__(self, cache: CodeCache | None = None) -> None:
+        self.cache = cache or CodeCache()
+
+    def load(self, code: str, guard: bool = False) -> CompiledProgram:
+        """Programa compilado para `code`; lanza `CompileError` si no se puede traducir."""
+        digest = content_hash(code)
+        program = self.cache.get(digest, guard)
+        if program is not None:
+            return program
+        tree, error = parse_program(code)
+        if tree is None:
+            raise CompileError(error)
+        source, line_map = Transpiler(guard=guard).transpile(tree)
+        compiled = compile(source, f"<php:{digest[:12]}>", "exec")
+        program = CompiledProgram(digest, source, compiled, line_map, guard)
+        self.cache.put(program)
+        return program
+
+    def run(self, code: str, max_steps: Optional[int] = None) -> ExecutionResult:
+        try:
+            program = self.load(code, guard=max_steps is not None)
+        except CompileError as exc:
+            error = exc.message if exc.lineno is None else str(exc)
+            return ExecutionResult(ok=False, output="", error=error, lineno=exc.lineno)
+        return program.run(max_steps=max_steps)
+
+
+def transpile(program: ast.Program) -> str:
+    """Fuente Python generado para un programa (util para depurar)."""
+    return Transpiler().transpile(program)[0]
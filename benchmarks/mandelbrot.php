@@ -0,0 +1,26 @@
+<?php
+// Floating-point arithmetic in tight loops.
+function mandel($size, $max_iter) {
+    $inside = 0;
+    for ($py = 0; $py < $size; $py++) {
+        for ($px = 0; $px < $size; $px++) {
+            $cx = $px * 3.0 / $size - 2.0;
+            $cy = $py * 2.0 / $size - 1.0;
+            $x = 0.0;
+            $y = 0.0;
+            $iter = 0;
+            while ($iter < $max_iter && $x * $x + $y * $y <= 4.0) {
+                $tmp = $x * $x - $y * $y + $cx;
+                $y = 2.0 * $x * $y + $cy;
+                $x = $tmp;
+                $iter++;
+            }
+            if ($iter == $max_iter) {
+                $inside++;
+            }
+        }
+    }
+    return $inside;
+}
+echo mandel(40, 50), "\n";
+?>
@@ -0,0 +1,26 @@
+<?php
+// Method dispatch, property access and object allocation.
+class Vec {
+    public function __construct($x, $y) {
+        $this->x = $x;
+        $this->y = $y;
+    }
+    public function add($other) {
+        return new Vec($this->x + $other->x, $this->y + $other->y);
+    }
+    public function dot($other) {
+        return $this->x * $other->x + $this->y * $other->y;
+    }
+    public static function unit() {
+        return new Vec(1, 1);
+    }
+}
+$acc = new Vec(0, 0);
+$step = Vec::unit();
+$dots = 0;
+for ($i = 0; $i < 15000; $i++) {
+    $acc = $acc->add($step);
+    $dots = $dots + $acc->dot($step);
+}
+echo $acc->x, " ", $dots, "\n";
+?>
@@ -0,0 +1,124 @@
+"""Suite de benchmarks de ejecucion: `python -m benchmarks.run [nombre ...]`.
+
+Cada programa `*.php` de esta carpeta se parsea y compila una vez y luego se
+ejecuta `--repeat` veces; se reporta el mejor tiempo, las instrucciones de
+bytecode ejecutadas y el throughput (millones de instrucciones por segundo).
+Con `--backend python` (o `all`) se mide tambien el backend que traduce a
+Python; ahi no hay instrucciones de VM y el throughput se omite. El backend
+`ir` ejecuta la IR en SSA optimizada y reporta, ademas, las instrucciones de
+IR (estaticas y ejecutadas) antes y despues de los pases.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.facade import parse_source
+from backend.ir import IRMachine, build_ir
+from backend.vm import CompileError, PythonBackend, VirtualMachine, compile_program
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def discover(names: Optional[List[str]] = None) -> List[Path]:
+    programs = sorted(BENCH_DIR.glob("*.php"))
+    if names:
+        wanted = {name.removesuffix(".php") for name in names}
+        programs = [path for path in programs if path.stem in wanted]
+    return programs
+
+
+def _loader(path: Path, code: str, backend: str) -> Tuple[Callable[[], Any], Dict[str, Any]]:
+    if backend == "python":
+        try:
+            return PythonBackend().load(code).run, {}
+        except CompileError as exc:
+            raise SystemExit(f"{path.name}: {exc}") from exc
+    parsed = parse_source(code)
+    if parsed.ast is None or parsed.lexical_errors or parsed.syntax_errors:
+        raise SystemExit(f"{path.name}: errores de parseo")
+    try:
+        if backend == "ir":
+            return _ir_loader(parsed.ast)
+        module = compile_program(parsed.ast)
+    except CompileError as exc:
+        raise SystemExit(f"{path.name}: {exc}") from exc
+    return VirtualMachine(module).run, {}
+
+
+def _ir_loader(program: Any) -> Tuple[Callable[[], Any], Dict[str, Any]]:
+    module, report = build_ir(program)
+    return IRMachine(module).run, {"ir_before": report.before, "ir_after": report.after}
+
+
+def _ir_steps_unoptimized(code: str) -> int:
+    """Instrucciones de IR ejecutadas sin aplicar los pases (fuera del tiempo medido)."""
+    plain, _ = build_ir(parse_source(code).ast, optimize=False)
+    return IRMachine(plain).run().steps
+
+
+def run_benchmark(path: Path, repeat: int = 3, backend: str = "vm") -> Dict[str, Any]:
+    code = path.read_text(encoding="utf-8")
+    started = time.perf_counter()
+    run, info = _loader(path, code, backend)
+    compile_time = time.perf_counter() - started
+    if backend == "ir":
+        info["ir_steps_before"] = _ir_steps_unoptimized(code)
+
+    best = None
+    for _ in range(max(1, repeat)):
+        result = run()
+        if not result.ok:
+            raise SystemExit(f"{path.name}: {result.error}")
+        if best is None or result.elapsed < best.elapsed:
+            best = result
+    return {
+        "name": path.stem,
+        "backend": backend,
+        "compile_ms": round(compile_time * 1000, 2),
+        "run_ms": round(best.elapsed * 1000, 2),
+        "steps": best.steps,
+        "mips": round(best.steps / best.elapsed / 1e6, 2) if best.elapsed and backend == "vm" else None,
+        "output": best.output.strip(),
+        **info,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Benchmarks de los backends de ejecucion")
+    parser.add_argument("names", nargs="*", help="programas a ejecutar (por defecto todos)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=("vm", "python", "ir", "all"), default="vm")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    backends = ("vm", "python", "ir") if args.backend == "all" else (args.backend,)
+    rows = [run_benchmark(path, args.repeat, backend) for path in discover(args.names) for backend in backends]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'programa':<12} {'backend':<7} {'compila ms':>10} {'ejecuta ms':>10} {'instr.':>10} {'Minstr/s':>9}  salida")
+    for row in rows:
+        steps = row["steps"] if row["backend"] != "python" else "-"
+        mips = row["mips"] if row["mips"] is not None else "-"
+        print(
+            f"{row['name']:<12} {row['backend']:<7} {row['compile_ms']:>10} {row['run_ms']:>10} "
+            f"{steps:>10} {mips:>9}  {row['output'][:40]}"
+        )
+    ir_rows = [row for row in rows if row["backend"] == "ir"]
+    if ir_rows:
+        print(f"\n{'programa':<12} {'IR antes':>9} {'IR despues':>10} {'ejec. antes':>12} {'ejec. despues':>13}")
+        for row in ir_rows:
+            print(
+                f"{row['name']:<12} {row['ir_before']:>9} {row['ir_after']:>10} "
+                f"{row['ir_steps_before']:>12} {row['steps']:>13}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
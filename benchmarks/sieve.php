@@ -0,0 +1,20 @@
+<?php
+// Array writes in nested loops: sieve of Eratosthenes.
+function sieve($limit) {
+    $flags = [];
+    for ($i = 0; $i <= $limit; $i++) {
+        $flags[$i] = true;
+    }
+    $count = 0;
+    for ($i = 2; $i <= $limit; $i++) {
+        if ($flags[$i]) {
+            $count++;
+            for ($j = $i * $i; $j <= $limit; $j = $j + $i) {
+                $flags[$j] = false;
+            }
+        }
+    }
+    return $count;
+}
+echo sieve(60000), "\n";
+?>
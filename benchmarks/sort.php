@@ -0,0 +1,26 @@
+<?php
+// Array reads/writes and comparisons: insertion sort of a pseudo-random list.
+function make_list($n, $seed) {
+    $items = [];
+    for ($i = 0; $i < $n; $i++) {
+        $seed = ($seed * 1103515245 + 12345) % 2147483648;
+        $items[$i] = $seed % 1000;
+    }
+    return $items;
+}
+function insertion_sort($items) {
+    $n = count($items);
+    for ($i = 1; $i < $n; $i++) {
+        $key = $items[$i];
+        $j = $i - 1;
+        while ($j >= 0 && $items[$j] > $key) {
+            $items[$j + 1] = $items[$j];
+            $j--;
+        }
+        $items[$j + 1] = $key;
+    }
+    return $items;
+}
+$sorted = insertion_sort(make_list(600, 42));
+echo $sorted[0], " ", $sorted[299], " ", $sorted[599], "\n";
+?>
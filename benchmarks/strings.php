@@ -0,0 +1,13 @@
+<?php
+// Concatenation and string builtins.
+$out = "";
+$total = 0;
+for ($i = 0; $i < 20000; $i++) {
+    $piece = "item" . $i;
+    $total = $total + strlen($piece);
+    if ($i % 1000 == 0) {
+        $out = $out . $piece . ";";
+    }
+}
+echo $total, " ", $out, "\n";
+?>
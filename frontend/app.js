@@ -9,16 +9,345 @@ import {
   renderMessages,
   renderTokens,
   renderAst,
+  renderOutline,
+  renderCompletion,
+  hideCompletion,
   updateSummary,
   showError,
   resetOutputs,
   resetEditorToSample,
   initEditorContent,
   updateLineNumbers,
-  syncLineNumbersScroll,
+  getEditorView,
   renderSemantic,
 } from './ui.js';
-import { backendApi } from './backend.js';
+import { backendApi, decodeTokens } from './backend.js';
+import { applyEdits, codePoints, diffEdit } from './text.js';
+
+// Documento abierto en el backend: solo se envian las diferencias con `synced`.
+const doc = { id: null, version: 0, synced: '', queue: Promise.resolve() };
+async function openDocument(content) {
+  if (doc.id) await backendApi.closeDocument(doc.id);
+  const result = await backendApi.openDocument(content, state.path);
+  doc.id = result.doc_id;
+  doc.version = result.version;
+  doc.synced = content;
+}
+
+async function pushEdits() {
+  const value = els.editor.value;
+  if (!doc.id) {
+    await openDocument(value);
+    return;
+  }
+  const hint = getEditorView().takeChangedFrom();
+  if (value === doc.synced) return;
+  const result = await backendApi.applyEdits(doc.id, doc.version + 1, [diffEdit(doc.synced, value, hint)]);
+  if (!result.ok) {
+    // Version perdida o edicion rechazada: se reabre con el texto completo.
+    await openDocument(value);
+    return;
+  }
+  doc.version = result.version;
+  doc.synced = value;
+}
+
+// Todo lo que toca el documento del backend va en fila detras de las ediciones.
+function enqueue(task) {
+  const run = doc.queue.then(task, task);
+  doc.queue = run.catch(() => {});
+  return run;
+}
+
+function syncDocument() {
+  return enqueue(pushEdits);
+}
+
+// Tokens de las lineas visibles para el resaltado; null si el documento ya cambio.
+function fetchHighlight(firstLine, lastLine) {
+  return enqueue(async () => {
+    await pushEdits();
+    const version = doc.version;
+    const result = await backendApi.highlight(doc.id, firstLine, lastLine);
+    return result.ok && result.version === version ? result : null;
+  });
+}
+
+// Diagnosticos en vivo: se piden tras una pausa al escribir y como mucho uno en vuelo;
+// el backend responde solo las lineas que cambiaron desde la secuencia `seq`.
+const LIVE_DELAY = 400;
+const live = { timer: 0, inFlight: false, dirty: false, seq: null, lines: new Map() };
+
+function scheduleDiagnostics() {
+  if (!els.liveToggle.checked) return;
+  clearTimeout(live.timer);
+  live.timer = setTimeout(runDiagnostics, LIVE_DELAY);
+}
+
+async function runDiagnostics() {
+  if (live.inFlight) {
+    live.dirty = true;
+    return;
+  }
+  live.inFlight = true;
+  live.dirty = false;
+  try {
+    await syncDocument();
+    const result = await backendApi.diagnostics(doc.id, live.seq);
+    if (result.ok) applyDiagnostics(result);
+    else if (!result.cancelled) live.seq = null;
+  } catch (err) {
+    live.seq = null;
+  } finally {
+    live.inFlight = false;
+    if (live.dirty) scheduleDiagnostics();
+  }
+}
+
+function applyDiagnostics(result) {
+  if (result.full) live.lines = new Map();
+  result.removed.forEach((line) => live.lines.delete(line));
+  result.changed.forEach(([line, items]) => live.lines.set(line, items));
+  live.seq = result.seq;
+  getEditorView().setDiagnostics(live.lines);
+  if (!state.running) {
+    els.summaryLabel.className = `small ${result.count ? 'text-warning' : 'text-success'}`;
+    els.summaryLabel.textContent = result.count ? `En vivo: ${result.count} problema(s)` : 'En vivo: sin problemas';
+  }
+}
+
+function toggleLive() {
+  if (els.liveToggle.checked) {
+    live.seq = null;
+    scheduleDiagnostics();
+    return;
+  }
+  clearTimeout(live.timer);
+  live.lines = new Map();
+  getEditorView().setDiagnostics(live.lines);
+}
+
+// Hover: nodo y tipo bajo el puntero; el backend arma el indice de posiciones una vez por version.
+const HOVER_DELAY = 150;
+const hover = { timer: 0, offset: null };
+
+function scheduleHover(evt) {
+  clearTimeout(hover.timer);
+  const offset = getEditorView().offsetAt(evt.clientX, evt.clientY);
+  if (offset === hover.offset) return;
+  hover.offset = offset;
+  els.editor.title = '';
+  if (offset !== null) hover.timer = setTimeout(() => runHover(offset), HOVER_DELAY);
+}
+
+async function runHover(offset) {
+  try {
+    const result = await enqueue(async () => {
+      await pushEdits();
+      return backendApi.hover(doc.id, offset);
+    });
+    if (offset === hover.offset && result.ok) els.editor.title = hoverText(result);
+  } catch (err) {
+    // Sin tooltip: el proximo movimiento vuelve a pedirlo.
+  }
+}
+
+function hoverText({ node, typed }) {
+  const target = typed || node;
+  if (!target) return '';
+  const label = target.name ? `${target.kind} ${target.name}` : target.kind;
+  return typed ? `${label}: ${typed.type}` : label;
+}
+
+// Esquema: se pide al mostrar la pestana y, mientras esta visible, tras una pausa al escribir.
+const outline = { timer: 0 };
+
+function scheduleOutline() {
+  if (!els.outlineTab.classList.contains('active')) return;
+  clearTimeout(outline.timer);
+  outline.timer = setTimeout(refreshOutline, LIVE_DELAY);
+}
+
+async function refreshOutline() {
+  try {
+    const result = await enqueue(async () => {
+      await pushEdits();
+      return backendApi.outline(doc.id);
+    });
+    if (result.ok && result.version === doc.version) renderOutline(result.items);
+  } catch (err) {
+    // Se conserva el esquema anterior hasta el proximo pedido.
+  }
+}
+
+function jumpToOutline(evt) {
+  const row = evt.target.closest('.outline-row');
+  if (row) getEditorView().revealLine(Number(row.dataset.line));
+}
+
+// Autocompletado: Ctrl+Espacio o al escribir `->`/`::`, y se refina mientras se escribe.
+// El backend usa los simbolos del ultimo analisis y devuelve el rango del prefijo a reemplazar.
+const completion = { items: [], active: 0, from: 0, ticket: 0 };
+
+async function requestCompletion() {
+  completion.ticket += 1;
+  const { ticket } = completion;
+  const caret = els.editor.selectionStart;
+  try {
+    const result = await enqueue(async () => {
+      await pushEdits();
+      return backendApi.complete(doc.id, codePoints(els.editor.value.slice(0, caret)));
+    });
+    if (ticket !== completion.ticket || els.editor.selectionStart !== caret) return;
+    if (!result.ok || result.version !== doc.version || !result.items.length) {
+      closeCompletion();
+      return;
+    }
+    completion.items = result.items;
+    completion.active = 0;
+    // El prefijo son letras, digitos, `_` o `$`: sus code points son unidades UTF-16.
+    completion.from = caret - (result.end - result.start);
+    renderCompletion(completion.items, 0, getEditorView().caretPoint());
+  } catch (err) {
+    closeCompletion();
+  }
+}
+
+function closeCompletion() {
+  completion.ticket += 1;
+  completion.items = [];
+  hideCompletion();
+}
+
+function followCompletion() {
+  const caret = els.editor.selectionStart;
+  const typed = els.editor.value.slice(Math.max(caret - 2, 0), caret);
+  if (completion.items.length || typed === '->' || typed === '::') requestCompletion();
+}
+
+function moveCompletion(step) {
+  const count = completion.items.length;
+  completion.active = (completion.active + step + count) % count;
+  renderCompletion(completion.items, completion.active, getEditorView().caretPoint());
+}
+
+function acceptCompletion(index = completion.active) {
+  const item = completion.items[index];
+  closeCompletion();
+  if (!item) return;
+  const caret = els.editor.selectionStart;
+  const value = els.editor.value;
+  els.editor.value = value.slice(0, completion.from) + item.label + value.slice(caret);
+  els.editor.selectionStart = els.editor.selectionEnd = completion.from + item.label.length;
+  updateOnChange();
+}
+
+// Teclas del editor con la lista abierta; devuelve true si la tecla era para la lista.
+function completionKey(evt) {
+  if (evt.ctrlKey && evt.code === 'Space') {
+    requestCompletion();
+    return true;
+  }
+  if (!completion.items.length) return false;
+  if (evt.key === 'ArrowDown' || evt.key === 'ArrowUp') moveCompletion(evt.key === 'ArrowDown' ? 1 : -1);
+  else if (evt.key === 'Enter' || evt.key === 'Tab') acceptCompletion();
+  else if (evt.key === 'Escape') closeCompletion();
+  else return false;
+  return true;
+}
+
+function pickCompletion(evt) {
+  const row = evt.target.closest('.completion-row');
+  if (!row) return;
+  evt.preventDefault(); // el foco se queda en el editor
+  acceptCompletion(Number(row.dataset.index));
+}
+
+// Renombrar (F2): el backend responde con las ediciones de todas las apariciones del
+// simbolo bajo el cursor (desde su indice invertido) y se aplican juntas.
+async function handleRename() {
+  const offset = codePoints(els.editor.value.slice(0, els.editor.selectionStart));
+  const newName = window.prompt('Nuevo nombre para el simbolo bajo el cursor');
+  if (!newName) return;
+  try {
+    const result = await enqueue(async () => {
+      await pushEdits();
+      return backendApi.rename(doc.id, offset, newName.trim());
+    });
+    if (!result.ok) {
+      setStatus('No se pudo renombrar', 'warning');
+      showError(result.error);
+      return;
+    }
+    if (result.version !== doc.version) return; // el texto cambio mientras tanto
+    els.editor.value = applyEdits(els.editor.value, result.edits);
+    updateOnChange();
+    setStatus(`Renombrado en ${result.edits.length} lugar(es)`, 'success');
+  } catch (err) {
+    setStatus('Fallo al renombrar', 'warning');
+    showError(err);
+  }
+}
+
+function updateOnChange() {
+  markDirty();
+  updateLineNumbers();
+  syncDocument();
+  scheduleDiagnostics();
+  scheduleOutline();
+}
+
+// Filas paginadas de un resultado guardado en el backend (`get_tokens`/`get_symbols`).
+function pager(fetch, resultId) {
+  return async (offset, limit) => {
+    const page = await fetch(resultId, offset, limit);
+    if (!page.ok) throw new Error(page.error);
+    return page.columns ? decodeTokens(page.columns) : page.rows;
+  };
+}
+
+// AST del ultimo resultado: se pide al backend solo al abrir su pestana.
+const ast = { resultId: null, loaded: false };
+
+function resetAst(result) {
+  ast.resultId = result.has_ast ? result.result_id : null;
+  ast.loaded = false;
+  renderAst(null);
+  if (els.astTab.classList.contains('active')) loadAst();
+}
+
+async function loadAst() {
+  if (ast.loaded || !ast.resultId) return;
+  const { resultId } = ast;
+  ast.loaded = true;
+  renderAst('Cargando AST...');
+  try {
+    const page = await backendApi.getAst(resultId);
+    if (resultId === ast.resultId) renderAst(page.ok ? page.ast_json : null);
+  } catch (err) {
+    if (resultId === ast.resultId) {
+      ast.loaded = false;
+      renderAst(null);
+    }
+  }
+}
+
+// Ultimo pedido de cada accion: las respuestas de pedidos anteriores se descartan.
+const latest = { run: 0, semantic: 0 };
+
+// Sincroniza y analiza hasta obtener un resultado de la version actual.
+// Devuelve null si otro pedido de la misma accion lo reemplazo.
+async function analyzeLatest(kind, stages) {
+  latest[kind] += 1;
+  const ticket = latest[kind];
+  for (;;) {
+    await syncDocument();
+    const result = await backendApi.analyze(doc.id, stages);
+    if (ticket !== latest[kind]) return null;
+    if (!result.cancelled && (result.version === undefined || result.version === doc.version)) return result;
+    // Cancelado por una edicion o calculado sobre una version vieja: se repite.
+  }
+}
 
 async function handleOpenFile() {
   try {
@@ -37,6 +366,9 @@ async function handleOpenFile() {
     setPath(result.path || null);
     updateLineNumbers();
     markClean();
+    enqueue(() => openDocument(els.editor.value));
+    scheduleDiagnostics();
+    scheduleOutline();
   } catch (err) {
     setStatus('Fallo al abrir', 'warning');
     showError(err);
@@ -87,26 +419,26 @@ async function handleSaveFileAs() {
 }
 
 async function handleRunCompiler() {
-  if (state.running) return;
   state.running = true;
   setStatus('Compilando...', 'info');
   try {
-    const result = await backendApi.compile(els.editor.value, state.path);
+    const result = await analyzeLatest('run', ['tokens', 'ast', 'semantic', 'lint']);
+    if (!result) return;
+    state.running = false;
     renderMessages(result);
-    renderTokens(result.tokens);
-    renderAst(result.ast_json);
+    renderTokens(result.token_count, pager(backendApi.getTokens, result.result_id));
+    resetAst(result);
     renderSemantic(result.semantic_messages, {
       errors: result.semantic_errors,
       lexical: result.lexical_errors,
       syntax: result.syntax_errors,
-    }, result.symbol_table);
+    }, { total: result.symbol_count, fetchPage: pager(backendApi.getSymbols, result.result_id) });
     updateSummary(result);
     setStatus(result.ok ? 'Compilacion exitosa' : 'Compilacion con errores', result.ok ? 'success' : 'warning');
   } catch (err) {
+    state.running = false;
     setStatus('Fallo al compilar', 'warning');
     showError(err);
-  } finally {
-    state.running = false;
   }
 }
 
@@ -114,7 +446,8 @@ async function handleSemanticPreview() {
   try {
     renderSemantic([], { errors: 0, lexical: 0, syntax: 0 });
     els.semanticSummary.textContent = 'Analizando...';
-    const result = await backendApi.semanticPreview(els.editor.value);
+    const result = await analyzeLatest('semantic', ['semantic']);
+    if (!result) return;
     const mergedMessages = [
       ...(result.lexical_messages || []),
       ...(result.syntax_messages || []),
@@ -124,7 +457,7 @@ async function handleSemanticPreview() {
       errors: result.semantic_errors,
       lexical: result.lexical_errors,
       syntax: result.syntax_errors,
-    }, result.symbol_table);
+    }, { total: result.symbol_count, fetchPage: pager(backendApi.getSymbols, result.result_id) });
   } catch (err) {
     els.semanticSummary.textContent = 'Error al analizar';
     els.semanticMessages.textContent = `Error: ${err}`;
@@ -136,10 +469,37 @@ function wireEvents() {
   els.buttons.save.addEventListener('click', handleSaveFile);
   els.buttons.saveAs.addEventListener('click', handleSaveFileAs);
   els.buttons.run.addEventListener('click', handleRunCompiler);
-  els.buttons.newFile.addEventListener('click', resetEditorToSample);
+  els.buttons.newFile.addEventListener('click', () => {
+    resetEditorToSample();
+    ast.resultId = null;
+    syncDocument();
+    scheduleDiagnostics();
+    scheduleOutline();
+  });
   els.buttons.semantic.addEventListener('click', handleSemanticPreview);
+  els.astTab.addEventListener('shown.bs.tab', loadAst);
+  els.outlineTab.addEventListener('shown.bs.tab', refreshOutline);
+  els.outlineList.addEventListener('click', jumpToOutline);
+  els.editor.addEventListener('mousemove', scheduleHover);
+  els.editor.addEventListener('mouseleave', () => {
+    clearTimeout(hover.timer);
+    hover.offset = null;
+  });
+  els.liveToggle.addEventListener('change', toggleLive);
+  els.completionList.addEventListener('mousedown', pickCompletion);
+  els.editor.addEventListener('blur', closeCompletion);
+  els.editor.addEventListener('mousedown', closeCompletion);
   // Insertar 4 espacios al presionar Tab en el editor
   els.editor.addEventListener('keydown', (evt) => {
+    if (completionKey(evt)) {
+      evt.preventDefault();
+      return;
+    }
+    if (evt.key === 'F2') {
+      evt.preventDefault();
+      handleRename();
+      return;
+    }
     if (evt.key === 'Tab') {
       evt.preventDefault();
       const start = els.editor.selectionStart;
@@ -150,16 +510,16 @@ function wireEvents() {
       els.editor.selectionStart = els.editor.selectionEnd = start + indent.length;
       markDirty();
       updateLineNumbers();
+      syncDocument();
+      scheduleDiagnostics();
+      scheduleOutline();
     }
   });
-  const updateOnChange = () => {
-    markDirty();
-    updateLineNumbers();
-  };
-  ['input', 'change', 'keyup', 'cut', 'paste', 'drop'].forEach((evt) => {
+  // `input` ya cubre cortar, pegar y soltar; `keyup` solo repetia el trabajo.
+  ['input', 'change'].forEach((evt) => {
     els.editor.addEventListener(evt, updateOnChange);
   });
-  els.editor.addEventListener('scroll', syncLineNumbersScroll);
+  els.editor.addEventListener('input', followCompletion);
 }
 
 function start() {
@@ -168,6 +528,9 @@ function start() {
   wireEvents();
   markClean();
   resetOutputs();
+  syncDocument();
+  getEditorView().setHighlighter(fetchHighlight);
+  scheduleDiagnostics();
 }
 
 if (window.pywebview) {
@@ -11,4 +11,29 @@ export const backendApi = {
   saveFileAs: (suggested, content) => invoke('save_file_as', suggested, content),
   compile: (code, path) => invoke('compile', code, path),
   semanticPreview: (code) => invoke('semantic_preview', code),
+  openDocument: (content, path) => invoke('open_document', content, path),
+  applyEdits: (docId, version, edits) => invoke('apply_edits', docId, version, edits),
+  analyze: (docId, stages) => invoke('analyze', docId, stages),
+  closeDocument: (docId) => invoke('close_document', docId),
+  diagnostics: (docId, since) => invoke('diagnostics', docId, since),
+  highlight: (docId, firstLine, lastLine) => invoke('highlight', docId, firstLine, lastLine),
+  outline: (docId) => invoke('outline', docId),
+  hover: (docId, offset) => invoke('hover', docId, offset),
+  complete: (docId, offset) => invoke('complete', docId, offset),
+  rename: (docId, offset, newName) => invoke('rename', docId, offset, newName),
+  getTokens: (resultId, offset, limit) => invoke('get_tokens', resultId, offset, limit),
+  getSymbols: (resultId, offset, limit) => invoke('get_symbols', resultId, offset, limit),
+  getAst: (resultId) => invoke('get_ast', resultId),
 };
+
+// Inversa de `results.encode_tokens`: columnas (tipos/valores internados, lineas en deltas) a filas.
+export function decodeTokens(columns) {
+  const { types, type_ids: typeIds, lines, values, value_ids: valueIds } = columns;
+  const rows = new Array(typeIds.length);
+  let lineno = 0;
+  for (let i = 0; i < typeIds.length; i += 1) {
+    lineno += lines[i];
+    rows[i] = { lineno, type: types[typeIds[i]], value: values[valueIds[i]] };
+  }
+  return rows;
+}
@@ -1,15 +1,23 @@
 export const els = {
   editor: document.getElementById('editor'),
+  editorHighlight: document.getElementById('editor-highlight'),
   lineNumbers: document.getElementById('line-numbers'),
+  completionList: document.getElementById('completion-list'),
   pathLabel: document.getElementById('path-label'),
   statusBadge: document.getElementById('status-badge'),
   summaryLabel: document.getElementById('summary-label'),
+  liveToggle: document.getElementById('live-toggle'),
   messagesBox: document.getElementById('messages'),
+  tokensScroll: document.getElementById('tokens-scroll'),
   tokensBody: document.getElementById('tokens-body'),
+  astTab: document.getElementById('ast-tab'),
   astPre: document.getElementById('ast-pre'),
   semanticMessages: document.getElementById('semantic-messages'),
   semanticSummary: document.getElementById('semantic-summary'),
+  symbolsScroll: document.getElementById('symbols-scroll'),
   symbolTableBody: document.getElementById('symbol-table-body'),
+  outlineTab: document.getElementById('outline-tab'),
+  outlineList: document.getElementById('outline-list'),
   buttons: {
     open: document.getElementById('open-btn'),
     save: document.getElementById('save-btn'),
@@ -0,0 +1,232 @@
+// Gutter y resaltado del editor pintando solo las lineas visibles (mas un margen).
+// Los inicios de linea se actualizan con cada edicion en lugar de recontar todo
+// el texto, y los colores salen de los tokens del lexer del backend para la vista.
+import { escapeHtml } from './virtual.js';
+import { codePoints, diffRange, lineStarts, toUnits, upperBound } from './text.js';
+
+const OVERSCAN = 5;
+const CACHE_LIMIT = 20000;
+
+export class EditorView {
+  // fetchHighlight(firstLine, lastLine) -> Promise<respuesta de `highlight` | null>
+  constructor({ editor, gutter, overlay, margin = 40 }) {
+    Object.assign(this, { editor, gutter, overlay, margin });
+    this.text = editor.value;
+    this.starts = lineStarts(this.text);
+    this.hint = 0;
+    this.changedFrom = Infinity;
+    this.revision = 0;
+    this.frame = 0;
+    this.fetchHighlight = null;
+    this.inFlight = false;
+    this.pending = false;
+    // Texto de linea -> html resaltado: sobrevive a corrimientos de lineas y a ediciones en otras lineas.
+    this.lineHtml = new Map();
+    // Linea -> diagnosticos en vivo (ver `setDiagnostics`).
+    this.diagnostics = new Map();
+    editor.addEventListener('beforeinput', () => {
+      this.hint = editor.selectionStart;
+    });
+    editor.addEventListener('scroll', () => {
+      this.schedule();
+      this.requestHighlight();
+    });
+  }
+
+  get lineCount() {
+    return this.starts.length;
+  }
+
+  setDiagnostics(diagnostics) {
+    this.diagnostics = diagnostics;
+    this.schedule();
+  }
+
+  gutterRow(line) {
+    const items = this.diagnostics.get(line);
+    if (!items) return `<div class="line-number-row">${line}</div>`;
+    const title = escapeHtml(items.map((item) => item.message).join('\n'));
+    return `<div class="line-number-row has-error" title="${title}">${line}</div>`;
+  }
+
+  setHighlighter(fetchHighlight) {
+    this.fetchHighlight = fetchHighlight;
+    this.requestHighlight();
+  }
+
+  // Aplica el cambio entre el texto anterior y el actual del textarea.
+  sync() {
+    const value = this.editor.value;
+    if (value === this.text) return;
+    const hint = Math.min(this.hint, this.editor.selectionStart);
+    const { start, end } = diffRange(this.text, value, hint);
+    const deleted = this.text.length - end - start;
+    const inserted = value.slice(start, value.length - end);
+    this.text = value;
+    this.changedFrom = Math.min(this.changedFrom, start);
+    this.revision += 1;
+    this.hint = this.editor.selectionStart;
+    this.shiftStarts(start, deleted, inserted);
+    this.schedule();
+    this.requestHighlight();
+  }
+
+  // Primer offset cambiado desde la ultima llamada: pista para el diff que se envia al backend.
+  takeChangedFrom() {
+    const from = this.changedFrom;
+    this.changedFrom = Infinity;
+    return Number.isFinite(from) ? from : 0;
+  }
+
+  shiftStarts(start, deleted, inserted) {
+    const added = [];
+    for (let idx = inserted.indexOf('\n'); idx !== -1; idx = inserted.indexOf('\n', idx + 1)) added.push(start + idx + 1);
+    if (added.length > 10000) {
+      this.starts = lineStarts(this.text);
+      return;
+    }
+    const { starts } = this;
+    const lo = upperBound(starts, start);
+    const hi = upperBound(starts, start + deleted);
+    const delta = inserted.length - deleted;
+    for (let i = hi; i < starts.length; i += 1) starts[i] += delta;
+    starts.splice(lo, hi - lo, ...added);
+  }
+
+  lineText(line) {
+    const begin = this.starts[line - 1];
+    const end = line < this.starts.length ? this.starts[line] - 1 : this.text.length;
+    return this.text.slice(begin, end);
+  }
+
+  // Lleva el cursor al inicio de `line` y la deja visible en la parte superior.
+  revealLine(line) {
+    const target = Math.min(Math.max(line, 1), this.lineCount);
+    const offset = this.starts[target - 1];
+    this.editor.focus();
+    this.editor.setSelectionRange(offset, offset);
+    this.editor.scrollTop = (target - 1) * this.metrics().lineHeight;
+    this.schedule();
+  }
+
+  // Offset (en code points, como el backend) del caracter bajo el puntero; null fuera del texto.
+  offsetAt(clientX, clientY) {
+    const rect = this.editor.getBoundingClientRect();
+    const style = getComputedStyle(this.editor);
+    const top = clientY - rect.top - parseFloat(style.paddingTop) + this.editor.scrollTop;
+    const left = clientX - rect.left - parseFloat(style.paddingLeft) + this.editor.scrollLeft;
+    const line = Math.floor(top / this.metrics().lineHeight) + 1;
+    if (line < 1 || line > this.lineCount || left < 0) return null;
+    const column = Math.floor(left / this.charWidth());
+    if (column >= this.lineText(line).length) return null;
+    return codePoints(this.text.slice(0, this.starts[line - 1] + column));
+  }
+
+  // Esquina inferior izquierda del cursor en pixeles dentro de la vista del editor.
+  caretPoint() {
+    const style = getComputedStyle(this.editor);
+    const caret = this.editor.selectionStart;
+    const line = upperBound(this.starts, caret);
+    const column = caret - this.starts[line - 1];
+    return {
+      top: line * this.metrics().lineHeight + parseFloat(style.paddingTop) - this.editor.scrollTop,
+      left: column * this.charWidth() + parseFloat(style.paddingLeft) - this.editor.scrollLeft,
+    };
+  }
+
+  // Ancho de un caracter de la fuente monoespaciada del editor.
+  charWidth() {
+    if (!this.cellWidth) {
+      const context = document.createElement('canvas').getContext('2d');
+      context.font = getComputedStyle(this.editor).font;
+      this.cellWidth = context.measureText('M').width || 8;
+    }
+    return this.cellWidth;
+  }
+
+  metrics() {
+    const lineHeight = parseFloat(getComputedStyle(this.editor).lineHeight) || 24;
+    const first = Math.max(Math.floor(this.editor.scrollTop / lineHeight) + 1, 1);
+    const rows = Math.ceil(this.editor.clientHeight / lineHeight) + 1;
+    return { lineHeight, first, last: Math.min(first + rows, this.lineCount) };
+  }
+
+  schedule() {
+    if (this.frame) return;
+    this.frame = requestAnimationFrame(() => {
+      this.frame = 0;
+      this.render();
+    });
+  }
+
+  render() {
+    const { lineHeight, first, last } = this.metrics();
+    const from = Math.max(first - OVERSCAN, 1);
+    const to = Math.min(last + OVERSCAN, this.lineCount);
+    const offsetY = (from - 1) * lineHeight - this.editor.scrollTop;
+    const numbers = [];
+    const lines = [];
+    for (let line = from; line <= to; line += 1) {
+      numbers.push(this.gutterRow(line));
+      const text = this.lineText(line);
+      lines.push(this.lineHtml.get(text) ?? escapeHtml(text));
+    }
+    this.gutter.style.minWidth = `${String(this.lineCount).length + 3}ch`;
+    this.gutter.innerHTML = `<div style="transform: translateY(${offsetY}px)">${numbers.join('')}</div>`;
+    this.overlay.innerHTML = lines.join('\n');
+    this.overlay.style.transform = `translate(${-this.editor.scrollLeft}px, ${offsetY}px)`;
+  }
+
+  // Pide los tokens de la vista; como mucho un pedido en vuelo, el siguiente se agrupa.
+  async requestHighlight() {
+    if (!this.fetchHighlight) return;
+    if (this.inFlight) {
+      this.pending = true;
+      return;
+    }
+    this.inFlight = true;
+    try {
+      const { first, last } = this.metrics();
+      const revision = this.revision;
+      const result = await this.fetchHighlight(Math.max(first - this.margin, 1), last + this.margin);
+      if (result && result.ok && revision === this.revision) {
+        this.applyHighlight(result);
+        this.schedule();
+      }
+    } catch (err) {
+      // Sin colores hasta el proximo pedido: el texto sigue visible sin resaltar.
+    } finally {
+      this.inFlight = false;
+      if (this.pending) {
+        this.pending = false;
+        this.requestHighlight();
+      }
+    }
+  }
+
+  applyHighlight({ first_line: firstLine, last_line: lastLine, classes, spans }) {
+    if (lastLine > this.lineCount) return;
+    const base = this.starts[firstLine - 1];
+    const segment = this.text.slice(base, lastLine < this.lineCount ? this.starts[lastLine] - 1 : this.text.length);
+    const units = toUnits(segment);
+    if (this.lineHtml.size > CACHE_LIMIT) this.lineHtml.clear();
+    let cursor = 0;
+    for (let line = firstLine; line <= lastLine; line += 1) {
+      const lineStart = this.starts[line - 1] - base;
+      const lineEnd = lineStart + this.lineText(line).length;
+      const parts = [];
+      let pos = lineStart;
+      while (cursor < spans.length && units(spans[cursor]) < lineEnd) {
+        const lo = Math.max(units(spans[cursor]), lineStart);
+        const hi = Math.min(units(spans[cursor + 1]), lineEnd);
+        if (lo > pos) parts.push(escapeHtml(segment.slice(pos, lo)));
+        parts.push(`<span class="hl-${classes[spans[cursor + 2]]}">${escapeHtml(segment.slice(lo, hi))}</span>`);
+        pos = hi;
+        if (units(spans[cursor + 1]) > lineEnd) break; // el token sigue en la proxima linea
+        cursor += 3;
+      }
+      if (pos < lineEnd) parts.push(escapeHtml(segment.slice(pos, lineEnd)));
+      this.lineHtml.set(segment.slice(lineStart, lineEnd), parts.join(''));
+    }
+  }
+}
@@ -0,0 +1,87 @@
+// Utilidades de texto compartidas por la sincronizacion con el backend y el editor.
+
+const ASTRAL = /[\uD800-\uDBFF][\uDC00-\uDFFF]/g;
+
+// El backend cuenta caracteres (code points); JS cuenta unidades UTF-16.
+export function codePoints(text) {
+  return text.length - (text.match(ASTRAL)?.length || 0);
+}
+
+function isHighSurrogate(code) {
+  return code >= 0xd800 && code <= 0xdbff;
+}
+
+// Prefijo y sufijo comunes (en unidades UTF-16) entre dos versiones del texto.
+// `hint` es donde probablemente empieza el cambio (p. ej. el cursor): si el
+// prefijo hasta ahi coincide se verifica con una comparacion nativa en lugar
+// de recorrer caracter por caracter, y lo mismo con el sufijo mas largo
+// posible, asi que una tecla cuesta O(1) recorridos en JS aunque el texto sea enorme.
+export function diffRange(before, after, hint = 0) {
+  const max = Math.min(before.length, after.length);
+  let start = Math.min(Math.max(hint, 0), max);
+  if (before.slice(0, start) !== after.slice(0, start)) start = 0;
+  while (start < max && before.charCodeAt(start) === after.charCodeAt(start)) start += 1;
+  if (start > 0 && isHighSurrogate(before.charCodeAt(start - 1))) start -= 1;
+  let end = max - start;
+  if (before.slice(before.length - end) !== after.slice(after.length - end)) {
+    end = 0;
+    while (end < max - start && before.charCodeAt(before.length - 1 - end) === after.charCodeAt(after.length - 1 - end)) end += 1;
+  }
+  if (end > 0 && isHighSurrogate(before.charCodeAt(before.length - end - 1))) end -= 1;
+  return { start, end };
+}
+
+// Edicion `{offset, deleted, text}` en code points que lleva `before` a `after`.
+export function diffEdit(before, after, hint = 0) {
+  const { start, end } = diffRange(before, after, hint);
+  return {
+    offset: codePoints(before.slice(0, start)),
+    deleted: codePoints(before.slice(start, before.length - end)),
+    text: after.slice(start, after.length - end),
+  };
+}
+
+// Offsets donde empieza cada linea.
+export function lineStarts(text) {
+  const starts = [0];
+  for (let idx = text.indexOf('\n'); idx !== -1; idx = text.indexOf('\n', idx + 1)) starts.push(idx + 1);
+  return starts;
+}
+
+// Primer indice con `sorted[i] > value`.
+export function upperBound(sorted, value) {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (sorted[mid] <= value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// Conversion de offsets en code points (backend) a unidades UTF-16 dentro de `segment`.
+export function toUnits(segment) {
+  if (!/[\uD800-\uDBFF]/.test(segment)) return (offset) => offset;
+  const map = [];
+  for (let unit = 0; unit < segment.length; unit += 1) {
+    map.push(unit);
+    if (segment.charCodeAt(unit) >= 0xd800 && segment.charCodeAt(unit) <= 0xdbff) unit += 1;
+  }
+  map.push(segment.length);
+  return (offset) => map[Math.min(offset, map.length - 1)];
+}
+
+// Aplica ediciones `{offset, deleted, text}` en code points, ordenadas de la ultima a la
+// primera (como las de `rename`), armando el texto nuevo en una sola pasada.
+export function applyEdits(text, edits) {
+  const units = toUnits(text);
+  const parts = [];
+  let pos = 0;
+  [...edits].reverse().forEach(({ offset, deleted, text: inserted }) => {
+    parts.push(text.slice(pos, units(offset)), inserted);
+    pos = units(offset + deleted);
+  });
+  parts.push(text.slice(pos));
+  return parts.join('');
+}
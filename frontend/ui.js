@@ -1,4 +1,6 @@
 import { els, sampleCode } from './dom.js';
+import { VirtualList, escapeHtml } from './virtual.js';
+import { EditorView } from './editor.js';
 
 export const state = {
   path: null,
@@ -37,48 +39,155 @@ export function basename(path) {
   return parts[parts.length - 1];
 }
 
+const ROW_HEIGHT = 30;
+const MESSAGE_HEIGHT = 34;
+const OUTLINE_KINDS = { namespace: 'ns', use: 'use', class: 'class', function: 'fn', method: 'fn' };
+const COMPLETION_KINDS = { var: 'var', param: 'var', func: 'fn', method: 'fn', class: 'class', keyword: 'kw' };
+
+const tableSpacer = (colspan) => (px) => (px > 0 ? `<tr class="virtual-spacer"><td colspan="${colspan}" style="height:${px}px"></td></tr>` : '');
+const blockSpacer = (px) => (px > 0 ? `<div class="virtual-spacer" style="height:${px}px"></div>` : '');
+
+function levelTone(level) {
+  return level === 'error' ? 'danger' : level === 'warning' ? 'warning' : 'secondary';
+}
+
+function outlineRow(item) {
+  const signature = item.kind === 'function' || item.kind === 'method' ? `(${item.params.join(', ')})` : '';
+  const modifiers = [item.visibility, item.is_static ? 'static' : null].filter(Boolean).join(' ');
+  return `
+    <div class="outline-row" data-line="${item.lineno}" style="padding-left:${item.depth * 1.25}rem" title="${escapeHtml(item.qualified)}">
+      <span class="badge text-bg-secondary">${OUTLINE_KINDS[item.kind] || item.kind}</span>
+      <span class="text-secondary">${modifiers}</span>
+      <span>${escapeHtml(item.name)}${escapeHtml(signature)}</span>
+      <span class="text-secondary ms-auto">${item.lineno}</span>
+    </div>
+  `;
+}
+
+function messageRow(entry, bucket, detail) {
+  const text = escapeHtml(entry.message);
+  return `
+    <div class="message-row">
+      <span class="badge text-bg-${levelTone(entry.level)}">${bucket}</span>
+      <span class="text-secondary small">${detail}</span>
+      <span class="message-text small" title="${text}">${text}</span>
+    </div>
+  `;
+}
+
+// Las listas se crean al primer uso (els ya existe cuando la GUI arranca).
+let panels = null;
+
+function getPanels() {
+  if (panels) return panels;
+  panels = {
+    messages: new VirtualList({
+      scroller: els.messagesBox,
+      body: els.messagesBox,
+      rowHeight: MESSAGE_HEIGHT,
+      spacer: blockSpacer,
+      empty: '<div class="text-secondary small">Sin mensajes. Ejecuta el compilador para ver resultados.</div>',
+      renderRow: (entry) => messageRow(entry, entry.bucket, entry.level?.toUpperCase() || 'INFO'),
+    }),
+    semantic: new VirtualList({
+      scroller: els.semanticMessages,
+      body: els.semanticMessages,
+      rowHeight: MESSAGE_HEIGHT,
+      spacer: blockSpacer,
+      empty: '<div class="text-secondary">Sin mensajes semanticos.</div>',
+      renderRow: (m) => messageRow(m, 'Semantico', typeof m.lineno === 'number' ? `Linea ${m.lineno}` : ''),
+    }),
+    tokens: new VirtualList({
+      scroller: els.tokensScroll,
+      body: els.tokensBody,
+      rowHeight: ROW_HEIGHT,
+      spacer: tableSpacer(3),
+      empty: '<tr><td colspan="3" class="text-center text-secondary">Sin datos</td></tr>',
+      renderRow: (t) => {
+        const line = typeof t.lineno === 'number' ? t.lineno.toString().padStart(3, '0') : '-';
+        const value = typeof t.value === 'string' ? t.value : JSON.stringify(t.value);
+        return `<tr class="virtual-row"><td class="text-secondary">${line}</td><td class="text-info">${t.type}</td><td class="text-light">${escapeHtml(value)}</td></tr>`;
+      },
+    }),
+    outline: new VirtualList({
+      scroller: els.outlineList,
+      body: els.outlineList,
+      rowHeight: ROW_HEIGHT,
+      spacer: blockSpacer,
+      empty: '<div class="text-secondary">Sin declaraciones</div>',
+      renderRow: outlineRow,
+    }),
+    symbols: new VirtualList({
+      scroller: els.symbolsScroll,
+      body: els.symbolTableBody,
+      rowHeight: ROW_HEIGHT,
+      spacer: tableSpacer(6),
+      empty: '<tr><td colspan="6" class="text-center text-secondary">Sin tabla de simbolos</td></tr>',
+      renderRow: (sym) => `
+        <tr class="virtual-row">
+          <td class="text-secondary">${sym.scope ?? 0}</td>
+          <td>${escapeHtml(sym.name)}</td>
+          <td class="text-light">${escapeHtml(sym.type ?? '')}</td>
+          <td class="text-info">${sym.kind}</td>
+          <td class="text-secondary">${escapeHtml(sym.value ?? '')}</td>
+          <td class="text-secondary">${typeof sym.lineno === 'number' ? sym.lineno : ''}</td>
+        </tr>
+      `,
+    }),
+  };
+  return panels;
+}
+
 export function renderMessages(result) {
   const combined = [
     ...(result.lexical_messages || []).map((m) => ({ ...m, bucket: 'Lexico' })),
     ...(result.syntax_messages || []).map((m) => ({ ...m, bucket: 'Sintactico' })),
     ...(result.semantic_messages || []).map((m) => ({ ...m, bucket: 'Semantico' })),
+    ...(result.lint_messages || []).map((m) => ({ ...m, bucket: 'Lint' })),
   ];
-  els.messagesBox.innerHTML = '';
+  getPanels().messages.setRows(combined);
+}
 
-  if (combined.length === 0) {
-    els.messagesBox.innerHTML = '<div class="text-secondary small">Sin mensajes. Ejecuta el compilador para ver resultados.</div>';
-    return;
-  }
+// total filas en el backend; fetchPage(offset, limit) -> Promise<filas>.
+export function renderTokens(total = 0, fetchPage = null) {
+  getPanels().tokens.setSource(total, fetchPage);
+}
 
-  const list = document.createElement('ul');
-  list.className = 'list-unstyled mb-0';
-  combined.forEach((entry) => {
-    const li = document.createElement('li');
-    li.className = 'py-2';
-    li.innerHTML = `
-      <div class="d-flex align-items-center justify-content-between">
-        <span class="badge text-bg-${entry.level === 'error' ? 'danger' : entry.level === 'warning' ? 'warning' : 'secondary'}">${entry.bucket}</span>
-        <span class="text-secondary small">${entry.level?.toUpperCase() || 'INFO'}</span>
-      </div>
-      <div class="mt-1 small">${entry.message}</div>
-    `;
-    list.appendChild(li);
+// Arbol de `outline` aplanado a filas con su profundidad.
+function flattenOutline(items, depth = 0, rows = []) {
+  items.forEach((item) => {
+    rows.push({ ...item, depth });
+    flattenOutline(item.children, depth + 1, rows);
   });
-  els.messagesBox.appendChild(list);
+  return rows;
 }
 
-export function renderTokens(tokens) {
-  els.tokensBody.innerHTML = '';
-  if (!tokens || tokens.length === 0) {
-    els.tokensBody.innerHTML = '<tr><td colspan="3" class="text-center text-secondary">Sin datos</td></tr>';
-    return;
-  }
-  const rows = tokens.map((t) => {
-    const line = typeof t.lineno === 'number' ? t.lineno.toString().padStart(3, '0') : '-';
-    const value = typeof t.value === 'string' ? t.value : JSON.stringify(t.value);
-    return `<tr><td class="text-secondary">${line}</td><td class="text-info">${t.type}</td><td class="text-light">${value}</td></tr>`;
-  });
-  els.tokensBody.innerHTML = rows.join('');
+export function renderOutline(items) {
+  getPanels().outline.setRows(flattenOutline(items || []));
+}
+
+// Lista de autocompletado bajo el cursor (`point` de `EditorView.caretPoint`).
+export function renderCompletion(items, active, point) {
+  const list = els.completionList;
+  list.innerHTML = items
+    .map(
+      (item, idx) => `
+    <div class="completion-row${idx === active ? ' active' : ''}" data-index="${idx}" role="option">
+      <span class="badge text-bg-secondary">${COMPLETION_KINDS[item.kind] || item.kind}</span>
+      <span>${escapeHtml(item.label)}</span>
+      <span class="text-secondary small">${escapeHtml(item.detail || '')}</span>
+    </div>`,
+    )
+    .join('');
+  list.style.top = `${point.top}px`;
+  list.style.left = `${point.left}px`;
+  list.classList.remove('d-none');
+  list.children[active]?.scrollIntoView({ block: 'nearest' });
+}
+
+export function hideCompletion() {
+  els.completionList.classList.add('d-none');
+  els.completionList.innerHTML = '';
 }
 
 export function renderAst(astJson) {
@@ -93,13 +202,15 @@ export function updateSummary(result) {
 }
 
 export function showError(message) {
-  els.messagesBox.innerHTML = `<div class="text-danger small">${message}</div>`;
+  getPanels().messages.setRows([]);
+  els.messagesBox.innerHTML = `<div class="text-danger small">${escapeHtml(message)}</div>`;
 }
 
 export function resetOutputs() {
   renderMessages({ lexical_messages: [], syntax_messages: [], semantic_messages: [] });
-  renderTokens([]);
+  renderTokens(0);
   renderAst(null);
+  renderOutline([]);
   els.summaryLabel.textContent = 'Sin ejecuciones';
   renderSemantic([], { errors: 0, lexical: 0, syntax: 0 });
 }
@@ -116,19 +227,22 @@ export function initEditorContent() {
   els.editor.value = sampleCode;
 }
 
-export function updateLineNumbers() {
-  const value = els.editor.value || '';
-  const lines = (value.match(/\n/g)?.length || 0) + 1;
-  const gutter = Array.from({ length: lines }, (_, i) => `<div class="line-number-row">${i + 1}</div>`).join('');
-  els.lineNumbers.innerHTML = gutter;
+let editorView = null;
+
+// Gutter y resaltado de las lineas visibles; se crea al primer uso como los paneles.
+export function getEditorView() {
+  if (!editorView) {
+    editorView = new EditorView({ editor: els.editor, gutter: els.lineNumbers, overlay: els.editorHighlight });
+  }
+  return editorView;
 }
 
-export function syncLineNumbersScroll() {
-  els.lineNumbers.scrollTop = els.editor.scrollTop;
+export function updateLineNumbers() {
+  getEditorView().sync();
 }
 
-export function renderSemantic(messages, counts, symbolTable = []) {
-  const container = els.semanticMessages;
+// symbols: { total, fetchPage } como en renderTokens.
+export function renderSemantic(messages, counts, symbols = {}) {
   const errors = counts?.errors ?? messages?.length ?? 0;
   const lex = counts?.lexical ?? 0;
   const syn = counts?.syntax ?? 0;
@@ -137,51 +251,6 @@ export function renderSemantic(messages, counts, symbolTable = []) {
     ? 'Sin errores semanticos'
     : `Semantico: ${errors} | Lexico: ${lex} | Sintactico: ${syn}`;
 
-  container.innerHTML = '';
-  if (!messages || messages.length === 0) {
-    container.innerHTML = '<div class="text-secondary">Sin mensajes semanticos.</div>';
-  } else {
-    const list = document.createElement('ul');
-    list.className = 'list-unstyled mb-0';
-    messages.forEach((m) => {
-      const lineTxt = typeof m.lineno === 'number' ? `Linea ${m.lineno}` : '';
-      const level = (m.level || 'info').toUpperCase();
-      const li = document.createElement('li');
-      li.className = 'py-2 border-bottom';
-      li.innerHTML = `
-        <div class="d-flex align-items-center justify-content-between">
-          <span class="badge text-bg-${m.level === 'error' ? 'danger' : 'secondary'}">Semantico</span>
-          <span class="text-secondary small">${lineTxt}</span>
-        </div>
-        <div class="mt-1 small">${level}: ${m.message}</div>
-      `;
-      list.appendChild(li);
-    });
-    container.appendChild(list);
-  }
-
-  // Render tabla de simbolos
-  const tbody = els.symbolTableBody;
-  if (!symbolTable || symbolTable.length === 0) {
-    tbody.innerHTML = '<tr><td colspan="6" class="text-center text-secondary">Sin tabla de simbolos</td></tr>';
-    return;
-  }
-  const rows = [];
-  symbolTable.forEach((scope) => {
-    const scopeId = scope.scope ?? 0;
-    (scope.symbols || []).forEach((sym) => {
-      const line = typeof sym.lineno === 'number' ? sym.lineno : '';
-      rows.push(`
-        <tr>
-          <td class="text-secondary">${scopeId}</td>
-          <td>${sym.name}</td>
-          <td class="text-light">${sym.type ?? ''}</td>
-          <td class="text-info">${sym.kind}</td>
-          <td class="text-secondary">${sym.value ?? ''}</td>
-          <td class="text-secondary">${line}</td>
-        </tr>
-      `);
-    });
-  });
-  tbody.innerHTML = rows.join('') || '<tr><td colspan="6" class="text-center text-secondary">Sin simbolos</td></tr>';
+  getPanels().semantic.setRows(messages || []);
+  getPanels().symbols.setSource(symbols.total || 0, symbols.fetchPage || null);
 }
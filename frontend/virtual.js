@@ -0,0 +1,94 @@
+// Listas virtualizadas: solo se pintan las filas visibles (mas un margen).
+// Las filas salen de un arreglo local o se piden al backend por paginas.
+
+export function escapeHtml(value) {
+  return String(value ?? '')
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;');
+}
+
+export class VirtualList {
+  // scroller: elemento con scroll; body: contenedor de filas (tbody/ul).
+  // renderRow(row, index) -> html; spacer(px) -> html de relleno; empty -> html sin filas.
+  constructor({ scroller, body, rowHeight, renderRow, spacer, empty, pageSize = 200, overscan = 10 }) {
+    Object.assign(this, { scroller, body, rowHeight, renderRow, spacer, empty, pageSize, overscan });
+    this.total = 0;
+    this.pages = new Map();
+    this.fetchPage = null;
+    this.generation = 0;
+    this.frame = 0;
+    scroller.addEventListener('scroll', () => this.schedule());
+  }
+
+  setRows(rows) {
+    this.reset(rows?.length || 0, null);
+    if (this.total) this.pages.set(0, rows);
+    this.pageSize = Math.max(this.total, 1);
+    this.render();
+  }
+
+  // fetchPage(offset, limit) -> Promise<filas>
+  setSource(total, fetchPage, pageSize = 200) {
+    this.reset(total || 0, fetchPage);
+    this.pageSize = pageSize;
+    this.scroller.scrollTop = 0;
+    this.render();
+  }
+
+  reset(total, fetchPage) {
+    this.generation += 1;
+    this.total = total;
+    this.fetchPage = fetchPage;
+    this.pages = new Map();
+  }
+
+  schedule() {
+    if (this.frame) return;
+    this.frame = requestAnimationFrame(() => {
+      this.frame = 0;
+      this.render();
+    });
+  }
+
+  row(index) {
+    const page = this.pages.get(Math.floor(index / this.pageSize));
+    return Array.isArray(page) ? page[index % this.pageSize] : undefined;
+  }
+
+  load(pageIndex) {
+    if (this.pages.has(pageIndex) || !this.fetchPage) return;
+    const generation = this.generation;
+    const pending = this.fetchPage(pageIndex * this.pageSize, this.pageSize).then((rows) => {
+      if (generation !== this.generation) return;
+      this.pages.set(pageIndex, rows || []);
+      this.schedule();
+    }, () => {
+      if (generation === this.generation) this.pages.delete(pageIndex);
+    });
+    this.pages.set(pageIndex, pending);
+  }
+
+  render() {
+    if (!this.total) {
+      this.body.innerHTML = this.empty;
+      return;
+    }
+    const visible = Math.ceil((this.scroller.clientHeight || 400) / this.rowHeight);
+    const first = Math.max(Math.floor(this.scroller.scrollTop / this.rowHeight) - this.overscan, 0);
+    const last = Math.min(first + visible + 2 * this.overscan, this.total);
+    const html = [this.spacer(first * this.rowHeight)];
+    for (let index = first; index < last; index += 1) {
+      const row = this.row(index);
+      if (row === undefined) {
+        this.load(Math.floor(index / this.pageSize));
+        html.push(this.spacer(this.rowHeight));
+      } else {
+        html.push(this.renderRow(row, index));
+      }
+    }
+    html.push(this.spacer((this.total - last) * this.rowHeight));
+    this.body.innerHTML = html.join('');
+  }
+}
@@ -0,0 +1,65 @@
+from backend.facade import CompilerFacade
+
+
+def messages(code: str):
+    result = CompilerFacade().compile(code)
+    return [m["message"] for m in result.semantic_messages]
+
+
+def test_method_calls_resolve_through_member_index():
+    code = """<?php
+    function main() {
+        $g = new Greeter("hola");
+        $g->greet("mundo");
+        $n = Greeter::count();
+        return $n + 1;
+    }
+    class Greeter {
+        public function __construct($prefix) { echo $prefix; }
+        public function greet($name, $suffix = "!") { echo $this->decorate($name) . $suffix; }
+        private function decorate($text) { return "[" . $text . "]"; }
+        public static function count() { return 1; }
+    }
+    ?>"""
+    assert messages(code) == []
+
+
+def test_undefined_method_and_arity_errors():
+    code = """<?php
+    class Greeter {
+        public function greet($name) { echo $name; }
+        private function secret() { return 1; }
+    }
+    $g = new Greeter();
+    $g->greet();
+    $g->wave();
+    $g->secret();
+    Greeter::greet("x");
+    $h = new Missing();
+    ?>"""
+    found = messages(code)
+
+    assert any("Method 'Greeter::greet' expects 1 args, got 0" in m for m in found)
+    assert any("undefined method Greeter::wave()" in m for m in found)
+    assert any("private method Greeter::secret()" in m for m in found)
+    assert any("Non-static method Greeter::greet()" in m for m in found)
+    assert any("Class 'Missing' not found" in m for m in found)
+
+
+def test_self_static_and_parent_resolve_to_the_current_class():
+    code = """<?php
+    class Contador {
+        public static function uno() { return 1; }
+        public static function dos() { return self::uno() + static::uno(); }
+        public function tres() { return self::dos() + 1; }
+        public function cuatro() { return parent::uno(); }
+    }
+    echo self::uno();
+    ?>"""
+    assert messages(code) == [
+        "[Semantic] Cannot use 'parent' in class 'Contador': it has no parent class (linea 6)",
+        "[Semantic] Cannot use 'self' outside of a class (linea 8)",
+    ]
+    assert not messages(code.replace("self::uno()", "Contador::uno()").replace("parent::", "self::"))
+    result = CompilerFacade().execute(code.split("public function cuatro")[0] + "}\necho Contador::dos();\n?>")
+    assert result.output == "2"
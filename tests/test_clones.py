@@ -0,0 +1,107 @@
+import json
+import random
+
+from backend.cli import main
+from backend.clones import CloneDetector, kgram_hashes, normalize, winnow
+from backend.facade import CompilerFacade
+from backend.outline import scan_spans
+
+ORIGINAL = """<?php
+function total($items, $tax) {
+    $sum = 0;
+    foreach ($items as $item) {
+        if ($item > 10) { $sum = $sum + $item * 2; } else { $sum = $sum + $item; }
+    }
+    return $sum + $sum * $tax / 100;
+}
+echo total(array(1, 2, 3), 21);
+?>"""
+
+COPY = """<?php
+$x = 1;
+function suma_total($lista, $iva) {
+    $acc = 0;
+    foreach ($lista as $v) {
+        if ($v > 99) { $acc = $acc + $v * 7; } else { $acc = $acc + $v; }
+    }
+    return $acc + $acc * $iva / 1000;
+}
+?>"""
+
+OTHER = """<?php
+class Caja {
+    public function abrir($n) { while ($n < 3) { $n = $n + 1; } return $n; }
+}
+echo "hola";
+?>"""
+
+
+def write(tmp_path, files):
+    for name, code in files.items():
+        (tmp_path / name).write_text(code, encoding="utf-8")
+
+
+def test_renamed_copy_is_reported_with_its_spans(tmp_path):
+    write(tmp_path, {"a.php": ORIGINAL, "b.php": COPY, "c.php": OTHER})
+    report = CompilerFacade(tmp_path).find_clones(["."], workers=1)
+    assert report.files == 3 and not report.errors and len(report.pairs) == 1
+    pair = report.pairs[0]
+    first = ORIGINAL[pair.first.start:pair.first.end]
+    second = COPY[pair.second.start:pair.second.end]
+    assert first.startswith("function total(") and first.endswith("/ 100;\n}")
+    assert second.startswith("function suma_total(") and second.endswith("/ 1000;\n}")
+    assert (pair.first.start_line, pair.first.end_line, pair.second.start_line, pair.second.end_line) == (2, 8, 3, 9)
+    assert normalize(scan_spans(first))[0] == normalize(scan_spans(second))[0]
+    assert pair.tokens == len(normalize(scan_spans(first))[0])
+
+
+def test_every_window_keeps_a_fingerprint():
+    rng = random.Random(7)
+    hashes = [rng.randint(0, 50) for _ in range(2000)]
+    chosen = winnow(hashes, 8)
+    positions = [pos for _, pos in chosen]
+    assert positions == sorted(set(positions))
+    for first in range(len(hashes) - 7):
+        window = hashes[first:first + 8]
+        assert any(first <= pos < first + 8 and value == min(window) for value, pos in chosen)
+    kinds = normalize(scan_spans(ORIGINAL))[0]
+    assert kgram_hashes(kinds, 5)[3] == kgram_hashes(kinds[3:8], 5)[0]
+
+
+def test_parallel_matches_serial_and_finds_planted_copies(tmp_path):
+    rng = random.Random(11)
+    snippets = [
+        "$a{n} = $b + {n};",
+        "if ($x > {n}) {{ echo $y; }}",
+        "while ($i < {n}) {{ $i = $i + 1; }}",
+        "$arr[{n}] = \"s\" . $q;",
+        "function f{n}($p, $q) {{ return $p * $q - {n}; }}",
+        "echo strlen($s{n}) + {n};",
+    ]
+    block = "\n".join(ORIGINAL.splitlines()[1:8])
+    files = {}
+    for idx in range(12):
+        lines = [rng.choice(snippets).format(n=rng.randint(0, 99)) for _ in range(rng.randint(5, 30))]
+        if idx % 4 == 0:
+            lines.insert(rng.randint(0, len(lines)), block.replace("$sum", f"$s{idx}"))
+        files[f"f{idx:02}.php"] = "<?php\n" + "\n".join(lines) + "\n?>"
+    write(tmp_path, files)
+
+    serial = CloneDetector(workers=1, max_postings=10**6).detect([tmp_path])
+    parallel = CloneDetector(workers=2, max_postings=10**6).detect([tmp_path])
+    assert serial.to_dict() == parallel.to_dict()
+    size = len(normalize(scan_spans(block))[0])
+    planted = {(pair.first.path, pair.second.path) for pair in serial.pairs if pair.tokens >= size}
+    names = [str(tmp_path / name) for name in ("f00.php", "f04.php", "f08.php")]
+    assert planted == {(names[0], names[1]), (names[0], names[2]), (names[1], names[2])}
+
+
+def test_cli_clones(tmp_path, capsys):
+    write(tmp_path, {"a.php": ORIGINAL, "b.php": COPY})
+    assert main(["clones", str(tmp_path), "--workers", "1"]) == 0
+    assert "a.php:2-8" in capsys.readouterr().out
+    assert main(["clones", str(tmp_path / "a.php"), str(tmp_path / "missing.php"), "--json", "--workers", "1"]) == 1
+    out = capsys.readouterr()
+    data = json.loads(out.out)
+    assert data["files"] == 1 and data["pairs"] == [] and data["errors"][0]["path"].endswith("missing.php")
+    assert main(["clones", str(tmp_path), "--min-tokens", "4", "--window", "8"]) == 1
@@ -0,0 +1,129 @@
+from backend.completion import DEFAULT_LIMIT, Candidate, CompletionIndex, PrefixTrie
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade
+from backend.semantic import SemanticAnalyzer, SymbolTable
+from backend.semantic.symbol_table import Symbol
+
+SAMPLE = """<?php
+namespace App;
+function suma($a, $b) { return $a + $b; }
+class Caja {
+  private function secreto() { return 1; }
+  public function abrir($llave) { $x = 1; return $this->secreto(); }
+  public static function crear() { return new Caja(); }
+}
+$caja = new Caja();
+$total = suma(1, 2);
+?>"""
+
+document_store = DocumentStore()
+
+
+def labels(result):
+    return [item["label"] for item in result["items"]]
+
+
+def type_at(facade, document, offset, text):
+    document_store.apply_edits(document.doc_id, document.version + 1, [{"offset": offset, "text": text}])
+    return facade.complete_document(document, offset + len(text))
+
+
+def test_candidates_follow_the_scope_and_member_context():
+    facade = CompilerFacade()
+    document = document_store.open(SAMPLE)
+    inside = SAMPLE.index("$x = 1;") + len("$x = 1;")
+    result = facade.complete_document(document, inside)
+    assert result["items"] and result["start"] == result["end"] == inside
+
+    # Los tries son de los analisis previos: el codigo a medio escribir no parsea pero
+    # los rangos de las funciones se corren con cada edicion.
+    result = type_at(facade, document, inside, " $")
+    assert document.parser.lexer.error_count or document.parser.error_count
+    assert labels(result)[:3] == ["$llave", "$this", "$x"] and "$caja" in labels(result)
+    assert result["start"] == result["end"] - 1
+    result = type_at(facade, document, result["end"], "this->")
+    assert labels(result) == ["abrir", "secreto"]  # dentro de la clase se ven los privados
+
+    tail = document.text.index("?>")
+    assert labels(type_at(facade, document, tail, "$caja->")) == ["abrir"]
+    assert labels(type_at(facade, document, document.text.index("?>"), ";\nCaja::")) == ["crear"]
+    result = type_at(facade, document, document.text.index("?>"), ";\nsu")
+    assert [(item["label"], item["kind"], item["detail"]) for item in result["items"]] == [("suma", "func", "App\\suma")]
+    assert [item["kind"] for item in type_at(facade, document, result["end"], "; re")["items"]] == ["keyword"] * 2
+
+
+def dump(index):
+    return {key: trie.complete("", 10**6) for key, trie in index.tries.items()}
+
+
+def test_reanalysis_only_touches_what_changed():
+    facade = CompilerFacade()
+    document = document_store.open(SAMPLE)
+    facade.diagnose_document(document)
+    before = len(document.completions.tries)
+    old = "$total = suma(1, 2);"
+    document_store.apply_edits(
+        document.doc_id, 1, [{"offset": document.text.index(old), "deleted": len(old), "text": "$suma = suma(1, 2);"}]
+    )
+    facade.diagnose_document(document)
+    assert document.completions.changes == 2 and len(document.completions.tries) == before
+
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(document.parser.program)
+    fresh = CompletionIndex()
+    fresh.update(analyzer.symtab, analyzer.members)
+    assert dump(document.completions) == dump(fresh)
+
+
+def test_trie_discards_and_prunes_entries():
+    trie = PrefixTrie()
+    foo, klass = Candidate("foo", "func"), Candidate("Foo", "class")
+    trie.add("foo", foo)
+    trie.add("Foo", klass)
+    trie.add("foobar", Candidate("foobar", "func"))
+    assert len(trie) == 3 and trie.complete("FO", 2) == [klass, foo]
+    trie.discard("foobar", Candidate("foobar", "func"))
+    trie.discard("foo", foo)
+    assert len(trie) == 1 and trie.complete("f") == [klass]
+    trie.discard("Foo", klass)
+    assert not trie.root.children and trie.complete("") == []
+
+
+class CountingChildren(dict):
+    """Hijos de un nodo del trie que cuentan cada paso hacia ellos."""
+
+    walked = 0
+
+    def get(self, key, default=None):
+        CountingChildren.walked += 1
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key):
+        CountingChildren.walked += 1
+        return dict.__getitem__(self, key)
+
+
+def test_queries_walk_a_bounded_part_of_the_trie_with_100k_symbols():
+    symtab = SymbolTable()
+    for idx in range(100_000):
+        name = f"$v{idx}" if idx % 2 else f"fn{idx}"
+        symtab.declare(name, Symbol(name, "var" if idx % 2 else "func", "int"))
+    index = CompletionIndex()
+    assert index.update(symtab) == 100_000
+
+    stack = [trie.root for trie in (*index.tries.values(), index.keywords)]
+    total = 0
+    while stack:
+        node = stack.pop()
+        node.children = CountingChildren(node.children)
+        stack.extend(node.children.values())
+        total += 1
+    for prefix in ("$", "$v", "fn", "f", "$v1", "fn2", ""):
+        CountingChildren.walked = 0
+        assert len(index.complete(f"<?php {prefix}", 6 + len(prefix))[1]) == DEFAULT_LIMIT
+        # el recorrido corta al juntar `limit` candidatos: no depende de cuantos simbolos hay
+        assert CountingChildren.walked <= 5 * DEFAULT_LIMIT < total // 100
+
+    symtab.declare("$nuevo", Symbol("$nuevo", "var"))
+    assert index.update(symtab) == 1
+    assert [item.label for item in index.complete("$nu", 3)[1]] == ["$nuevo"]
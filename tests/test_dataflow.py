@@ -0,0 +1,67 @@
+from backend.lexer import PhpLexer
+from backend.parser import build_parser
+from backend.semantic import FunctionDataflow, LintEngine, build_all
+
+
+def parse(code: str):
+    parser = build_parser()
+    ast = parser.parse(code, lexer=PhpLexer().lexer)
+    assert parser.error_count == 0
+    return ast
+
+
+CODE = """<?php
+function f($flag) {
+    if ($flag) {
+        $x = 1;
+    }
+    $y = 2;
+    while ($flag) {
+        $y = $y + 1;
+    }
+    return $x;
+    echo $y;
+}
+?>"""
+
+
+def test_cfg_and_definite_assignment():
+    graphs = build_all(parse(CODE))
+    assert set(graphs) == {"<main>", "f"}
+
+    flow = FunctionDataflow(graphs["f"])
+    assert [name for name, _ in flow.maybe_unassigned()] == ["$x"]
+    assert flow.unreachable_blocks()  # echo tras return
+
+
+def test_liveness_and_reaching_definitions():
+    cfg = build_all(parse(CODE))["f"]
+    flow = FunctionDataflow(cfg)
+
+    # $x llega vivo a la entrada: hay un camino que lo lee sin asignarlo
+    assert flow.vars_of(flow.live_in[cfg.entry]) == ["$flag", "$x"]
+    reaching_exit = {name for name, _ in flow.reaching_at_block(cfg.exit)}
+    assert reaching_exit == {"$flag", "$x", "$y"}
+    # las asignaciones a $y se releen en la siguiente iteracion del bucle
+    assert [name for name, _ in flow.dead_stores()] == []
+
+
+def test_possibly_unassigned_lint_rule():
+    messages = LintEngine().run(parse(CODE))
+    flagged = [m for m in messages if m.rule == "possibly-unassigned"]
+    assert len(flagged) == 1 and "$x" in flagged[0].message
+
+
+def test_dead_store_detected():
+    code = "<?php function g() { $a = 1; $a = 2; return $a; } ?>"
+    flow = FunctionDataflow(build_all(parse(code))["g"])
+    dead = flow.dead_stores()
+    assert [name for name, _ in dead] == ["$a"]
+
+
+def test_entry_block_sees_only_parameters_and_static_methods_have_no_this():
+    code = "<?php function g($p) { $a = 1; $a = 2; return $a; } class K { public static function s($q) { return $q; } } ?>"
+    graphs = build_all(parse(code))
+    cfg = graphs["g"]
+    assert [name for name, _ in FunctionDataflow(cfg).reaching_at_block(cfg.entry)] == ["$p"]
+    assert graphs["K::s"].params == ["$q"]
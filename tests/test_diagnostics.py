@@ -0,0 +1,70 @@
+from backend.diagnostics import DiagnosticsTracker, by_line
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade
+
+SAMPLE = """<?php
+$a = 1;
+echo $a;
+?>"""
+
+
+def _apply(lines, delta):
+    if delta["full"]:
+        lines = {}
+    for line in delta["removed"]:
+        del lines[line]
+    for line, items in delta["changed"]:
+        lines[line] = items
+    return lines
+
+
+def test_diagnostics_only_run_the_error_stages():
+    facade = CompilerFacade()
+    document = DocumentStore().open(SAMPLE.replace("echo $a;", "echo $b;"))
+    diagnostics = facade.diagnose_document(document)
+    assert [(d["lineno"], d["stage"]) for d in diagnostics] == [(3, "semantic")]
+    assert set(diagnostics[0]) == {"lineno", "level", "stage", "message"}
+
+    # Con errores lexicos o sintacticos no se corre la semantica.
+    broken = DocumentStore().open(SAMPLE.replace("$a = 1;", "$a = 1 +;\n$c = \"x"))
+    stages = {d["stage"] for d in facade.diagnose_document(broken)}
+    assert "semantic" not in stages and stages & {"lexical", "syntax"}
+    assert all(d["lineno"] for d in facade.diagnose_document(broken))
+
+
+def test_tracker_sends_only_changed_lines():
+    tracker = DiagnosticsTracker()
+    first = tracker.delta("doc-1", [{"lineno": 2, "message": "x"}, {"lineno": 5, "message": "y"}])
+    assert first["full"] and [line for line, _ in first["changed"]] == [2, 5] and first["count"] == 2
+
+    second = tracker.delta("doc-1", [{"lineno": 5, "message": "y"}, {"lineno": 7, "message": "z"}], since=first["seq"])
+    assert not second["full"]
+    assert second["changed"] == [[7, [{"lineno": 7, "message": "z"}]]] and second["removed"] == [2]
+
+    # Una secuencia vieja (respuesta perdida) obliga a un envio completo.
+    stale = tracker.delta("doc-1", [{"lineno": 5, "message": "y"}], since=first["seq"])
+    assert stale["full"] and stale["changed"] == [[5, [{"lineno": 5, "message": "y"}]]]
+    tracker.forget("doc-1")
+    assert tracker.delta("doc-1", [], since=stale["seq"])["full"]
+
+
+def test_applied_deltas_track_the_full_state_while_editing():
+    facade = CompilerFacade()
+    store = DocumentStore()
+    document = store.open(SAMPLE)
+    tracker = DiagnosticsTracker()
+    edits = [
+        ("echo $a;", "echo $a;\necho $b;"),
+        ("$a = 1;", "\n\n$a = 1;"),
+        ("echo $b;", "echo $b + ;"),
+        ("echo $b + ;", "echo $a;"),
+    ]
+    lines, seq = {}, None
+    for version, (old, new) in enumerate(edits, start=1):
+        offset = document.text.index(old)
+        store.apply_edits(document.doc_id, version, [{"offset": offset, "deleted": len(old), "text": new}])
+        diagnostics = facade.diagnose_document(document)
+        delta = tracker.delta(document.doc_id, diagnostics, since=seq)
+        lines, seq = _apply(lines, delta), delta["seq"]
+        assert lines == by_line(diagnostics)
+    assert lines == {}
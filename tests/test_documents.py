@@ -0,0 +1,119 @@
+import random
+
+from backend import documents
+from backend.documents import DocumentError, DocumentStore, TextBuffer
+from backend.facade import CompilerFacade
+
+SAMPLE = """<?php
+function doble($x) { return $x * 2; }
+$a = doble(4);
+echo $a;
+?>"""
+
+
+def test_text_buffer_matches_plain_string(monkeypatch):
+    monkeypatch.setattr(documents, "CHUNK_SIZE", 8)
+    rng = random.Random(5)
+    text = SAMPLE
+    buffer = TextBuffer(text)
+    for _ in range(300):
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, min(12, len(text) - offset))
+        inserted = rng.choice(["", "x", "\n", "ab\ncd\n", "ñ" * 9])
+        buffer.replace(offset, deleted, inserted)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        assert buffer.text() == text and len(buffer) == len(text)
+        assert buffer.line_count == text.count("\n") + 1
+        probe = rng.randint(0, len(text))
+        line, col = buffer.position_at(probe)
+        assert buffer.offset_at(line, col) == probe
+        assert buffer.line(line) == text.split("\n")[line - 1]
+        assert buffer.slice(probe // 2, probe) == text[probe // 2:probe]
+
+
+def test_store_applies_versioned_edits_and_rolls_back_bad_batches():
+    store = DocumentStore()
+    document = store.open(SAMPLE, path="demo.php")
+    assert (document.doc_id, document.version) == ("doc-1", 0)
+
+    offset = SAMPLE.index("4")
+    store.apply_edits("doc-1", 1, [{"offset": offset, "deleted": 1, "text": "21"}])
+    # Rango por (linea, columna): reemplaza `$a` de la linea 4.
+    store.apply_edits("doc-1", 2, [{"start": [4, 5], "end": [4, 7], "text": "$a + 1"}])
+    expected = SAMPLE.replace("doble(4)", "doble(21)").replace("echo $a;", "echo $a + 1;")
+    assert document.text == document.buffer.text() == expected
+    assert document.version == 2 and document.parser.program is not None
+
+    try:
+        store.apply_edits("doc-1", 5, [])
+    except DocumentError as exc:
+        assert exc.version == 2
+    else:
+        raise AssertionError("version fuera de orden aceptada")
+
+    bad = [{"offset": 0, "deleted": 0, "text": "// x\n"}, {"offset": 10_000, "deleted": 1, "text": ""}]
+    try:
+        store.apply_edits("doc-1", 3, bad)
+    except DocumentError:
+        pass
+    else:
+        raise AssertionError("edicion fuera del texto aceptada")
+    assert document.text == document.buffer.text() == expected and document.version == 2
+
+    store.close("doc-1")
+    try:
+        store.get("doc-1")
+    except DocumentError:
+        pass
+    else:
+        raise AssertionError("documento cerrado sigue abierto")
+
+
+def test_analyze_document_matches_full_compile():
+    facade = CompilerFacade()
+    store = DocumentStore()
+    document = store.open(SAMPLE)
+    store.apply_edits(document.doc_id, 1, [{"offset": len(SAMPLE) - 2, "deleted": 0, "text": "echo $nope;\n"}])
+
+    result = facade.analyze_document(document, ["tokens", "ast", "semantic", "lint"])
+    compiled = facade.compile(document.text)
+    for key in ("ok", "tokens", "ast_json", "semantic_messages", "semantic_errors", "symbol_table", "lint_messages",
+                "lexical_errors", "syntax_errors"):
+        assert result[key] == getattr(compiled, key), key
+    assert result["semantic_errors"] and result["version"] == 1
+
+    store.apply_edits(document.doc_id, 2, [{"offset": SAMPLE.index("return"), "deleted": 6, "text": "retur"}])
+    broken = facade.analyze_document(document)
+    assert not broken["ok"] and broken["syntax_errors"] and broken["semantic_messages"] == []
+    assert set(broken) >= {"syntax_messages", "lexical_messages"} and "tokens" not in broken
+
+    try:
+        facade.analyze_document(document, ["bytecode"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("etapa desconocida aceptada")
+
+
+def test_highlight_returns_only_the_requested_lines(monkeypatch):
+    from backend.lexer import incremental
+
+    monkeypatch.setattr(incremental, "BLOCK_SIZE", 4)
+    text = SAMPLE.replace("echo $a;", "echo 'uno\ndos' . $a; // fin")
+    document = DocumentStore().open(text)
+    lines = text.split("\n")
+
+    result = document.highlight(2, 3)
+    base = text.index(lines[1])
+    painted = [
+        (text[base + lo:base + hi], result["classes"][css])
+        for lo, hi, css in zip(*[iter(result["spans"])] * 3)
+    ]
+    assert painted[:3] == [("function", "keyword"), ("doble", "name"), ("(", "punct")]
+    assert ("$a", "variable") in painted and ("4", "number") in painted and ("echo", "keyword") not in painted
+
+    # Un string de dos lineas se recorta al rango pedido.
+    tail = document.highlight(5, 5)
+    start = text.index("dos")
+    assert (text[start + tail["spans"][0]:start + tail["spans"][1]], tail["classes"][tail["spans"][2]]) == ("dos'", "string")
+    assert document.highlight(0, 10_000)["last_line"] == len(lines)
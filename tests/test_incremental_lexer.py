@@ -0,0 +1,98 @@
+import random
+from pathlib import Path
+
+from backend.lexer import IncrementalLexer, PhpLexer
+from backend.lexer import incremental
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+SAMPLE = """<?php
+// comentario
+$a = "uno
+dos" . 'tres';
+/* bloque
+   de varias lineas */
+if ($a <= 1.5) { echo $a; } ?>"""
+
+
+def full_lex(text: str):
+    errors = []
+    lexer = PhpLexer(reporter=lambda level, message: errors.append(message))
+    lexer.lexer.input(text)
+    tokens = []
+    while True:
+        tok = lexer.lexer.token()
+        if tok is None:
+            return tokens, errors
+        tokens.append((tok.type, tok.value, tok.lexpos, lexer.lexer.lexpos, tok.lineno))
+
+
+def assert_matches_full_lex(lexer: IncrementalLexer):
+    tokens, errors = full_lex(lexer.text)
+    assert list(lexer.spans()) == tokens
+    assert lexer.errors == errors and lexer.error_count == len(errors)
+
+
+def test_random_edits_match_full_lexing(monkeypatch):
+    monkeypatch.setattr(incremental, "BLOCK_SIZE", 4)
+    pieces = ['"', "'", "/*", "*/", "\n", " ", "$", "1", ".5", "a", "<?php", "?>", "=", "!", "//", "#", "@", "3a", "$ 9", ";", "}"]
+    rng = random.Random(7)
+    lexer = IncrementalLexer(SAMPLE + (BENCH_DIR / "strings.php").read_text(encoding="utf-8"))
+    for _ in range(300):
+        offset = rng.randint(0, len(lexer.text))
+        deleted = min(rng.choice([0, 0, 1, 3, 20]), len(lexer.text) - offset)
+        lexer.edit(offset, deleted, "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3))))
+        assert_matches_full_lex(lexer)
+
+
+def test_comments_and_strings_opened_and_closed_by_edits():
+    lexer = IncrementalLexer(SAMPLE)
+    comment = SAMPLE.index("$a =")
+    change = lexer.edit(comment, 0, "/*")
+    assert_matches_full_lex(lexer)
+    # Todo hasta el `*/` existente queda dentro del comentario.
+    assert change.resynced and change.added == 0 and change.removed > 5
+    lexer.edit(comment, 2, "")
+    assert_matches_full_lex(lexer)
+
+    quote = lexer.text.index("'tres'")
+    lexer.edit(quote, 1, "")
+    assert lexer.error_count == 1
+    assert_matches_full_lex(lexer)
+    lexer.edit(quote, 0, "'")
+    assert lexer.error_count == 0
+    assert_matches_full_lex(lexer)
+
+    # Un `/*` sin cerrar se tokeniza como `/` `*`; cerrarlo despues lo convierte en comentario.
+    lexer.edit(len(lexer.text) - 2, 0, "/* x")
+    assert_matches_full_lex(lexer)
+    lexer.edit(len(lexer.text), 0, "*/")
+    assert_matches_full_lex(lexer)
+
+
+def test_small_edit_relexes_locally_and_shifts_the_tail():
+    body = "".join(path.read_text(encoding="utf-8") for path in sorted(BENCH_DIR.glob("*.php")))
+    lexer = IncrementalLexer(body * 20)
+    before = list(lexer.tokens())
+    offset = lexer.text.index("$", len(lexer.text) // 2)
+    change = lexer.edit(offset, 0, "\n\n$zz = 1;")
+    assert change.resynced and change.relexed_to - change.relexed_from < 30
+    assert change.added - change.removed == 4 and change.removed <= 2
+    after = list(lexer.tokens())
+    assert len(after) == len(before) + 4
+    assert (after[-1].lexpos, after[-1].lineno) == (before[-1].lexpos + 10, before[-1].lineno + 2)
+    assert_matches_full_lex(lexer)
+
+
+def test_error_lines_follow_edits():
+    lexer = IncrementalLexer("<?php\n$x = 1;\n@\n?>")
+    assert lexer.errors == ["[Lexer] Error lexico en linea 3: caracter inesperado '@'"]
+    lexer.edit(0, 0, "\n\n")
+    assert lexer.errors == ["[Lexer] Error lexico en linea 5: caracter inesperado '@'"]
+    assert [tok.type for tok in lexer.tokens()][:2] == ["PHP_OPEN", "VARIABLE"]
+    try:
+        lexer.edit(len(lexer.text), 1, "")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("edicion fuera del texto aceptada")
@@ -0,0 +1,109 @@
+import random
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+from backend.lexer import PhpLexer
+from backend.parser import IncrementalParser, build_parser
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+SAMPLE = """<?php
+function a($x) { return $x + 1; }
+class K { public function m() { return 2; } }
+if (a(1) > 1) { echo "si"; } else { echo "no"; }
+$total = 0;
+for ($i = 0; $i < 3; $i++) { $total = $total + a($i); }
+echo $total;
+?>"""
+
+
+PARSER = build_parser(reporter=lambda level, message: None)
+
+
+def full_parse(text: str):
+    parser = PARSER
+    program = parser.parse(text, lexer=PhpLexer(reporter=lambda level, message: None).lexer)
+    return program, [error.message for error in parser.errors]
+
+
+def lines_of(node):
+    """(tipo, linea, inicio, fin) de cada nodo en preorden, para comparar tambien posiciones."""
+    out, stack = [], [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif is_dataclass(item):
+            out.append((type(item).__name__, getattr(item, "lineno", None), item.start, item.end))
+            stack.extend(reversed([getattr(item, f.name) for f in fields(item)]))
+    return out
+
+
+def assert_matches_full_parse(parser: IncrementalParser):
+    program, errors = full_parse(parser.text)
+    parser.settle_offsets()
+    assert parser.program == program
+    if program is not None:
+        assert lines_of(parser.program) == lines_of(program)
+    else:
+        assert [error.message for error in parser.errors][:1] == errors[:1]
+
+
+def test_random_edits_match_full_reparse():
+    pieces = [" ", "\n", "$a = 1;", "echo 2;", "if ($x) { echo 1; }", "x", "1", "+ 2", ";", "}", "else { }",
+              "function g() { return 1; }", "\n// c\n"]
+    rng = random.Random(3)
+    for path in sorted(BENCH_DIR.glob("*.php"))[:3]:
+        original = path.read_text(encoding="utf-8")
+        parser = IncrementalParser(original)
+        for step in range(60):
+            offset = rng.randint(0, len(parser.text))
+            deleted = min(rng.choice([0, 0, 1, 4]), len(parser.text) - offset)
+            parser.edit(offset, deleted, rng.choice(pieces))
+            assert_matches_full_parse(parser)
+            if step % 15 == 14:
+                parser.reset(original)
+
+
+def test_edit_reparses_only_the_touched_item_and_shifts_lines():
+    parser = IncrementalParser(SAMPLE)
+    before = list(parser.program.items)
+    change = parser.edit(SAMPLE.index("return 2"), len("return 2"), "return 20;\n}\npublic function n() {\nreturn 3")
+    assert not change.full and change.reparsed == 1 and change.reused == len(before) - 1
+    after = parser.program.items
+    assert after[0] is before[0] and after[1] is not before[1] and after[2] is before[2]
+    assert after[-1].exprs[0].lineno == 10
+    assert_matches_full_parse(parser)
+
+    lineno = after[-1].exprs[0].lineno
+    change = parser.edit(0, 0, "\n\n")
+    assert change.full  # la edicion toca `<?php`
+    parser.edit(parser.text.index("$total = 0;"), 0, "\n")
+    assert parser.program.items[-1].exprs[0].lineno == lineno + 3
+    assert_matches_full_parse(parser)
+
+
+def test_broken_item_reports_errors_and_recovers_incrementally():
+    parser = IncrementalParser(SAMPLE)
+    anchor = SAMPLE.index("echo $total;")
+    typed = "$y = $total +"
+    for idx, char in enumerate(typed):
+        change = parser.edit(anchor + idx, 0, char)
+        assert not change.full
+    assert parser.program is None and parser.error_count
+    assert_matches_full_parse(parser)
+    change = parser.edit(anchor + len(typed), 0, " 1;\n")
+    assert not change.full and parser.errors == []
+    assert_matches_full_parse(parser)
+
+
+def test_lost_php_tags_fall_back_to_full_parse():
+    parser = IncrementalParser(SAMPLE)
+    close = parser.text.rindex("?>")
+    change = parser.edit(close, 2, "")
+    assert change.full and parser.program is None
+    program, errors = full_parse(parser.text)
+    assert [error.message for error in parser.errors] == errors
+    parser.edit(close, 0, "?>")
+    assert parser.program is not None
+    assert_matches_full_parse(parser)
@@ -0,0 +1,58 @@
+from backend.cli import main
+from backend.indexer import ProjectIndex
+
+CODE = """<?php
+class Greeter {
+    public function greet($name) { echo $name; }
+}
+function run() {
+    $g = new Greeter();
+    $g->greet("a");
+    $g->greet("b");
+}
+run();
+?>"""
+
+
+def test_index_answers_definition_and_caller_queries(tmp_path):
+    src = tmp_path / "app.php"
+    src.write_text(CODE, encoding="utf-8")
+    index = ProjectIndex(tmp_path / "idx.sqlite")
+
+    assert index.index_paths([tmp_path])["updated"] == 1
+    assert index.index_paths([tmp_path])["updated"] == 0  # mismo hash: sin trabajo
+
+    (definition,) = index.find_definitions("greet")
+    assert definition["kind"] == "method" and definition["owner"] == "Greeter" and definition["lineno"] == 3
+
+    callers = index.callers("Greeter::greet")
+    assert [c["lineno"] for c in callers] == [7, 8]
+    first = callers[0]
+    assert CODE[first["start"]:first["end"]] == "greet"
+    assert [r["lineno"] for r in index.find_references("run", kind="call")] == [10]
+
+    src.write_text(CODE.replace('$g->greet("b");\n', ""), encoding="utf-8")
+    assert index.index_paths([tmp_path])["updated"] == 1
+    assert len(index.callers("Greeter::greet")) == 1
+
+
+def test_reference_spans_skip_declarations_on_the_same_line():
+    code = "<?php\nfunction f($a) { return $a + f($a); }\n?>"
+    index = ProjectIndex()
+    index.index_file("rec.php", code)
+    (call,) = index.find_references("f", kind="call")
+    assert (call["start"], call["end"]) == (code.index("f($a);"), code.index("f($a);") + 1)
+    reads = [(r["start"], r["end"]) for r in index.find_references("$a", kind="var")]
+    assert [code[start:end] for start, end in reads] == ["$a", "$a"]
+    assert [start for start, _ in reads] == [code.index("$a +"), code.index("$a);")]
+
+
+def test_cli_queries_index(tmp_path, capsys):
+    (tmp_path / "app.php").write_text(CODE, encoding="utf-8")
+    db = str(tmp_path / "idx.sqlite")
+
+    assert main(["index", str(tmp_path), "--db", db]) == 0
+    capsys.readouterr()
+    assert main(["where", "Greeter", "--db", db]) == 0
+    assert "class" in capsys.readouterr().out
+    assert main(["callers", "missing", "--db", db]) == 1
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from backend.cli import main
+from backend.facade import CompilerFacade
+from backend.ir import IRMachine, build_ir, run_ir
+from backend.vm import parse_program, run_source
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+SAMPLE = """<?php
+function sq($x) { return $x * $x; }
+function label($n, $suffix = "!") { return $n > 1 ? "muchos" . $suffix : "uno" . $suffix; }
+class Box {
+    public function __construct($v) { $this->v = $v; $this->items = []; }
+    public function add($x) { $this->items[count($this->items)] = $x; return $this; }
+}
+$t = 0;
+for ($i = 0; $i < 10; $i++) { $t = $t + sq($i) + sq($i); }
+$a = [1, [2, 3]]; $b = $a; $b[1][0] = 9;
+$m = [];
+foreach ($a as $k => $v) { $m[$k] = $k && $v; }
+$box = new Box(2); $box->add(1)->add($a);
+$j = 3; $w = $j++ + ++$j;
+echo $t, " ", $a[1][0], $b[1][0], " ", label(count($box->items)), label(1, "?"), " ", $w, $j, count($m), 7 / 2;
+?>"""
+
+
+def build(code: str, optimize: bool = True):
+    program, error = parse_program(code)
+    assert program is not None, error
+    return build_ir(program, optimize=optimize)
+
+
+def test_ir_matches_vm_output_with_and_without_passes():
+    programs = [path.read_text(encoding="utf-8") for path in sorted(BENCH_DIR.glob("*.php"))]
+    programs.append(SAMPLE)
+    for code in programs:
+        expected = run_source(code)
+        for optimize in (False, True):
+            module, _ = build(code, optimize)
+            actual = run_ir(module)
+            assert actual.ok, actual.error
+            assert actual.output == expected.output
+
+
+def test_passes_shrink_ir_and_executed_instructions():
+    plain, _ = build(SAMPLE, optimize=False)
+    module, report = build(SAMPLE)
+    assert report.before == plain.instruction_count() > report.after == module.instruction_count()
+    for name in ("copias propagadas", "subexpresiones comunes", "llamadas expandidas en linea", "constantes plegadas"):
+        assert report.counts.get(name), name
+    assert IRMachine(module).run().steps < IRMachine(plain).run().steps
+
+    dump = module.dump()
+    assert "function <main>():" in dump and " = phi [b" in dump
+    # sq() se expande en linea y la segunda llamada es una subexpresion comun.
+    main_dump = dump.split("\n\n")[0]
+    assert "call sq(" not in main_dump and main_dump.count(" * ") == 1
+
+
+def test_cse_keeps_array_union_order():
+    code = '<?php $a = ["x" => 1]; $b = ["x" => 2]; $c = $a + $b; $d = $b + $a; echo $c["x"], $d["x"]; ?>'
+    assert run_source(code).output == "12"
+    for optimize in (False, True):
+        module, _ = build(code, optimize)
+        assert run_ir(module).output == "12"
+
+
+def test_runtime_errors_and_limits_match_vm():
+    code = '<?php\nfunction f($a, $b) { return $a; }\necho "antes";\n$x = 1 / 1;\necho $x . nope();\n?>'
+    module, _ = build(code)
+    result = run_ir(module)
+    assert not result.ok and result.output == "antes"
+    assert "Call to undefined function nope()" in result.error and result.lineno == 5
+
+    for snippet in ("echo f(1);", "function r($n) { return r($n + 1); } echo r(1);", "echo 1 % 0;"):
+        code = f"<?php function f($a, $b) {{ return $a; }} {snippet} ?>"
+        expected, actual = run_source(code), run_ir(build(code)[0])
+        assert not actual.ok and actual.error == expected.error
+
+    looping, _ = build("<?php $i = 0; while (true) { $i = $i + 1; } ?>")
+    result = IRMachine(looping, max_steps=1000).run()
+    assert not result.ok and "aborted" in result.error
+
+
+def test_facade_and_cli_ir_backend(tmp_path, capsys):
+    assert CompilerFacade().execute("<?php echo 1 + 2; ?>", backend="ir").output == "3"
+
+    src = tmp_path / "prog.php"
+    src.write_text("<?php function sq($x) { return $x * $x; } echo sq(12); ?>", encoding="utf-8")
+    assert main(["run", "--backend", "ir", str(src)]) == 0
+    assert capsys.readouterr().out == "144"
+    assert main(["run", "--backend", "ir", "--dis", str(src)]) == 0
+    assert "echo 144" in capsys.readouterr().out
+    assert main(["run", "--backend", "ir", "--no-opt", "--dis", str(src)]) == 0
+    assert "call sq(" in capsys.readouterr().out
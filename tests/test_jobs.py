@@ -0,0 +1,92 @@
+import threading
+
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade
+from backend.jobs import Cancelled, CancelToken, JobManager
+from backend.semantic import SemanticAnalyzer
+from backend.vm import parse_program
+
+SAMPLE = """<?php
+function doble($x) { return $x * 2; }
+$a = doble(4);
+echo $a;
+?>"""
+
+
+def test_newer_job_supersedes_queued_and_running_ones():
+    jobs = JobManager()
+    started, release = threading.Event(), threading.Event()
+
+    def slow(cancel):
+        started.set()
+        release.wait(5)
+        cancel.check()
+        return "viejo"
+
+    first = jobs.submit("doc-1", "semantic", slow)
+    started.wait(5)
+    queued = jobs.submit("doc-1", "semantic", lambda cancel: "en cola")
+    other = jobs.submit("doc-1", "run", lambda cancel: "otra etapa")
+    newest = jobs.submit("doc-1", "semantic", lambda cancel: "nuevo")
+    release.set()
+
+    for future in (first, queued):
+        try:
+            future.result(5)
+        except Cancelled:
+            pass
+        else:
+            raise AssertionError("trabajo reemplazado no cancelado")
+    assert other.result(5) == "otra etapa"
+    assert newest.result(5) == "nuevo"
+    jobs.shutdown()
+
+
+def test_cancel_token_stops_semantic_visitor_and_lint_walk():
+    program, _ = parse_program(SAMPLE)
+    cancel = CancelToken()
+    cancel.cancel()
+    facade = CompilerFacade()
+    for run in (
+        lambda: SemanticAnalyzer(cancel=cancel).analyze(program),
+        lambda: facade.lint_engine.run(program, cancel=cancel),
+        lambda: facade.compile(SAMPLE, cancel=cancel),
+    ):
+        try:
+            run()
+        except Cancelled:
+            pass
+        else:
+            raise AssertionError("el recorrido no consulto el token")
+    # Sin cancelar el resultado es el mismo que sin token.
+    assert facade.compile(SAMPLE, cancel=CancelToken()).__dict__ == facade.compile(SAMPLE).__dict__
+
+
+def test_edit_cancels_document_jobs_and_results_carry_version():
+    store = DocumentStore()
+    document = store.open(SAMPLE)
+    facade = CompilerFacade()
+    jobs = JobManager()
+    inside, edited = threading.Event(), threading.Event()
+
+    def job(cancel):
+        with document.lock:
+            inside.set()
+            edited.wait(0.2)
+            return facade.analyze_document(document, ["semantic", "lint"], cancel=cancel)
+
+    future = jobs.submit(document.doc_id, "semantic", job)
+    inside.wait(5)
+    assert jobs.cancel(document.doc_id) == 1
+    edited.set()
+    try:
+        future.result(5)
+    except Cancelled:
+        pass
+    else:
+        raise AssertionError("la edicion no cancelo el analisis")
+
+    store.apply_edits(document.doc_id, 1, [{"offset": SAMPLE.index("4"), "deleted": 1, "text": "5"}])
+    result = jobs.run(document.doc_id, "semantic", lambda cancel: facade.analyze_document(document, cancel=cancel))
+    assert result["ok"] and result["version"] == 1
+    jobs.shutdown()
@@ -0,0 +1,55 @@
+from backend.facade import CompilerFacade
+from backend.lexer import PhpLexer
+from backend.parser import build_parser
+from backend.semantic import LintConfig, LintEngine
+
+
+def parse(code: str):
+    parser = build_parser()
+    ast = parser.parse(code, lexer=PhpLexer().lexer)
+    assert parser.error_count == 0
+    return ast
+
+
+def rules_of(messages):
+    return sorted(m.rule for m in messages)
+
+
+def test_all_rules_report_in_single_pass():
+    code = """<?php
+    function f($a) {
+        $unused = 1;
+        return $a;
+        echo $a;
+    }
+    $arr = [1 => 'a', '1' => 'b', 'k' => 2];
+    if ($arr == null) { echo $arr; }
+    ?>"""
+    engine = LintEngine()
+    messages = engine.run(parse(code))
+
+    assert rules_of(messages) == [
+        "duplicate-array-key",
+        "loose-comparison",
+        "unreachable-code",
+        "unused-variable",
+    ]
+    unused = next(m for m in messages if m.rule == "unused-variable")
+    assert "$unused" in unused.message
+    assert all(entry["calls"] > 0 for entry in engine.timings())
+
+
+def test_config_disables_rules():
+    code = "<?php $x = 1; if ($x == false) { echo 1; } ?>"
+    engine = LintEngine(LintConfig(enabled={"loose-comparison": False}))
+    messages = engine.run(parse(code))
+
+    assert "loose-comparison" not in engine.stats
+    assert rules_of(messages) == []
+
+
+def test_lint_messages_do_not_fail_compilation():
+    result = CompilerFacade().compile("<?php $x = 1; ?>")
+
+    assert result.ok is True
+    assert [m["rule"] for m in result.lint_messages] == ["unused-variable"]
@@ -0,0 +1,107 @@
+import csv
+import json
+import math
+
+from backend import metrics
+from backend.cli import main
+from backend.facade import CompilerFacade
+from backend.metrics import aggregate, batch_ops, collect_columns, collect_metrics
+from backend.outline import scan_spans
+
+SAMPLE = """<?php
+function clasificar($n) {
+    if ($n > 10 && $n < 20) {
+        while ($n > 0) {
+            if ($n % 2 == 0) { $n = $n - 2; } else { $n = $n - 1; }
+        }
+    } elseif ($n < 0 || $n == 5) {
+        return $n > 100 ? 1 : 0;
+    }
+    return $n;
+}
+
+class Caja {
+    public function abrir($x) {
+        foreach ($x as $v) { echo $v; }
+        return true;
+    }
+}
+$y = clasificar(3);
+?>"""
+
+
+def rows(table):
+    return [dict(zip(table, values)) for values in zip(*table.values())]
+
+
+def test_function_and_file_metrics():
+    report = aggregate([collect_columns(SAMPLE, "a.php")])
+    functions = {row["name"]: row for row in rows(report.functions)}
+    assert list(functions) == ["clasificar", "Caja::abrir"]
+    first = functions["clasificar"]
+    # if, &&, while, if, elseif, ||, ternario
+    assert (first["start_line"], first["end_line"], first["loc"]) == (2, 11, 10)
+    assert (first["complexity"], first["max_nesting"]) == (8, 3)
+    second = functions["Caja::abrir"]
+    assert (second["start_line"], second["end_line"], second["complexity"], second["max_nesting"]) == (14, 17, 2, 1)
+
+    (row,) = rows(report.files)
+    assert (row["loc"], row["sloc"], row["functions"], row["complexity"], row["max_nesting"]) == (20, 17, 2, 9, 3)
+    assert row["syntax_errors"] == 0
+    assert row["tokens"] == sum(report.token_kinds["count"]) == first["tokens"] + second["tokens"] + 11
+
+
+def test_halstead_matches_a_direct_count():
+    spans = [span for span in scan_spans(SAMPLE) if span[0] not in ("PHP_OPEN", "PHP_CLOSE")]
+    operands = [(span[0], span[1]) for span in spans if span[0] in metrics.OPERANDS]
+    operators = [span[0] for span in spans if span[0] not in metrics.OPERANDS + ("RPAREN", "RBRACKET", "RBRACE")]
+    (row,) = rows(aggregate([collect_columns(SAMPLE, "a.php")]).files)
+    assert (row["operators"], row["operands"]) == (len(operators), len(operands))
+    assert (row["distinct_operators"], row["distinct_operands"]) == (len(set(operators)), len(set(operands)))
+    volume = (len(operators) + len(operands)) * math.log2(len(set(operators)) + len(set(operands)))
+    assert row["volume"] == round(volume, 2)
+    assert row["difficulty"] == round(len(set(operators)) / 2 * len(operands) / len(set(operands)), 2)
+
+
+def test_corpus_aggregates_match_each_file_alone(tmp_path):
+    codes = {
+        "a.php": SAMPLE,
+        "b.php": "<?php\nfunction f($a) { return $a ? $a : 1; }\nfunction g() { return f(2) || f(0); }\n?>",
+        "c.php": "<?php\n$x = ;\n?>",
+        "d.php": "<?php\necho 'hola';\n?>",
+    }
+    for name, code in codes.items():
+        (tmp_path / name).write_text(code, encoding="utf-8")
+    serial = collect_metrics([tmp_path], workers=1, use_numpy=False)
+    assert serial.to_dict() == collect_metrics([tmp_path], workers=2, use_numpy=False).to_dict()
+    assert serial.files["syntax_errors"] == [0, 0, 1, 0] and serial.files["functions"] == [2, 2, 0, 0]
+
+    backends = [batch_ops(False)] + ([batch_ops(True)] if metrics.np is not None else [])
+    items = [collect_columns(code, str(tmp_path / name)) for name, code in codes.items()]
+    for ops in backends:
+        alone = [aggregate([item], ops) for item in items]
+        together = aggregate(items, ops)
+        for table in ("files", "functions", "token_kinds"):
+            columns = getattr(together, table)
+            assert columns == {key: [v for report in alone for v in getattr(report, table)[key]] for key in columns}
+
+
+def test_cli_metrics_writes_columnar_tables(tmp_path, capsys):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.php").write_text(SAMPLE, encoding="utf-8")
+    assert main(["metrics", str(src), "--table", "functions", "--workers", "1"]) == 0
+    lines = list(csv.reader(capsys.readouterr().out.splitlines()))
+    assert lines[0][:2] == ["path", "name"] and [line[1] for line in lines[1:]] == ["clasificar", "Caja::abrir"]
+
+    out = tmp_path / "out"
+    assert main(["metrics", str(src), "-o", str(out), "--format", "json", "--workers", "1"]) == 0
+    data = json.loads((out / "files.json").read_text(encoding="utf-8"))
+    assert data["rows"] == 1 and data["columns"]["complexity"] == [9]
+    assert main(["metrics", str(src), "-o", str(out), "--workers", "1"]) == 0
+    with (out / "token_kinds.csv").open(encoding="utf-8") as fh:
+        assert next(csv.reader(fh)) == ["path", "kind", "count"]
+
+    assert CompilerFacade(tmp_path).metrics(["src"], workers=1).files["loc"] == [20]
+    assert main(["metrics", str(tmp_path / "nada.php"), "--workers", "1"]) == 1
+    assert "nada.php" in capsys.readouterr().err
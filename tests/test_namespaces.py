@@ -0,0 +1,42 @@
+from backend.facade import CompilerFacade
+from backend.semantic.names import CLASS, FUNCTION, NameResolver
+
+
+def messages(code: str):
+    return [m["message"] for m in CompilerFacade().compile(code).semantic_messages]
+
+
+def test_resolver_applies_aliases_and_global_fallback():
+    resolver = NameResolver()
+    resolver.enter_namespace(["Lib", "Util"])
+    resolver.declare(CLASS, "Str", object())
+    resolver.declare(FUNCTION, "pad", object())
+    resolver.enter_namespace([])
+    resolver.declare(FUNCTION, "strlen", object())
+
+    resolver.enter_namespace(["App"])
+    resolver.add_use(["Lib", "Util"])
+    assert resolver.resolve_class(["Util", "Str"]).qualified == "Lib\\Util\\Str"
+    assert resolver.resolve_function(["Util", "pad"]).qualified == "Lib\\Util\\pad"
+    assert resolver.resolve_function(["strlen"]).qualified == "strlen"
+    assert resolver.resolve_class(["Str"]) is None
+
+
+def test_same_names_in_different_namespaces_do_not_collide():
+    code = """<?php
+    namespace Lib\\Text;
+    function fmt($s) { return $s; }
+    class Box { public function get() { return 1; } }
+    namespace App;
+    use Lib\\Text;
+    function fmt($s) { return $s; }
+    echo fmt("a") . Text\\fmt("b");
+    $b = new Text\\Box();
+    echo $b->get();
+    $c = new Box();
+    ?>"""
+    found = messages(code)
+
+    assert not any("already declared" in m for m in found)
+    assert not any("undefined function" in m for m in found)
+    assert found == ["[Semantic] Class 'App\\Box' not found (linea 11)"]
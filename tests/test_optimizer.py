@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from backend import ast_nodes as ast
+from backend.cli import main
+from backend.optimizer import fold_constants
+from backend.vm import compile_program, parse_program, run_module, run_source
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+SAMPLE = """<?php
+$secs = 2 * 60 * 60;
+$name = "app" . "-" . "v" . 2 . $secs . "x" . "y";
+if (false) { echo "never"; } elseif (1 > 2) { echo "no"; } elseif ($secs) { echo "d"; } else { echo "e"; }
+if (true && 1) { echo "yes"; } else { echo "no"; }
+while (false) { echo "loop"; }
+echo $name, 10 / 4, -3 + 1, !true ? "a" : "b" . PHP_EOL;
+echo "abc" + 1, "|", 7 % 0;
+?>"""
+
+
+def fold(code: str):
+    program, error = parse_program(code)
+    assert program is not None, error
+    return program, *fold_constants(program)
+
+
+def test_folds_expressions_concat_chains_and_prunes_branches():
+    original, folded, report = fold(SAMPLE)
+    secs, concat = folded.items[0].decls[0][1], folded.items[1].decls[0][1]
+    assert secs == ast.NumberLit(7200)
+    assert [getattr(part, "value", None) for part in (concat.left.left, concat.right)] == ["app-v2", "xy"]
+
+    pruned_if = folded.items[2]
+    assert isinstance(pruned_if, ast.IfStmt) and isinstance(pruned_if.cond, ast.Var) and not pruned_if.elifs
+    assert isinstance(folded.items[3], ast.Block)
+    assert not any(isinstance(item, ast.WhileStmt) for item in folded.items)
+
+    echo = folded.items[4]
+    assert echo.exprs[1:] == [ast.NumberLit(2.5), ast.Unary("-", ast.NumberLit(2)), ast.StringLit("b\\n")]
+    # Lo que fallaria (o avisaria) en ejecucion no se pliega.
+    assert [type(expr).__name__ for expr in folded.items[5].exprs] == ["Binary", "StringLit", "Binary"]
+
+    assert report.counts() == {"expr": 5, "concat": 1, "if": 2, "while": 1, "ternary": 1}
+    assert report.nodes_after < report.nodes_before
+    assert isinstance(original.items[4], ast.WhileStmt)  # el AST original no se modifica
+
+
+def test_folding_preserves_program_output():
+    programs = [path.read_text(encoding="utf-8") for path in sorted(BENCH_DIR.glob("*.php"))]
+    programs.append(SAMPLE.replace(', "|", 7 % 0', ""))
+    # Los pares sin clave de un arreglo literal llevan `None` como clave.
+    programs.append('<?php\n$a = [1, 2 + 3, 3]; $b = ["x" => 1 + 1, 4];\necho count($a) . $a[1] . $b["x"] . $b[0];\n?>')
+    # Los enteros que desbordan se pliegan como literales float.
+    programs.append('<?php\necho PHP_INT_MAX + 1, " ", PHP_INT_MAX * 3, " ", -PHP_INT_MIN;\n?>')
+    for code in programs:
+        _, folded, _ = fold(code)
+        assert run_module(compile_program(folded)).output == run_source(code).output
+
+
+def test_cli_optimize_and_run_with_fold(tmp_path, capsys):
+    src = tmp_path / "cfg.php"
+    src.write_text('<?php\nif (1 + 1 == 2) { echo "on" . "!"; }\n?>', encoding="utf-8")
+    assert main(["optimize", str(src)]) == 0
+    out = capsys.readouterr().out
+    assert '"on" . "!" -> "on!"' in out and "if (1 + 1 == 2)" in out
+    assert main(["run", "--fold", str(src)]) == 0
+    assert capsys.readouterr().out == "on!"
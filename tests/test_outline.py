@@ -0,0 +1,78 @@
+from backend.ast_nodes import ClassDecl, FunctionDecl
+from backend.cli import main
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade, parse_source
+from backend.outline import outline
+
+SAMPLE = r"""<?php
+namespace App\Util;
+use App\Base, Lib\Helper;
+
+function suma($a, $b = 2) {
+    if ($a > 0) { return $a + $b; }
+    return 0;
+}
+
+class Caja {
+    public static function crear($x = [1, 2], $y) { return new Caja(); }
+    private function oculto() { $z = "{"; }
+    function normal() { }
+}
+?>"""
+
+
+def test_outline_matches_the_full_parse():
+    code = SAMPLE.replace("namespace App\\Util;\nuse App\\Base, Lib\\Helper;\n", "")
+    ast = parse_source(code).ast
+    parsed = {}
+    for node in ast.items:
+        if isinstance(node, FunctionDecl):
+            parsed[node.name] = ("function", len(node.params), node.lineno)
+        elif isinstance(node, ClassDecl):
+            parsed[node.name] = ("class", None, node.lineno)
+            for member in node.members:
+                parsed[f"{node.name}::{member.name}"] = ("method", len(member.params), member.lineno)
+    skimmed = {
+        item.qualified: (item.kind, None if item.kind == "class" else len(item.params), item.lineno)
+        for top in outline(code)
+        for item in top.walk()
+    }
+    assert skimmed == parsed
+
+
+def test_outline_reports_headers_modifiers_and_spans():
+    items = outline(SAMPLE)
+    assert [item.kind for item in items] == ["namespace"]
+    namespace = items[0]
+    assert [(child.kind, child.name) for child in namespace.children] == [
+        ("use", "App\\Base"), ("use", "Lib\\Helper"), ("function", "suma"), ("class", "Caja"),
+    ]
+    suma, caja = namespace.children[2:]
+    assert suma.qualified == "App\\Util\\suma" and suma.params == ["$a", "$b = 2"]
+    assert (suma.lineno, suma.end_lineno) == (5, 8) and SAMPLE[suma.start:suma.end].endswith("return 0;\n}")
+    methods = {m.name: m for m in caja.children}
+    assert methods["crear"].params == ["$x = [1, 2]", "$y"]
+    assert (methods["crear"].visibility, methods["crear"].is_static) == ("public", True)
+    assert SAMPLE[methods["crear"].start:].startswith("public static function crear")
+    assert (methods["oculto"].visibility, methods["normal"].visibility) == ("private", None)
+    assert caja.end_lineno == 14 and namespace.end_lineno == 14
+
+
+def test_outline_survives_broken_code_and_uses_document_tokens():
+    broken = "<?php\nfunction a($x) { if ($x) {\n  $y = ;\n}\nfunction b() { }\n"
+    items = outline(broken)
+    # La llave sin cerrar de `a` se traga a `b`, pero el esquema no falla.
+    assert [item.name for item in items] == ["a"] and items[0].end_lineno == 5
+
+    document = DocumentStore().open(SAMPLE)
+    facade = CompilerFacade()
+    assert facade.outline_document(document) == facade.outline(SAMPLE)
+
+
+def test_cli_outline(tmp_path, capsys):
+    source = tmp_path / "caja.php"
+    source.write_text(SAMPLE, encoding="utf-8")
+    assert main(["outline", str(source)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["2", "namespace", "App\\Util"]
+    assert "method     public static crear($x = [1, 2], $y)" in lines[-3]
@@ -0,0 +1,98 @@
+import random
+from dataclasses import fields, is_dataclass
+
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade, parse_source
+from backend.parser import IncrementalParser
+from backend.positions import NodeSpan, SpanIndex, index_program
+
+SAMPLE = """<?php
+function doble($x) { return $x * 2; }
+class K { public static function m($y = 1) { return ($y + 2) * 3; } }
+$a = 1;
+$b = $a + 2.5;
+if ($a > 0) { echo "si" . $b; }
+?>"""
+
+
+def spans_of(node):
+    out, stack = [], [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif is_dataclass(item):
+            out.append((type(item).__name__, item.start, item.end))
+            stack.extend(reversed([getattr(item, f.name) for f in fields(item)]))
+    return out
+
+
+def test_nodes_carry_offsets_also_after_incremental_edits():
+    program = parse_source(SAMPLE).ast
+    klass = program.items[1]
+    assert SAMPLE[klass.start:klass.end].startswith("class K {") and SAMPLE[klass.end - 1] == "}"
+    method = klass.members[0]
+    assert SAMPLE[method.start:method.end].startswith("public static function m(")
+    decl = program.items[3]
+    assert SAMPLE[decl.start:decl.end] == "$b = $a + 2.5;"
+
+    # Los corrimientos pendientes se acumulan entre ediciones y se aplican juntos.
+    parser = IncrementalParser(SAMPLE)
+    edits = [("$a = 1;", "$a  =  1;\n"), ("doble($x)", "doble($x, $z)"), ("echo", "  echo"), ("2.5", "2.5 + 1")]
+    for old, new in edits:
+        parser.edit(parser.text.index(old), len(old), new)
+    parser.settle_offsets()
+    assert spans_of(parser.program) == spans_of(parse_source(parser.text).ast)
+
+
+def test_interval_tree_matches_a_linear_scan():
+    rng = random.Random(5)
+    spans = []
+    for _ in range(400):
+        start = rng.randint(0, 500)
+        spans.append(NodeSpan(start, start + rng.randint(1, 60), object()))
+    index = SpanIndex(spans)
+    for offset in range(-1, 570):
+        expected = sorted((s for s in spans if s.start <= offset < s.end), key=lambda s: (s.start, -s.end))
+        assert index.containing(offset) == expected
+    assert SpanIndex().node_at(3) is None
+
+
+def test_type_at_uses_the_inferred_types():
+    facade = CompilerFacade()
+    document = DocumentStore().open(SAMPLE)
+    result = facade.analyze_document(document)
+    positions = result["positions"]
+    assert len(positions) == len(facade.index_document(document)) > 0
+
+    at = SAMPLE.index("$a + 2.5") + 1
+    assert positions.node_at(at).to_dict()["kind"] == "Var"
+    assert (positions.type_at(at).node.name, positions.type_at(at).type) == ("$a", "int")
+    plus = SAMPLE.index("+ 2.5")
+    assert positions.node_at(plus).to_dict()["kind"] == "Binary" and positions.type_at(plus).type == "float"
+    assert positions.type_at(SAMPLE.index('"si"')).type == "string"
+    assert positions.node_at(SAMPLE.index("?>") + 2) is None
+
+    broken = DocumentStore().open(SAMPLE.replace("$a = 1;", "$a = ;"))
+    assert len(facade.index_document(broken)) == 0
+
+
+def test_queries_visit_a_logarithmic_number_of_tree_nodes(monkeypatch):
+    body = "".join(f"$v{i} = {i} + ($v{i} * 2);\necho $v{i} . \"x\";\n" for i in range(5000))
+    code = f"<?php\n{body}?>"
+    index = index_program(parse_source(code).ast)
+    visits = []
+    stab = index._stab
+
+    def counting(lo, hi, offset, out):
+        visits.append(lo)
+        stab(lo, hi, offset, out)
+
+    monkeypatch.setattr(index, "_stab", counting)
+    rng = random.Random(1)
+    depth = len(index).bit_length()
+    for offset in [rng.randint(0, len(code)) for _ in range(2000)]:
+        visits.clear()
+        found = index.containing(offset)
+        # un recorrido por cada nodo encontrado y uno mas, de altura log2(n)
+        assert len(visits) <= 2 * depth * (len(found) + 1)
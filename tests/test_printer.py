@@ -0,0 +1,84 @@
+import io
+from pathlib import Path
+
+from backend.cli import main
+from backend.facade import CompilerFacade
+from backend.printer import FormatError, format_code, format_stream, minify_stream
+from backend.vm import parse_program
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+SAMPLE = """<?php
+// comentario con ; y }
+function f($a, $b = "x;}") { return ($a + $b) * 2 - -$a . 'it\\'s'; }
+class P { public function m() { return (new P())->v; } }
+$x = 1 - (2 - 3); $y = ($x = 2) ? 1 : (0 ? 2 : 3);
+/* bloque { ; */
+if ($x > 1) { echo "a"; } elseif ($x) { echo "b"; } else { echo "c"; }
+foreach ([1, 2] as $k => $v) { echo $k . 1.5 . $v; }
+for ($i = 0; $i < 3; $i++) { echo !($i == 1), $i++ + ++$i; }
+?>"""
+
+
+def ast_of(code: str):
+    program, error = parse_program(code)
+    assert program is not None, error
+    return program
+
+
+def test_round_trip_and_idempotence():
+    programs = [path.read_text(encoding="utf-8") for path in sorted(BENCH_DIR.glob("*.php"))]
+    programs.append(SAMPLE)
+    for code in programs:
+        for minify in (False, True):
+            out = format_code(code, minify=minify)
+            assert ast_of(out) == ast_of(code)
+            assert format_code(out, minify=minify) == out
+
+
+def test_parentheses_follow_precedence():
+    assert format_code("<?php echo 1 - (2 - 3), (1 - 2) - 3, (1 + 2) * 3; ?>", minify=True) == (
+        "<?php echo 1-(2-3),1-2-3,(1+2)*3;?>"
+    )
+    assert format_code("<?php echo ($a . $b) + 1, - -$x, $a - -1; ?>", minify=True) == (
+        "<?php echo($a.$b)+1,- -$x,$a- -1;?>"
+    )
+    pretty = format_code("<?php function f() { return 1; } $a = 2; ?>")
+    assert pretty == "<?php\nfunction f() {\n    return 1;\n}\n\n$a = 2;\n?>\n"
+
+
+def test_streaming_in_small_chunks_matches_whole_input():
+    for minify in (False, True):
+        parts = []
+        format_stream(io.StringIO(SAMPLE), parts.append, minify=minify, chunk_size=7)
+        assert "".join(parts) == format_code(SAMPLE, minify=minify)
+
+    parts = []
+    minify_stream(io.StringIO(SAMPLE), parts.append, chunk_size=5)
+    tokens = "".join(parts)
+    assert "comentario" not in tokens and ast_of(tokens) == ast_of(SAMPLE)
+
+    for bad in ("echo 1;", "<?php echo 1; ?> echo 2;", "<?php echo (1; ?>"):
+        try:
+            format_stream(io.StringIO(bad), parts.append)
+        except FormatError:
+            pass
+        else:
+            raise AssertionError(bad)
+
+
+def test_facade_and_cli_format(tmp_path, capsys):
+    result = CompilerFacade().format_code("<?php echo 1 + 2; ?>", minify=True)
+    assert result["ok"] and result["code"] == "<?php echo 1+2;?>"
+    assert not CompilerFacade().format_code("<?php echo ; ?>")["ok"]
+
+    src = tmp_path / "prog.php"
+    src.write_text(SAMPLE, encoding="utf-8")
+    out = tmp_path / "min.php"
+    assert main(["format", "--minify", str(src), "-o", str(out)]) == 0
+    assert out.read_text(encoding="utf-8") == format_code(SAMPLE, minify=True)
+    assert main(["format", str(src)]) == 0
+    assert capsys.readouterr().out == format_code(SAMPLE)
+    src.write_text("<?php echo (1; ?>", encoding="utf-8")
+    assert main(["format", "--tokens", str(src)]) == 0
+    assert main(["format", str(src)]) == 1
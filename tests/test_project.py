@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from backend.facade import CompilerFacade
+from backend.project import ProjectAnalyzer
+
+
+def write(root: Path, name: str, code: str) -> Path:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(code, encoding="utf-8")
+    return path
+
+
+def test_included_symbols_are_visible_and_shared_headers_cached(tmp_path):
+    write(tmp_path, "lib/header.php", "<?php function helper($x) { return $x; } ?>")
+    write(tmp_path, "lib/config.php", "<?php $version = 1; ?>")
+    write(tmp_path, "lib/a.php", "<?php require 'header.php'; class A { public function run() { return helper(1); } } ?>")
+    write(tmp_path, "lib/b.php", "<?php include __DIR__ . '/header.php'; include 'config.php'; function b() { return helper(2); } ?>")
+    write(tmp_path, "copy/config.php", "<?php $version = 1; ?>")
+    entry = write(
+        tmp_path,
+        "main.php",
+        "<?php include 'lib/a.php'; include 'lib/b.php'; include 'copy/config.php'; "
+        "$a = new A(); echo $a->run() + b() + $version; ?>",
+    )
+
+    analyzer = ProjectAnalyzer()
+    result = analyzer.analyze(entry)
+
+    assert result.messages == []
+    # cabecera compartida en dos rutas con el mismo contenido: un solo analisis
+    assert analyzer.cache.misses == 5 and analyzer.cache.hits == 1
+    assert len(result.files) == 6
+    assert result.order[-1] == str(entry.resolve())
+    assert str((tmp_path / "lib/header.php").resolve()) in result.graph[str((tmp_path / "lib/a.php").resolve())]
+    assert all(report.ok for report in result.files.values())
+    assert result.ok is True
+
+    again = analyzer.analyze(entry)
+    assert all(report.cached for report in again.files.values())
+
+
+def test_function_declared_in_two_included_files_is_reported(tmp_path):
+    header = "<?php function helper($x) { return $x; } ?>"
+    write(tmp_path, "lib/header.php", header)
+    write(tmp_path, "copy/header.php", header)
+    write(tmp_path, "main.php", "<?php include 'lib/header.php'; include 'copy/header.php'; echo helper(1); ?>")
+    result = CompilerFacade(tmp_path).analyze_project("main.php")
+
+    assert result.ok is False
+    (message,) = result.messages
+    assert "Cannot redeclare function 'helper'" in message["message"]
+    assert str((tmp_path / "lib/header.php").resolve()) in message["message"]
+
+    write(tmp_path, "main.php", "<?php include 'lib/header.php'; function helper($y) { return $y; } ?>")
+    result = CompilerFacade(tmp_path).analyze_project("main.php")
+    # el archivo que incluye lo reporta en su analisis semantico, una sola vez
+    assert result.messages == []
+    (report,) = [report for report in result.files.values() if report.semantic_errors]
+    assert report.semantic_errors == 1 and "already declared" in report.messages[0]["message"]
+
+
+def test_missing_include_is_reported(tmp_path):
+    write(tmp_path, "main.php", "<?php include 'nope.php'; echo 1; ?>")
+    result = CompilerFacade(tmp_path).analyze_project("main.php")
+
+    assert result.ok is False
+    assert "nope.php" in result.messages[0]["message"]
@@ -0,0 +1,116 @@
+import pytest
+
+from backend.cli import main
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade, parse_source
+from backend.outline import scan_spans
+from backend.references import ReferenceIndex, collect_occurrences
+from backend.semantic import SemanticAnalyzer
+
+CODE = """<?php
+function suma($a, $b) { return $a + $b; }
+function doble($a) { $r = $a * 2; $r = $r + 0; return $r; }
+class Caja {
+    public function abrir($n) { return $this->cerrar() + suma($n, 1); }
+    public function cerrar() { return 0; }
+}
+$c = new Caja();
+$total = suma(1, 2) + doble($c->abrir(3));
+echo $total;
+?>"""
+
+
+def occurrences_of(code):
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(parse_source(code).ast)
+    return collect_occurrences(analyzer, scan_spans(code))
+
+
+def texts(code, occurrences, symbol):
+    return [(code[o.start:o.end], o.lineno, o.declaration) for o in occurrences if o.symbol == symbol]
+
+
+def test_declarations_and_uses_resolve_to_their_symbol():
+    occurrences = occurrences_of(CODE)
+    assert texts(CODE, occurrences, "func:suma") == [("suma", 2, True), ("suma", 5, False), ("suma", 9, False)]
+    assert texts(CODE, occurrences, "method:caja::cerrar") == [("cerrar", 5, False), ("cerrar", 6, True)]
+    assert texts(CODE, occurrences, "class:caja") == [("Caja", 4, True), ("Caja", 8, False)]
+    # Cada funcion tiene su propio `$a`; la reasignacion de `$r` es un uso.
+    assert [o.declaration for o in occurrences if o.symbol == "var:suma:$a"] == [True, False]
+    assert [o.declaration for o in occurrences if o.symbol == "var:doble:$a"] == [True, False]
+    assert [o.declaration for o in occurrences if o.symbol == "var:doble:$r"] == [True, False, False, False]
+    assert texts(CODE, occurrences, "var::$total") == [("$total", 9, True), ("$total", 10, False)]
+
+    result = CompilerFacade().compile(CODE, references=True)
+    assert [(ref["symbol"], ref["start"]) for ref in result.references] == [(o.symbol, o.start) for o in occurrences]
+    assert CompilerFacade().compile(CODE).references == []
+
+
+def test_index_updates_one_file_at_a_time():
+    index = ReferenceIndex()
+    other = "<?php\n$x = suma(4, 5);\n?>"
+    index.update("a.php", occurrences_of(CODE), stamp=1)
+    index.update("b.php", occurrences_of(CODE.replace("?>", "") + other[6:]), stamp=1)
+    assert sorted(index.occurrences("func:suma")) == ["a.php", "b.php"]
+
+    found = index.references("a.php", CODE.index("suma(1, 2)") + 2)
+    assert found["symbol"] == "func:suma"
+    assert [(d["path"], d["lineno"]) for d in found["declarations"]] == [("a.php", 2), ("b.php", 2)]
+    assert len(found["uses"]) == 5
+
+    index.update("b.php", occurrences_of(other.replace("suma(4, 5)", "4")), stamp=2)
+    assert list(index.occurrences("func:suma")) == ["a.php"] and index.stamp("b.php") == 2
+    index.remove("a.php")
+    assert index.occurrences("func:suma") == {} and index.references("a.php", 10) is None
+    assert index.occurrence_at("b.php", other.index("$x") + 2).symbol == "var::$x"
+
+
+def test_rename_rewrites_every_occurrence_of_the_symbol():
+    facade = CompilerFacade()
+    store = DocumentStore()
+    document = store.open(CODE)
+    index = ReferenceIndex()
+    result = facade.rename_document(document, index, CODE.index("$a * 2") + 1, "$valor")
+    assert result["symbol"] == "var:doble:$a" and len(result["edits"]) == 2
+    assert result["text"] == CODE.replace("doble($a)", "doble($valor)").replace("$a * 2", "$valor * 2")
+    stamp = index.stamp(document.doc_id)
+
+    result = facade.rename_document(document, index, CODE.index("cerrar()"), "terminar")
+    assert index.stamp(document.doc_id) == stamp  # misma version: no se reindexa
+    renamed = result["text"]
+    assert renamed.count("terminar") == 2 and "cerrar" not in renamed
+    edits = [{"offset": e["offset"], "deleted": e["deleted"], "text": e["text"]} for e in result["edits"]]
+    store.apply_edits(document.doc_id, 1, edits)
+    assert document.text == renamed and facade.diagnose_document(document) == []
+    assert facade.references_document(document, index, renamed.index("terminar"))["symbol"] == "method:caja::terminar"
+
+    with pytest.raises(ValueError):
+        facade.rename_document(document, index, renamed.index("terminar"), "$mal")
+    # Un nombre ya usado en el mismo contenedor no se acepta (uniria dos simbolos).
+    for at, taken in (("doble(", "Suma"), ("$r = $a", "$a"), ("terminar", "abrir")):
+        with pytest.raises(ValueError):
+            facade.rename_document(document, index, renamed.index(at) + 1, taken)
+    assert facade.rename_document(document, index, renamed.index("$r = $a") + 1, "$total")["symbol"] == "var:doble:$r"
+
+    # El nombre de clase de las llamadas y accesos estaticos tambien se renombra.
+    static = "<?php\nclass K { public static function s() { return 1; } }\n$k = new K();\necho K::s();\n?>"
+    other = store.open(static)
+    result = facade.rename_document(other, index, static.index("K {"), "Q")
+    assert result["symbol"] == "class:k" and len(result["edits"]) == 3
+    store.apply_edits(other.doc_id, 1, [dict(edit) for edit in result["edits"]])
+    assert other.text == static.replace("K", "Q") and facade.diagnose_document(other) == []
+    with pytest.raises(ValueError):
+        facade.rename_document(document, index, renamed.index("echo"), "nada")
+    store.apply_edits(document.doc_id, 2, [{"offset": renamed.index("echo"), "deleted": 4, "text": "ech"}])
+    with pytest.raises(ValueError):
+        facade.rename_document(document, index, renamed.index("$total"), "$t")
+
+
+def test_cli_rename(tmp_path, capsys):
+    src = tmp_path / "app.php"
+    src.write_text(CODE, encoding="utf-8")
+    assert main(["rename", str(src), "2:11", "sumar"]) == 0
+    assert capsys.readouterr().out == CODE.replace("suma(", "sumar(")
+    assert main(["rename", str(src), "9:3", "$suma_total", "--write"]) == 0
+    assert src.read_text(encoding="utf-8") == CODE.replace("$total", "$suma_total")
+    assert main(["rename", str(src), "1:1", "otro"]) == 1
@@ -0,0 +1,75 @@
+import json
+
+from backend.documents import DocumentStore
+from backend.facade import CompilerFacade
+from backend.results import MAX_PAGE, ResultError, ResultStore, decode_tokens, encode_tokens, flatten_symbols
+
+SAMPLE = """<?php
+function doble($x) { return $x * 2; }
+$a = doble(4);
+echo $a;
+?>"""
+
+
+def test_pages_cover_the_token_list_without_gaps():
+    document = DocumentStore().open(SAMPLE)
+    result = CompilerFacade().analyze_document(document, ["tokens"])
+    store = ResultStore()
+    result_id = store.store(document.doc_id, "run", {"tokens": result["tokens"]})
+
+    rows, offset = [], 0
+    while True:
+        page = store.page(result_id, "tokens", offset, 7)
+        assert page["total"] == len(result["tokens"]) and page["offset"] == offset
+        if not page["rows"]:
+            break
+        rows.extend(page["rows"])
+        offset += len(page["rows"])
+    assert rows == result["tokens"]
+    assert len(store.page(result_id, "tokens", 0, 10 * MAX_PAGE)["rows"]) == min(len(rows), MAX_PAGE)
+
+
+def test_symbols_are_flattened_with_their_scope():
+    document = DocumentStore().open(SAMPLE)
+    table = CompilerFacade().analyze_document(document)["symbol_table"]
+    rows = flatten_symbols(table)
+    assert len(rows) == sum(len(scope["symbols"]) for scope in table)
+    assert [(row["scope"], row["name"], row["kind"]) for row in rows] == [(0, "doble", "func"), (0, "$a", "var"), (1, "$x", "param")]
+    assert all(set(row) == {"scope", "name", "type", "kind", "value", "lineno"} for row in rows)
+
+
+def test_new_result_replaces_owner_and_old_ones_expire():
+    store = ResultStore(limit=2)
+    first = store.store("doc-1", "run", {"tokens": [1, 2]})
+    second = store.store("doc-1", "run", {"tokens": [3]})
+    other = store.store("doc-2", "run", {"tokens": []})
+    store.store("doc-3", "run", {"tokens": []})
+    for stale in (first, second):
+        try:
+            store.page(stale, "tokens")
+        except ResultError:
+            pass
+        else:
+            raise AssertionError("resultado reemplazado o expulsado sigue disponible")
+    assert store.page(other, "tokens")["total"] == 0
+    try:
+        store.page(other, "symbols")
+    except ResultError:
+        pass
+    else:
+        raise AssertionError("seccion inexistente aceptada")
+    store.discard("doc-2")
+    assert len(store) == 1
+
+
+def test_columnar_tokens_round_trip_and_shrink_the_payload():
+    document = DocumentStore().open(SAMPLE.replace("echo $a;", "echo $a;\n" * 200 + "$b = 1.0 + 1;"))
+    rows = CompilerFacade().analyze_document(document, ["tokens"])["tokens"]
+    columns = encode_tokens(rows)
+    assert decode_tokens(columns) == rows
+    assert len(columns["types"]) == len({row["type"] for row in rows}) < 20
+    assert len(columns["values"]) < 25
+    assert set(columns["lines"][1:]) <= {0, 1}
+    # 1.0 y 1 no se confunden al internar.
+    assert sorted(type(v).__name__ for v in columns["values"] if v == 1) == ["float", "int"]
+    assert len(json.dumps(columns)) * 3 < len(json.dumps(rows))
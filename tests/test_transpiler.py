@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from backend.cli import main
+from backend.facade import CompilerFacade
+from backend.vm import CodeCache, PythonBackend, run_source
+from backend.vm import transpiler
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+
+
+def test_python_backend_matches_vm_output():
+    programs = [path.read_text(encoding="utf-8") for path in sorted(BENCH_DIR.glob("*.php"))]
+    programs.append(
+        """<?php
+        namespace App;
+        class Stack {
+            public function __construct() { $this->items = []; }
+            public function push($v) { $this->items[count($this->items)] = $v; return $this; }
+            public static function of($a, $b) { $s = new Stack(); return $s->push($a)->push($b); }
+        }
+        function label($n, $suffix = "!") { return $n > 1 ? "muchos" . $suffix : "uno" . $suffix; }
+        $s = Stack::of(1, "2");
+        $i = 0;
+        echo label(count($s->items)), $s->items[1] + 3, " ", $i++, ++$i, " ", "10" == "1e1" ? "y" : "n", -7 % 3, 7 / 2;
+        ?>"""
+    )
+    backend = PythonBackend()
+    for code in programs:
+        expected = run_source(code)
+        actual = backend.run(code)
+        assert actual.ok, actual.error
+        assert actual.output == expected.output
+
+
+def test_cache_hit_skips_parsing_and_survives_on_disk(tmp_path, monkeypatch):
+    code = "<?php $a = [1, 2]; $b = $a; $b[0] = 9; echo $a[0], $b[0]; ?>"
+    backend = PythonBackend(CodeCache(directory=tmp_path))
+    assert backend.run(code).output == "19"
+
+    def fail(_code):
+        raise AssertionError("no deberia reparsear")
+
+    monkeypatch.setattr(transpiler, "parse_program", fail)
+    assert backend.run(code).output == "19"
+    assert backend.cache.hits == 1 and backend.cache.misses == 1
+
+    fresh = PythonBackend(CodeCache(directory=tmp_path))
+    assert fresh.run(code).output == "19"
+    assert fresh.cache.hits == 1 and list(tmp_path.iterdir())
+
+
+def test_runtime_errors_report_php_line():
+    backend = PythonBackend()
+    result = backend.run('<?php\necho "antes";\n$x = 1;\n$y = $x . nope();\n?>')
+    assert not result.ok
+    assert result.output == "antes"
+    assert "Call to undefined function nope()" in result.error
+    assert result.lineno == 4
+
+    looping = backend.run("<?php while (true) { $i = 1; } ?>", max_steps=1000)
+    assert not looping.ok and "aborted" in looping.error
+    assert not backend.run("<?php echo 1 +; ?>").ok
+
+
+def test_facade_and_cli_python_backend(tmp_path, capsys):
+    assert CompilerFacade().execute("<?php echo 1 + 2; ?>", backend="python").output == "3"
+
+    src = tmp_path / "prog.php"
+    src.write_text("<?php function sq($x) { return $x * $x; } echo sq(12); ?>", encoding="utf-8")
+    assert main(["run", "--backend", "python", str(src)]) == 0
+    assert capsys.readouterr().out == "144"
+    assert main(["run", "--backend", "python", "--dis", str(src)]) == 0
+    assert "def _main():" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+from backend.cli import main
+from backend.facade import CompilerFacade
+from backend.ir import build_ir, run_ir
+from backend.vm import PythonBackend, parse_program, run_source
+
+
+def output(code: str) -> str:
+    result = run_source(code)
+    assert result.ok, result.error
+    return result.output
+
+
+def test_functions_control_flow_and_php_value_semantics():
+    code = """<?php
+    function fib($n) { if ($n < 2) { return $n; } return fib($n - 1) + fib($n - 2); }
+    function greet($name = "mundo") { return "hola " . $name; }
+    echo fib(15), "|", greet(), "|", greet("ana"), "|";
+    $total = 0;
+    for ($i = 0; $i < 5; $i++) { $total = $total + $i; }
+    $j = 3;
+    while ($j > 0) { $j--; }
+    echo $total, $j, "|", 7 / 2, " ", 6 / 3, " ", -7 % 3, " ", 0.1 + 0.2, "|";
+    echo "1" == "01" ? "y" : "n", "abc" == 0 ? "y" : "n", null == false ? "y" : "n", 1 === 1.0 ? "y" : "n";
+    print "|ok";
+    ?>"""
+    assert output(code) == "610|hola mundo|hola ana|100|3.5 2 -1 0.3|ynyn|ok"
+
+
+def test_backends_agree_on_overflow_null_keys_strlen_and_string_increments():
+    code = """<?php
+    function fact($n) { $r = 1; for ($i = 2; $i <= $n; $i++) { $r = $r * $i; } return $r; }
+    $big = PHP_INT_MAX; $big++;
+    $small = PHP_INT_MIN; $small--;
+    echo PHP_INT_MAX + 1, " ", fact(21), " ", fact(20), " ", PHP_INT_MIN - 1, " ", -PHP_INT_MIN, " ", $big, " ", $small, "|";
+    $a = ["a", null => "b"];
+    $c = [5];
+    $c[null] = 7;
+    echo count($a), $a[""], $a[1] === null ? "y" : "n", count($c), $c[0], $c[""], "|", strlen("héllo"), "|";
+    $s = "a"; $s++; $t = "Az"; $t++; $u = "zz"; $u++; $v = "a9"; $v++; $w = "5"; $w++; $x = "b"; $x--;
+    echo $s, " ", $t, " ", $u, " ", $v, " ", $w, " ", $x;
+    ?>"""
+    expected = (
+        "9.2233720368548E+18 5.1090942171709E+19 2432902008176640000 -9.2233720368548E+18 9.2233720368548E+18"
+        " 9.2233720368548E+18 -9.2233720368548E+18|2by257|6|b Ba aaa b0 6 b"
+    )
+    assert output(code) == expected
+    assert PythonBackend().run(code).output == expected
+    program, error = parse_program(code)
+    assert program is not None, error
+    for optimize in (False, True):
+        assert run_ir(build_ir(program, optimize=optimize)[0]).output == expected
+
+
+def test_arrays_are_copied_on_assignment():
+    code = """<?php
+    $a = [1, 2, 3];
+    $b = $a;
+    $b[0] = 99;
+    $m = ["x" => [1, 2]];
+    $n = $m;
+    $n["x"][1] = 7;
+    $n["y"] = "z";
+    foreach ($n as $k => $v) { echo $k, ":", is_array($v) ? implode(",", $v) : $v, ";"; }
+    echo $a[0], $b[0], $m["x"][1], count($m), count($n);
+    ?>"""
+    assert output(code) == "x:1,7;y:z;199212"
+
+
+def test_classes_with_new_arrow_and_static_calls():
+    code = """<?php
+    class Counter {
+        public function __construct($start) { $this->n = $start; $this->seen = []; }
+        public function add($k) { $this->n = $this->n + $k; $this->seen[$k] = true; return $this; }
+        public static function make() { return new Counter(10); }
+    }
+    $c = Counter::make();
+    echo $c->add(5)->add(2)->n, " ", count($c->seen);
+    ?>"""
+    assert output(code) == "17 2"
+
+
+def test_runtime_errors_report_line_and_partial_output():
+    code = """<?php
+    echo "antes";
+    $x = nope(1);
+    ?>"""
+    result = run_source(code)
+    assert not result.ok
+    assert result.output == "antes"
+    assert "Call to undefined function nope()" in result.error
+    assert result.lineno == 3
+
+    looping = run_source("<?php while (true) { $i = 1; } ?>", max_steps=1000)
+    assert not looping.ok and "aborted" in looping.error
+
+
+def test_facade_and_cli_run(tmp_path, capsys):
+    assert CompilerFacade().execute("<?php echo 1 + 2; ?>").output == "3"
+
+    src = tmp_path / "prog.php"
+    src.write_text("<?php function sq($x) { return $x * $x; } echo sq(12); ?>", encoding="utf-8")
+    assert main(["run", str(src)]) == 0
+    assert capsys.readouterr().out == "144"
+    assert main(["run", "--dis", str(src)]) == 0
+    assert "CALL_FUNCTION" in capsys.readouterr().out